@@ -7,25 +7,40 @@ This script creates standalone executables for different variants:
 - semantics-video: Video processing only
 - semantics-document: Document processing only
 
+The 'shared' target builds the same entry points as one onedir runtime in
+dist/shared/semantics/: a single copy of Python and the libraries in
+_internal/, with every entry point a hard link to (or copy of) one small
+bootloader. Nothing is extracted at startup, unlike the onefile variants.
+
 Usage:
     python build.py all        # Build all variants
     python build.py launcher   # Build main entry point only
     python build.py audio      # Build audio variant only
     python build.py video      # Build video variant only
     python build.py document   # Build document variant only
+    python build.py shared     # Build the shared onedir runtime
+    python build.py compare    # Compare size and startup of onefile vs shared
 """
 
 from __future__ import annotations
 
+import os
 import shutil
+import statistics
 import subprocess
 import sys
+import time
 from pathlib import Path
 
 # Project root directory
 ROOT_DIR = Path(__file__).parent
 DIST_DIR = ROOT_DIR / "dist"
 BUILD_DIR = ROOT_DIR / "build"
+SHARED_DIST_DIR = DIST_DIR / "shared"
+SHARED_DIR = SHARED_DIST_DIR / "semantics"
+
+# Runs per entry point for `python build.py compare`
+COMPARE_RUNS = 5
 
 # Module configurations
 VARIANTS = {
@@ -33,6 +48,7 @@ VARIANTS = {
         "modules": [],
         "hidden_imports": [
             "semantics",
+            "semantics.core.worker",
         ],
         "entry_point": "launcher",  # Uses launcher.py instead of __main__.py
     },
@@ -69,6 +85,19 @@ def get_version() -> str:
         return "dev"
 
 
+def get_exe_name(name: str) -> str:
+    """Get the executable name for a variant, without platform suffix."""
+    return "semantics" if name == "launcher" else f"semantics-{name}"
+
+
+def add_module_data(cmd: list[str], modules: list[str]) -> None:
+    """Add the data files of the given modules to a PyInstaller command."""
+    sep = ";" if sys.platform == "win32" else ":"
+    for module in modules:
+        module_path = ROOT_DIR / "src" / "semantics" / "modules" / module
+        cmd.extend(["--add-data", f"{module_path}{sep}semantics/modules/{module}"])
+
+
 def build_variant(name: str) -> bool:
     """Build a specific variant using PyInstaller.
 
@@ -84,11 +113,7 @@ def build_variant(name: str) -> bool:
 
     config = VARIANTS[name]
 
-    # Determine executable name
-    if name == "launcher":
-        exe_name = "semantics"
-    else:
-        exe_name = f"semantics-{name}"
+    exe_name = get_exe_name(name)
 
     print(f"\n[BUILD] Building {exe_name}...")
 
@@ -110,11 +135,7 @@ def build_variant(name: str) -> bool:
         cmd.extend(["--hidden-import", hidden])
 
     # Add data files for modules (not needed for launcher)
-    if config["modules"]:
-        sep = ";" if sys.platform == "win32" else ":"
-        for module in config["modules"]:
-            module_path = ROOT_DIR / "src" / "semantics" / "modules" / module
-            cmd.extend(["--add-data", f"{module_path}{sep}semantics/modules/{module}"])
+    add_module_data(cmd, config["modules"])
 
     # Determine entry point
     if config.get("entry_point") == "launcher":
@@ -133,6 +154,138 @@ def build_variant(name: str) -> bool:
         return False
 
 
+def link_entry_point(bootloader: Path, target: Path) -> None:
+    """Create a thin entry point that shares the runtime's bootloader.
+
+    Hard links cost no space; filesystems without them get a copy, which is
+    still only the size of the bootloader.
+    """
+    target.unlink(missing_ok=True)
+    try:
+        os.link(bootloader, target)
+    except OSError:
+        shutil.copy2(bootloader, target)
+
+
+def build_shared() -> bool:
+    """Build every entry point as one onedir runtime with shared libraries.
+
+    Returns:
+        True if build succeeded, False otherwise
+    """
+    exe_suffix = ".exe" if sys.platform == "win32" else ""
+    print(f"\n[BUILD] Building shared runtime in {SHARED_DIR}...")
+
+    cmd = [
+        "uv",
+        "run",
+        "python",
+        "-m",
+        "PyInstaller",
+        "--onedir",
+        "--name",
+        "semantics",
+        "--distpath",
+        str(SHARED_DIST_DIR),
+        "--noconfirm",
+        "--clean",
+    ]
+
+    modules = []
+    hidden_imports = ["semantics.cli", "semantics.launcher"]
+    for config in VARIANTS.values():
+        modules.extend(config["modules"])
+        hidden_imports.extend(config["hidden_imports"])
+
+    for hidden in dict.fromkeys(hidden_imports):
+        cmd.extend(["--hidden-import", hidden])
+    add_module_data(cmd, modules)
+
+    cmd.append(str(ROOT_DIR / "src" / "semantics" / "runtime.py"))
+
+    try:
+        subprocess.run(cmd, check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"[ERROR] Build failed for shared runtime: {e}")
+        return False
+
+    bootloader = SHARED_DIR / f"semantics{exe_suffix}"
+    for name in VARIANTS:
+        if name != "launcher":
+            link_entry_point(bootloader, SHARED_DIR / f"{get_exe_name(name)}{exe_suffix}")
+
+    print(f"[OK] Built: {SHARED_DIR}")
+    return True
+
+
+def get_tree_size(path: Path) -> int:
+    """Get the size of a file or directory tree, counting hard links once."""
+    if path.is_file():
+        return path.stat().st_size
+
+    seen: set[tuple[int, int]] = set()
+    total = 0
+    for item in path.rglob("*"):
+        if not item.is_file() or item.is_symlink():
+            continue
+        stat = item.stat()
+        key = (stat.st_dev, stat.st_ino)
+        if key not in seen:
+            seen.add(key)
+            total += stat.st_size
+    return total
+
+
+def time_startup(cmd: list[str]) -> tuple[float, float]:
+    """Time a command's first run and the median of the following runs.
+
+    Returns:
+        First-run and median wall time in milliseconds
+    """
+    timings = []
+    for _ in range(COMPARE_RUNS + 1):
+        start = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=120)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings[0], statistics.median(timings[1:])
+
+
+def compare_builds() -> bool:
+    """Compare size and startup time of the onefile and shared builds.
+
+    Returns:
+        True if both layouts were found, False otherwise
+    """
+    exe_suffix = ".exe" if sys.platform == "win32" else ""
+    onefile = {name: DIST_DIR / f"{get_exe_name(name)}{exe_suffix}" for name in VARIANTS}
+    shared = {name: SHARED_DIR / f"{get_exe_name(name)}{exe_suffix}" for name in VARIANTS}
+
+    missing = [path for path in [*onefile.values(), *shared.values()] if not path.exists()]
+    if missing:
+        print(f"[ERROR] Missing executables: {', '.join(str(path) for path in missing)}")
+        print("Run 'python build.py all' and 'python build.py shared' first.")
+        return False
+
+    onefile_size = sum(get_tree_size(path) for path in onefile.values())
+    shared_size = get_tree_size(SHARED_DIR)
+    print("\n[COMPARE] Size on disk")
+    print(f"   onefile: {onefile_size / 1024 / 1024:8.1f} MB ({len(onefile)} executables)")
+    print(f"   shared:  {shared_size / 1024 / 1024:8.1f} MB (one runtime)")
+
+    print(f"\n[COMPARE] Startup, first run / median of {COMPARE_RUNS} (ms)")
+    print(f"   {'entry point':<30} {'onefile':>17} {'shared':>17}")
+    for name in VARIANTS:
+        args = ["--version"] if name == "launcher" else ["--help"]
+        entry = f"{get_exe_name(name)} {' '.join(args)}"
+        onefile_first, onefile_median = time_startup([str(onefile[name]), *args])
+        shared_first, shared_median = time_startup([str(shared[name]), *args])
+        print(
+            f"   {entry:<30} {onefile_first:8.1f}/{onefile_median:8.1f}"
+            f" {shared_first:8.1f}/{shared_median:8.1f}"
+        )
+    return True
+
+
 def clean_build() -> None:
     """Clean build artifacts."""
     print("[CLEAN] Cleaning build artifacts...")
@@ -170,9 +323,17 @@ def main() -> int:
         clean_build()
         return 0 if success else 1
 
+    elif target == "shared":
+        success = build_shared()
+        clean_build()
+        return 0 if success else 1
+
+    elif target == "compare":
+        return 0 if compare_builds() else 1
+
     else:
         print(f"[ERROR] Unknown target: {target}")
-        print("Valid targets: all, clean, launcher, audio, video, document")
+        print("Valid targets: all, clean, launcher, audio, video, document, shared, compare")
         return 1
 
 
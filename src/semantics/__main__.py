@@ -3,4 +3,8 @@
 from semantics.cli import main
 
 if __name__ == "__main__":
+    # Required for batch worker processes in PyInstaller executables
+    import multiprocessing
+
+    multiprocessing.freeze_support()
     main()
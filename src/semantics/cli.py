@@ -2,6 +2,11 @@
 
 This module provides the main Click-based CLI with automatic module loading
 from the modules/ directory. It also supports extension-based file routing.
+
+Modules are loaded lazily: each module ships a small manifest.py describing
+its name, help summary, flags and extensions, and the module's cli.py (with
+its handlers) is only imported when its subcommand or an auto-routed input
+actually needs it.
 """
 
 from __future__ import annotations
@@ -9,11 +14,15 @@ from __future__ import annotations
 import importlib.util
 import sys
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
 
 import click
 from click_help_colors import HelpColorsGroup
 
+from semantics.core.path import expand_inputs
+from semantics.core.sniff import sniff_media
+from semantics.runtime import get_entry_module
+
 if TYPE_CHECKING:
     from types import ModuleType
 
@@ -82,7 +91,7 @@ def generate_dynamic_help(available_modules: set[str]) -> str:
         "",
         "Extract meaning, not just metadata. Composable AI operations designed for developers scaling intelligent workflows",
         "",
-        "Process files directly with auto-detection based on extension:",
+        "Process files directly with auto-detection based on file content and extension:",
     ]
 
     # Add examples based on available modules
@@ -90,6 +99,7 @@ def generate_dynamic_help(available_modules: set[str]) -> str:
     if "audio" in available_modules:
         examples.append("  semantics -i input.wav -o ./output --transcribe")
         examples.append("  semantics -i input.wav -o ./output --transcribe --extract-metadata")
+        examples.append("  semantics -i ./recordings -o ./output --transcribe --jobs 4")
     if "video" in available_modules:
         examples.append("  semantics -i input.mp4 -o ./output --transcribe")
     if "document" in available_modules:
@@ -123,18 +133,38 @@ def generate_dynamic_help(available_modules: set[str]) -> str:
     return "\n".join(lines)
 
 
+class ModuleManifest(NamedTuple):
+    """Static description of a module, read without importing its CLI."""
+
+    name: str
+    help: str
+    flags: tuple[str, ...]
+    extensions: tuple[str, ...]
+    cli_path: Path
+
+
 class ModuleRegistry:
     """Dynamically loads modules from the modules/ directory.
 
     This registry discovers and loads CLI modules that follow the convention
     of having a cli.py file with a 'cli' Click command exported.
+
+    Modules that also ship a manifest.py are registered lazily by
+    discover_modules(): only the manifest is read up front, and the module's
+    cli.py is imported on the first get_command() call for that module.
     """
 
     def __init__(self) -> None:
         """Initialize the registry with empty command storage."""
         self._commands: dict[str, click.Command] = {}
+        self._manifests: dict[str, ModuleManifest] = {}
         self._failed: list[str] = []
 
+    @staticmethod
+    def _modules_dir() -> Path:
+        """Return the directory that holds the module packages."""
+        return Path(__file__).parent / "modules"
+
     def register(self, name: str, cli_path: Path) -> None:
         """Load a single module's CLI from its cli.py file.
 
@@ -162,13 +192,73 @@ class ModuleRegistry:
         except Exception:
             self._failed.append(name)
 
+    def read_manifest(self, name: str, cli_path: Path) -> ModuleManifest | None:
+        """Read the manifest.py that sits next to a module's cli.py.
+
+        Args:
+            name: The module name (e.g., 'audio', 'video')
+            cli_path: Path to the module's cli.py file
+
+        Returns:
+            The parsed manifest, or None if the module has no usable manifest
+        """
+        manifest_path = cli_path.parent / "manifest.py"
+        if not manifest_path.is_file():
+            return None
+
+        try:
+            spec = importlib.util.spec_from_file_location(
+                f"semantics.modules.{name}.manifest", manifest_path
+            )
+            if spec is None or spec.loader is None:
+                return None
+
+            module: ModuleType = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        except Exception:
+            return None
+
+        return ModuleManifest(
+            name=name,
+            help=getattr(module, "HELP", ""),
+            flags=tuple(getattr(module, "FLAGS", ())),
+            extensions=tuple(getattr(module, "EXTENSIONS", ())),
+            cli_path=cli_path,
+        )
+
+    def discover_modules(self, only: str | None = None) -> None:
+        """Discover modules from the modules/ directory without importing them.
+
+        Modules with a manifest.py are recorded for lazy loading. Modules
+        without one are loaded immediately, as load_all_modules() would.
+
+        Args:
+            only: Discover just this module (e.g., 'audio') and ignore the rest
+        """
+        modules_dir = self._modules_dir()
+
+        if not modules_dir.is_dir():
+            return
+
+        for module_path in modules_dir.iterdir():
+            if only is not None and module_path.name != only:
+                continue
+            if module_path.is_dir():
+                cli_file = module_path / "cli.py"
+                if cli_file.exists():
+                    manifest = self.read_manifest(module_path.name, cli_file)
+                    if manifest is None:
+                        self.register(module_path.name, cli_file)
+                    else:
+                        self._manifests[module_path.name] = manifest
+
     def load_all_modules(self) -> None:
         """Discover and load all modules from the modules/ directory.
 
         Scans the modules/ directory for subdirectories containing a cli.py file
         and attempts to load each one. Failed loads are silently recorded.
         """
-        modules_dir = Path(__file__).parent / "modules"
+        modules_dir = self._modules_dir()
 
         if not modules_dir.is_dir():
             return
@@ -179,6 +269,48 @@ class ModuleRegistry:
                 if cli_file.exists():
                     self.register(module_path.name, cli_file)
 
+    def get_command(self, name: str) -> click.Command | None:
+        """Return a module's command, importing its cli.py on first use.
+
+        Args:
+            name: The module name (e.g., 'audio', 'video')
+
+        Returns:
+            The module's Click command, or None if it is unknown or failed to load
+        """
+        if name in self._commands:
+            return self._commands[name]
+
+        manifest = self._manifests.get(name)
+        if manifest is None or name in self._failed:
+            return None
+
+        self.register(name, manifest.cli_path)
+        return self._commands.get(name)
+
+    def get_available_modules(self) -> set[str]:
+        """Return names of modules that are loaded or can be loaded lazily.
+
+        Returns:
+            Set of module names, excluding modules that failed to load
+        """
+        names = set(self._commands) | set(self._manifests)
+        return names - set(self._failed)
+
+    def get_claimed_extensions(self) -> dict[str, str]:
+        """Return the extensions claimed by available module manifests.
+
+        Returns:
+            Dictionary mapping file extensions to module names
+        """
+        available = self.get_available_modules()
+        return {
+            ext: manifest.name
+            for manifest in self._manifests.values()
+            if manifest.name in available
+            for ext in manifest.extensions
+        }
+
     def get_unavailable_modules(self) -> list[str]:
         """Return list of modules that failed to load.
 
@@ -187,6 +319,15 @@ class ModuleRegistry:
         """
         return self._failed.copy()
 
+    @property
+    def manifests(self) -> dict[str, ModuleManifest]:
+        """Return the discovered module manifests.
+
+        Returns:
+            Dictionary mapping module names to their manifests
+        """
+        return self._manifests
+
     @property
     def commands(self) -> dict[str, click.Command]:
         """Return the loaded commands dictionary.
@@ -197,19 +338,304 @@ class ModuleRegistry:
         return self._commands
 
 
-# Load modules first so we can use them in main
+# Discover modules first so we can use them in main. Only the manifests are
+# read here; module CLIs are imported on demand. A semantics-<module> entry
+# point of the shared runtime bundles every module but only offers its own.
 registry = ModuleRegistry()
-registry.load_all_modules()
+registry.discover_modules(only=get_entry_module())
+
+
+# Options of the main group that take a value and are not passed to modules
+_MAIN_VALUE_OPTIONS = ("-i", "--input", "-o", "--output", "-j", "--jobs")
+
+
+def _is_attached_short_option(arg: str) -> bool:
+    """Return True for a main short option with its value attached (-j4)."""
+    return len(arg) > 2 and arg[:2] in _MAIN_VALUE_OPTIONS and arg[1] != "-"
+
+
+def extract_module_flags(args: list[str]) -> list[str]:
+    """Strip the main group's own options from the original arguments.
+
+    Args:
+        args: Original command-line arguments given to the main group
+
+    Returns:
+        The remaining arguments, which are passed on to the routed module
+    """
+    module_flags = []
+    skip_next = False
+    for arg in args:
+        if skip_next:
+            skip_next = False
+            continue
+        if arg in _MAIN_VALUE_OPTIONS:
+            skip_next = True
+            continue
+        if arg.startswith(tuple(f"{opt}=" for opt in _MAIN_VALUE_OPTIONS)):
+            continue
+        if _is_attached_short_option(arg):
+            continue
+        module_flags.append(arg)
+    return module_flags
+
+
+def route_input(input_path: Path, module_flags: list[str], output: str) -> str:
+    """Pick the module that should process an input file.
+
+    The module is chosen from the file's content when its magic bytes are
+    recognised, so mislabeled files and audio-only video containers reach the
+    right module. The extension is used when sniffing is inconclusive.
+
+    Args:
+        input_path: The input file
+        module_flags: Arguments that will be passed to the module
+        output: Output folder, used in suggestions
+
+    Returns:
+        Name of the module to invoke
+
+    Raises:
+        click.ClickException: If no available module can process the file
+    """
+    ext = input_path.suffix.lower()
+    media = sniff_media(input_path)
+    ext_module = EXTENSION_MAP.get(ext) or registry.get_claimed_extensions().get(ext)
+    module_name = (media.module if media is not None else None) or ext_module
+    available_modules = registry.get_available_modules()
+
+    if module_name is None:
+        available = sorted(available_modules)
+        raise click.ClickException(
+            f"Unsupported file extension: {ext}. "
+            f"Available modules: {', '.join(available) if available else 'none'}"
+        )
+
+    # A file whose content contradicts its extension may not support the
+    # requested operations (e.g. --detect-objects on an audio-only .mp4)
+    if module_name != ext_module and module_name in registry.manifests:
+        known_flags = {flag for m in registry.manifests.values() for flag in m.flags}
+        requested = [flag for flag in module_flags if flag in known_flags]
+        supported = registry.manifests[module_name].flags
+        if requested and not any(flag in supported for flag in requested):
+            raise click.ClickException(
+                f"{input_path.name} contains {media.format} {module_name} content; "
+                f"{', '.join(requested)} cannot be applied to it."
+            )
+
+    is_video = ext in AUDIO_COMPATIBLE_VIDEO_EXTENSIONS or module_name == "video"
+
+    # Check if module is available, with fallback logic
+    if module_name not in available_modules:
+        # Check for audio fallback: video files can be processed by audio module
+        # for transcription (audio track extraction)
+        can_fallback_to_audio = (
+            is_video
+            and "audio" in available_modules
+            and any(flag in AUDIO_COMPATIBLE_FLAGS for flag in module_flags)
+        )
+
+        if can_fallback_to_audio:
+            module_name = "audio"
+        else:
+            # Build helpful error message
+            available = sorted(available_modules)
+            available_str = ", ".join(available) if available else "none"
+
+            # Suggest alternative if possible
+            suggestions = []
+            if is_video and "audio" in available_modules:
+                suggestions.append(
+                    f"For transcription, use: semantics audio {input_path} -o {output} --transcribe"
+                )
+
+            error_msg = (
+                f"Module '{module_name}' is not available in this executable. "
+                f"Available modules: {available_str}."
+            )
+            if suggestions:
+                error_msg += "\n" + "\n".join(suggestions)
+
+            raise click.ClickException(error_msg)
+
+    return module_name
+
+
+def run_module(module_name: str, args: list[str]) -> str | None:
+    """Run a module command to completion in the current process.
+
+    This is the unit of work for batch processing, so it never raises and is
+    safe to call from a worker process.
+
+    Args:
+        module_name: Name of the module to run
+        args: Arguments for the module command
+
+    Returns:
+        None on success, otherwise an error message
+    """
+    module_cmd = registry.get_command(module_name)
+    if module_cmd is None:
+        return f"Module '{module_name}' is not available in this executable."
+
+    try:
+        result = module_cmd.main(args, prog_name=module_name, standalone_mode=False)
+    except click.ClickException as e:
+        return e.format_message()
+    except click.Abort:
+        return "Aborted"
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+    if isinstance(result, int) and result != 0:
+        return f"Exited with code {result}"
+    return None
+
+
+def run_batch(
+    ctx: click.Context,
+    inputs: tuple[str, ...],
+    output: str,
+    module_flags: list[str],
+    jobs: int,
+) -> None:
+    """Process every file matched by the inputs and print a summary.
+
+    Each file is routed on its own and written to its own folder below the
+    output folder, mirroring its path relative to the input directory or glob.
+    Files that no available module can process, or whose module supports none
+    of the requested operations, are skipped.
+
+    Args:
+        ctx: The main group's context
+        inputs: Files, directories or glob patterns given with -i
+        output: Output folder for results
+        module_flags: Arguments passed on to each module
+        jobs: Maximum number of files processed in parallel
+    """
+    try:
+        files = expand_inputs(inputs)
+    except FileNotFoundError as e:
+        raise click.BadParameter(
+            f"Path '{e.args[0]}' does not exist.", ctx=ctx, param_hint="'-i' / '--input'"
+        )
+
+    output_path = Path(output)
+    tasks: list[tuple[Path, str, list[str]]] = []
+    destinations: dict[Path, list[Path]] = {}
+    skipped = 0
+    for input_path, relative in files:
+        try:
+            module_name = route_input(input_path, module_flags, output)
+        except click.ClickException:
+            skipped += 1
+            continue
+
+        manifest = registry.manifests.get(module_name)
+        if manifest is not None and not set(manifest.flags) & set(module_flags):
+            skipped += 1
+            continue
+
+        module_args = [str(input_path), "-o", str(output_path / relative)] + module_flags
+        tasks.append((input_path, module_name, module_args))
+        destinations.setdefault(relative, []).append(input_path)
+
+    # Files given directly are named after themselves, so two of them with
+    # the same name would write to the same folder
+    collisions = {
+        relative: paths for relative, paths in destinations.items() if len(paths) > 1
+    }
+    if collisions:
+        lines = [
+            f"   {relative}: {', '.join(str(path) for path in paths)}"
+            for relative, paths in sorted(collisions.items())
+        ]
+        raise click.ClickException(
+            "Inputs would write to the same output folder:\n" + "\n".join(lines)
+        )
+
+    if not tasks:
+        raise click.ClickException(
+            f"No files to process: {len(files)} found, none supported by the requested operations."
+        )
+
+    jobs = min(jobs, len(tasks))
+    click.echo(f"[BATCH] Processing {len(tasks)} file(s) with {jobs} job(s)")
+
+    failures: list[tuple[Path, str]] = []
+    if jobs == 1:
+        for input_path, module_name, module_args in tasks:
+            error = run_module(module_name, module_args)
+            if error is not None:
+                failures.append((input_path, error))
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {
+                pool.submit(run_module, module_name, module_args): input_path
+                for input_path, module_name, module_args in tasks
+            }
+            for future in as_completed(futures):
+                try:
+                    error = future.result()
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                if error is not None:
+                    failures.append((futures[future], error))
+
+    succeeded = len(tasks) - len(failures)
+    click.echo(
+        f"[SUMMARY] {succeeded} succeeded, {len(failures)} failed, {skipped} skipped"
+    )
+    for input_path, error in sorted(failures):
+        click.echo(f"   [FAILED] {input_path}: {error}")
+
+    if failures:
+        ctx.exit(1)
 
 
 class AutoRoutingGroup(HelpColorsGroup):
     """Custom Click Group that supports auto-routing based on -i/--input option.
 
     When -i/--input is provided, this group bypasses normal subcommand resolution
-    and routes directly to the appropriate module based on file extension.
+    and routes directly to the appropriate module based on file content, falling
+    back to the file extension.
     Inherits from HelpColorsGroup to provide colorized help output.
+
+    Module subcommands are resolved through the registry, so a module's CLI is
+    only imported when that subcommand is invoked.
     """
 
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        """List module commands from the registry plus any added commands."""
+        return sorted(set(super().list_commands(ctx)) | registry.get_available_modules())
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        """Get a command, lazily loading the module that provides it."""
+        cmd = super().get_command(ctx, cmd_name)
+        if cmd is not None:
+            return cmd
+        return registry.get_command(cmd_name)
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        """List commands in help using module manifests instead of loading them."""
+        rows = []
+        for name in self.list_commands(ctx):
+            manifest = registry.manifests.get(name)
+            if manifest is not None and name not in registry.commands:
+                rows.append((name, manifest.help))
+                continue
+            cmd = self.get_command(ctx, name)
+            if cmd is None or cmd.hidden:
+                continue
+            limit = formatter.width - 6 - len(name)
+            rows.append((name, cmd.get_short_help_str(limit)))
+
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
     def make_context(
         self,
         info_name: str | None,
@@ -228,11 +654,13 @@ class AutoRoutingGroup(HelpColorsGroup):
             if arg in ("-i", "--input"):
                 has_input = True
                 break
-            if arg.startswith("-i=") or arg.startswith("--input="):
+            if arg.startswith("--input=") or (
+                arg.startswith("-i") and _is_attached_short_option(arg)
+            ):
                 has_input = True
                 break
             # Skip options with values
-            if arg in ("-o", "--output"):
+            if arg in ("-o", "--output", "-j", "--jobs"):
                 i += 2
                 continue
             if arg.startswith("-"):
@@ -250,6 +678,9 @@ class AutoRoutingGroup(HelpColorsGroup):
             extra["ignore_unknown_options"] = True
             # Store original args for later
             self._auto_routing_args = args.copy()
+        elif hasattr(self, "_auto_routing_args"):
+            # Drop args left behind by an earlier invocation that failed
+            del self._auto_routing_args
 
         return super().make_context(info_name, args, parent, **extra)
 
@@ -269,10 +700,10 @@ class AutoRoutingGroup(HelpColorsGroup):
         if ctx.invoked_subcommand is not None:
             return super().invoke(ctx)
 
-        # Get the input value
-        input_file = ctx.params.get("input")
+        # Get the input values
+        inputs = ctx.params.get("input")
 
-        if input_file is None:
+        if not inputs:
             # No input file and no subcommand - let the callback show help
             return super().invoke(ctx)
 
@@ -283,81 +714,170 @@ class AutoRoutingGroup(HelpColorsGroup):
 
         # Extract module flags from original args first (needed for fallback logic)
         original_args = getattr(self, "_auto_routing_args", [])
-        module_flags = []
-        skip_next = False
-        for i, arg in enumerate(original_args):
-            if skip_next:
-                skip_next = False
-                continue
-            if arg in ("-i", "--input", "-o", "--output"):
-                skip_next = True
-                continue
-            if arg.startswith(("-i=", "--input=", "-o=", "--output=")):
-                continue
-            module_flags.append(arg)
+        module_flags = extract_module_flags(original_args)
+
+        # Clean up
+        if hasattr(self, "_auto_routing_args"):
+            del self._auto_routing_args
 
-        # Detect module from extension
-        input_path = Path(input_file)
-        ext = input_path.suffix.lower()
-        module_name = EXTENSION_MAP.get(ext)
+        # Directories, globs and multiple inputs are processed as a batch
+        if len(inputs) > 1 or not Path(inputs[0]).is_file():
+            run_batch(ctx, inputs, output, module_flags, ctx.params.get("jobs") or 1)
+            return
+
+        input_file = inputs[0]
+        module_name = route_input(Path(input_file), module_flags, output)
+        module_args = [input_file, "-o", output] + module_flags
 
-        if module_name is None:
-            available = list(registry.commands.keys())
+        # Invoke the module's CLI command directly, importing it on first use
+        module_cmd = registry.get_command(module_name)
+        if module_cmd is None:
             raise click.ClickException(
-                f"Unsupported file extension: {ext}. "
-                f"Available modules: {', '.join(available) if available else 'none'}"
+                f"Module '{module_name}' is not available in this executable."
             )
 
-        # Check if module is available, with fallback logic
-        if module_name not in registry.commands:
-            # Check for audio fallback: video files can be processed by audio module
-            # for transcription (audio track extraction)
-            can_fallback_to_audio = (
-                ext in AUDIO_COMPATIBLE_VIDEO_EXTENSIONS
-                and "audio" in registry.commands
-                and any(flag in AUDIO_COMPATIBLE_FLAGS for flag in module_flags)
-            )
+        # Create a new context for the module command and invoke it
+        with module_cmd.make_context(module_name, module_args, parent=ctx) as sub_ctx:
+            module_cmd.invoke(sub_ctx)
 
-            if can_fallback_to_audio:
-                module_name = "audio"
-            else:
-                # Build helpful error message
-                available = list(registry.commands.keys())
-                available_str = ", ".join(available) if available else "none"
-
-                # Suggest alternative if possible
-                suggestions = []
-                if ext in AUDIO_COMPATIBLE_VIDEO_EXTENSIONS and "audio" in registry.commands:
-                    suggestions.append(
-                        f"For transcription, use: semantics audio {input_file} -o {output} --transcribe"
-                    )
-
-                error_msg = (
-                    f"Module '{module_name}' is not available in this executable. "
-                    f"Available modules: {available_str}."
-                )
-                if suggestions:
-                    error_msg += "\n" + "\n".join(suggestions)
 
-                raise click.ClickException(error_msg)
+def _serve(ctx: click.Context, param: click.Parameter, value: bool) -> None:
+    """Run this executable as a resident worker (eager --serve callback)."""
+    if not value or ctx.resilient_parsing:
+        return
 
-        module_args = [input_file, "-o", output] + module_flags
+    from semantics.core import worker
 
-        # Clean up
-        if hasattr(self, "_auto_routing_args"):
-            del self._auto_routing_args
+    if not worker.is_supported():
+        raise click.ClickException("--serve requires a POSIX system with Unix domain sockets")
 
-        # Invoke the module's CLI command directly
-        module_cmd = registry.commands[module_name]
+    # Import every module CLI (and its handlers) once, before forking requests
+    module_names = sorted(registry.get_available_modules())
+    for module_name in module_names:
+        registry.get_command(module_name)
 
-        # Create a new context for the module command and invoke it
-        with module_cmd.make_context(module_name, module_args, parent=ctx) as sub_ctx:
-            module_cmd.invoke(sub_ctx)
+    worker.serve(ctx.command, module_names, ctx.info_name or "semantics")
+    ctx.exit(0)
+
+
+def _describe(ctx: click.Context, param: click.Parameter, value: bool) -> None:
+    """Print the version and module manifests as JSON (eager --describe callback).
+
+    Used by the launcher to build its discovery cache without parsing help
+    output.
+    """
+    if not value or ctx.resilient_parsing:
+        return
+
+    import json
+
+    from semantics import __version__
+
+    modules = {
+        name: {
+            "help": manifest.help,
+            "flags": list(manifest.flags),
+            "extensions": list(manifest.extensions),
+        }
+        for name, manifest in sorted(registry.manifests.items())
+        if name in registry.get_available_modules()
+    }
+    click.echo(json.dumps({"version": __version__, "modules": modules}))
+    ctx.exit(0)
+
+
+def _format_size(size: float) -> str:
+    """Format a byte count for display (e.g., '1.5 GB')."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+@click.group(
+    cls=HelpColorsGroup,
+    help_headers_color="yellow",
+    help_options_color="green",
+)
+def cache() -> None:
+    """Inspect and manage the cache of handler results and decoded audio.
+
+    Results are reused when the same handler runs on the same file content
+    with the same options; decoded audio is shared by every handler reading
+    the same content. Audio fingerprints kept by --dedupe are listed and
+    cleared with them. Set SEMANTICS_CACHE_DIR to move the cache,
+    SEMANTICS_CACHE_MAX_SIZE (e.g. 20G) and SEMANTICS_DECODED_MAX_SIZE to
+    change their size limits and SEMANTICS_NO_CACHE=1 to disable them.
+    """
+
+
+@cache.command("stats")
+def cache_stats() -> None:
+    """Show the number of cached results, decoded inputs and fingerprints."""
+    from semantics.core.cache import ResultCache
+    from semantics.core.decode import DecodedAudioCache
+    from semantics.core.fingerprints import FingerprintIndex
+
+    stats = ResultCache().stats()
+    click.echo(f"[CACHE] {stats.path}")
+    click.echo(f"   Entries: {stats.entries}")
+    click.echo(f"   Size: {_format_size(stats.size)} of {_format_size(stats.max_size)}")
+
+    decoded = DecodedAudioCache().stats()
+    click.echo(f"[CACHE] {decoded.path}")
+    click.echo(f"   Decoded inputs: {decoded.entries}")
+    click.echo(
+        f"   Size: {_format_size(decoded.size)} of {_format_size(decoded.max_size)}"
+    )
+
+    fingerprints = FingerprintIndex().stats()
+    click.echo(f"[CACHE] {fingerprints.path}")
+    click.echo(f"   Fingerprints: {fingerprints.entries}")
+    click.echo(f"   Size: {_format_size(fingerprints.size)}")
+
+
+@cache.command("prune")
+@click.option(
+    "--max-size",
+    help="Size to prune the results down to, e.g. 5G (default: the configured limit)",
+)
+def cache_prune(max_size: str | None) -> None:
+    """Evict least recently used entries until each cache fits its size limit."""
+    from semantics.core.cache import ResultCache, parse_size
+    from semantics.core.decode import DecodedAudioCache
+
+    limit = None
+    if max_size is not None:
+        try:
+            limit = parse_size(max_size)
+        except ValueError:
+            raise click.ClickException(f"Invalid size: {max_size}")
+
+    removed, freed = ResultCache().prune(limit)
+    click.echo(f"[OK] Evicted {removed} result(s), freed {_format_size(freed)}")
+    removed, freed = DecodedAudioCache().prune()
+    click.echo(f"[OK] Evicted {removed} decoded input(s), freed {_format_size(freed)}")
+
+
+@cache.command("clear")
+def cache_clear() -> None:
+    """Remove all cached results, decoded audio and fingerprints."""
+    from semantics.core.cache import ResultCache
+    from semantics.core.decode import DecodedAudioCache
+    from semantics.core.fingerprints import FingerprintIndex
+
+    removed, freed = ResultCache().clear()
+    click.echo(f"[OK] Removed {removed} result(s), freed {_format_size(freed)}")
+    removed, freed = DecodedAudioCache().clear()
+    click.echo(f"[OK] Removed {removed} decoded input(s), freed {_format_size(freed)}")
+    removed, freed = FingerprintIndex().clear()
+    click.echo(f"[OK] Removed {removed} fingerprint(s), freed {_format_size(freed)}")
 
 
 # Create the main CLI group with auto-routing support
 # Generate dynamic help based on available modules
-_dynamic_help = generate_dynamic_help(set(registry.commands.keys()))
+_dynamic_help = generate_dynamic_help(registry.get_available_modules())
 
 
 @click.group(
@@ -370,8 +890,9 @@ _dynamic_help = generate_dynamic_help(set(registry.commands.keys()))
 @click.option(
     "--input",
     "-i",
-    type=click.Path(exists=True, dir_okay=False),
-    help="Input file to process (auto-detects module from extension)",
+    multiple=True,
+    type=click.Path(),
+    help="Input file, directory or glob pattern to process; repeatable (auto-detects module from content)",
 )
 @click.option(
     "--output",
@@ -379,16 +900,38 @@ _dynamic_help = generate_dynamic_help(set(registry.commands.keys()))
     type=click.Path(file_okay=False),
     help="Output folder for results",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Number of files to process in parallel for directory or glob inputs (default: 1)",
+)
+@click.option(
+    "--serve",
+    is_flag=True,
+    is_eager=True,
+    expose_value=False,
+    callback=_serve,
+    help="Run as a resident worker that the semantics launcher delegates to (POSIX only)",
+)
+@click.option(
+    "--describe",
+    is_flag=True,
+    is_eager=True,
+    expose_value=False,
+    hidden=True,
+    callback=_describe,
+)
 @click.version_option(package_name="semantics")
 @click.pass_context
-def main(ctx: click.Context, input: str | None, output: str | None) -> None:
+def main(ctx: click.Context, input: tuple[str, ...], output: str | None, jobs: int) -> None:
     """Main entry point for the semantics CLI."""
     # AutoRoutingGroup handles the logic in its invoke() method
     # This callback only runs when no subcommand and no -i is provided
-    if ctx.invoked_subcommand is None and input is None:
+    if ctx.invoked_subcommand is None and not input:
         click.echo(ctx.get_help())
 
 
-# Register all loaded modules as subcommands
-for name, cmd in registry.commands.items():
-    main.add_command(cmd, name)
+main.add_command(cache)
+
@@ -0,0 +1 @@
+"""Shared utilities for Semantics CLI."""
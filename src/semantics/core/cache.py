@@ -0,0 +1,594 @@
+"""Content-addressed cache of handler results.
+
+A handler's result is keyed by the SHA-256 of the input file's content, the
+handler's name and VERSION, and its options, except those the handler lists
+in RUN_OPTIONS as changing only how it runs (e.g., resuming). The files a
+handler writes into the output folder are stored under that key; running the
+same handler on the same content with the same options again restores them by
+hard link (or copy where linking is not possible) instead of recomputing them.
+
+Cached files are read-only so that hard-linked outputs cannot be edited in
+place without also changing the cache. Entries are evicted least recently
+used first once the cache grows beyond its size limit. Finding them means
+reading every entry's meta.json, so stores only do it every PRUNE_INTERVAL
+seconds, or once PRUNE_FRACTION of the limit has been stored since the last
+time; `semantics cache prune` does it on demand.
+
+Layout below the cache directory:
+    results/entries/<key[:2]>/<key>/meta.json   entry description; its mtime
+                                                is the entry's last use
+    results/entries/<key[:2]>/<key>/files/...   stored output files
+    results/hashes/<id[:2]>/<id>                content hashes of input files,
+                                                keyed by path and stat
+    results/tmp/                                entries being written
+    results/pruned.json                         time of the last prune and
+                                                bytes stored since
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import sys
+import time
+import uuid
+from pathlib import Path
+from types import ModuleType
+from typing import NamedTuple
+
+import click
+
+from semantics.core.path import snapshot_files
+
+# Default upper bound on the total size of stored results
+DEFAULT_MAX_SIZE = 10 * 1024**3
+
+# Stores prune the cache at most this often (seconds), or sooner once this
+# fraction of the size limit has been stored since the last prune
+PRUNE_INTERVAL = 10 * 60
+PRUNE_FRACTION = 0.1
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+class CacheStats(NamedTuple):
+    """Summary of the result cache's contents."""
+
+    path: Path
+    entries: int
+    size: int
+    max_size: int
+
+
+class _Entry(NamedTuple):
+    """A stored result found while scanning the cache."""
+
+    path: Path
+    size: int
+    last_used: float
+
+
+def get_cache_dir() -> Path:
+    """Get the base directory for semantics caches.
+
+    Uses SEMANTICS_CACHE_DIR if set, otherwise a 'semantics' folder in the
+    platform's user cache directory.
+
+    Returns:
+        Path to the cache directory (not created).
+    """
+    override = os.environ.get("SEMANTICS_CACHE_DIR")
+    if override:
+        return Path(override)
+
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "semantics"
+
+
+def parse_size(text: str) -> int:
+    """Parse a size such as '500M' or '10G' into bytes.
+
+    Args:
+        text: A number of bytes with an optional K, M, G or T suffix
+            (powers of 1024), optionally followed by 'B' or 'iB'.
+
+    Returns:
+        The size in bytes.
+
+    Raises:
+        ValueError: If the text is not a valid size.
+    """
+    value = text.strip().upper().removesuffix("IB").removesuffix("B")
+    unit = value[-1:] if value[-1:] in _SIZE_UNITS else ""
+    number = float(value[: len(value) - len(unit)])
+    if number < 0:
+        raise ValueError(f"Size must not be negative: {text}")
+    return int(number * _SIZE_UNITS[unit])
+
+
+def get_max_size() -> int:
+    """Get the configured size limit from SEMANTICS_CACHE_MAX_SIZE.
+
+    Returns:
+        The size limit in bytes, or DEFAULT_MAX_SIZE if unset or invalid.
+    """
+    try:
+        return parse_size(os.environ["SEMANTICS_CACHE_MAX_SIZE"])
+    except (KeyError, ValueError):
+        return DEFAULT_MAX_SIZE
+
+
+def is_enabled() -> bool:
+    """Return False if caching is disabled with SEMANTICS_NO_CACHE."""
+    return not os.environ.get("SEMANTICS_NO_CACHE")
+
+
+def make_key(content_hash: str, handler: str, version: str, options: dict) -> str:
+    """Build the cache key of a handler result.
+
+    Args:
+        content_hash: SHA-256 of the input file's content
+        handler: Fully qualified handler module name
+        version: The handler's VERSION
+        options: Options passed to the handler; their order does not matter
+
+    Returns:
+        Hex digest identifying the result.
+    """
+    description = json.dumps(
+        {
+            "input": content_hash,
+            "handler": handler,
+            "version": version,
+            "options": options,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+def _rmtree(path: Path) -> None:
+    """Remove a directory tree, including read-only files on Windows."""
+
+    def make_writable(function, failed_path, _exc) -> None:
+        os.chmod(failed_path, stat.S_IWRITE)
+        function(failed_path)
+
+    shutil.rmtree(path, onexc=make_writable)
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    """Hard link source to target, copying if the link is not possible."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+class ResultCache:
+    """Stores handler outputs by content, handler, version and options."""
+
+    def __init__(self, root: Path | None = None, max_size: int | None = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            root: Directory holding the results; defaults to 'results' in
+                get_cache_dir()
+            max_size: Size limit in bytes; defaults to get_max_size()
+        """
+        self.root = root if root is not None else get_cache_dir() / "results"
+        self.max_size = max_size if max_size is not None else get_max_size()
+
+    def _entry_dir(self, key: str) -> Path:
+        """Return the directory of the entry for a key."""
+        return self.root / "entries" / key[:2] / key
+
+    def hash_file(self, path: Path) -> str:
+        """Return the SHA-256 of a file's content.
+
+        Digests are remembered by path, size, mtime and inode, so unchanged
+        files are only read once.
+
+        Args:
+            path: Path to the file
+
+        Returns:
+            Hex digest of the content.
+        """
+        file_stat = path.stat()
+        identity = (
+            f"{path.resolve()}\0{file_stat.st_dev}\0{file_stat.st_ino}\0"
+            f"{file_stat.st_size}\0{file_stat.st_mtime_ns}\0{file_stat.st_ctime_ns}"
+        )
+        identity_bytes = identity.encode("utf-8", "surrogateescape")
+        identity_hash = hashlib.sha256(identity_bytes).hexdigest()
+        memo = self.root / "hashes" / identity_hash[:2] / identity_hash
+        try:
+            digest = memo.read_text(encoding="ascii")
+            if len(digest) == 64:
+                return digest
+        except OSError:
+            pass
+
+        with open(path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+
+        try:
+            memo.parent.mkdir(parents=True, exist_ok=True)
+            memo.write_text(digest, encoding="ascii")
+        except OSError:
+            pass
+        return digest
+
+    def lookup(self, key: str) -> Path | None:
+        """Return the stored files of an entry and mark it as recently used.
+
+        Entries whose files have gone missing or changed size are removed.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Directory holding the entry's files, or None on a miss.
+        """
+        entry_dir = self._entry_dir(key)
+        meta_path = entry_dir / "meta.json"
+        files_dir = entry_dir / "files"
+        try:
+            meta_text = meta_path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+        try:
+            for relative, size in json.loads(meta_text)["files"].items():
+                if (files_dir / relative).stat().st_size != size:
+                    raise ValueError(f"Cached file changed: {relative}")
+            os.utime(meta_path)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self._remove(entry_dir)
+            return None
+        return files_dir
+
+    def store(self, key: str, source_dir: Path, files: list[Path], meta: dict) -> None:
+        """Store files from a handler's output folder under a key.
+
+        The entry is written to a temporary directory and renamed into place,
+        so concurrent readers never see a partial entry. Storing is best
+        effort: errors leave the cache unchanged. The cache is pruned to its
+        size limit afterwards when a prune is due (see _prune_due()).
+
+        Args:
+            key: Cache key from make_key()
+            source_dir: The handler's output folder
+            files: Paths of the handler's output files, relative to source_dir
+            meta: Extra description of the entry (handler, options, input)
+        """
+        tmp_dir = self.root / "tmp" / uuid.uuid4().hex
+        size = 0
+        try:
+            files_dir = tmp_dir / "files"
+            files_dir.mkdir(parents=True)
+            sizes = {}
+            for relative in files:
+                target = files_dir / relative
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(source_dir / relative, target)
+                os.chmod(target, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                sizes[relative.as_posix()] = target.stat().st_size
+
+            size = sum(sizes.values())
+            data = dict(meta, key=key, created=time.time(), files=sizes, size=size)
+            (tmp_dir / "meta.json").write_text(
+                json.dumps(data, indent=2, default=str), encoding="utf-8"
+            )
+
+            entry_dir = self._entry_dir(key)
+            entry_dir.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.rename(tmp_dir, entry_dir)
+            except OSError:
+                # Another process stored the same result first
+                pass
+        except OSError:
+            pass
+        finally:
+            if tmp_dir.exists():
+                self._remove(tmp_dir)
+
+        if self._prune_due(size):
+            self.prune()
+
+    def _prune_due(self, stored: int) -> bool:
+        """Record stored bytes and return True if the cache should be pruned.
+
+        A prune is due PRUNE_INTERVAL seconds after the last one, or once
+        PRUNE_FRACTION of the size limit has been stored since. Concurrent
+        stores may miss each other's bytes; the interval bounds the overshoot.
+        """
+        state_path = self.root / "pruned.json"
+        now = time.time()
+        try:
+            state = json.loads(state_path.read_text(encoding="utf-8"))
+            last, stored = float(state["time"]), int(state["stored"]) + stored
+            due = (
+                now - last >= PRUNE_INTERVAL
+                or stored >= PRUNE_FRACTION * self.max_size
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            due = True
+
+        if due:
+            last, stored = now, 0
+        try:
+            tmp_path = state_path.with_name(f"pruned.{uuid.uuid4().hex}.tmp")
+            tmp_path.write_text(json.dumps({"time": last, "stored": stored}))
+            os.replace(tmp_path, state_path)
+        except OSError:
+            pass
+        return due
+
+    def materialize(self, files_dir: Path, output_path: Path) -> list[Path]:
+        """Restore an entry's files into an output folder.
+
+        Args:
+            files_dir: Directory returned by lookup()
+            output_path: Output folder to restore the files into
+
+        Returns:
+            Paths of the restored files, relative to output_path.
+        """
+        restored = []
+        for source in sorted(files_dir.rglob("*")):
+            if source.is_file():
+                relative = source.relative_to(files_dir)
+                _link_or_copy(source, output_path / relative)
+                restored.append(relative)
+        return restored
+
+    def _remove(self, path: Path) -> None:
+        """Remove an entry or temporary directory, ignoring errors."""
+        try:
+            _rmtree(path)
+        except OSError:
+            pass
+
+    def _entries(self) -> list[_Entry]:
+        """Return all complete entries in the cache."""
+        entries = []
+        for meta_path in (self.root / "entries").glob("*/*/meta.json"):
+            try:
+                size = json.loads(meta_path.read_text(encoding="utf-8"))["size"]
+                last_used = meta_path.stat().st_mtime
+                entries.append(_Entry(meta_path.parent, size, last_used))
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+        return entries
+
+    def stats(self) -> CacheStats:
+        """Return the number of entries and total size of the cache."""
+        entries = self._entries()
+        size = sum(e.size for e in entries)
+        return CacheStats(self.root, len(entries), size, self.max_size)
+
+    def prune(self, max_size: int | None = None) -> tuple[int, int]:
+        """Evict least recently used entries until the cache fits a size limit.
+
+        Args:
+            max_size: Size limit in bytes; defaults to the cache's max_size
+
+        Returns:
+            Number of evicted entries and the bytes they used.
+        """
+        limit = self.max_size if max_size is None else max_size
+        entries = self._entries()
+        total = sum(e.size for e in entries)
+        removed = freed = 0
+        for entry in sorted(entries, key=lambda e: e.last_used):
+            if total <= limit:
+                break
+            self._remove(entry.path)
+            total -= entry.size
+            removed += 1
+            freed += entry.size
+        return removed, freed
+
+    def clear(self) -> tuple[int, int]:
+        """Remove every entry and remembered content hash.
+
+        Returns:
+            Number of removed entries and the bytes they used.
+        """
+        entries = self._entries()
+        for name in ("entries", "hashes", "tmp"):
+            if (self.root / name).exists():
+                self._remove(self.root / name)
+        return len(entries), sum(e.size for e in entries)
+
+
+def _key_options(handler: ModuleType, options: dict) -> dict:
+    """Return the options that are part of a handler's cache keys."""
+    run_options = getattr(handler, "RUN_OPTIONS", ())
+    return {name: value for name, value in options.items() if name not in run_options}
+
+
+def _restore(
+    cache: ResultCache,
+    key: str,
+    short_name: str,
+    input_path: Path,
+    output_path: Path,
+    verbose: bool,
+) -> bool:
+    """Restore a cached result into the output folder.
+
+    Returns:
+        True if the result was found and restored.
+    """
+    files_dir = cache.lookup(key)
+    if files_dir is None:
+        return False
+    try:
+        restored = cache.materialize(files_dir, output_path)
+    except OSError:
+        return False
+    click.echo(
+        f"[CACHE] Reused {short_name} result for {input_path.name}"
+        f" ({len(restored)} file(s))"
+    )
+    if verbose:
+        click.echo(f"   Key: {key}")
+    return True
+
+
+def _store(
+    cache: ResultCache,
+    key: str,
+    handler: ModuleType,
+    input_path: Path,
+    output_path: Path,
+    before: dict[Path, tuple[int, int]],
+    options: dict,
+    verbose: bool,
+) -> None:
+    """Store the files a handler wrote since the `before` snapshot.
+
+    Nothing is stored if the handler wrote no files: an empty entry would
+    make later runs skip the handler without restoring anything.
+    """
+    name = handler.__name__
+    version = str(getattr(handler, "VERSION", "0"))
+    after = snapshot_files(output_path)
+    outputs = [path for path, state in after.items() if before.get(path) != state]
+    if not outputs:
+        return
+    meta = {
+        "handler": name,
+        "version": version,
+        "options": options,
+        "input": input_path.name,
+    }
+    cache.store(key, output_path, outputs, meta)
+    if verbose:
+        short_name = name.rsplit(".", 1)[-1]
+        click.echo(
+            f"[CACHE] Stored {short_name} result ({len(outputs)} file(s)), key {key}"
+        )
+
+
+def run_cached(
+    handler: ModuleType,
+    input_path: Path,
+    output_path: Path,
+    verbose: bool = False,
+    use_cache: bool = True,
+    **options,
+) -> None:
+    """Run a handler, reusing a cached result for the same content and options.
+
+    Output files are detected by comparing the output folder before and after
+    the handler runs; runs that write no files are not cached. Caching is
+    skipped when disabled with use_cache or SEMANTICS_NO_CACHE, or when the
+    cache cannot be used.
+
+    Args:
+        handler: Handler module exposing handle() and, optionally, VERSION
+        input_path: Path to the input file
+        output_path: Path to the output folder
+        verbose: Enable verbose output
+        use_cache: Set to False to always run the handler
+        **options: Options passed to the handler
+    """
+    if not use_cache or not is_enabled():
+        handler.handle(input_path, output_path, verbose=verbose, **options)
+        return
+
+    name = handler.__name__
+    version = str(getattr(handler, "VERSION", "0"))
+    cache = ResultCache()
+
+    key_options = _key_options(handler, options)
+    try:
+        key = make_key(cache.hash_file(input_path), name, version, key_options)
+    except OSError:
+        handler.handle(input_path, output_path, verbose=verbose, **options)
+        return
+
+    short_name = name.rsplit(".", 1)[-1]
+    if _restore(cache, key, short_name, input_path, output_path, verbose):
+        return
+
+    before = snapshot_files(output_path)
+    handler.handle(input_path, output_path, verbose=verbose, **options)
+    _store(cache, key, handler, input_path, output_path, before, key_options, verbose)
+
+
+def run_cached_batch(
+    handler: ModuleType,
+    jobs: list[tuple[Path, Path]],
+    verbose: bool = False,
+    use_cache: bool = True,
+    batch_options: dict | None = None,
+    **options,
+) -> None:
+    """Run a handler's handle_batch() on the inputs without a cached result.
+
+    Each input is looked up and stored on its own, under the same key as
+    run_cached() would use, so batched and single runs share results.
+
+    Args:
+        handler: Handler module exposing handle_batch(jobs, verbose, **options)
+        jobs: (input file, output folder) pairs
+        verbose: Enable verbose output
+        use_cache: Set to False to always run the handler on every input
+        batch_options: Options passed to handle_batch() that do not change
+            results (e.g., a batch size) and are left out of the keys
+        **options: Options passed to the handler
+    """
+    batch_options = batch_options or {}
+    if not use_cache or not is_enabled():
+        handler.handle_batch(jobs, verbose=verbose, **batch_options, **options)
+        return
+
+    name = handler.__name__
+    version = str(getattr(handler, "VERSION", "0"))
+    short_name = name.rsplit(".", 1)[-1]
+    cache = ResultCache()
+    key_options = _key_options(handler, options)
+
+    # (job, key or None if the input could not be hashed, snapshot)
+    misses: list[tuple[tuple[Path, Path], str | None, dict]] = []
+    for input_path, output_path in jobs:
+        try:
+            key = make_key(cache.hash_file(input_path), name, version, key_options)
+        except OSError:
+            key = None
+        if key and _restore(cache, key, short_name, input_path, output_path, verbose):
+            continue
+        misses.append(((input_path, output_path), key, snapshot_files(output_path)))
+
+    if not misses:
+        return
+
+    miss_jobs = [job for job, _, _ in misses]
+    handler.handle_batch(miss_jobs, verbose=verbose, **batch_options, **options)
+    for (input_path, output_path), key, before in misses:
+        if key is not None:
+            _store(
+                cache,
+                key,
+                handler,
+                input_path,
+                output_path,
+                before,
+                key_options,
+                verbose,
+            )
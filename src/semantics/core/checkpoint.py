@@ -0,0 +1,148 @@
+"""Checkpoints from which an interrupted handler continues where it stopped.
+
+A handler that writes its output incrementally (such as streaming
+transcription) saves a checkpoint every so often: a JSON state of its own
+choosing, plus the length of each output file at that moment. The output
+files are flushed to disk first, so everything the checkpoint counts is
+there after a crash. A later run with resume loads the checkpoint, cuts the
+output files back to those lengths, dropping whatever was written after it,
+and continues from the saved state.
+
+A checkpoint is tied to its input and options by a key (see
+checkpoint_key()); a checkpoint with another key is ignored, as is one whose
+output files are shorter than it records. Checkpoints are written to a
+temporary file and renamed into place, so they are never torn, and are
+removed once the handler finishes.
+
+Checkpoints are named `<stem>.checkpoint.json` and live next to the output
+they describe. The scheduler keeps a failed operation's staging folder when
+it holds one, so that the next run can resume from it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+# File name suffix of checkpoints
+SUFFIX = ".checkpoint.json"
+
+# Default minimum wall-clock time between two saves
+DEFAULT_INTERVAL = 30.0
+
+
+def checkpoint_key(input_path: Path, *parts: object) -> str:
+    """Build the key tying a checkpoint to its input and options.
+
+    The input is identified by its name, size and modification time rather
+    than its content, so that resuming does not read a long input in full.
+
+    Args:
+        input_path: Path to the input file
+        *parts: Anything else the output depends on (version, options, ...)
+
+    Returns:
+        Hex digest identifying the run.
+    """
+    file_stat = input_path.stat()
+    description = json.dumps(
+        [input_path.name, file_stat.st_size, file_stat.st_mtime_ns, *parts],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+def _fsync(path: Path) -> None:
+    """Flush a file's written data to disk."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Checkpoint:
+    """Saves and restores the progress of one handler run.
+
+    Args:
+        path: Checkpoint file, named `<stem>.checkpoint.json`
+        key: Key of this run (see checkpoint_key())
+        interval: Minimum seconds between two saves; save(force=True)
+            always saves
+    """
+
+    def __init__(
+        self, path: Path, key: str, interval: float = DEFAULT_INTERVAL
+    ) -> None:
+        self.path = path
+        self.key = key
+        self.interval = interval
+        self._saved_at = time.monotonic()
+
+    def load(self) -> dict | None:
+        """Load the saved state, cutting output files back to their saved lengths.
+
+        Returns:
+            The saved state, or None if there is no usable checkpoint.
+        """
+        try:
+            record = json.loads(self.path.read_text(encoding="utf-8"))
+            if record["key"] != self.key:
+                return None
+            folder = self.path.parent
+            files = {folder / name: size for name, size in record["files"].items()}
+            if any(path.stat().st_size < size for path, size in files.items()):
+                return None
+            for path, size in files.items():
+                os.truncate(path, size)
+            return record["state"]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def save(
+        self, state: dict, files: Iterable[Path] = (), force: bool = False
+    ) -> bool:
+        """Save a state, unless the last save was less than an interval ago.
+
+        Args:
+            state: JSON-serializable progress of the handler
+            files: Output files, in the checkpoint's folder, that the state
+                accounts for; they must have been flushed
+            force: Save regardless of the interval
+
+        Returns:
+            True if the checkpoint was saved.
+        """
+        if not force and time.monotonic() - self._saved_at < self.interval:
+            return False
+        sizes = {}
+        for path in files:
+            _fsync(path)
+            sizes[path.name] = path.stat().st_size
+        record = {"key": self.key, "files": sizes, "state": state}
+        tmp_path = self.path.with_name(self.path.name + ".part")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._saved_at = time.monotonic()
+        return True
+
+    def remove(self) -> None:
+        """Remove the checkpoint, once the handler has finished."""
+        for path in (self.path, self.path.with_name(self.path.name + ".part")):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def has_checkpoints(folder: Path) -> bool:
+    """Return True if a folder holds any checkpoint."""
+    return any(folder.glob(f"*{SUFFIX}"))
@@ -0,0 +1,610 @@
+"""Decoded audio shared by every handler that reads an input's samples.
+
+Decoding compressed audio is a large part of the work on short files, and
+several handlers need the samples of the same input (audio transcription and
+metadata, video transcription). Each input is decoded once to 16 kHz mono
+float32 and stored as a .npy file keyed by the SHA-256 of its content.
+Handlers map that file read-only with NumPy instead of decoding again, so
+concurrent handlers and later runs share the samples through the page cache.
+
+Soundtracks of video files are not stored. They are long (an hour of video
+is 230 MB of samples) and read by one handler, and writing them out would
+cost scratch disk bandwidth for every job: they stream from the decoder's
+pipe straight into the reading handler, through an in-memory read-ahead
+buffer that lets ffmpeg decode up to READ_AHEAD bytes ahead of the model.
+
+Files are written to a temporary name and renamed into place, so readers
+never see a partial file; two handlers decoding the same new input at once
+both write it and the last rename wins. Files are evicted least recently used
+first once the decoded audio grows beyond its size limit.
+
+Layout below the cache directory:
+    decoded/<hash[:2]>/<hash>.npy   samples; its mtime is its last use
+    decoded/tmp/                    files being written
+
+NumPy is only imported by the functions that return samples, which only
+handlers call.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+import wave
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from pathlib import Path
+
+import click
+
+from semantics.core.cache import (
+    CacheStats,
+    ResultCache,
+    get_cache_dir,
+    is_enabled,
+    parse_size,
+)
+from semantics.core.sniff import sniff_media
+
+# Sample format of decoded audio: what speech models expect
+SAMPLE_RATE = 16000
+
+# Decoders produce 16-bit PCM, as Whisper's own loader does
+SAMPLE_WIDTH = 2
+
+# Default upper bound on the total size of decoded audio
+DEFAULT_MAX_SIZE = 2 * 1024**3
+
+# Bytes reserved for the .npy header of a 1-D float32 array
+_HEADER_SIZE = 128
+
+# PCM bytes decoded at a time
+_CHUNK_SIZE = 1024**2
+
+# PCM bytes ffmpeg may decode ahead of its reader: about two minutes
+READ_AHEAD = 4 * 1024**2
+
+# Opens an input as a read(size) function of PCM, like open_decoder()
+Decoder = Callable[[Path], AbstractContextManager[Callable[[int], bytes]]]
+
+
+def get_max_size() -> int:
+    """Get the configured size limit from SEMANTICS_DECODED_MAX_SIZE.
+
+    Returns:
+        The size limit in bytes, or DEFAULT_MAX_SIZE if unset or invalid.
+    """
+    try:
+        return parse_size(os.environ["SEMANTICS_DECODED_MAX_SIZE"])
+    except (KeyError, ValueError):
+        return DEFAULT_MAX_SIZE
+
+
+def _wav_format(input_path: Path) -> tuple[int, int, int] | None:
+    """Return the channels, sample width and rate of a PCM WAV file.
+
+    Returns:
+        The format, or None if the file is not a WAV file the wave module
+        reads (compressed and floating-point WAV files are not).
+    """
+    try:
+        with wave.open(str(input_path), "rb") as wav:
+            if wav.getcomptype() != "NONE":
+                return None
+            return wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+    except (wave.Error, EOFError):
+        return None
+
+
+def _is_model_format(input_path: Path) -> bool:
+    """Return True if the file is a WAV file in the decoded sample format."""
+    return _wav_format(input_path) == (1, SAMPLE_WIDTH, SAMPLE_RATE)
+
+
+def _is_video(input_path: Path) -> bool:
+    """Return True if the file's content holds a video track."""
+    media = sniff_media(input_path)
+    return media is not None and bool(media.has_video)
+
+
+class _ReadAhead:
+    """Reads a stream ahead of its consumer into a ring buffer, on a thread.
+
+    The producer stops once `capacity` bytes wait to be read, so memory stays
+    bounded while decoding overlaps with what the consumer does in between
+    reads. An error of the producer is raised by the read that reaches it.
+
+    Args:
+        read: read(size) function of the stream, returning b"" at the end
+        capacity: Size of the buffer
+    """
+
+    def __init__(self, read: Callable[[int], bytes], capacity: int) -> None:
+        self._source = read
+        self._buffer = bytearray(capacity)
+        self._start = 0
+        self._size = 0
+        self._ended = False
+        self._closed = False
+        self._error: BaseException | None = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _fill(self) -> None:
+        """Producer thread: read the stream into free space of the buffer."""
+        capacity = len(self._buffer)
+        try:
+            while True:
+                with self._condition:
+                    while self._size == capacity and not self._closed:
+                        self._condition.wait()
+                    if self._closed:
+                        return
+                    end = (self._start + self._size) % capacity
+                    # Free space up to the end of the buffer, without wrapping
+                    room = min(capacity - self._size, capacity - end)
+                chunk = self._source(room)
+                with self._condition:
+                    if not chunk:
+                        return
+                    self._buffer[end : end + len(chunk)] = chunk
+                    self._size += len(chunk)
+                    self._condition.notify_all()
+        except BaseException as e:
+            with self._condition:
+                self._error = e
+        finally:
+            with self._condition:
+                self._ended = True
+                self._condition.notify_all()
+
+    def read(self, size: int) -> bytes:
+        """Return at most size bytes, waiting for some unless at the end."""
+        capacity = len(self._buffer)
+        with self._condition:
+            while self._size == 0 and not self._ended:
+                self._condition.wait()
+            if self._size == 0:
+                if self._error is not None:
+                    raise self._error
+                return b""
+            count = min(size, self._size)
+            first = min(count, capacity - self._start)
+            chunk = bytes(self._buffer[self._start : self._start + first])
+            if first < count:
+                chunk += self._buffer[: count - first]
+            self._start = (self._start + count) % capacity
+            self._size -= count
+            self._condition.notify_all()
+            return chunk
+
+    @property
+    def ended(self) -> bool:
+        """Whether the producer reached the end of the stream or failed."""
+        with self._condition:
+            return self._ended
+
+    def close(self) -> None:
+        """Stop reading ahead and wait for the producer.
+
+        The producer may be blocked reading the stream: end the stream (say,
+        kill its process) first.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+
+def _converted_reader(wav: wave.Wave_read) -> Callable[[int], bytes]:
+    """Return a read(size) function converting a WAV file's PCM in-process.
+
+    The samples are downmixed, resampled and requantized to the decoded
+    sample format by a Frontend, one chunk at a time.
+    """
+    from semantics.core.frontend import Frontend, to_pcm16
+
+    frontend = Frontend(
+        wav.getframerate(), wav.getnchannels(), wav.getsampwidth(), SAMPLE_RATE
+    )
+    frames = _CHUNK_SIZE // (wav.getnchannels() * wav.getsampwidth())
+    pending = bytearray()
+    finished = False
+
+    def read(size: int) -> bytes:
+        nonlocal finished
+        size -= size % SAMPLE_WIDTH
+        while len(pending) < size and not finished:
+            pcm = wav.readframes(frames)
+            if pcm:
+                pending.extend(to_pcm16(frontend.process(pcm)))
+            else:
+                pending.extend(to_pcm16(frontend.flush()))
+                finished = True
+        chunk = bytes(pending[:size])
+        del pending[:size]
+        return chunk
+
+    return read
+
+
+@contextmanager
+def open_decoder(input_path: Path) -> Iterator[Callable[[int], bytes]]:
+    """Decode an audio or video file to a stream of 16 kHz mono 16-bit PCM.
+
+    WAV files already in that format are read directly, and other PCM WAV
+    files are converted in-process (see semantics.core.frontend), which
+    saves starting a process per file; anything else is decoded through an
+    ffmpeg pipe, read ahead into memory (see READ_AHEAD) and never written
+    to disk. ffmpeg's error log is read on a thread meanwhile, so that it
+    cannot block on a full stderr pipe. A consumer may stop reading early:
+    ffmpeg is then stopped and its exit status ignored.
+
+    Args:
+        input_path: Path to the input file
+
+    Yields:
+        A read(size) function returning at most size bytes, b"" at the end.
+
+    Raises:
+        click.ClickException: If the file cannot be decoded.
+    """
+    if _is_model_format(input_path):
+        with wave.open(str(input_path), "rb") as wav:
+            yield lambda size: wav.readframes(size // SAMPLE_WIDTH)
+        return
+    if _wav_format(input_path) is not None:
+        with wave.open(str(input_path), "rb") as wav:
+            yield _converted_reader(wav)
+        return
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise click.ClickException(
+            f"Decoding {input_path.name} requires ffmpeg. "
+            "Install ffmpeg or convert the file to a PCM WAV file."
+        )
+
+    command = [
+        ffmpeg,
+        "-nostdin",
+        "-loglevel",
+        "error",
+        "-i",
+        str(input_path),
+        "-vn",
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-ar",
+        str(SAMPLE_RATE),
+        "-",
+    ]
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    log = bytearray()
+    log_thread = threading.Thread(
+        target=lambda: log.extend(process.stderr.read()), daemon=True
+    )
+    log_thread.start()
+    # read1() returns what the pipe holds instead of waiting for a full chunk
+    ahead = _ReadAhead(process.stdout.read1, READ_AHEAD)
+    finished = False
+    try:
+        yield ahead.read
+        # Stopped before the end: ffmpeg is killed, which is not a failure
+        finished = ahead.ended
+    finally:
+        if not finished:
+            process.kill()
+        ahead.close()
+        process.stdout.close()
+        returncode = process.wait()
+        log_thread.join()
+        process.stderr.close()
+    if finished and returncode != 0:
+        stderr = log.decode(errors="replace").strip()
+        raise click.ClickException(f"Could not decode {input_path.name}: {stderr}")
+
+
+def _to_float(pcm: bytes):
+    """Convert 16-bit PCM to float32 samples in [-1, 1]."""
+    import numpy as np
+
+    return np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def _to_pcm(samples) -> bytes:
+    """Convert float32 samples made by _to_float() back to 16-bit PCM."""
+    return (samples * 32768.0).astype("<i2").tobytes()
+
+
+class DecodedWriter:
+    """Writes decoded samples to a temporary file of the cache.
+
+    The file only replaces the cached one on commit(); closing without a
+    commit discards it.
+    """
+
+    def __init__(self, cache: DecodedAudioCache, content_hash: str) -> None:
+        self.cache = cache
+        self.content_hash = content_hash
+        self.samples = 0
+        self._tmp_path = cache.root / "tmp" / f"{uuid.uuid4().hex}.part"
+        self._tmp_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(b"\0" * _HEADER_SIZE)
+
+    def write(self, pcm: bytes) -> None:
+        """Append 16-bit PCM, stored as float32."""
+        pcm = pcm[: len(pcm) - len(pcm) % SAMPLE_WIDTH]
+        self._file.write(_to_float(pcm).tobytes())
+        self.samples += len(pcm) // SAMPLE_WIDTH
+
+    def commit(self) -> None:
+        """Write the header and move the file into the cache."""
+        import numpy as np
+
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(
+            header,
+            {"descr": "<f4", "fortran_order": False, "shape": (self.samples,)},
+        )
+        if len(header.getvalue()) != _HEADER_SIZE:
+            raise OSError("Unexpected .npy header size")
+        self._file.seek(0)
+        self._file.write(header.getvalue())
+        self._file.close()
+
+        target = self.cache.path(self.content_hash)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self._tmp_path, target)
+        self.cache.prune(keep=target)
+
+    def close(self) -> None:
+        """Discard the file unless it was committed."""
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> DecodedWriter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class DecodedAudioCache:
+    """Stores the decoded samples of inputs by content."""
+
+    def __init__(self, root: Path | None = None, max_size: int | None = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            root: Directory holding the samples; defaults to 'decoded' in
+                get_cache_dir()
+            max_size: Size limit in bytes; defaults to get_max_size()
+        """
+        self.root = root if root is not None else get_cache_dir() / "decoded"
+        self.max_size = max_size if max_size is not None else get_max_size()
+
+    def path(self, content_hash: str) -> Path:
+        """Return the path of the samples of an input."""
+        return self.root / content_hash[:2] / f"{content_hash}.npy"
+
+    def lookup(self, content_hash: str):
+        """Map the samples of an input and mark them as recently used.
+
+        Args:
+            content_hash: SHA-256 of the input's content
+
+        Returns:
+            A read-only float32 array backed by the cached file, or None on
+            a miss. Damaged files are removed.
+        """
+        import numpy as np
+
+        path = self.path(content_hash)
+        if not path.exists():
+            return None
+        try:
+            samples = np.load(path, mmap_mode="r")
+            if samples.dtype != np.float32 or samples.ndim != 1:
+                raise ValueError(f"Unexpected samples in {path.name}")
+            os.utime(path)
+        except (OSError, ValueError):
+            path.unlink(missing_ok=True)
+            return None
+        return samples
+
+    def writer(self, content_hash: str) -> DecodedWriter:
+        """Start writing the samples of an input."""
+        return DecodedWriter(self, content_hash)
+
+    def _files(self) -> list[Path]:
+        """Return all complete files in the cache."""
+        return list(self.root.glob("*/*.npy"))
+
+    def stats(self) -> CacheStats:
+        """Return the number of decoded inputs and their total size."""
+        files = self._files()
+        size = sum(_size(path) for path in files)
+        return CacheStats(self.root, len(files), size, self.max_size)
+
+    def prune(
+        self, max_size: int | None = None, keep: Path | None = None
+    ) -> tuple[int, int]:
+        """Evict least recently used files until the cache fits a size limit.
+
+        Args:
+            max_size: Size limit in bytes; defaults to the cache's max_size
+            keep: File never evicted, e.g. the one just written
+
+        Returns:
+            Number of evicted files and the bytes they used.
+        """
+        limit = self.max_size if max_size is None else max_size
+        files = []
+        for path in self._files():
+            try:
+                file_stat = path.stat()
+            except OSError:
+                continue
+            files.append((file_stat.st_mtime, file_stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        removed = freed = 0
+        for _, size, path in sorted(files):
+            if total <= limit:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+            freed += size
+        return removed, freed
+
+    def clear(self) -> tuple[int, int]:
+        """Remove all decoded audio.
+
+        Returns:
+            Number of removed files and the bytes they used.
+        """
+        stats = self.stats()
+        if self.root.exists():
+            shutil.rmtree(self.root, ignore_errors=True)
+        return stats.entries, stats.size
+
+
+def _size(path: Path) -> int:
+    """Return the size of a file, or 0 if it is gone."""
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _content_hash(input_path: Path) -> str | None:
+    """Return the content hash of an input, or None without caching."""
+    if not is_enabled():
+        return None
+    try:
+        return ResultCache().hash_file(input_path)
+    except OSError:
+        return None
+
+
+def load_audio(input_path: Path, decoder: Decoder | None = None):
+    """Return the samples of an input, decoding it on first use.
+
+    Args:
+        input_path: Path to an audio or video file
+        decoder: Replaces open_decoder() to decode the input, for example to
+            read a soundtrack demuxed along with something else
+
+    Returns:
+        16 kHz mono float32 samples in [-1, 1]. With caching enabled (see
+        semantics.core.cache.is_enabled) this is a read-only memory map of
+        the cached file, so it costs no copy; soundtracks of videos are
+        decoded in memory and not cached.
+
+    Raises:
+        click.ClickException: If the file cannot be decoded.
+    """
+    decoder = decoder or open_decoder
+    content_hash = None if _is_video(input_path) else _content_hash(input_path)
+    if content_hash is None:
+        with decoder(input_path) as read:
+            chunks = iter(lambda: read(_CHUNK_SIZE), b"")
+            return _to_float(b"".join(chunks))
+
+    cache = DecodedAudioCache()
+    samples = cache.lookup(content_hash)
+    if samples is not None:
+        return samples
+
+    with cache.writer(content_hash) as writer:
+        with decoder(input_path) as read:
+            for chunk in iter(lambda: read(_CHUNK_SIZE), b""):
+                writer.write(chunk)
+        writer.commit()
+
+    samples = cache.lookup(content_hash)
+    if samples is None:
+        raise click.ClickException(f"Could not read decoded audio of {input_path.name}")
+    return samples
+
+
+@contextmanager
+def open_pcm(
+    input_path: Path, decoder: Decoder | None = None
+) -> Iterator[Callable[[int], bytes]]:
+    """Open an input as a stream of 16 kHz mono 16-bit PCM, through the cache.
+
+    Decoded samples already in the cache are read from there. Otherwise the
+    input is decoded as it is read, and if it is read to the end the samples
+    are stored for the next handler. WAV files already in the PCM format
+    are read directly, and soundtracks of videos streamed from the decoder,
+    and neither is stored.
+
+    Args:
+        input_path: Path to an audio or video file
+        decoder: Replaces open_decoder() to decode the input (see load_audio())
+
+    Yields:
+        A read(size) function returning at most size bytes, b"" at the end.
+
+    Raises:
+        click.ClickException: If the file cannot be decoded.
+    """
+    decoder = decoder or open_decoder
+    streamed = _is_model_format(input_path) or _is_video(input_path)
+    content_hash = None if streamed else _content_hash(input_path)
+    if content_hash is None:
+        with decoder(input_path) as read:
+            yield read
+        return
+
+    cache = DecodedAudioCache()
+    samples = cache.lookup(content_hash)
+    if samples is not None:
+        position = 0
+
+        def read_cached(size: int) -> bytes:
+            nonlocal position
+            count = size // SAMPLE_WIDTH
+            chunk = samples[position : position + count]
+            position += len(chunk)
+            return _to_pcm(chunk)
+
+        yield read_cached
+        return
+
+    ended = False
+    with cache.writer(content_hash) as writer:
+        with decoder(input_path) as read:
+
+            def read_and_store(size: int) -> bytes:
+                nonlocal ended
+                chunk = read(size)
+                if chunk:
+                    writer.write(chunk)
+                else:
+                    ended = True
+                return chunk
+
+            yield read_and_store
+        if ended:
+            writer.commit()
@@ -0,0 +1,215 @@
+"""Local index of audio fingerprints and the transcripts made from them.
+
+An audio fingerprint is a sequence of 32-bit sub-fingerprints, one per short
+frame of audio (see semantics.modules.audio.fingerprint). Recordings that
+sound the same share most sub-fingerprints at the same relative positions,
+even when they were encoded differently, so a new recording is matched by
+looking up some of its sub-fingerprints and voting for (recording, offset)
+pairs; the best candidates are then compared in full by the caller.
+
+Each entry holds one recording's fingerprint, the SHA-256 of its content and
+the files its transcript was written to, and belongs to a scope (the options
+the transcript was made with): only entries of the same scope are matched.
+
+The index is one SQLite database, which serializes writers from concurrent
+processes:
+    fingerprints.sqlite   entries, sub-fingerprint postings and files
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterable
+from contextlib import closing
+from pathlib import Path
+from typing import NamedTuple
+
+from semantics.core.cache import get_cache_dir
+
+# Seconds to wait for another process holding the database
+_TIMEOUT = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    scope TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    fingerprint BLOB NOT NULL,
+    UNIQUE (scope, content_hash)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    value INTEGER NOT NULL,
+    entry INTEGER NOT NULL REFERENCES entries (id) ON DELETE CASCADE,
+    frame INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS postings_value ON postings (value);
+CREATE INDEX IF NOT EXISTS postings_entry ON postings (entry);
+CREATE TABLE IF NOT EXISTS files (
+    entry INTEGER NOT NULL REFERENCES entries (id) ON DELETE CASCADE,
+    suffix TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+"""
+
+
+class FingerprintEntry(NamedTuple):
+    """A recording in the index."""
+
+    id: int
+    content_hash: str
+    fingerprint: bytes
+    files: dict[str, bytes]
+
+
+class Candidate(NamedTuple):
+    """A recording sharing sub-fingerprints with a query at one offset."""
+
+    entry: int
+    offset: int
+    votes: int
+
+
+class FingerprintStats(NamedTuple):
+    """Summary of the fingerprint index."""
+
+    path: Path
+    entries: int
+    size: int
+
+
+class FingerprintIndex:
+    """Stores fingerprints and transcript files of recordings."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        """Initialize the index.
+
+        Args:
+            path: Database file; defaults to 'fingerprints.sqlite' in
+                get_cache_dir()
+        """
+        if path is None:
+            path = get_cache_dir() / "fingerprints.sqlite"
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating it if needed."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=_TIMEOUT)
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def _entry(self, connection: sqlite3.Connection, row: tuple) -> FingerprintEntry:
+        """Build an entry from its row, with its files."""
+        entry_id, content_hash, fingerprint = row
+        files = connection.execute(
+            "SELECT suffix, data FROM files WHERE entry = ?", (entry_id,)
+        )
+        return FingerprintEntry(entry_id, content_hash, fingerprint, dict(files))
+
+    def find(self, scope: str, content_hash: str) -> FingerprintEntry | None:
+        """Return the entry of a recording with exactly this content, if any."""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT id, content_hash, fingerprint FROM entries"
+                " WHERE scope = ? AND content_hash = ?",
+                (scope, content_hash),
+            ).fetchone()
+            return self._entry(connection, row) if row else None
+
+    def get(self, entry_id: int) -> FingerprintEntry | None:
+        """Return an entry by id."""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT id, content_hash, fingerprint FROM entries WHERE id = ?",
+                (entry_id,),
+            ).fetchone()
+            return self._entry(connection, row) if row else None
+
+    def candidates(
+        self, scope: str, probes: Iterable[tuple[int, int]], limit: int = 5
+    ) -> list[Candidate]:
+        """Find the recordings sharing the most probed sub-fingerprints.
+
+        Args:
+            scope: Scope of the entries to search
+            probes: (sub-fingerprint, frame) pairs of the query
+            limit: Maximum number of candidates
+
+        Returns:
+            Candidates, most votes first; a candidate's offset is the frame
+            of its recording that lines up with frame 0 of the query.
+        """
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "CREATE TEMP TABLE probes"
+                " (value INTEGER NOT NULL, frame INTEGER NOT NULL)"
+            )
+            connection.executemany("INSERT INTO probes VALUES (?, ?)", probes)
+            rows = connection.execute(
+                "SELECT p.entry, p.frame - q.frame AS offset, COUNT(*) AS votes"
+                " FROM probes q"
+                " JOIN postings p ON p.value = q.value"
+                " JOIN entries e ON e.id = p.entry"
+                " WHERE e.scope = ?"
+                " GROUP BY p.entry, offset"
+                " ORDER BY votes DESC"
+                " LIMIT ?",
+                (scope, limit),
+            ).fetchall()
+        return [Candidate(*row) for row in rows]
+
+    def add(
+        self,
+        scope: str,
+        content_hash: str,
+        fingerprint: bytes,
+        postings: Iterable[tuple[int, int]],
+        files: dict[str, bytes],
+    ) -> None:
+        """Add a recording, replacing an earlier entry for the same content.
+
+        Args:
+            scope: Options the transcript was made with
+            content_hash: SHA-256 of the recording's content
+            fingerprint: The recording's fingerprint, as stored
+            postings: (sub-fingerprint, frame) pairs to find it by
+            files: Transcript files by file name suffix (e.g. '.txt')
+        """
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "DELETE FROM entries WHERE scope = ? AND content_hash = ?",
+                (scope, content_hash),
+            )
+            entry_id = connection.execute(
+                "INSERT INTO entries (scope, content_hash, fingerprint)"
+                " VALUES (?, ?, ?)",
+                (scope, content_hash, fingerprint),
+            ).lastrowid
+            connection.executemany(
+                "INSERT INTO postings VALUES (?, ?, ?)",
+                ((value, entry_id, frame) for value, frame in postings),
+            )
+            connection.executemany(
+                "INSERT INTO files VALUES (?, ?, ?)",
+                ((entry_id, suffix, data) for suffix, data in files.items()),
+            )
+
+    def stats(self) -> FingerprintStats:
+        """Return the number of recordings and the size of the database."""
+        if not self.path.exists():
+            return FingerprintStats(self.path, 0, 0)
+        with closing(self._connect()) as connection:
+            (entries,) = connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+        return FingerprintStats(self.path, entries, self.path.stat().st_size)
+
+    def clear(self) -> tuple[int, int]:
+        """Remove the index.
+
+        Returns:
+            The number of recordings removed and the bytes freed.
+        """
+        stats = self.stats()
+        for suffix in ("", "-journal", "-wal", "-shm"):
+            self.path.with_name(self.path.name + suffix).unlink(missing_ok=True)
+        return stats.entries, stats.size
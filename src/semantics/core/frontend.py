@@ -0,0 +1,211 @@
+"""In-process conversion of PCM audio to the sample format of speech models.
+
+Speech models take 16 kHz mono audio (see semantics.core.decode). Inputs that
+are already PCM but at another rate, width or channel count (44.1 kHz stereo
+recordings, 8 kHz telephone audio, 24-bit field recorders) do not need a
+codec, only a conversion, and starting an ffmpeg process for each of them is
+a noticeable share of the time spent on short clips. The Frontend does that
+conversion in the process, one block of PCM at a time:
+
+- normalization of 8-bit unsigned and 16, 24 and 32-bit signed integers to
+  float32 in [-1, 1];
+- downmix of interleaved channels to mono by averaging them;
+- polyphase resampling by the rational factor up/down between the rates.
+
+Each output sample of the resampler is the dot product of 2 * half input
+samples with one row (phase) of a Kaiser-windowed sinc filter bank, low-passed
+below the lower of both Nyquist frequencies. All outputs of a block are
+gathered and computed in one vectorized pass; the last input samples of a
+block are carried over as history, so converting a file block by block gives
+the same samples as converting it at once, in bounded memory.
+
+Unlike the rest of semantics.core this needs NumPy; import it only from
+functions that return samples, which only handlers call.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+# Zero crossings of the sinc on each side of a tap window, at the cutoff
+ZERO_CROSSINGS = 16
+
+# Cutoff as a share of the lower Nyquist frequency; the rest is transition
+ROLLOFF = 0.95
+
+# Kaiser window shape: about 80 dB of stopband attenuation
+KAISER_BETA = 8.6
+
+# Output samples computed at once, bounding the gathered taps in memory
+_OUTPUT_BLOCK = 8192
+
+
+def to_float(pcm: bytes, sample_width: int) -> np.ndarray:
+    """Convert interleaved little-endian PCM to float32 samples in [-1, 1].
+
+    Args:
+        pcm: Whole samples of PCM; 8-bit samples are unsigned, wider ones
+            signed, as in WAV files
+        sample_width: Bytes per sample (1 to 4)
+
+    Returns:
+        One float per sample, channels still interleaved.
+
+    Raises:
+        ValueError: If the sample width is not supported.
+    """
+    if sample_width == 1:
+        samples = np.frombuffer(pcm, dtype=np.uint8).astype(np.float32) - 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32)
+    elif sample_width == 3:
+        # Place the three bytes in the top of an int32 to keep the sign
+        wide = np.zeros((len(pcm) // 3, 4), dtype=np.uint8)
+        wide[:, 1:] = np.frombuffer(pcm, dtype=np.uint8).reshape(-1, 3)
+        samples = (wide.view("<i4").ravel() >> 8).astype(np.float32)
+    elif sample_width == 4:
+        samples = np.frombuffer(pcm, dtype="<i4").astype(np.float32)
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width} bytes")
+    return samples / float(1 << (8 * sample_width - 1))
+
+
+def downmix(samples: np.ndarray, channels: int) -> np.ndarray:
+    """Average interleaved channels into one.
+
+    Args:
+        samples: Interleaved samples of whole frames
+        channels: Number of channels
+
+    Returns:
+        One sample per frame.
+    """
+    if channels == 1:
+        return samples
+    return samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    """Convert float samples to 16-bit PCM, clipping them to full scale."""
+    return np.clip(np.rint(samples * 32768.0), -32768, 32767).astype("<i2").tobytes()
+
+
+def _filter_bank(up: int, down: int) -> tuple[np.ndarray, int]:
+    """Build the polyphase filter bank of a resampler.
+
+    Returns:
+        The (up, 2 * half) bank, whose row p weighs the input samples around
+        an output sample p / up input samples past an input sample, and half.
+    """
+    cutoff = ROLLOFF * min(1.0, up / down)
+    half = math.ceil(ZERO_CROSSINGS / cutoff)
+    # Distance from each tap to the output sample, in input samples
+    phases = np.arange(up)[:, None] / up
+    distance = phases + (half - 1) - np.arange(2 * half)[None, :]
+    window = np.kaiser(2 * half + 1, KAISER_BETA)
+    taper = np.interp(distance, np.arange(-half, half + 1), window)
+    bank = cutoff * np.sinc(cutoff * distance) * taper
+    # Keep a unit gain at DC on every phase
+    bank /= bank.sum(axis=1, keepdims=True)
+    return bank.astype(np.float32), half
+
+
+class Resampler:
+    """Resamples a stream of mono float32 blocks by a rational factor.
+
+    Args:
+        in_rate: Sample rate of the input
+        out_rate: Sample rate of the output
+    """
+
+    def __init__(self, in_rate: int, out_rate: int) -> None:
+        divisor = math.gcd(in_rate, out_rate)
+        self.up = out_rate // divisor
+        self.down = in_rate // divisor
+        self.bank, self.half = _filter_bank(self.up, self.down)
+        # Input samples not needed any more have been dropped from the
+        # buffer; its first sample has index _offset. The leading zeros
+        # stand for the silence before the first sample.
+        self._buffer = np.zeros(self.half - 1, dtype=np.float32)
+        self._offset = -(self.half - 1)
+        self._inputs = 0
+        self._outputs = 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample a block, returning every output its samples complete."""
+        if self.up == self.down:
+            return samples.astype(np.float32, copy=False)
+        self._inputs += len(samples)
+        self._buffer = np.concatenate((self._buffer, samples.astype(np.float32)))
+        # The last input sample an output can use is half samples past its
+        # position, so outputs positioned up to `last` are complete
+        last = self._offset + len(self._buffer) - 1 - self.half
+        return self._emit(((last + 1) * self.up + self.down - 1) // self.down)
+
+    def flush(self) -> np.ndarray:
+        """Return the remaining outputs, reading silence past the input."""
+        if self.up == self.down:
+            return np.zeros(0, dtype=np.float32)
+        tail = np.zeros(self.half, dtype=np.float32)
+        self._buffer = np.concatenate((self._buffer, tail))
+        return self._emit(-(-self._inputs * self.up // self.down))
+
+    def _emit(self, end: int) -> np.ndarray:
+        """Compute outputs up to, not including, output number end."""
+        taps = np.arange(2 * self.half)
+        blocks = []
+        for start in range(self._outputs, end, _OUTPUT_BLOCK):
+            outputs = np.arange(start, min(start + _OUTPUT_BLOCK, end))
+            position, phase = np.divmod(outputs * self.down, self.up)
+            first = position - (self.half - 1) - self._offset
+            window = self._buffer[first[:, None] + taps]
+            blocks.append(np.einsum("ij,ij->i", window, self.bank[phase]))
+        self._outputs = max(self._outputs, end)
+
+        # Drop the samples before the first tap of the next output
+        position = self._outputs * self.down // self.up
+        keep = position - (self.half - 1) - self._offset
+        if keep > 0:
+            self._buffer = self._buffer[keep:]
+            self._offset += keep
+        if not blocks:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(blocks).astype(np.float32, copy=False)
+
+
+class Frontend:
+    """Converts a stream of PCM blocks to mono float32 at another rate.
+
+    Blocks may end in the middle of a frame; the partial frame is kept for
+    the next block.
+
+    Args:
+        rate: Sample rate of the input
+        channels: Number of interleaved channels of the input
+        sample_width: Bytes per sample of the input
+        out_rate: Sample rate of the output
+    """
+
+    def __init__(
+        self, rate: int, channels: int, sample_width: int, out_rate: int
+    ) -> None:
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_size = channels * sample_width
+        self.resampler = Resampler(rate, out_rate)
+        self._partial = b""
+
+    def process(self, pcm: bytes) -> np.ndarray:
+        """Convert a block of PCM, returning the output samples it completes."""
+        pcm = self._partial + pcm
+        whole = len(pcm) - len(pcm) % self.frame_size
+        self._partial = pcm[whole:]
+        samples = to_float(pcm[:whole], self.sample_width)
+        return self.resampler.process(downmix(samples, self.channels))
+
+    def flush(self) -> np.ndarray:
+        """Return the last output samples, once the input has ended."""
+        self._partial = b""
+        return self.resampler.flush()
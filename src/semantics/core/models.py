@@ -0,0 +1,255 @@
+"""In-process pool of loaded models shared by all handlers.
+
+Loading model weights is usually the most expensive part of handling a
+file. Handlers ask the pool for a model instead of loading it themselves, so
+every later file handled by the same process (batch runs, the scheduler's
+worker processes, which serve all of a module's inputs, in-process launcher
+dispatch) reuses the loaded model.
+
+Models are keyed by backend, model name, device and precision. The pool
+keeps the least recently used models within a memory budget: after a load
+pushes the total past the budget, the least recently used other models are
+dropped. A model that does not fit the budget on its own is still kept
+until the next load.
+
+The budget is read from SEMANTICS_MODEL_MEMORY (e.g. '6G'); it defaults to
+DEFAULT_MEMORY_BUDGET.
+
+Model libraries are only touched if a handler has already imported them.
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from semantics.core.cache import parse_size
+
+# Default upper bound on the memory held by loaded models
+DEFAULT_MEMORY_BUDGET = 4 * 1024**3
+
+
+class ModelKey(NamedTuple):
+    """Identity of a loaded model."""
+
+    backend: str
+    name: str
+    device: str
+    precision: str
+
+
+class PoolStats(NamedTuple):
+    """Summary of the models held by a pool."""
+
+    models: int
+    size: int
+    budget: int
+    loads: int
+    hits: int
+
+
+class _Loaded(NamedTuple):
+    """A model held by the pool and its estimated size in bytes."""
+
+    model: Any
+    size: int
+
+
+def get_memory_budget() -> int:
+    """Get the configured model memory budget from SEMANTICS_MODEL_MEMORY.
+
+    Returns:
+        The budget in bytes, or DEFAULT_MEMORY_BUDGET if unset or invalid.
+    """
+    try:
+        return parse_size(os.environ["SEMANTICS_MODEL_MEMORY"])
+    except (KeyError, ValueError):
+        return DEFAULT_MEMORY_BUDGET
+
+
+def default_device() -> str:
+    """Return the best available torch device: 'cuda', 'mps' or 'cpu'."""
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    if torch.cuda.is_available():
+        return "cuda"
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def default_precision(device: str) -> str:
+    """Return the precision used by default on a device."""
+    return "fp16" if device == "cuda" else "fp32"
+
+
+def estimate_size(model: Any) -> int:
+    """Estimate the memory held by a model's weights.
+
+    Understands torch modules, and objects wrapping one in a `model`
+    attribute (as ultralytics does). Other objects count as 0 bytes.
+    """
+    for candidate in (model, getattr(model, "model", None)):
+        parameters = getattr(candidate, "parameters", None)
+        buffers = getattr(candidate, "buffers", None)
+        if callable(parameters) and callable(buffers):
+            try:
+                tensors = [*parameters(), *buffers()]
+                return sum(t.numel() * t.element_size() for t in tensors)
+            except (AttributeError, TypeError):
+                continue
+    return 0
+
+
+def _release_memory() -> None:
+    """Return memory freed by dropped models to the system."""
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+class ModelPool:
+    """Loaded models, kept least recently used first within a memory budget."""
+
+    def __init__(self, budget: int | None = None) -> None:
+        self.budget = get_memory_budget() if budget is None else budget
+        self._models: OrderedDict[ModelKey, _Loaded] = OrderedDict()
+        self._lock = threading.RLock()
+        # Held while a key's model loads, so that other keys can load meanwhile
+        self._key_locks: dict[ModelKey, threading.Lock] = {}
+        self._loads = 0
+        self._hits = 0
+
+    def get(
+        self,
+        key: ModelKey,
+        load: Callable[[ModelKey], Any],
+        warmup: Callable[[Any], None] | None = None,
+    ) -> Any:
+        """Return the model for a key, loading and warming it up if needed.
+
+        Args:
+            key: Identity of the model
+            load: Function loading the model for the key
+            warmup: Function run once on a freshly loaded model, e.g. a
+                tiny inference so the first real input is not slowed down
+                by lazy initialisation
+
+        Returns:
+            The loaded model.
+        """
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                loaded = self._models.get(key)
+                if loaded is not None:
+                    self._models.move_to_end(key)
+                    self._hits += 1
+                    return loaded.model
+
+            # Only this key waits for the load; other models stay available
+            model = load(key)
+            if warmup is not None:
+                warmup(model)
+            with self._lock:
+                self._models[key] = _Loaded(model, estimate_size(model))
+                self._loads += 1
+                self._evict(keep=key)
+            return model
+
+    def _evict(self, keep: ModelKey) -> None:
+        """Drop least recently used models until the pool fits its budget."""
+        dropped = False
+        for key in list(self._models):
+            if self.size <= self.budget:
+                break
+            if key != keep:
+                del self._models[key]
+                dropped = True
+        if dropped:
+            _release_memory()
+
+    def discard(self, key: ModelKey) -> bool:
+        """Drop a model from the pool.
+
+        Returns:
+            True if the model was loaded.
+        """
+        with self._lock:
+            if self._models.pop(key, None) is None:
+                return False
+        _release_memory()
+        return True
+
+    def clear(self) -> None:
+        """Drop every model."""
+        with self._lock:
+            self._models.clear()
+        _release_memory()
+
+    @property
+    def size(self) -> int:
+        """Estimated memory held by the loaded models, in bytes."""
+        return sum(loaded.size for loaded in self._models.values())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._models
+
+    def stats(self) -> PoolStats:
+        """Return a summary of the pool."""
+        with self._lock:
+            return PoolStats(
+                len(self._models), self.size, self.budget, self._loads, self._hits
+            )
+
+
+_pool: ModelPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ModelPool:
+    """Return the model pool shared by everything in this process."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ModelPool()
+        return _pool
+
+
+def get_model(
+    backend: str,
+    name: str,
+    load: Callable[[ModelKey], Any],
+    device: str | None = None,
+    precision: str | None = None,
+    warmup: Callable[[Any], None] | None = None,
+) -> Any:
+    """Return a model from the shared pool, loading it on first use.
+
+    Args:
+        backend: Model library (e.g., 'whisper', 'yolo')
+        name: Model name or size (e.g., 'base', 'yolov8n')
+        load: Function loading the model for its ModelKey, on key.device and
+            in key.precision
+        device: Device to load on; defaults to default_device()
+        precision: 'fp16' or 'fp32'; defaults to default_precision(device)
+        warmup: Function run once on a freshly loaded model
+
+    Returns:
+        The loaded model.
+    """
+    device = device or default_device()
+    precision = precision or default_precision(device)
+    key = ModelKey(backend, name, device, precision)
+    return get_pool().get(key, load, warmup)
@@ -1,2 +1,113 @@
-# This is the script for shared logic for path/file handling in the semantics module.
-# Where goes the functions that deal with paths and files used in semantics?
\ No newline at end of file
+"""Shared path and file handling utilities for semantics.
+
+These helpers are used from the main CLI and from any module.
+"""
+
+from __future__ import annotations
+
+import glob
+from collections.abc import Iterable
+from pathlib import Path
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+def is_glob_pattern(pattern: str) -> bool:
+    """Return True if the pattern contains glob wildcards.
+
+    Args:
+        pattern: Path or pattern given on the command line.
+
+    Returns:
+        True if the pattern should be expanded with glob.
+    """
+    return any(char in _GLOB_CHARS for char in pattern)
+
+
+def _glob_root(pattern: str) -> Path:
+    """Return the leading directory of a glob pattern that has no wildcards."""
+    root = Path()
+    for part in Path(pattern).parts:
+        if is_glob_pattern(part):
+            break
+        root = root / part
+    return root
+
+
+def _walk_directory(directory: Path) -> list[Path]:
+    """Return all non-hidden files below a directory in sorted order."""
+    files = []
+    for path in directory.rglob("*"):
+        relative = path.relative_to(directory)
+        if any(part.startswith(".") for part in relative.parts):
+            continue
+        if path.is_file():
+            files.append(path)
+    return sorted(files)
+
+
+def expand_inputs(patterns: Iterable[str]) -> list[tuple[Path, Path]]:
+    """Expand files, directories and glob patterns into a list of input files.
+
+    Directories are walked recursively, skipping hidden files and folders.
+    Glob patterns support ``**`` for recursive matching. Duplicate files are
+    only returned once, in the order they were first found.
+
+    Args:
+        patterns: Files, directories or glob patterns.
+
+    Returns:
+        List of (file, relative) tuples, where relative is the file's path
+        relative to the directory or glob root it was found under, or just its
+        name for files given directly.
+
+    Raises:
+        FileNotFoundError: If a pattern is neither an existing path nor a glob.
+    """
+    found: list[tuple[Path, Path]] = []
+    seen: set[Path] = set()
+
+    def add(path: Path, relative: Path) -> None:
+        key = path.resolve()
+        if key not in seen:
+            seen.add(key)
+            found.append((path, relative))
+
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            for file in _walk_directory(path):
+                add(file, file.relative_to(path))
+        elif path.is_file():
+            add(path, Path(path.name))
+        elif is_glob_pattern(pattern):
+            root = _glob_root(pattern)
+            for match in sorted(glob.glob(pattern, recursive=True)):
+                file = Path(match)
+                if file.is_file():
+                    add(file, file.relative_to(root))
+        else:
+            raise FileNotFoundError(pattern)
+
+    return found
+
+
+def snapshot_files(directory: Path) -> dict[Path, tuple[int, int]]:
+    """Record the size and mtime of every non-hidden file below a directory.
+
+    Comparing two snapshots shows which files were written in between.
+
+    Args:
+        directory: Directory to scan; a missing directory has no files.
+
+    Returns:
+        Dictionary mapping paths relative to directory to (size, mtime_ns).
+    """
+    if not directory.is_dir():
+        return {}
+    snapshot = {}
+    for path in _walk_directory(directory):
+        file_stat = path.stat()
+        relative = path.relative_to(directory)
+        snapshot[relative] = (file_stat.st_size, file_stat.st_mtime_ns)
+    return snapshot
@@ -0,0 +1,383 @@
+"""Concurrent scheduling of a module's operations on one input file.
+
+Each handler module may declare how it is scheduled:
+
+    DEPENDS_ON = ("transcribe",)  # operations that must finish first, if requested
+    WORKLOAD = "cpu"              # "cpu" (default) or "io"
+
+Operations whose dependencies have finished run concurrently: CPU-bound ones
+on a process pool, I/O-bound ones on a thread pool. An operation that is the
+only one ready runs inline, exactly as if it had been called directly. The
+pools only live for one run_operations() call, unless the calls share an
+OperationPools: a module handling several inputs runs them all on the same
+worker processes, which keep the models they loaded (see
+semantics.core.models) from one input to the next.
+
+Operations that run concurrently are isolated from each other: each writes
+into its own hidden staging folder inside the output folder, which starts
+with links to the outputs of its dependencies. Files it writes are moved
+into the output folder once it finishes, and its console output is printed
+as one block, with the staging folder shown as the output folder. A failed
+operation's staging folder is removed, unless it holds a checkpoint (see
+semantics.core.checkpoint): then it is left in place, and the next run of
+that operation starts in it so that it can resume.
+"""
+
+from __future__ import annotations
+
+import importlib
+import io
+import os
+import shutil
+import sys
+import threading
+import uuid
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import ExitStack
+from pathlib import Path
+from types import ModuleType
+from typing import NamedTuple
+
+from semantics.core.cache import run_cached
+from semantics.core.checkpoint import has_checkpoints
+from semantics.core.path import snapshot_files
+
+WORKLOADS = ("cpu", "io")
+
+_local = threading.local()
+
+
+class Operation(NamedTuple):
+    """A handler to run on the input file, with its options."""
+
+    handler: ModuleType
+    options: dict
+
+    @property
+    def name(self) -> str:
+        """Short handler name (e.g., 'transcribe'), as used in DEPENDS_ON."""
+        return self.handler.__name__.rsplit(".", 1)[-1]
+
+    @property
+    def depends_on(self) -> tuple[str, ...]:
+        """Names of operations that must finish before this one."""
+        return tuple(getattr(self.handler, "DEPENDS_ON", ()))
+
+    @property
+    def workload(self) -> str:
+        """Whether the handler is 'cpu' or 'io' bound."""
+        workload = getattr(self.handler, "WORKLOAD", "cpu")
+        if workload not in WORKLOADS:
+            raise ValueError(
+                f"{self.handler.__name__}: WORKLOAD must be one of {WORKLOADS}"
+            )
+        return workload
+
+
+class _OutputRouter(io.TextIOBase):
+    """Standard stream that sends each thread's writes to its own buffer.
+
+    Threads without a buffer write to the original stream.
+    """
+
+    def __init__(self, stream) -> None:
+        self._stream = stream
+
+    def write(self, text: str) -> int:
+        buffer = getattr(_local, "buffer", None)
+        return (buffer if buffer is not None else self._stream).write(text)
+
+    def flush(self) -> None:
+        if getattr(_local, "buffer", None) is None:
+            self._stream.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+    @property
+    def encoding(self) -> str:
+        return getattr(self._stream, "encoding", "utf-8")
+
+
+def _install_router() -> None:
+    """Route sys.stdout and sys.stderr through per-thread buffers."""
+    if not isinstance(sys.stdout, _OutputRouter):
+        sys.stdout = _OutputRouter(sys.stdout)
+    if not isinstance(sys.stderr, _OutputRouter):
+        sys.stderr = _OutputRouter(sys.stderr)
+
+
+def _uninstall_router() -> None:
+    """Restore the streams replaced by _install_router()."""
+    if isinstance(sys.stdout, _OutputRouter):
+        sys.stdout = sys.stdout._stream
+    if isinstance(sys.stderr, _OutputRouter):
+        sys.stderr = sys.stderr._stream
+
+
+class OperationPools:
+    """Worker pools shared by the run_operations() calls of one module run.
+
+    Pools are created when first needed and shut down on exit.
+    """
+
+    def __init__(self) -> None:
+        self._pools: dict[str, Executor] = {}
+        self._stack = ExitStack()
+
+    def get(self, workload: str, workers: int) -> Executor:
+        """Return the pool for a workload, creating it with `workers` workers."""
+        if workload not in self._pools:
+            if workload == "cpu":
+                pool: Executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers)
+            self._pools[workload] = self._stack.enter_context(pool)
+        return self._pools[workload]
+
+    def close(self) -> None:
+        """Shut the pools down, waiting for their workers."""
+        self._pools = {}
+        self._stack.close()
+
+    def __enter__(self) -> OperationPools:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _check_graph(operations: list[Operation]) -> None:
+    """Raise ValueError if the requested operations have cyclic dependencies."""
+    names = {op.name for op in operations}
+    remaining = {op.name: set(op.depends_on) & names for op in operations}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            cycle = ", ".join(sorted(remaining))
+            raise ValueError(f"Cyclic operation dependencies: {cycle}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def _ancestors(op: Operation, by_name: dict[str, Operation]) -> set[str]:
+    """Return the names of all requested operations op depends on, directly or not."""
+    found: set[str] = set()
+    stack = [name for name in op.depends_on if name in by_name]
+    while stack:
+        name = stack.pop()
+        if name not in found:
+            found.add(name)
+            stack.extend(dep for dep in by_name[name].depends_on if dep in by_name)
+    return found
+
+
+def _run_isolated(
+    handler: ModuleType | str,
+    input_path: Path,
+    staging: Path,
+    verbose: bool,
+    use_cache: bool,
+    options: dict,
+) -> tuple[str, list[Path], BaseException | None]:
+    """Run one operation in its staging folder and capture its output.
+
+    Runs in a pool thread or process. Handlers are passed by module name to
+    processes, since modules cannot be pickled.
+
+    Returns:
+        The captured console output, the files written (relative to the
+        staging folder) and the exception raised, if any.
+    """
+    if isinstance(handler, str):
+        handler = importlib.import_module(handler)
+
+    _install_router()
+    _local.buffer = io.StringIO()
+    error = None
+    before = snapshot_files(staging)
+    try:
+        run_cached(
+            handler,
+            input_path,
+            staging,
+            verbose=verbose,
+            use_cache=use_cache,
+            **options,
+        )
+    except Exception as e:
+        error = e
+    finally:
+        output = _local.buffer.getvalue()
+        _local.buffer = None
+
+    after = snapshot_files(staging)
+    written = [path for path, state in after.items() if before.get(path) != state]
+    return output, written, error
+
+
+def _stage(op: Operation, output_path: Path, inputs: list[Path]) -> Path:
+    """Create a staging folder holding links to the operation's inputs.
+
+    A staging folder left by an interrupted run of the operation is reused,
+    so that the checkpoints it holds can be resumed from.
+    """
+    staging = output_path / f".{op.name}-{uuid.uuid4().hex[:8]}"
+    for leftover in sorted(output_path.glob(f".{op.name}-????????")):
+        try:
+            # Renaming claims it, should another run be looking too
+            os.rename(leftover, staging)
+            break
+        except OSError:
+            continue
+    else:
+        staging.mkdir()
+    for relative in inputs:
+        target = staging / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.unlink(missing_ok=True)
+        try:
+            os.link(output_path / relative, target)
+        except OSError:
+            shutil.copy2(output_path / relative, target)
+    return staging
+
+
+def _publish(staging: Path, output_path: Path, written: list[Path]) -> None:
+    """Move the files an operation wrote from its staging folder into place."""
+    for relative in written:
+        target = output_path / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staging / relative, target)
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+def run_operations(
+    operations: list[Operation],
+    input_path: Path,
+    output_path: Path,
+    verbose: bool = False,
+    use_cache: bool = True,
+    pools: OperationPools | None = None,
+) -> None:
+    """Run a module's requested operations, concurrently where possible.
+
+    Once an operation fails no new operations are started; running ones are
+    allowed to finish and the first error is then raised.
+
+    Args:
+        operations: The requested operations
+        input_path: Path to the input file
+        output_path: Path to the output folder
+        verbose: Enable verbose output
+        use_cache: Set to False to bypass the result cache
+        pools: Pools to run concurrent operations on; by default, pools are
+            created for this call only
+
+    Raises:
+        ValueError: If the operations have cyclic dependencies.
+    """
+    _check_graph(operations)
+    by_name = {op.name: op for op in operations}
+    pending = list(operations)
+    done: set[str] = set()
+    written_by: dict[str, list[Path]] = {}
+    running: dict[Future, tuple[Operation, Path]] = {}
+    error: BaseException | None = None
+
+    def is_ready(op: Operation) -> bool:
+        return all(dep in done or dep not in by_name for dep in op.depends_on)
+
+    with ExitStack() as stack:
+        if pools is None:
+            pools = stack.enter_context(OperationPools())
+
+        def get_pool(workload: str) -> Executor:
+            if workload == "cpu":
+                # A module has only a few operations; give each its own
+                # process and let the OS share the cores between them
+                workers = sum(op.workload == "cpu" for op in operations)
+            else:
+                workers = len(operations)
+            return pools.get(workload, workers)
+
+        stack.callback(_uninstall_router)
+
+        while pending or running:
+            ready = [op for op in pending if is_ready(op)] if error is None else []
+            for op in ready:
+                pending.remove(op)
+
+            if len(ready) == 1 and not running:
+                # Nothing to overlap with: run inline with streaming output
+                op = ready[0]
+                before = snapshot_files(output_path)
+                run_cached(
+                    op.handler,
+                    input_path,
+                    output_path,
+                    verbose=verbose,
+                    use_cache=use_cache,
+                    **op.options,
+                )
+                after = snapshot_files(output_path)
+                written_by[op.name] = [
+                    path for path, state in after.items() if before.get(path) != state
+                ]
+                done.add(op.name)
+                continue
+
+            for op in ready:
+                ancestors = sorted(_ancestors(op, by_name))
+                inputs = [path for dep in ancestors for path in written_by.get(dep, [])]
+                staging = _stage(op, output_path, inputs)
+                _install_router()
+                if op.workload == "cpu":
+                    handler: ModuleType | str = op.handler.__name__
+                else:
+                    handler = op.handler
+                future = get_pool(op.workload).submit(
+                    _run_isolated,
+                    handler,
+                    input_path,
+                    staging,
+                    verbose,
+                    use_cache,
+                    op.options,
+                )
+                running[future] = (op, staging)
+
+            if not running:
+                # A failure left dependents that can no longer run
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                op, staging = running.pop(future)
+                try:
+                    output, written, op_error = future.result()
+                except Exception as e:
+                    output, written, op_error = "", [], e
+                # Handlers print the folder they were given: show the real one
+                sys.stdout.write(output.replace(str(staging), str(output_path)))
+                sys.stdout.flush()
+                if op_error is not None:
+                    if not has_checkpoints(staging):
+                        shutil.rmtree(staging, ignore_errors=True)
+                    error = error or op_error
+                    continue
+                _publish(staging, output_path, written)
+                written_by[op.name] = written
+                done.add(op.name)
+
+    if error is not None:
+        raise error
@@ -0,0 +1,336 @@
+"""Content sniffing for routing input files to modules.
+
+Detects the media format of a file from its magic bytes instead of its
+extension. Only the first few KB of a file are read with a single positional
+read; ISO-BMFF files whose movie header is not at the start get a handful of
+extra small reads to walk the top-level boxes.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+# Bytes read from the start of every file
+HEAD_SIZE = 4096
+
+# Upper bound on the bytes read from an ISO-BMFF 'moov' box
+MOOV_READ_LIMIT = 256 * 1024
+
+# Maximum number of top-level ISO-BMFF boxes walked to find 'moov'
+MAX_TOP_LEVEL_BOXES = 16
+
+_ISOBMFF_AUDIO_BRANDS = {b"M4A ", b"M4B ", b"M4P ", b"F4A ", b"F4B "}
+_ISOBMFF_IMAGE_BRANDS = {b"heic", b"heix", b"mif1", b"msf1", b"avif"}
+
+_OGG_VIDEO_CODECS = (b"\x80theora", b"\x01video", b"\x80daala")
+_OGG_AUDIO_CODECS = (b"\x01vorbis", b"OpusHead", b"\x7fFLAC", b"Speex   ")
+
+_ASF_HEADER = bytes.fromhex("3026b2758e66cf11a6d900aa0062ce6c")
+_ASF_VIDEO_MEDIA = bytes.fromhex("c0ef19bc4d5bcf11a8fd00805f5c442b")
+_ASF_AUDIO_MEDIA = bytes.fromhex("409e69f84d5bcf11a8fd00805f5c442b")
+
+_EBML_HEADER = b"\x1a\x45\xdf\xa3"
+_MATROSKA_TRACKS = b"\x16\x54\xae\x6b"
+_MATROSKA_VIDEO_TRACK = b"\x83\x81\x01"
+_MATROSKA_AUDIO_TRACK = b"\x83\x81\x02"
+
+
+class MediaType(NamedTuple):
+    """Result of sniffing a file's content."""
+
+    format: str
+    module: str | None
+    has_video: bool | None
+
+
+def _read_at(fd: int, size: int, offset: int) -> bytes:
+    """Read up to size bytes at offset without moving a shared file position."""
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+def _container(format: str, has_video: bool | None) -> MediaType:
+    """Build the result for a container that may or may not hold video."""
+    if has_video is None:
+        return MediaType(format, None, None)
+    return MediaType(format, "video" if has_video else "audio", has_video)
+
+
+def _read_range(head: bytes, fd: int | None, offset: int, size: int) -> bytes:
+    """Return bytes from the head if available, otherwise read them from fd."""
+    if offset + size <= len(head) or fd is None:
+        return head[offset : offset + size]
+    return _read_at(fd, size, offset)
+
+
+def _isobmff_handlers(head: bytes, fd: int | None) -> set[bytes] | None:
+    """Return the track handler types of an ISO-BMFF file.
+
+    Walks the top-level boxes until 'moov' is found. Returns None if it could
+    not be found within the head (when fd is None) or the first few boxes.
+    """
+    offset = 0
+    for _ in range(MAX_TOP_LEVEL_BOXES):
+        header = _read_range(head, fd, offset, 16)
+        if len(header) < 8:
+            return None
+
+        size = int.from_bytes(header[:4], "big")
+        box_type = header[4:8]
+        header_size = 8
+        if size == 1:
+            if len(header) < 16:
+                return None
+            size = int.from_bytes(header[8:16], "big")
+            header_size = 16
+
+        if box_type == b"moov":
+            length = MOOV_READ_LIMIT if size == 0 else min(size, MOOV_READ_LIMIT)
+            moov = _read_range(head, fd, offset, length)
+            handlers = set()
+            index = moov.find(b"hdlr")
+            while index != -1:
+                handlers.add(moov[index + 12 : index + 16])
+                index = moov.find(b"hdlr", index + 4)
+            return handlers
+
+        if size < header_size:
+            return None
+        offset += size
+
+    return None
+
+
+def _sniff_isobmff(head: bytes, fd: int | None) -> MediaType:
+    """Classify an ISO-BMFF file (MP4, MOV, M4A, HEIF)."""
+    brand = head[8:12]
+    if brand in _ISOBMFF_IMAGE_BRANDS:
+        return MediaType("heif", "document", False)
+
+    format = "mov" if brand == b"qt  " else "mp4"
+    handlers = _isobmff_handlers(head, fd)
+    if handlers is None:
+        if brand in _ISOBMFF_AUDIO_BRANDS:
+            return MediaType("m4a", "audio", False)
+        return _container(format, None)
+    if b"vide" in handlers:
+        return _container(format, True)
+    if b"soun" in handlers:
+        return MediaType("m4a" if format == "mp4" else format, "audio", False)
+    return _container(format, None)
+
+
+def _sniff_matroska(head: bytes) -> MediaType:
+    """Classify a Matroska or WebM file from the tracks in its head."""
+    format = "webm" if b"webm" in head[:64] else "mkv"
+    tracks = head.find(_MATROSKA_TRACKS)
+    if tracks == -1:
+        return _container(format, None)
+    if _MATROSKA_VIDEO_TRACK in head[tracks:]:
+        return _container(format, True)
+    if _MATROSKA_AUDIO_TRACK in head[tracks:]:
+        return _container(format, False)
+    return _container(format, None)
+
+
+def _sniff_ogg(head: bytes) -> MediaType:
+    """Classify an Ogg file from the codec headers of its first pages."""
+    if any(codec in head for codec in _OGG_VIDEO_CODECS):
+        return _container("ogv", True)
+    if any(codec in head for codec in _OGG_AUDIO_CODECS):
+        return _container("ogg", False)
+    return _container("ogg", None)
+
+
+# Bitrates in kbps by (MPEG-1, layer) and (MPEG-2/2.5, layer)
+_MPEG_BITRATES = {
+    (True, 1): (32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+# Sample rates by version bits: MPEG-2.5, reserved, MPEG-2, MPEG-1
+_MPEG_SAMPLE_RATES = {
+    0: (11025, 12000, 8000),
+    2: (22050, 24000, 16000),
+    3: (44100, 48000, 32000),
+}
+
+
+class MpegFrame(NamedTuple):
+    """A parsed MPEG audio frame header (see parse_mpeg_frame())."""
+
+    mpeg1: bool
+    layer: int
+    bitrate: int
+    sample_rate: int
+    padding: bool
+    mono: bool
+
+    @property
+    def samples(self) -> int:
+        """Samples per channel in one frame."""
+        if self.layer == 1:
+            return 384
+        return 1152 if self.mpeg1 or self.layer == 2 else 576
+
+    @property
+    def length(self) -> int:
+        """Length of the frame in bytes, header included."""
+        slot = 4 if self.layer == 1 else 1
+        slots = self.samples // 8 * self.bitrate // self.sample_rate // slot
+        return (slots + self.padding) * slot
+
+
+def parse_mpeg_frame(data: bytes) -> MpegFrame | None:
+    """Parse a 4-byte MPEG audio frame header, or None if it is not one."""
+    if len(data) < 4:
+        return None
+    value = int.from_bytes(data[:4], "big")
+    version = (value >> 19) & 0x03
+    layer = 4 - ((value >> 17) & 0x03)
+    bitrate_index = (value >> 12) & 0x0F
+    rate_index = (value >> 10) & 0x03
+    if (
+        value >> 21 != 0x7FF
+        or version == 1
+        or layer == 4
+        or bitrate_index in (0, 15)
+        or rate_index == 3
+    ):
+        return None
+    mpeg1 = version == 3
+    return MpegFrame(
+        mpeg1,
+        layer,
+        _MPEG_BITRATES[(mpeg1, layer)][bitrate_index - 1] * 1000,
+        _MPEG_SAMPLE_RATES[version][rate_index],
+        bool((value >> 9) & 0x01),
+        (value >> 6) & 0x03 == 3,
+    )
+
+
+def _adts_frame_length(data: bytes) -> int | None:
+    """Return the length of the ADTS (AAC) frame whose header starts data."""
+    if len(data) < 7 or data[0] != 0xFF or data[1] & 0xF6 != 0xF0:
+        return None
+    # Sampling frequency indexes 13 to 15 are reserved
+    if (data[2] >> 2) & 0x0F > 12:
+        return None
+    length = ((data[3] & 0x03) << 11) | (data[4] << 3) | (data[5] >> 5)
+    header = 7 if data[1] & 0x01 else 9
+    return length if length >= header else None
+
+
+def _is_mpeg_audio_frame(head: bytes) -> bool:
+    """Return True if the head starts with MPEG audio or ADTS frames.
+
+    A frame header alone is four bytes that other data matches by chance (a
+    UTF-16LE byte order mark does), so the next frame's header must follow
+    where the first frame ends. A frame that ends past the head counts if the
+    head was cut short by HEAD_SIZE, not by the end of the file.
+    """
+    is_adts = len(head) >= 2 and head[1] & 0x06 == 0
+    if is_adts:
+        length = _adts_frame_length(head)
+    else:
+        frame = parse_mpeg_frame(head)
+        length = frame.length if frame is not None else None
+    if length is None:
+        return False
+    if length >= len(head):
+        return length == len(head) or len(head) >= HEAD_SIZE
+    following = head[length:]
+    if is_adts:
+        header = _adts_frame_length(following) is not None
+    else:
+        header = parse_mpeg_frame(following) is not None
+    # The next header may itself be cut by the end of the head
+    return header or (len(following) < 7 and len(head) >= HEAD_SIZE)
+
+
+def sniff_head(head: bytes, fd: int | None = None) -> MediaType | None:
+    """Detect the media type from the first bytes of a file.
+
+    Args:
+        head: The first bytes of the file (at least a few hundred bytes)
+        fd: Open file descriptor, used for extra reads of ISO-BMFF files whose
+            'moov' box lies beyond the head
+
+    Returns:
+        The detected media type, or None if no known signature matched
+    """
+    if head.startswith(b"%PDF"):
+        return MediaType("pdf", "document", False)
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return MediaType("png", "document", False)
+    if head.startswith(b"\xff\xd8\xff"):
+        return MediaType("jpeg", "document", False)
+    if head.startswith((b"II*\x00", b"MM\x00*")):
+        return MediaType("tiff", "document", False)
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return MediaType("gif", "document", False)
+
+    if head.startswith(b"RIFF") and len(head) >= 12:
+        riff_type = head[8:12]
+        if riff_type == b"WAVE":
+            return MediaType("wav", "audio", False)
+        if riff_type == b"AVI ":
+            return _container("avi", True)
+        if riff_type == b"WEBP":
+            return MediaType("webp", "document", False)
+        return None
+
+    if head.startswith(b"fLaC"):
+        return MediaType("flac", "audio", False)
+    if head.startswith(b"OggS"):
+        return _sniff_ogg(head)
+    if head.startswith(b"ID3"):
+        return MediaType("mp3", "audio", False)
+    if head[4:8] == b"ftyp":
+        return _sniff_isobmff(head, fd)
+    if head.startswith(_EBML_HEADER):
+        return _sniff_matroska(head)
+    if head.startswith(b"FLV\x01") and len(head) >= 5:
+        return _container("flv", bool(head[4] & 0x01))
+    if head.startswith(_ASF_HEADER):
+        if _ASF_VIDEO_MEDIA in head:
+            return _container("asf", True)
+        if _ASF_AUDIO_MEDIA in head:
+            return _container("asf", False)
+        return _container("asf", None)
+    if _is_mpeg_audio_frame(head):
+        return MediaType("mp3" if head[1] & 0x06 else "aac", "audio", False)
+
+    return None
+
+
+def sniff_media(path: Path) -> MediaType | None:
+    """Detect the media type of a file from its content.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        The detected media type, or None if the file could not be read or no
+        known signature matched. A result with module=None means the format
+        was recognised but it could not be told whether it holds video.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    except OSError:
+        return None
+    try:
+        head = _read_at(fd, HEAD_SIZE, 0)
+        return sniff_head(head, fd)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
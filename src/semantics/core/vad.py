@@ -0,0 +1,207 @@
+"""Voice activity detection with a cheap energy and spectral detector.
+
+Finds the regions of a recording that hold speech so that only those are
+sent to a transcription model. Audio is cut into short frames and every
+frame is classified in one vectorized pass over three features:
+
+- energy, compared with the recording's own noise floor and an absolute
+  floor, which rejects silence and line noise;
+- spectral flatness, which rejects broadband noise (hiss, static);
+- the share of energy in the speech band (300-3400 Hz), which rejects rumble
+  and high-pitched tones.
+
+Consecutive speech frames are merged into regions, bridging short pauses.
+Regions whose loudness barely changes are dropped: speech rises and falls
+with every syllable, while tones and most hold music are steady. Kept
+regions are padded so that word onsets are not clipped.
+
+`compact()` joins the regions into one shorter signal and returns a TimeMap
+that converts times in it back to the original timeline.
+
+Unlike the rest of semantics.core this needs NumPy; import it only from
+handlers, where the heavy dependencies of a module are available.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple
+
+import numpy as np
+
+# Length of one analysis frame
+FRAME_SECONDS = 0.03
+
+# Frames must be this much louder than the noise floor (its 10th percentile)
+ENERGY_MARGIN_DB = 10.0
+
+# Frames quieter than this (dBFS) are never speech
+MIN_ENERGY_DB = -55.0
+
+# Frames flatter than this (1.0 is white noise) are noise, not voice
+MAX_FLATNESS = 0.4
+
+# Minimum share of a frame's energy in the speech band
+SPEECH_BAND = (300.0, 3400.0)
+MIN_SPEECH_BAND_RATIO = 0.35
+
+# Pauses shorter than this are kept inside a region
+MIN_SILENCE_SECONDS = 0.3
+
+# Regions shorter than this are dropped
+MIN_SPEECH_SECONDS = 0.25
+
+# Regions whose frame energies vary less than this (std, dB) are dropped
+MIN_MODULATION_DB = 3.0
+
+# Audio kept on both sides of a region
+PAD_SECONDS = 0.2
+
+
+class SpeechRegion(NamedTuple):
+    """A region of speech, in samples."""
+
+    start: int
+    end: int
+
+
+class FrameFeatures(NamedTuple):
+    """Per-frame features used to classify frames."""
+
+    energy_db: np.ndarray
+    flatness: np.ndarray
+    band_ratio: np.ndarray
+
+
+def frame_features(
+    samples: np.ndarray, sample_rate: int, frame_length: int
+) -> FrameFeatures:
+    """Compute the features of every complete frame.
+
+    Args:
+        samples: Mono audio as floats in [-1, 1]
+        sample_rate: Sample rate in Hz
+        frame_length: Samples per frame
+
+    Returns:
+        One value per frame for each feature.
+    """
+    count = len(samples) // frame_length
+    frames = samples[: count * frame_length].reshape(count, frame_length)
+    frames = frames.astype(np.float32, copy=False)
+
+    energy_db = 10.0 * np.log10(np.mean(frames**2, axis=1) + 1e-12)
+
+    power = np.abs(np.fft.rfft(frames * np.hanning(frame_length), axis=1)) ** 2
+    power += 1e-12
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+
+    freqs = np.fft.rfftfreq(frame_length, 1.0 / sample_rate)
+    band = (freqs >= SPEECH_BAND[0]) & (freqs <= SPEECH_BAND[1])
+    band_ratio = power[:, band].sum(axis=1) / power.sum(axis=1)
+
+    return FrameFeatures(energy_db, flatness, band_ratio)
+
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """Return the [start, end) frame indices of each run of True values."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.column_stack((np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def detect_speech(samples: np.ndarray, sample_rate: int) -> list[SpeechRegion]:
+    """Find the regions of a recording that hold speech.
+
+    Args:
+        samples: Mono audio as floats in [-1, 1]
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        Non-overlapping speech regions in order, in samples.
+    """
+    frame_length = max(1, int(FRAME_SECONDS * sample_rate))
+    if len(samples) < frame_length:
+        return []
+
+    features = frame_features(samples, sample_rate, frame_length)
+    floor = np.percentile(features.energy_db, 10)
+    threshold = max(floor + ENERGY_MARGIN_DB, MIN_ENERGY_DB)
+    speech = (
+        (features.energy_db > threshold)
+        & (features.flatness < MAX_FLATNESS)
+        & (features.band_ratio > MIN_SPEECH_BAND_RATIO)
+    )
+
+    runs = _runs(speech)
+    if not len(runs):
+        return []
+
+    # Bridge short pauses
+    min_silence = MIN_SILENCE_SECONDS / FRAME_SECONDS
+    merged = [list(runs[0])]
+    for start, end in runs[1:]:
+        if start - merged[-1][1] < min_silence:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    min_speech = MIN_SPEECH_SECONDS / FRAME_SECONDS
+    pad = int(PAD_SECONDS * sample_rate)
+    regions: list[SpeechRegion] = []
+    for start, end in merged:
+        if end - start < min_speech:
+            continue
+        if np.std(features.energy_db[start:end]) < MIN_MODULATION_DB:
+            continue
+        first = max(0, start * frame_length - pad)
+        last = min(len(samples), end * frame_length + pad)
+        if regions and first <= regions[-1].end:
+            regions[-1] = SpeechRegion(regions[-1].start, last)
+        else:
+            regions.append(SpeechRegion(first, last))
+    return regions
+
+
+class TimeMap:
+    """Convert times in compacted audio back to the original timeline."""
+
+    def __init__(self, regions: list[SpeechRegion], sample_rate: int) -> None:
+        self._compact_starts: list[float] = []
+        self._original_starts: list[float] = []
+        offset = 0
+        for region in regions:
+            self._compact_starts.append(offset / sample_rate)
+            self._original_starts.append(region.start / sample_rate)
+            offset += region.end - region.start
+
+    def to_original(self, seconds: float, end: bool = False) -> float:
+        """Map a time in the compacted audio to the original audio.
+
+        Args:
+            seconds: Time in the compacted audio
+            end: Map a time on a region boundary to the end of the region
+                before it rather than the start of the region after it, as
+                is right for the end of a segment
+
+        Returns:
+            The time in the original audio.
+        """
+        if not self._compact_starts:
+            return seconds
+        find = bisect_left if end else bisect_right
+        index = max(0, find(self._compact_starts, seconds) - 1)
+        return self._original_starts[index] + seconds - self._compact_starts[index]
+
+
+def compact(
+    samples: np.ndarray, regions: list[SpeechRegion], sample_rate: int
+) -> tuple[np.ndarray, TimeMap]:
+    """Join the speech regions of a recording into one signal.
+
+    Returns:
+        The joined samples and the map from their times to the original ones.
+    """
+    if not regions:
+        return samples[:0], TimeMap([], sample_rate)
+    joined = np.concatenate([samples[r.start : r.end] for r in regions])
+    return joined, TimeMap(regions, sample_rate)
@@ -0,0 +1,270 @@
+"""Resident warm worker for module executables.
+
+A module executable started with `--serve` imports its module CLIs once and
+then listens on a Unix domain socket per module. The launcher connects to
+that socket instead of spawning the executable, which avoids unpacking the
+PyInstaller bundle and re-importing everything on every call.
+
+Each request runs in a forked child of the worker, so requests are isolated
+from each other while sharing the warm interpreter state. The client's stdin,
+stdout and stderr file descriptors are passed over the socket, so the command
+reads and writes the caller's terminal or pipes directly.
+
+Protocol (client -> worker): a 4-byte big-endian length followed by a JSON
+object with "argv", "cwd" and "env"; fds 0, 1 and 2 are attached to the first
+message. Worker -> client: the 4-byte pid of the child running the request,
+then its 4-byte signed exit code once it finishes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import click
+
+_HEADER = struct.Struct("!I")
+_STATUS = struct.Struct("!i")
+
+# Upper bound on the size of a request message (argv + cwd + env)
+MAX_REQUEST_SIZE = 1024 * 1024
+
+
+def is_supported() -> bool:
+    """Return True if the platform supports worker mode."""
+    return hasattr(socket, "AF_UNIX") and hasattr(socket, "send_fds") and hasattr(os, "fork")
+
+
+def get_runtime_dir() -> Path:
+    """Get the directory holding worker sockets.
+
+    Uses SEMANTICS_RUNTIME_DIR if set, otherwise a 'semantics' folder in
+    XDG_RUNTIME_DIR, otherwise a per-user folder in the temp directory.
+
+    Returns:
+        Path to the runtime directory (not created).
+    """
+    override = os.environ.get("SEMANTICS_RUNTIME_DIR")
+    if override:
+        return Path(override)
+
+    xdg_runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if xdg_runtime:
+        return Path(xdg_runtime) / "semantics"
+
+    import tempfile
+
+    return Path(tempfile.gettempdir()) / f"semantics-{os.getuid()}"
+
+
+def get_socket_path(module_name: str) -> Path:
+    """Get the socket path of the worker serving a module.
+
+    Args:
+        module_name: The module name (e.g., 'audio', 'video')
+
+    Returns:
+        Path to the module's worker socket.
+    """
+    return get_runtime_dir() / f"{module_name}.sock"
+
+
+def _recv_exact(conn: socket.socket, size: int) -> bytes:
+    """Receive exactly size bytes, or fewer if the peer closed the connection."""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = conn.recv(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def run_in_worker(module_name: str, argv: list[str]) -> int | None:
+    """Run a command in the module's worker, if one is running.
+
+    Args:
+        module_name: The module name (e.g., 'audio', 'video')
+        argv: Arguments for the module executable
+
+    Returns:
+        The command's exit code, or None if no worker is available and the
+        caller should fall back to spawning the executable.
+    """
+    if not is_supported():
+        return None
+
+    socket_path = get_socket_path(module_name)
+    if not socket_path.exists():
+        return None
+
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(str(socket_path))
+    except OSError:
+        conn.close()
+        return None
+
+    with conn:
+        request = json.dumps(
+            {"argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}
+        ).encode("utf-8")
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+        socket.send_fds(conn, [_HEADER.pack(len(request)) + request], [0, 1, 2])
+
+        pid_bytes = _recv_exact(conn, _STATUS.size)
+        if len(pid_bytes) < _STATUS.size:
+            return None
+        (pid,) = _STATUS.unpack(pid_bytes)
+
+        try:
+            status = _recv_exact(conn, _STATUS.size)
+        except KeyboardInterrupt:
+            try:
+                os.kill(pid, signal.SIGINT)
+            except OSError:
+                pass
+            return 130
+
+        if len(status) < _STATUS.size:
+            return 1
+        return _STATUS.unpack(status)[0]
+
+
+def _exit_code(code: object) -> int:
+    """Convert a SystemExit code to a process exit status."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _handle_request(conn: socket.socket, command: click.Command, prog_name: str) -> int:
+    """Run one request in the current (forked) process and return its exit code."""
+    message, fds, _, _ = socket.recv_fds(conn, _HEADER.size + MAX_REQUEST_SIZE, 3)
+    if len(message) < _HEADER.size or len(fds) != 3:
+        return 1
+    (length,) = _HEADER.unpack(message[: _HEADER.size])
+    body = message[_HEADER.size :]
+    body += _recv_exact(conn, length - len(body))
+    request = json.loads(body.decode("utf-8"))
+
+    for stream in (sys.stdout, sys.stderr):
+        stream.flush()
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    # Rebind the standard streams so output is line-buffered to the caller
+    sys.stdin = open(0, "r", closefd=False)
+    sys.stdout = open(1, "w", buffering=1, closefd=False)
+    sys.stderr = open(2, "w", buffering=1, errors="backslashreplace", closefd=False)
+
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    sys.argv = [prog_name, *request["argv"]]
+
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    try:
+        command.main(args=request["argv"], prog_name=prog_name)
+    except SystemExit as e:
+        return _exit_code(e.code)
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+def _run_child(
+    conn: socket.socket,
+    listeners: list[socket.socket],
+    command: click.Command,
+    prog_name: str,
+) -> None:
+    """Handle one request in a freshly forked child and exit."""
+    code = 1
+    try:
+        for listener in listeners:
+            listener.close()
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        conn.sendall(_STATUS.pack(os.getpid()))
+        code = _handle_request(conn, command, prog_name)
+    except Exception:
+        import traceback
+
+        traceback.print_exc()
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+        try:
+            conn.sendall(_STATUS.pack(code))
+        except OSError:
+            pass
+        os._exit(code & 0xFF)
+
+
+def serve(command: click.Command, module_names: list[str], prog_name: str) -> None:
+    """Serve requests for the given modules until terminated.
+
+    Args:
+        command: The root command that runs each request's argv
+        module_names: Modules to listen for; one socket is bound per module
+        prog_name: Program name reported in usage and help output
+    """
+    import selectors
+
+    runtime_dir = get_runtime_dir()
+    runtime_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if runtime_dir.stat().st_uid != os.getuid():
+        raise PermissionError(f"{runtime_dir} is not owned by the current user")
+
+    selector = selectors.DefaultSelector()
+    listeners = []
+    socket_paths = []
+    for module_name in module_names:
+        socket_path = get_socket_path(module_name)
+        # Bind under a temporary name so clients never see a socket that is
+        # not listening yet
+        pending_path = socket_path.with_name(f".{socket_path.name}.{os.getpid()}")
+        pending_path.unlink(missing_ok=True)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(str(pending_path))
+        os.chmod(pending_path, 0o600)
+        listener.listen()
+        os.replace(pending_path, socket_path)
+        selector.register(listener, selectors.EVENT_READ)
+        listeners.append(listener)
+        socket_paths.append(socket_path)
+        print(f"[SERVE] {module_name} worker listening on {socket_path}", flush=True)
+
+    # Finished children are reaped automatically; SIGTERM shuts down cleanly
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    try:
+        while True:
+            for key, _ in selector.select():
+                conn, _ = key.fileobj.accept()
+                if os.fork() == 0:
+                    _run_child(conn, listeners, command, prog_name)
+                conn.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        selector.close()
+        for listener in listeners:
+            listener.close()
+        for socket_path in socket_paths:
+            socket_path.unlink(missing_ok=True)
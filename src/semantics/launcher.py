@@ -16,18 +16,35 @@ When a user installs only the audio module, they get:
   ~/.semantics/bin/semantics       <- This entry point
   ~/.semantics/bin/semantics-audio <- The actual audio module
 
-This discovers semantics-* executables and delegates to them.
+This discovers semantics-* executables and delegates to them, replacing the
+launcher process with the module executable where the platform allows it.
+
+Wheel and source installs ship the modules as importable packages instead.
+Those are run in-process through the same registry cli.py uses, which saves
+a second interpreter start per call.
+
+Discovery results are cached in a small JSON manifest next to the
+executables, together with each module's version, help summary and flags.
+The cache is keyed on the names of the module executables and each one's
+size and mtime, so a normal call costs a directory listing and a few stats
+instead of running every module to describe it. It is replaced atomically,
+so a launcher running alongside never reads a partial manifest.
 """
 
 from __future__ import annotations
 
+import json
+import os
 import subprocess
 import sys
+import uuid
 from pathlib import Path
 
 import click
 from click_help_colors import HelpColorsCommand, HelpColorsGroup
 
+from semantics.cli import cache
+
 
 def get_install_dir() -> Path:
     """Get the directory where semantics executables are installed.
@@ -83,6 +100,179 @@ def discover_modules() -> dict[str, Path]:
     return modules
 
 
+# Discovery cache written next to the module executables
+CACHE_FILE_NAME = ".semantics-modules.json"
+CACHE_FORMAT = 2
+
+
+def _module_files(install_dir: Path) -> list[str]:
+    """Return the sorted names of the module executables, without stat calls."""
+    return sorted(
+        name
+        for name in os.listdir(install_dir)
+        if name.startswith("semantics-")
+    )
+
+
+def _stat_key(path: Path) -> list[int]:
+    """Return the (size, mtime) pair used to detect a changed executable."""
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def describe_module(exe_path: Path) -> dict:
+    """Ask a module executable for its version, help summary and flags.
+
+    Args:
+        exe_path: Path to the module executable.
+
+    Returns:
+        The parsed `--describe` output, or an empty dict if it failed.
+    """
+    try:
+        result = subprocess.run(
+            [str(exe_path), "--describe"], capture_output=True, text=True, timeout=120
+        )
+        return json.loads(result.stdout) if result.returncode == 0 else {}
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return {}
+
+
+def read_discovery_cache(install_dir: Path) -> dict[str, dict] | None:
+    """Read the discovery cache if it still matches the install directory.
+
+    Args:
+        install_dir: Directory containing the module executables.
+
+    Returns:
+        Dictionary mapping module names to their cached info, or None if the
+        cache is missing, unreadable or stale.
+    """
+    try:
+        data = json.loads((install_dir / CACHE_FILE_NAME).read_text(encoding="utf-8"))
+        if data.get("format") != CACHE_FORMAT:
+            return None
+        if data.get("files") != _module_files(install_dir):
+            return None
+        modules = data["modules"]
+        for info in modules.values():
+            if _stat_key(install_dir / info["file"]) != info["stat"]:
+                return None
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+    return modules
+
+
+def build_discovery_cache(
+    install_dir: Path, exclude: frozenset[str] = frozenset()
+) -> dict[str, dict]:
+    """Scan the install directory, describe each module and write the cache.
+
+    The cache is written on a best-effort basis; read-only install
+    directories simply fall back to scanning on every call.
+
+    Args:
+        install_dir: Directory containing the module executables.
+        exclude: Modules not to describe or cache, such as modules that are
+            importable into the launcher itself.
+
+    Returns:
+        Dictionary mapping module names to their info.
+    """
+    modules: dict[str, dict] = {}
+    for name, exe_path in discover_modules().items():
+        if name in exclude:
+            continue
+        description = describe_module(exe_path)
+        manifest = description.get("modules", {}).get(name, {})
+        modules[name] = {
+            "file": exe_path.name,
+            "stat": _stat_key(exe_path),
+            "version": description.get("version"),
+            "help": manifest.get("help", ""),
+            "flags": manifest.get("flags", []),
+        }
+
+    cache_path = install_dir / CACHE_FILE_NAME
+    # Written under a unique name and renamed into place, so that concurrent
+    # launchers only ever read a complete file
+    temp_path = install_dir / f"{CACHE_FILE_NAME}.{uuid.uuid4().hex}.tmp"
+    try:
+        data = {
+            "format": CACHE_FORMAT,
+            "files": _module_files(install_dir),
+            "modules": modules,
+        }
+        temp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(temp_path, cache_path)
+    except OSError:
+        temp_path.unlink(missing_ok=True)
+
+    return modules
+
+
+def discover_importable_modules() -> dict[str, dict]:
+    """Find module CLIs that can be imported into this interpreter.
+
+    Only the module manifests are read; the module CLIs are imported when a
+    command is run.
+
+    Returns:
+        Dictionary mapping module names to their info, including 'path' to
+        the module's cli.py.
+    """
+    from semantics.cli import registry
+
+    modules: dict[str, dict] = {}
+    for name in sorted(registry.get_available_modules()):
+        manifest = registry.manifests.get(name)
+        if manifest is not None:
+            path, help_text, flags = manifest.cli_path, manifest.help, list(manifest.flags)
+        else:
+            command = registry.get_command(name)
+            path = Path(sys.modules[f"semantics.modules.{name}.cli"].__file__)
+            help_text, flags = command.get_short_help_str() if command else "", []
+        modules[name] = {
+            "path": str(path),
+            "version": get_version(),
+            "help": help_text,
+            "flags": flags,
+        }
+    return modules
+
+
+def is_module_cli(path: Path) -> bool:
+    """Return True if a discovered module is an importable cli.py, not an executable."""
+    return path.suffix == ".py"
+
+
+def load_module_info() -> dict[str, dict]:
+    """Get installed modules with their version, help summary and flags.
+
+    Frozen installs use the discovery cache and rebuild it when the install
+    directory changes; otherwise the install directory is scanned. Modules
+    importable into this interpreter take precedence over executables.
+
+    Returns:
+        Dictionary mapping module names to their info, including either
+        'file' (an executable in the install directory) or 'path' (an
+        importable module's cli.py).
+    """
+    install_dir = get_install_dir()
+    importable = discover_importable_modules()
+    if not getattr(sys, "frozen", False) or os.environ.get("SEMANTICS_NO_DISCOVERY_CACHE"):
+        modules = {name: {"file": path.name} for name, path in discover_modules().items()}
+    else:
+        modules = read_discovery_cache(install_dir)
+        if modules is None:
+            # The shared runtime bundles its modules, so their entry points
+            # need not be run to describe them
+            modules = build_discovery_cache(install_dir, frozenset(importable))
+
+    modules.update(importable)
+    return modules
+
+
 def get_version() -> str:
     """Get the CLI version."""
     try:
@@ -109,10 +299,24 @@ def get_virtual_modules(discovered: dict[str, Path]) -> dict[str, Path]:
 
 
 # Discover modules at import time for help generation
-_raw_discovered_modules = discover_modules()
+_module_info = load_module_info()
+_raw_discovered_modules = {
+    name: Path(info["path"]) if "path" in info else get_install_dir() / info["file"]
+    for name, info in _module_info.items()
+}
 _discovered_modules = get_virtual_modules(_raw_discovered_modules)
 
 
+def generate_version_message() -> str:
+    """Generate the --version message, including cached module versions."""
+    lines = ["%(prog)s, version %(version)s"]
+    for name in sorted(_module_info):
+        version = _module_info[name].get("version")
+        if version:
+            lines.append(f"  {name} {version}")
+    return "\n".join(lines)
+
+
 def generate_help_text() -> str:
     """Generate dynamic help text based on discovered modules."""
     lines = [
@@ -124,6 +328,7 @@ def generate_help_text() -> str:
 
     if _discovered_modules:
         lines.append("")
+        lines.append("\b")
         lines.append("Examples:")
         if "audio" in _discovered_modules:
             lines.append("  semantics audio input.wav -o ./output --transcribe")
@@ -145,20 +350,55 @@ class LauncherGroup(HelpColorsGroup):
     """Custom group that delegates commands to module executables."""
 
     def list_commands(self, ctx: click.Context) -> list[str]:
-        """List available module commands."""
-        return sorted(_discovered_modules.keys())
+        """List available module commands plus the launcher's own commands."""
+        return sorted(set(_discovered_modules) | set(self.commands))
+
+    @staticmethod
+    def get_short_help(cmd_name: str) -> str | None:
+        """Return a module's help summary and flags from its module info."""
+        info = _module_info.get(cmd_name, {})
+        short_help = info.get("help") or None
+        if short_help and info.get("flags"):
+            short_help += f" ({', '.join(info['flags'])})"
+        return short_help
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        """List commands in help without importing importable module CLIs."""
+        rows = []
+        for name in self.list_commands(ctx):
+            short_help = self.get_short_help(name)
+            if short_help is None:
+                cmd = self.get_command(ctx, name)
+                if cmd is None or cmd.hidden:
+                    continue
+                short_help = cmd.get_short_help_str(formatter.width - 6 - len(name))
+            rows.append((name, short_help))
+
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
 
     def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
-        """Get a command that delegates to the module executable."""
+        """Get the module's own command, or one that delegates to its executable."""
+        if cmd_name in self.commands:
+            return self.commands[cmd_name]
         if cmd_name not in _discovered_modules:
             return None
 
         exe_path = _discovered_modules[cmd_name]
+        if is_module_cli(exe_path):
+            # Importable module - run its command in this process
+            from semantics.cli import registry
+
+            return registry.get_command(cmd_name)
+
+        short_help = self.get_short_help(cmd_name)
 
         @click.command(
             cls=HelpColorsCommand,
             name=cmd_name,
-            # Disable Click's automatic help handling - let the subprocess handle it
+            short_help=short_help,
+            # Disable Click's automatic help handling - let the executable handle it
             context_settings={
                 "allow_extra_args": True,
                 "allow_interspersed_args": True,
@@ -171,12 +411,30 @@ class LauncherGroup(HelpColorsGroup):
         )
         @click.pass_context
         def delegate_command(ctx: click.Context, _exe: Path = exe_path, _cmd: str = cmd_name) -> None:
-            """Delegate to the module executable."""
+            """Delegate to the module's resident worker or executable."""
+            # Module executables expose the module as a subcommand
+            module_args = [_cmd] + ctx.args
+
+            # Prefer a warm worker started with `semantics-<module> --serve`
+            from semantics.core.worker import run_in_worker
+
+            returncode = run_in_worker(_cmd, module_args)
+            if returncode is not None:
+                ctx.exit(returncode)
+
+            argv = [str(_exe)] + module_args
             try:
-                # Pass all args directly to the module executable
-                result = subprocess.run([str(_exe)] + ctx.args)
-                ctx.exit(result.returncode)
-            except FileNotFoundError:
+                if sys.platform == "win32":
+                    # os.execv on Windows spawns a new process rather than
+                    # replacing this one, so wait on a child instead
+                    result = subprocess.run(argv)
+                    ctx.exit(result.returncode)
+
+                # Replace the launcher so no parent interpreter stays resident
+                for stream in (sys.stdout, sys.stderr):
+                    stream.flush()
+                os.execv(_exe, argv)
+            except OSError:
                 raise click.ClickException(f"Could not execute '{_cmd}' module.")
             except KeyboardInterrupt:
                 ctx.exit(130)
@@ -191,7 +449,9 @@ class LauncherGroup(HelpColorsGroup):
     help_headers_color="yellow",
     help_options_color="green",
 )
-@click.version_option(version=get_version(), prog_name="semantics")
+@click.version_option(
+    version=get_version(), prog_name="semantics", message=generate_version_message()
+)
 @click.pass_context
 def main(ctx: click.Context) -> None:
     """Semantics CLI - Unified interface for media intelligence."""
@@ -199,5 +459,9 @@ def main(ctx: click.Context) -> None:
         click.echo(ctx.get_help())
 
 
+# The result cache is shared by all modules, so it is managed from here
+main.add_command(cache)
+
+
 if __name__ == "__main__":
     sys.exit(main())
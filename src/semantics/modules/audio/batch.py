@@ -0,0 +1,160 @@
+"""Batched transcription of many files, bucketed by window length.
+
+Each file is streamed as windows (see audio.stream). With VAD only the
+speech of a window is kept, so windows of the same file and of different
+files end up with very different lengths. Windows are grouped into buckets
+of similar length, and a bucket is sent to the model as one batch as soon as
+it holds `batch_size` windows, so a batch pads its windows to nearly the
+same length. Whatever is left in the buckets is sent once all files have
+been read.
+
+Results come back out of order: the windows of one file may sit in
+different buckets. Each file keeps the results of its windows until the
+earlier ones have arrived and then writes them in order, so that its
+transcript is stitched exactly as in streaming mode. At most one bucket per
+length class is held in memory, whatever the number of files.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import click
+
+from semantics.core.decode import open_pcm
+from semantics.modules.audio.stream import (
+    Segment,
+    TranscriptWriter,
+    Window,
+    iter_windows,
+    map_segments,
+    speech_window,
+)
+
+# Width of a length bucket
+BUCKET_SECONDS = 5.0
+
+
+class _Item(NamedTuple):
+    """A window waiting in a bucket."""
+
+    file: int
+    index: int
+    window: Window
+    model_window: Window
+    time_map: Any
+
+
+class _File:
+    """A file whose transcript is being written."""
+
+    def __init__(self, input_path: Path, writer: TranscriptWriter) -> None:
+        self.input_path = input_path
+        self.writer = writer
+        self.windows: int | None = None
+        self.written = 0
+        self.done = False
+        self.results: dict[int, tuple[Window, list[Segment]]] = {}
+
+    def flush(self) -> bool:
+        """Write results that are next in order.
+
+        Returns:
+            True if this completed the file's transcript.
+        """
+        while self.written in self.results:
+            self.writer.write(*self.results.pop(self.written))
+            self.written += 1
+        if self.done or self.windows is None or self.written < self.windows:
+            return False
+        self.writer.close()
+        self.done = True
+        return True
+
+
+def bucket_of(window: Window) -> int:
+    """Return the length bucket of a window."""
+    return max(1, math.ceil((window.end - window.start) / BUCKET_SECONDS))
+
+
+def transcribe_files(
+    jobs: list[tuple[Path, Path]],
+    transcribe_batch: Callable[[list[Window]], list[list[Segment]]],
+    batch_size: int,
+    vad: bool = True,
+    verbose: bool = False,
+) -> list[int]:
+    """Transcribe several files, batching windows of similar length.
+
+    Args:
+        jobs: (input file, output folder) pairs
+        transcribe_batch: Function returning the segments of each window
+            of a batch, in seconds from the window's start
+        batch_size: Number of windows sent to the model at once
+        vad: Send only the speech in each window to the model
+        verbose: Print every batch
+
+    Returns:
+        The number of segments written for each job.
+    """
+    files: list[_File] = []
+    counts: list[int] = [0] * len(jobs)
+    buckets: dict[int, list[_Item]] = {}
+
+    def finish(position: int) -> None:
+        file = files[position]
+        if file.flush():
+            counts[position] = file.writer.count
+            click.echo(
+                f"[OK] Transcribed {file.input_path.name}"
+                f" ({file.writer.count} segment(s))"
+            )
+
+    def run(key: int) -> None:
+        items = buckets.pop(key)
+        if verbose:
+            click.echo(
+                f"   [BATCH] {len(items)} window(s) of up to"
+                f" {key * BUCKET_SECONDS:g}s"
+            )
+        results = transcribe_batch([item.model_window for item in items])
+        for item, segments in zip(items, results):
+            if item.time_map is not None:
+                segments = map_segments(segments, item.time_map)
+            files[item.file].results[item.index] = (item.window, segments)
+        for position in dict.fromkeys(item.file for item in items):
+            finish(position)
+
+    try:
+        for position, (input_path, output_path) in enumerate(jobs):
+            file = _File(input_path, TranscriptWriter(output_path, input_path.stem))
+            files.append(file)
+            windows = 0
+            with open_pcm(input_path) as read:
+                for index, window in enumerate(iter_windows(read)):
+                    windows = index + 1
+                    model_window, time_map = window, None
+                    if vad:
+                        model_window, time_map = speech_window(window)
+                        if model_window is None:
+                            file.results[index] = (window, [])
+                            continue
+                    key = bucket_of(model_window)
+                    waiting = buckets.setdefault(key, [])
+                    waiting.append(
+                        _Item(position, index, window, model_window, time_map)
+                    )
+                    if len(waiting) >= batch_size:
+                        run(key)
+            file.windows = windows
+            finish(position)
+
+        for key in sorted(buckets):
+            run(key)
+    finally:
+        for file in files:
+            file.writer.close()
+    return counts
@@ -0,0 +1,185 @@
+"""Bulk metadata catalog of audio files, read from their headers.
+
+Folders are walked with os.scandir, which gives each entry's type without a
+stat call, and every audio file (by extension) is read with
+headers.read_info() on a thread pool. Reading headers is a few small reads
+per file, so the threads mostly wait on storage and many of them keep it
+busy. Files are submitted as they are found and at most a few per thread are
+in flight, so memory does not grow with the size of the tree; rows are
+written in the order files were found.
+
+The catalog is JSON Lines (one object per file) or, for a .csv path, CSV
+with one column per field and tag. Files whose headers cannot be read get a
+row with only their path, size and error.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+import click
+
+from semantics.modules.audio.headers import TAG_KEYS, AudioInfo, read_info
+from semantics.modules.audio.manifest import EXTENSIONS
+
+# Files in flight per thread
+_QUEUE_PER_WORKER = 4
+
+# CSV columns, after which come the tags
+_FIELDS = (
+    "path",
+    "size",
+    "format",
+    "codec",
+    "sample_rate",
+    "channels",
+    "bits_per_sample",
+    "bitrate",
+    "duration",
+)
+
+
+class CatalogStats(NamedTuple):
+    """Summary of a catalog scan."""
+
+    files: int
+    errors: int
+
+
+def default_workers() -> int:
+    """Return the number of threads used to read headers."""
+    return min(32, (os.cpu_count() or 1) * 4)
+
+
+def iter_audio_files(inputs: Iterable[Path]) -> Iterator[Path]:
+    """Yield audio files given directly or found below folders.
+
+    Folders are walked depth first in name order, skipping hidden files and
+    folders. Only files with an audio extension are yielded from folders;
+    files given directly are always yielded.
+    """
+    for input_path in inputs:
+        if not input_path.is_dir():
+            yield input_path
+            continue
+        stack = [input_path]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as scan:
+                    entries = sorted(scan, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            subdirectories = []
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(Path(entry.path))
+                    elif (
+                        entry.is_file()
+                        and os.path.splitext(entry.name)[1].lower() in EXTENSIONS
+                    ):
+                        yield Path(entry.path)
+                except OSError:
+                    continue
+            stack.extend(reversed(subdirectories))
+
+
+def _read(path: Path) -> AudioInfo | dict:
+    """Read a file's headers, or describe why they could not be read."""
+    try:
+        return read_info(path)
+    except (OSError, ValueError) as e:
+        try:
+            size = path.stat().st_size
+        except OSError:
+            size = None
+        return {"path": str(path), "size": size, "error": str(e)}
+
+
+class _JsonLinesWriter:
+    """Write catalog rows as JSON Lines."""
+
+    def __init__(self, file) -> None:
+        self.file = file
+
+    def write(self, row: AudioInfo | dict) -> None:
+        record = row._asdict() if isinstance(row, AudioInfo) else row
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class _CsvWriter:
+    """Write catalog rows as CSV, one column per field and tag."""
+
+    def __init__(self, file) -> None:
+        columns = [*_FIELDS, *TAG_KEYS, "error"]
+        self.writer = csv.DictWriter(file, fieldnames=columns, restval="")
+        self.writer.writeheader()
+
+    def write(self, row: AudioInfo | dict) -> None:
+        if isinstance(row, AudioInfo):
+            record = row._asdict()
+            record.update(record.pop("tags"))
+        else:
+            record = row
+        self.writer.writerow(
+            {key: "" if value is None else value for key, value in record.items()}
+        )
+
+
+def write_catalog(
+    inputs: Iterable[Path],
+    catalog_path: Path,
+    workers: int | None = None,
+    verbose: bool = False,
+) -> CatalogStats:
+    """Read the headers of every audio file and write them to a catalog.
+
+    Args:
+        inputs: Files and folders to scan
+        catalog_path: Output file; CSV if it ends in .csv, else JSON Lines
+        workers: Number of threads reading headers; defaults to
+            default_workers()
+        verbose: Print files whose headers could not be read
+
+    Returns:
+        The number of files written and how many of them failed.
+    """
+    workers = workers or default_workers()
+    files = errors = 0
+    catalog_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(catalog_path, "w", encoding="utf-8", newline="") as f:
+        if catalog_path.suffix.lower() == ".csv":
+            writer = _CsvWriter(f)
+        else:
+            writer = _JsonLinesWriter(f)
+
+        def write(future: Future) -> None:
+            nonlocal files, errors
+            row = future.result()
+            files += 1
+            if isinstance(row, dict):
+                errors += 1
+                if verbose:
+                    click.echo(f"   [SKIP] {row['path']}: {row['error']}")
+            writer.write(row)
+
+        pending: deque[Future] = deque()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for path in iter_audio_files(inputs):
+                pending.append(pool.submit(_read, path))
+                if len(pending) >= workers * _QUEUE_PER_WORKER:
+                    write(pending.popleft())
+            while pending:
+                write(pending.popleft())
+
+    return CatalogStats(files, errors)
@@ -11,6 +11,9 @@ from pathlib import Path
 import click
 from click_help_colors import HelpColorsCommand
 
+from semantics.core.cache import run_cached_batch
+from semantics.core.scheduler import Operation, OperationPools, run_operations
+from semantics.modules.audio.catalog import write_catalog
 from semantics.modules.audio.handlers import extract_metadata, transcribe
 
 _AUDIO_HELP = """\
@@ -23,6 +26,12 @@ Examples:
   semantics audio input.wav -o ./output --transcribe
   semantics audio input.wav -o ./output --transcribe --extract-metadata
   semantics audio input.wav -o ./output --extract-metadata --transcribe
+  semantics audio meeting.wav -o ./output --transcribe --stream
+  semantics audio voicemail/*.wav -o ./output --transcribe --batch-size 16
+  semantics audio lecture.mp3 -o ./output --transcribe --workers 8
+  semantics audio lecture.mp3 -o ./output --transcribe --stream --resume
+  semantics audio inbox/*.mp3 -o ./output --transcribe --stream --dedupe
+  semantics audio ./library --catalog library.jsonl
 """
 
 
@@ -32,12 +41,11 @@ Examples:
     help_headers_color="yellow",
     help_options_color="green",
 )
-@click.argument("input", type=click.Path(exists=True, dir_okay=False))
+@click.argument("inputs", nargs=-1, required=True, type=click.Path(exists=True))
 @click.option(
     "--output",
     "-o",
     type=click.Path(file_okay=False),
-    required=True,
     help="Output folder for results",
 )
 @click.option("--transcribe", "do_transcribe", is_flag=True, help="Transcribe audio to text")
@@ -55,6 +63,66 @@ Examples:
     type=click.Choice(["tiny", "base", "small", "medium", "large"]),
     help="Model size for transcription (default: base)",
 )
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Transcribe long recordings in 30s windows with constant memory",
+)
+@click.option(
+    "--vad/--no-vad",
+    default=True,
+    help=(
+        "Transcribe only speech, skipping silence and music; applies with "
+        "--stream, --workers or --batch-size (default: on)"
+    ),
+)
+@click.option(
+    "--batch-size",
+    default=1,
+    type=click.IntRange(1),
+    help=(
+        "With several inputs, transcribe up to N windows of similar length "
+        "at once (default: 1)"
+    ),
+)
+@click.option(
+    "--workers",
+    default=1,
+    type=click.IntRange(1),
+    help=(
+        "Transcribe a long recording on N processes, cut into time ranges "
+        "at silences (default: 1)"
+    ),
+)
+@click.option(
+    "--dedupe",
+    is_flag=True,
+    help=(
+        "Reuse the transcript of an earlier recording that sounds the same, "
+        "such as a re-encoded copy"
+    ),
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help=(
+        "Continue an interrupted --stream or --workers transcription from "
+        "its last checkpoint"
+    ),
+)
+@click.option(
+    "--catalog",
+    type=click.Path(dir_okay=False),
+    help=(
+        "Instead of running operations, read the header metadata of every "
+        "input (folders recursively) into one JSONL or .csv file"
+    ),
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Recompute results instead of reusing cached ones",
+)
 @click.option(
     "--verbose",
     "-v",
@@ -62,28 +130,104 @@ Examples:
     help="Enable verbose output",
 )
 def cli(
-    input: str,
-    output: str,
+    inputs: tuple[str, ...],
+    output: str | None,
     do_transcribe: bool,
     do_extract_metadata: bool,
     language: str,
     model: str,
+    stream: bool,
+    vad: bool,
+    batch_size: int,
+    workers: int,
+    dedupe: bool,
+    resume: bool,
+    catalog: str | None,
+    no_cache: bool,
     verbose: bool,
 ) -> None:
+    if catalog is not None:
+        if do_transcribe or do_extract_metadata:
+            raise click.ClickException("--catalog cannot be combined with operations")
+        paths = [Path(name) for name in inputs]
+        stats = write_catalog(paths, Path(catalog), verbose=verbose)
+        click.echo(
+            f"[OK] Cataloged {stats.files} file(s) into {catalog}"
+            f" ({stats.errors} unreadable)"
+        )
+        return
+
     if not do_transcribe and not do_extract_metadata:
         raise click.ClickException(
             "At least one operation required: --transcribe or --extract-metadata"
         )
+    if output is None:
+        raise click.UsageError("Missing option '--output' / '-o'.")
+    folders = [name for name in inputs if Path(name).is_dir()]
+    if folders:
+        raise click.ClickException(
+            f"Folders are only accepted with --catalog: {folders[0]}"
+        )
 
-    input_path = Path(input)
     output_path = Path(output)
     output_path.mkdir(parents=True, exist_ok=True)
 
-    if do_transcribe:
-        transcribe.handle(
-            input_path, output_path, verbose=verbose, language=language, model=model
+    # Several inputs each get a folder named after the file
+    if len(inputs) == 1:
+        jobs = [(Path(inputs[0]), output_path)]
+    else:
+        names = [Path(name).name for name in inputs]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise click.ClickException(
+                f"Inputs must have different file names: {', '.join(duplicates)}"
+            )
+        jobs = [(Path(name), output_path / Path(name).name) for name in inputs]
+        for _, job_output in jobs:
+            job_output.mkdir(exist_ok=True)
+
+    transcribe_options = {
+        "language": language,
+        "model": model,
+        "stream": stream,
+        "vad": vad,
+        "workers": workers,
+        "resume": resume,
+        "dedupe": dedupe,
+    }
+    use_cache = not no_cache
+
+    if do_transcribe and batch_size > 1 and len(jobs) > 1:
+        if workers > 1 or resume:
+            flag = "--workers" if workers > 1 else "--resume"
+            raise click.ClickException(f"{flag} cannot be combined with --batch-size")
+        # Batched transcription writes the streaming transcript format
+        run_cached_batch(
+            transcribe,
+            jobs,
+            verbose=verbose,
+            use_cache=use_cache,
+            batch_options={"batch_size": batch_size},
+            **{**transcribe_options, "stream": True},
         )
+        do_transcribe = False
 
+    operations = []
+    if do_transcribe:
+        operations.append(Operation(transcribe, transcribe_options))
     if do_extract_metadata:
-        extract_metadata.handle(input_path, output_path, verbose=verbose)
+        operations.append(Operation(extract_metadata, {}))
 
+    if operations:
+        # One set of worker processes for every input, so that each loads
+        # its model once
+        with OperationPools() as pools:
+            for input_path, job_output in jobs:
+                run_operations(
+                    operations,
+                    input_path,
+                    job_output,
+                    verbose=verbose,
+                    use_cache=use_cache,
+                    pools=pools,
+                )
@@ -0,0 +1,259 @@
+"""Acoustic fingerprints, to reuse the transcript of a recording heard before.
+
+Inputs are often the same recording more than once: a forwarded voicemail, a
+podcast re-uploaded in another format. Their bytes differ, so the result
+cache misses them, but they sound the same. Each input's decoded samples
+(see semantics.core.decode) are reduced to a fingerprint, and an input whose
+fingerprint matches an earlier one gets a copy of that transcript instead of
+going through the model.
+
+The fingerprint has one 32-bit sub-fingerprint per 64 ms hop: the energy of
+33 bands between 300 and 2000 Hz is taken from a short-time Fourier
+transform, and each bit tells whether the energy difference of two adjacent
+bands grew or shrank since the previous frame. These signs survive lossy
+encoding, resampling and volume changes. Frames are transformed in blocks
+with NumPy, so memory stays bounded on long inputs.
+
+Two recordings are the same when, lined up, at most MATCH_BIT_ERROR_RATE of
+their bits differ over nearly their whole length. Candidates and their
+offset are found in the index (see semantics.core.fingerprints) from a
+sample of sub-fingerprints, then compared bit by bit.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import NamedTuple
+
+import click
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from semantics.core.cache import ResultCache
+from semantics.core.decode import SAMPLE_RATE, load_audio
+from semantics.core.fingerprints import FingerprintEntry, FingerprintIndex
+
+# Frame length and hop of the transform, in samples (256 ms and 64 ms)
+FRAME_SIZE = 4096
+HOP_SIZE = 1024
+
+# Frequency range of the bands; speech and most music carry energy here
+LOW_HZ = 300.0
+HIGH_HZ = 2000.0
+BANDS = 33
+
+# Recordings whose bits differ less than this are the same; unrelated
+# recordings differ in about half of them
+MATCH_BIT_ERROR_RATE = 0.35
+
+# Share of both recordings that must line up
+MIN_OVERLAP = 0.9
+
+# Frames transformed at once
+_BLOCK_FRAMES = 1024
+
+# Sub-fingerprints looked up in the index, and candidates compared in full
+_PROBES = 256
+_CANDIDATES = 5
+
+# Files of a transcript, by file name suffix
+TRANSCRIPT_SUFFIXES = (".segments.jsonl", ".txt")
+
+
+class Match(NamedTuple):
+    """An earlier recording that sounds the same as an input."""
+
+    entry: FingerprintEntry
+    offset: float
+    bit_error_rate: float
+
+
+def _band_matrix() -> np.ndarray:
+    """Return the (frequency bin, band) matrix summing power into bands."""
+    edges = np.geomspace(LOW_HZ, HIGH_HZ, BANDS + 1)
+    frequencies = np.fft.rfftfreq(FRAME_SIZE, 1 / SAMPLE_RATE)
+    band = np.searchsorted(edges, frequencies, side="right") - 1
+    matrix = np.zeros((len(frequencies), BANDS), dtype=np.float32)
+    inside = (band >= 0) & (band < BANDS)
+    matrix[np.flatnonzero(inside), band[inside]] = 1.0
+    return matrix
+
+
+def fingerprint(samples: np.ndarray) -> np.ndarray:
+    """Compute the fingerprint of a recording.
+
+    Args:
+        samples: Mono audio at SAMPLE_RATE, as floats in [-1, 1]
+
+    Returns:
+        One uint32 sub-fingerprint per hop, after the first frame; empty for
+        recordings shorter than two frames.
+    """
+    if len(samples) < FRAME_SIZE + HOP_SIZE:
+        return np.zeros(0, dtype=np.uint32)
+    frames = sliding_window_view(samples, FRAME_SIZE)[::HOP_SIZE]
+    taper = np.hanning(FRAME_SIZE).astype(np.float32)
+    bands = _band_matrix()
+    energy = np.empty((len(frames), BANDS), dtype=np.float32)
+    for start in range(0, len(frames), _BLOCK_FRAMES):
+        block = frames[start : start + _BLOCK_FRAMES] * taper
+        power = np.abs(np.fft.rfft(block, axis=1)) ** 2
+        energy[start : start + len(block)] = power @ bands
+
+    difference = energy[:, :-1] - energy[:, 1:]
+    bits = difference[1:] > difference[:-1]
+    return np.packbits(bits, axis=1, bitorder="little").view("<u4").ravel()
+
+
+def bit_error_rate(first: np.ndarray, second: np.ndarray) -> float:
+    """Return the share of differing bits of two equally long fingerprints."""
+    differing = np.bitwise_xor(first, second).view(np.uint8)
+    return float(np.unpackbits(differing).mean()) if len(first) else 1.0
+
+
+def compare(query: np.ndarray, other: np.ndarray, offset: int) -> float:
+    """Compare two fingerprints lined up with query[i] on other[i + offset].
+
+    Returns:
+        The bit error rate of the overlap, or 1.0 if it does not cover
+        MIN_OVERLAP of both.
+    """
+    start = max(0, -offset)
+    end = min(len(query), len(other) - offset)
+    if end - start < MIN_OVERLAP * max(len(query), len(other)):
+        return 1.0
+    return bit_error_rate(query[start:end], other[start + offset : end + offset])
+
+
+def _informative_frames(prints: np.ndarray) -> np.ndarray:
+    """Return the frames worth indexing.
+
+    Silent frames have no bits set (or all of them) and would match any
+    other silence.
+    """
+    return np.flatnonzero((prints != 0) & (prints != 0xFFFFFFFF))
+
+
+def find_match(
+    index: FingerprintIndex, scope: str, prints: np.ndarray
+) -> Match | None:
+    """Find the earlier recording of a scope that sounds the same.
+
+    Args:
+        index: Fingerprint index
+        scope: Options the transcript must have been made with
+        prints: Fingerprint of the input
+
+    Returns:
+        The best match under MATCH_BIT_ERROR_RATE, or None.
+    """
+    frames = _informative_frames(prints)
+    if not len(frames):
+        return None
+    picks = np.linspace(0, len(frames) - 1, min(_PROBES, len(frames)), dtype=int)
+    probes = [(int(prints[frame]), int(frame)) for frame in frames[picks]]
+
+    best = None
+    for candidate in index.candidates(scope, probes, limit=_CANDIDATES):
+        entry = index.get(candidate.entry)
+        if entry is None:
+            continue
+        other = np.frombuffer(entry.fingerprint, dtype="<u4")
+        rate = compare(prints, other, candidate.offset)
+        if rate > MATCH_BIT_ERROR_RATE:
+            continue
+        if best is None or rate < best.bit_error_rate:
+            best = Match(entry, candidate.offset * HOP_SIZE / SAMPLE_RATE, rate)
+    return best
+
+
+def _shift_segments(data: bytes, offset: float) -> bytes:
+    """Move the segments of a `.segments.jsonl` file earlier by offset seconds."""
+    lines = []
+    for line in data.decode("utf-8").splitlines():
+        segment = json.loads(line)
+        segment["start"] = max(0.0, segment["start"] - offset)
+        segment["end"] = max(0.0, segment["end"] - offset)
+        lines.append(json.dumps(segment, ensure_ascii=False) + "\n")
+    return "".join(lines).encode("utf-8")
+
+
+class Deduplicator:
+    """Reuses the transcripts of recordings that were transcribed before.
+
+    Call reuse() before transcribing an input and, if it returns False,
+    remember() once the transcript has been written.
+
+    Args:
+        scope: Options the transcripts are made with; only transcripts made
+            with the same options are reused
+        index: Fingerprint index; defaults to the one in the cache folder
+    """
+
+    def __init__(self, scope: dict, index: FingerprintIndex | None = None) -> None:
+        self.scope = json.dumps(scope, sort_keys=True)
+        self.index = index if index is not None else FingerprintIndex()
+        self._pending: dict[Path, tuple[str, np.ndarray]] = {}
+
+    def reuse(self, input_path: Path, output_path: Path, verbose: bool = False) -> bool:
+        """Write an earlier transcript of the same recording, if there is one.
+
+        Args:
+            input_path: Path to the input audio file
+            output_path: Path to the output folder
+            verbose: Print the matched recording
+
+        Returns:
+            True if the transcript was written.
+        """
+        content_hash = ResultCache().hash_file(input_path)
+        entry = self.index.find(self.scope, content_hash)
+        if entry is not None:
+            match = Match(entry, 0.0, 0.0)
+            click.echo("[DEDUPE] Reused the transcript of an identical input")
+        else:
+            prints = fingerprint(load_audio(input_path))
+            match = find_match(self.index, self.scope, prints)
+            if match is None:
+                self._pending[input_path] = (content_hash, prints)
+                return False
+            click.echo(
+                "[DEDUPE] Reused the transcript of a recording that sounds the "
+                f"same ({match.bit_error_rate:.0%} bits differ, "
+                f"offset {match.offset:+.2f}s)"
+            )
+        if verbose:
+            click.echo(f"   Matched content: {match.entry.content_hash}")
+
+        for suffix, data in match.entry.files.items():
+            if suffix == ".segments.jsonl" and match.offset:
+                data = _shift_segments(data, match.offset)
+            (output_path / f"{input_path.stem}{suffix}").write_bytes(data)
+        return True
+
+    def remember(self, input_path: Path, output_path: Path) -> None:
+        """Index an input's fingerprint with the transcript written for it.
+
+        Nothing is indexed if no transcript files were written, so that later
+        copies are transcribed instead of getting an empty transcript.
+        """
+        pending = self._pending.pop(input_path, None)
+        files = {}
+        for suffix in TRANSCRIPT_SUFFIXES:
+            path = output_path / f"{input_path.stem}{suffix}"
+            if path.exists():
+                files[suffix] = path.read_bytes()
+        if not files:
+            return
+
+        if pending is not None:
+            content_hash, prints = pending
+        else:
+            content_hash = ResultCache().hash_file(input_path)
+            prints = fingerprint(load_audio(input_path))
+        frames = _informative_frames(prints)
+        postings = zip(prints[frames].tolist(), frames.tolist())
+        self.index.add(
+            self.scope, content_hash, prints.astype("<u4").tobytes(), postings, files
+        )
@@ -1,9 +1,24 @@
 """Audio metadata extraction handler."""
 
+import json
 from pathlib import Path
 
 import click
 
+from semantics.modules.audio.headers import (
+    SUPPORTED_FORMATS,
+    UnsupportedContainerError,
+    read_info,
+)
+
+# Part of the result cache key; bump when this handler's output changes
+VERSION = "3"
+
+# Scheduling hints for semantics.core.scheduler: operations that must finish
+# first, and whether the handler is "cpu" or "io" bound
+DEPENDS_ON = ()
+WORKLOAD = "io"
+
 
 def handle(input_path: Path, output_path: Path, verbose: bool = False, **options) -> None:
     """
@@ -21,15 +36,34 @@ def handle(input_path: Path, output_path: Path, verbose: bool = False, **options
     click.echo(f"[METADATA] Extracting metadata from: {input_path.name}")
     click.echo(f"   Output folder: {output_path}")
 
-    # TODO: Implement actual metadata extraction with heavy dependencies
-    # try:
-    #     import mutagen
-    #     audio = mutagen.File(str(input_path))
-    #     metadata = dict(audio.tags) if audio.tags else {}
-    # except ImportError:
-    #     raise click.ClickException(
-    #         'This feature requires additional dependencies. '
-    #         'Run: uv pip install -e ".[audio]"'
-    #     )
-
-    click.echo("[OK] Metadata extraction complete (dummy)")
+    # Container headers and tags only: no samples are decoded
+    try:
+        metadata = read_info(input_path)._asdict()
+        # The output is cached by content, so it must not depend on the path
+        del metadata["path"]
+    except UnsupportedContainerError:
+        supported = ", ".join(SUPPORTED_FORMATS)
+        click.echo(
+            f"[WARN] Unsupported container: {input_path.name}"
+            f" (metadata is read from {supported} files)"
+        )
+        metadata = {
+            "size": input_path.stat().st_size,
+            "error": "Unsupported container",
+            "supported_formats": list(SUPPORTED_FORMATS),
+        }
+    except ValueError as e:
+        click.echo(f"[WARN] Could not read the headers of {input_path.name}: {e}")
+        metadata = {"size": input_path.stat().st_size, "error": str(e)}
+
+    metadata_path = output_path / f"{input_path.stem}.metadata.json"
+    metadata_path.write_text(
+        json.dumps(metadata, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+    )
+    if verbose and "duration" in metadata:
+        click.echo(
+            f"   {metadata['format']}/{metadata['codec']}, "
+            f"{metadata['duration']}s, {metadata['sample_rate']} Hz"
+        )
+
+    click.echo(f"[OK] Metadata extraction complete ({metadata_path.name})")
@@ -1,9 +1,23 @@
 """Audio transcription handler."""
 
+import importlib.util
+from functools import partial
 from pathlib import Path
 
 import click
 
+# Part of the result cache key; bump when this handler's output changes
+VERSION = "1"
+
+# Scheduling hints for semantics.core.scheduler: operations that must finish
+# first, and whether the handler is "cpu" or "io" bound
+DEPENDS_ON = ()
+WORKLOAD = "cpu"
+
+# Options that change how the handler runs, not what it writes; they are left
+# out of the result cache key
+RUN_OPTIONS = ("resume",)
+
 
 def handle(input_path: Path, output_path: Path, verbose: bool = False, **options) -> None:
     """
@@ -13,26 +27,209 @@ def handle(input_path: Path, output_path: Path, verbose: bool = False, **options
         input_path: Path to the input audio file.
         output_path: Path to the output folder.
         verbose: Enable verbose output.
-        **options: Additional options (language, model).
+        **options: Additional options (language, model, stream, vad, workers,
+            resume, dedupe).
     """
     language = options.get("language", "en")
     model = options.get("model", "base")
+    stream = options.get("stream", False)
+    vad = options.get("vad", True)
+    workers = options.get("workers", 1)
+    resume = options.get("resume", False)
+    dedupe = options.get("dedupe", False)
 
     if verbose:
-        click.echo(f"[OPTIONS] language={language}, model={model}")
+        click.echo(
+            f"[OPTIONS] language={language}, model={model}, "
+            f"stream={stream}, vad={vad}, workers={workers}, resume={resume}, "
+            f"dedupe={dedupe}"
+        )
 
     click.echo(f"[AUDIO] Transcribing audio: {input_path.name}")
     click.echo(f"   Output folder: {output_path}")
 
-    # TODO: Implement actual transcription with heavy dependencies
-    # try:
-    #     import whisper
-    #     model_obj = whisper.load_model(model)
-    #     result = model_obj.transcribe(str(input_path))
-    # except ImportError:
-    #     raise click.ClickException(
-    #         'This feature requires additional dependencies. '
-    #         'Run: uv pip install -e ".[audio]"'
-    #     )
-
-    click.echo("[OK] Transcription complete (dummy)")
+    deduplicator = None
+    if dedupe:
+        # Streaming and parallel runs write the same transcript files
+        deduplicator = _deduplicator(language, model, vad, stream or workers > 1)
+        if deduplicator.reuse(input_path, output_path, verbose=verbose):
+            click.echo("[OK] Transcription complete (reused)")
+            return
+
+    if workers > 1:
+        _parallel(
+            input_path, output_path, verbose, language, model, vad, workers, resume
+        )
+    elif stream:
+        _stream(input_path, output_path, verbose, language, model, vad, resume)
+    else:
+        # TODO: Implement actual transcription with heavy dependencies
+        # from semantics.core.decode import load_audio
+        # from semantics.modules.audio.stream import load_model
+        # model_obj = load_model(model)  # from the shared model pool
+        # audio = load_audio(input_path)  # decoded once, memory-mapped
+        # With vad, send only semantics.core.vad.compact() speech to the model
+        # and map timestamps back with its TimeMap
+        # result = model_obj.transcribe(audio)
+        # Long inputs are checkpointed through stream_transcribe() (see --stream)
+
+        click.echo("[OK] Transcription complete (dummy)")
+
+    if deduplicator is not None:
+        deduplicator.remember(input_path, output_path)
+
+
+def _deduplicator(language: str, model: str, vad: bool, streamed: bool):
+    """Return a Deduplicator for transcripts made with these options.
+
+    Raises:
+        click.ClickException: If NumPy, which fingerprints need, is missing.
+    """
+    if importlib.util.find_spec("numpy") is None:
+        raise click.ClickException(
+            "--dedupe requires additional dependencies. "
+            'Run: uv pip install -e ".[audio]"'
+        )
+
+    from semantics.modules.audio.fingerprint import Deduplicator
+
+    return Deduplicator(
+        {
+            "version": VERSION,
+            "language": language,
+            "model": model,
+            "vad": vad,
+            "streamed": streamed,
+        }
+    )
+
+
+def _checkpoint(input_path: Path, output_path: Path, **options):
+    """Return the checkpoint of a transcription (see core.checkpoint)."""
+    from semantics.core.checkpoint import SUFFIX, Checkpoint, checkpoint_key
+
+    key = checkpoint_key(input_path, __name__, VERSION, options)
+    return Checkpoint(output_path / f"{input_path.stem}{SUFFIX}", key)
+
+
+def _stream(
+    input_path: Path,
+    output_path: Path,
+    verbose: bool,
+    language: str,
+    model: str,
+    vad: bool,
+    resume: bool,
+) -> None:
+    """Transcribe window by window in bounded memory (see audio.stream)."""
+    from semantics.core.decode import open_pcm
+    from semantics.modules.audio import stream
+
+    model_obj = stream.load_model(model)
+
+    def transcribe(window: stream.Window) -> list[stream.Segment]:
+        return stream.transcribe_window(model_obj, window, language)
+
+    speech_only = stream.SpeechOnly(transcribe) if vad else None
+    with open_pcm(input_path) as read:
+        count = stream.stream_transcribe(
+            read,
+            speech_only or transcribe,
+            output_path,
+            input_path.stem,
+            verbose=verbose,
+            checkpoint=_checkpoint(
+                input_path, output_path, language=language, model=model, vad=vad
+            ),
+            resume=resume,
+        )
+
+    if speech_only is not None and speech_only.total_seconds:
+        share = speech_only.speech_seconds / speech_only.total_seconds
+        click.echo(f"[VAD] Sent {share:.0%} of the audio to the model")
+    click.echo(f"[OK] Transcription complete ({count} segment(s))")
+
+
+def _parallel(
+    input_path: Path,
+    output_path: Path,
+    verbose: bool,
+    language: str,
+    model: str,
+    vad: bool,
+    workers: int,
+    resume: bool,
+) -> None:
+    """Transcribe time ranges on several processes (see audio.parallel)."""
+    from semantics.modules.audio import parallel, stream
+
+    stream.require_whisper()
+    make_transcriber = partial(stream.whisper_transcriber, model, language, vad)
+    count = parallel.transcribe_parallel(
+        input_path,
+        output_path,
+        input_path.stem,
+        workers,
+        make_transcriber,
+        verbose=verbose,
+        checkpoint=_checkpoint(
+            input_path, output_path, language=language, model=model, vad=vad
+        ),
+        resume=resume,
+    )
+    click.echo(f"[OK] Transcription complete ({count} segment(s))")
+
+
+def handle_batch(
+    jobs: list[tuple[Path, Path]],
+    verbose: bool = False,
+    batch_size: int = 8,
+    **options,
+) -> None:
+    """
+    Handle transcription of several files, batching windows across files.
+
+    Transcripts are written as in streaming mode (see audio.batch).
+
+    Args:
+        jobs: (input file, output folder) pairs.
+        verbose: Enable verbose output.
+        batch_size: Number of windows sent to the model at once.
+        **options: Additional options (language, model, vad, dedupe).
+    """
+    from semantics.modules.audio import batch, stream
+
+    language = options.get("language", "en")
+    model = options.get("model", "base")
+    vad = options.get("vad", True)
+    dedupe = options.get("dedupe", False)
+
+    if verbose:
+        click.echo(
+            f"[OPTIONS] language={language}, model={model}, "
+            f"vad={vad}, batch_size={batch_size}, dedupe={dedupe}"
+        )
+
+    deduplicator = None
+    if dedupe:
+        deduplicator = _deduplicator(language, model, vad, streamed=True)
+        jobs = [
+            (input_path, output_path)
+            for input_path, output_path in jobs
+            if not deduplicator.reuse(input_path, output_path, verbose=verbose)
+        ]
+        if not jobs:
+            return
+
+    click.echo(f"[AUDIO] Transcribing {len(jobs)} file(s) in batches of {batch_size}")
+
+    model_obj = stream.load_model(model)
+
+    def transcribe(windows: list[stream.Window]) -> list[list[stream.Segment]]:
+        return stream.transcribe_batch(model_obj, windows, language)
+
+    batch.transcribe_files(jobs, transcribe, batch_size, vad=vad, verbose=verbose)
+
+    if deduplicator is not None:
+        for input_path, output_path in jobs:
+            deduplicator.remember(input_path, output_path)
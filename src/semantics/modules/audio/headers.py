@@ -0,0 +1,538 @@
+"""Read audio metadata from container headers without decoding samples.
+
+Only the headers and tag blocks of a file are read, with positional reads
+(pread) of a few KB: the first HEAD_SIZE bytes serve most files, tag frames
+beyond them are read one by one, and Ogg files also read their last page for
+the duration. No decoder is started and no samples are touched, so a file
+costs one open and a couple of small reads.
+
+Supported containers:
+- RIFF/WAVE: the fmt chunk, the data chunk's size and LIST/INFO tags;
+- FLAC: STREAMINFO and VORBIS_COMMENT blocks;
+- MPEG audio (MP3): ID3v2 and ID3v1 tags and the first frame header, with
+  the Xing/Info or VBRI header of VBR files;
+- Ogg: the Vorbis, Opus or FLAC identification and comment headers.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+from pathlib import Path
+from typing import NamedTuple
+
+from semantics.core.sniff import MpegFrame, parse_mpeg_frame
+
+# Bytes read from the start of every file
+HEAD_SIZE = 8192
+
+# Bytes read from the end of an Ogg file; holds at least one whole page
+TAIL_SIZE = 65536
+
+# Larger tag frames and comment blocks (usually cover art) are not read
+MAX_TAG_SIZE = 65536
+
+# Tags reported for every format, in catalog column order
+TAG_KEYS = ("title", "artist", "album", "date", "genre", "track")
+
+# Containers whose headers are read (see the module docstring)
+SUPPORTED_FORMATS = ("wav", "flac", "mp3", "ogg")
+
+
+class UnsupportedContainerError(ValueError):
+    """The file is not in one of the SUPPORTED_FORMATS (e.g., MP4/M4A, WMA)."""
+
+
+class AudioInfo(NamedTuple):
+    """Metadata read from an audio file's headers."""
+
+    path: str
+    size: int
+    format: str
+    codec: str | None
+    sample_rate: int | None
+    channels: int | None
+    bits_per_sample: int | None
+    bitrate: int | None
+    duration: float | None
+    tags: dict[str, str]
+
+
+class _Fields:
+    """Fields of an AudioInfo being filled in by a parser."""
+
+    def __init__(self, format_name: str) -> None:
+        self.format = format_name
+        self.codec: str | None = None
+        self.sample_rate: int | None = None
+        self.channels: int | None = None
+        self.bits_per_sample: int | None = None
+        self.bitrate: int | None = None
+        self.duration: float | None = None
+        self.tags: dict[str, str] = {}
+
+    def tag(self, key: str | None, value: str) -> None:
+        """Set a tag unless it is unknown, empty or already set."""
+        value = value.strip("\0 \t\r\n")
+        if key and value and key not in self.tags:
+            self.tags[key] = value
+
+
+def _pread(fd: int, size: int, offset: int) -> bytes:
+    """Read bytes at an offset without moving a shared file position."""
+    if size <= 0:
+        return b""
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+class _File:
+    """Positional reads of an open file, served from its head when possible."""
+
+    def __init__(self, fd: int, size: int) -> None:
+        self.fd = fd
+        self.size = size
+        self.head = _pread(fd, min(HEAD_SIZE, size), 0)
+
+    def read(self, offset: int, size: int) -> bytes:
+        """Return up to size bytes at offset."""
+        if offset < 0 or offset >= self.size:
+            return b""
+        if offset + size <= len(self.head):
+            return self.head[offset : offset + size]
+        return _pread(self.fd, min(size, self.size - offset), offset)
+
+
+def read_info(path: Path) -> AudioInfo:
+    """Read the metadata of an audio file from its headers.
+
+    Args:
+        path: Path to the audio file
+
+    Returns:
+        The container's stream parameters and tags. Fields the headers do
+        not hold are None.
+
+    Raises:
+        OSError: If the file cannot be read.
+        UnsupportedContainerError: If the container is not one of
+            SUPPORTED_FORMATS.
+        ValueError: If the container's headers are damaged.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        file = _File(fd, os.fstat(fd).st_size)
+        try:
+            fields = _parse(file)
+        except (struct.error, IndexError) as e:
+            raise ValueError(f"Damaged audio headers: {e}") from None
+    finally:
+        os.close(fd)
+
+    return AudioInfo(
+        str(path),
+        file.size,
+        fields.format,
+        fields.codec,
+        fields.sample_rate,
+        fields.channels,
+        fields.bits_per_sample,
+        fields.bitrate,
+        round(fields.duration, 3) if fields.duration is not None else None,
+        fields.tags,
+    )
+
+
+def _parse(file: _File) -> _Fields:
+    """Pick the parser for a file's container."""
+    head = file.head
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return _parse_wav(file)
+    if head[:4] == b"fLaC":
+        return _parse_flac(file, 0, _Fields("flac"))
+    if head[:4] == b"OggS":
+        return _parse_ogg(file)
+
+    tags: dict[str, str] = {}
+    offset = 0
+    if head[:3] == b"ID3":
+        tags, offset = _read_id3v2(file)
+        if file.read(offset, 4) == b"fLaC":
+            fields = _parse_flac(file, offset, _Fields("flac"))
+            fields.tags = {**tags, **fields.tags}
+            return fields
+    fields = _parse_mpeg(file, offset)
+    if fields is None:
+        raise UnsupportedContainerError("Unrecognized audio container")
+    fields.tags = {**fields.tags, **tags}
+    return fields
+
+
+# RIFF/WAVE
+
+_WAV_CODECS = {
+    0x0001: "pcm",
+    0x0002: "adpcm",
+    0x0003: "pcm_float",
+    0x0006: "alaw",
+    0x0007: "mulaw",
+    0x0011: "ima_adpcm",
+    0x0055: "mp3",
+}
+
+_RIFF_INFO_TAGS = {
+    b"INAM": "title",
+    b"IART": "artist",
+    b"IPRD": "album",
+    b"ICRD": "date",
+    b"IGNR": "genre",
+    b"ITRK": "track",
+    b"IPRT": "track",
+}
+
+
+def _parse_wav(file: _File) -> _Fields:
+    """Read the fmt, data and LIST/INFO chunks of a WAV file."""
+    fields = _Fields("wav")
+    byte_rate = 0
+    data_size = None
+    offset = 12
+    while offset + 8 <= file.size:
+        chunk_id, chunk_size = struct.unpack("<4sI", file.read(offset, 8))
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            fmt = file.read(body, min(chunk_size, 40))
+            tag, channels, rate, byte_rate, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+            if tag == 0xFFFE and len(fmt) >= 26:
+                # WAVE_FORMAT_EXTENSIBLE: the format is the subformat GUID's start
+                tag = struct.unpack("<H", fmt[24:26])[0]
+            fields.codec = _WAV_CODECS.get(tag, f"0x{tag:04x}")
+            fields.sample_rate = rate
+            fields.channels = channels
+            fields.bits_per_sample = bits or None
+            fields.bitrate = byte_rate * 8 or None
+        elif chunk_id == b"data":
+            # Streamed files may leave the size unset (0 or 0xFFFFFFFF)
+            available = file.size - body
+            data_size = chunk_size if 0 < chunk_size <= available else available
+        elif chunk_id == b"LIST" and file.read(body, 4) == b"INFO":
+            info = file.read(body + 4, min(chunk_size - 4, MAX_TAG_SIZE))
+            _read_riff_info(info, fields)
+        offset = body + chunk_size + (chunk_size & 1)
+
+    if data_size is not None and byte_rate:
+        fields.duration = data_size / byte_rate
+    return fields
+
+
+def _read_riff_info(data: bytes, fields: _Fields) -> None:
+    """Read the tags of a LIST/INFO chunk."""
+    offset = 0
+    while offset + 8 <= len(data):
+        tag_id, size = struct.unpack("<4sI", data[offset : offset + 8])
+        value = data[offset + 8 : offset + 8 + size]
+        fields.tag(_RIFF_INFO_TAGS.get(tag_id), _decode_text(value))
+        offset += 8 + size + (size & 1)
+
+
+# FLAC
+
+_VORBIS_TAGS = {
+    "TITLE": "title",
+    "ARTIST": "artist",
+    "ALBUM": "album",
+    "DATE": "date",
+    "GENRE": "genre",
+    "TRACKNUMBER": "track",
+}
+
+
+def _read_streaminfo(data: bytes, fields: _Fields) -> None:
+    """Read a FLAC STREAMINFO block."""
+    rate = int.from_bytes(data[10:13], "big") >> 4
+    total_samples = ((data[13] & 0x0F) << 32) | int.from_bytes(data[14:18], "big")
+    fields.codec = "flac"
+    fields.sample_rate = rate or None
+    fields.channels = ((data[12] >> 1) & 0x07) + 1
+    fields.bits_per_sample = (((data[12] & 0x01) << 4) | (data[13] >> 4)) + 1
+    if rate and total_samples:
+        fields.duration = total_samples / rate
+
+
+def _parse_flac(file: _File, start: int, fields: _Fields) -> _Fields:
+    """Read the metadata blocks of a native FLAC stream at an offset."""
+    offset = start + 4
+    last = False
+    while not last and offset + 4 <= file.size:
+        header = file.read(offset, 4)
+        last = bool(header[0] & 0x80)
+        block_type = header[0] & 0x7F
+        length = int.from_bytes(header[1:4], "big")
+        body = offset + 4
+        if block_type == 0:
+            _read_streaminfo(file.read(body, 34), fields)
+        elif block_type == 4:
+            _read_vorbis_comment(file.read(body, min(length, MAX_TAG_SIZE)), fields)
+        offset = body + length
+
+    if fields.duration:
+        fields.bitrate = round((file.size - offset) * 8 / fields.duration)
+    return fields
+
+
+def _read_vorbis_comment(data: bytes, fields: _Fields) -> None:
+    """Read a Vorbis comment list, as used by FLAC, Vorbis and Opus.
+
+    A list cut short by MAX_TAG_SIZE yields the comments before the cut.
+    """
+    try:
+        (vendor_length,) = struct.unpack_from("<I", data, 0)
+        offset = 4 + vendor_length
+        (count,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        for _ in range(count):
+            (length,) = struct.unpack_from("<I", data, offset)
+            comment = data[offset + 4 : offset + 4 + length]
+            offset += 4 + length
+            if offset > len(data):
+                break
+            key, _, value = comment.decode("utf-8", "replace").partition("=")
+            fields.tag(_VORBIS_TAGS.get(key.upper()), value)
+    except struct.error:
+        pass
+
+
+# MPEG audio and ID3
+
+_ID3_TAGS = {
+    "TIT2": "title",
+    "TT2": "title",
+    "TPE1": "artist",
+    "TP1": "artist",
+    "TALB": "album",
+    "TAL": "album",
+    "TDRC": "date",
+    "TYER": "date",
+    "TYE": "date",
+    "TCON": "genre",
+    "TCO": "genre",
+    "TRCK": "track",
+    "TRK": "track",
+}
+
+_ID3_ENCODINGS = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}
+
+# Bytes searched for the first frame after the ID3v2 tag
+_MPEG_SYNC_SEARCH = 4096
+
+
+def _synchsafe(data: bytes) -> int:
+    """Decode an ID3v2 synchsafe integer (7 bits per byte)."""
+    value = 0
+    for byte in data:
+        value = (value << 7) | (byte & 0x7F)
+    return value
+
+
+def _decode_text(data: bytes, encoding: str = "latin-1") -> str:
+    """Decode tag text, joining null-separated values."""
+    text = data.decode(encoding, "replace")
+    return "; ".join(part for part in text.split("\0") if part.strip())
+
+
+def _read_id3v2(file: _File) -> tuple[dict[str, str], int]:
+    """Read the text frames of an ID3v2 tag at the start of a file.
+
+    Returns:
+        The tags and the offset of the first byte after the tag.
+    """
+    header = file.read(0, 10)
+    major = header[3]
+    flags = header[5]
+    end = 10 + _synchsafe(header[6:10])
+    fields = _Fields("id3")
+    if major not in (2, 3, 4):
+        return fields.tags, end
+
+    offset = 10
+    if flags & 0x40 and major >= 3:
+        extended = file.read(offset, 4)
+        size = _synchsafe(extended) if major == 4 else struct.unpack(">I", extended)[0]
+        offset += size if major == 4 else size + 4
+
+    id_length, header_length = (3, 6) if major == 2 else (4, 10)
+    while offset + header_length <= end:
+        frame = file.read(offset, header_length)
+        if frame[0] == 0:
+            # Padding
+            break
+        frame_id = frame[:id_length].decode("latin-1")
+        if major == 2:
+            size = int.from_bytes(frame[3:6], "big")
+        elif major == 3:
+            size = struct.unpack(">I", frame[4:8])[0]
+        else:
+            size = _synchsafe(frame[4:8])
+        body = offset + header_length
+        offset = body + size
+
+        key = _ID3_TAGS.get(frame_id)
+        # Skip compressed or encrypted frames
+        packed = major >= 3 and frame[9] & (0xC0 if major == 3 else 0x0C)
+        if key is None or packed or not 1 < size <= MAX_TAG_SIZE:
+            continue
+        data = file.read(body, size)
+        encoding = _ID3_ENCODINGS.get(data[0])
+        if encoding is not None:
+            fields.tag(key, _decode_text(data[1:], encoding))
+
+    # A footer repeats the header after the tag
+    return fields.tags, end + (10 if major == 4 and flags & 0x10 else 0)
+
+
+def _read_id3v1(file: _File) -> dict[str, str]:
+    """Read an ID3v1 tag from the last 128 bytes of a file."""
+    data = file.read(file.size - 128, 128)
+    if len(data) != 128 or data[:3] != b"TAG":
+        return {}
+    fields = _Fields("id3")
+    fields.tag("title", _decode_text(data[3:33]))
+    fields.tag("artist", _decode_text(data[33:63]))
+    fields.tag("album", _decode_text(data[63:93]))
+    fields.tag("date", _decode_text(data[93:97]))
+    if data[125] == 0 and data[126]:
+        fields.tag("track", str(data[126]))
+    return fields.tags
+
+
+def _find_frame(file: _File, start: int) -> tuple[int, MpegFrame] | None:
+    """Find the first MPEG audio frame at or shortly after an offset.
+
+    A frame header only counts if another one follows it where it ends, or
+    it ends the file, which rules out stray sync bytes in other data.
+    """
+    data = file.read(start, _MPEG_SYNC_SEARCH)
+    position = data.find(b"\xff")
+    while position != -1:
+        frame = parse_mpeg_frame(data[position : position + 4])
+        if frame is not None:
+            following = start + position + frame.length
+            if following == file.size or parse_mpeg_frame(file.read(following, 4)):
+                return start + position, frame
+        position = data.find(b"\xff", position + 1)
+    return None
+
+
+def _parse_mpeg(file: _File, start: int) -> _Fields | None:
+    """Read the first MPEG audio frame at or shortly after an offset."""
+    found = _find_frame(file, start)
+    if found is None:
+        return None
+
+    offset, frame = found
+    fields = _Fields("mpeg")
+    fields.codec = f"mp{frame.layer}"
+    fields.sample_rate = frame.sample_rate
+    fields.channels = 1 if frame.mono else 2
+    fields.tags = _read_id3v1(file)
+    audio_bytes = file.size - offset - (128 if fields.tags else 0)
+
+    # VBR files announce their frame count in the first frame
+    side_info = (17 if frame.mono else 32) if frame.mpeg1 else (9 if frame.mono else 17)
+    first = file.read(offset, 4 + side_info + 120)
+    frames = None
+    xing = first[4 + side_info : 4 + side_info + 4]
+    if xing in (b"Xing", b"Info"):
+        xing_flags = struct.unpack(">I", first[8 + side_info : 12 + side_info])[0]
+        if xing_flags & 0x01:
+            frames = struct.unpack(">I", first[12 + side_info : 16 + side_info])[0]
+    elif first[36:40] == b"VBRI":
+        frames = struct.unpack(">I", first[50:54])[0]
+
+    if frames:
+        fields.duration = frames * frame.samples / frame.sample_rate
+        fields.bitrate = round(audio_bytes * 8 / fields.duration)
+    else:
+        fields.bitrate = frame.bitrate
+        fields.duration = audio_bytes * 8 / frame.bitrate
+    return fields
+
+
+# Ogg
+
+def _ogg_packets(file: _File, count: int) -> list[bytes]:
+    """Return the first packets of an Ogg stream, each cut at MAX_TAG_SIZE."""
+    packets: list[bytes] = []
+    current = bytearray()
+    offset = 0
+    while len(packets) < count and file.read(offset, 4) == b"OggS":
+        segments = file.read(offset + 26, 1)[0]
+        lacing = file.read(offset + 27, segments)
+        position = offset + 27 + segments
+        for value in lacing:
+            if len(current) < MAX_TAG_SIZE:
+                current += file.read(position, min(value, MAX_TAG_SIZE - len(current)))
+            position += value
+            if value < 255:
+                packets.append(bytes(current))
+                current = bytearray()
+                if len(packets) == count:
+                    break
+        offset = position
+    return packets
+
+
+def _last_granule(file: _File) -> int | None:
+    """Return the granule position of the last Ogg page."""
+    start = max(0, file.size - TAIL_SIZE)
+    tail = file.read(start, file.size - start)
+    position = tail.rfind(b"OggS")
+    if position == -1 or position + 14 > len(tail):
+        return None
+    granule = struct.unpack("<q", tail[position + 6 : position + 14])[0]
+    return granule if granule >= 0 else None
+
+
+def _parse_ogg(file: _File) -> _Fields:
+    """Read the identification and comment headers of an Ogg stream."""
+    fields = _Fields("ogg")
+    packets = _ogg_packets(file, 2)
+    if not packets:
+        raise ValueError("Damaged Ogg stream")
+    identification = packets[0]
+    comments = packets[1] if len(packets) > 1 else b""
+    granule = _last_granule(file)
+
+    if identification[:7] == b"\x01vorbis":
+        channels, rate, _, nominal = struct.unpack("<BIiI", identification[11:24])
+        fields.codec = "vorbis"
+        fields.channels = channels
+        fields.sample_rate = rate
+        if comments[:7] == b"\x03vorbis":
+            _read_vorbis_comment(comments[7:], fields)
+        if granule and rate:
+            fields.duration = granule / rate
+        elif nominal:
+            fields.bitrate = nominal
+    elif identification[:8] == b"OpusHead":
+        channels, pre_skip, rate = struct.unpack("<BHI", identification[9:16])
+        fields.codec = "opus"
+        fields.channels = channels
+        fields.sample_rate = rate or 48000
+        if comments[:8] == b"OpusTags":
+            _read_vorbis_comment(comments[8:], fields)
+        # Opus granule positions always count 48 kHz samples
+        if granule:
+            fields.duration = max(0, granule - pre_skip) / 48000
+    elif identification[:5] == b"\x7fFLAC":
+        _read_streaminfo(identification[17:51], fields)
+        if comments[:1] and comments[0] & 0x7F == 4:
+            _read_vorbis_comment(comments[4:], fields)
+    else:
+        fields.codec = None
+
+    if fields.duration:
+        fields.bitrate = round(file.size * 8 / fields.duration)
+    return fields
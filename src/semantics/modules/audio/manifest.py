@@ -0,0 +1,11 @@
+"""Audio module manifest.
+
+Static description of the audio module. The main CLI reads this file to list
+and route to the module without importing its CLI or handlers.
+"""
+
+HELP = "Transcribe audio and extract audio metadata"
+
+FLAGS = ["--transcribe", "--extract-metadata"]
+
+EXTENSIONS = [".wav", ".mp3", ".flac", ".ogg", ".m4a", ".aac", ".wma"]
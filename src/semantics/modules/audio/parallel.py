@@ -0,0 +1,300 @@
+"""Transcription of one long recording on several processes at once.
+
+The recording is decoded once (see semantics.core.decode) and cut into as
+many contiguous time ranges as there are workers. Each cut is placed at the
+quietest moment near its ideal position, so it falls between words. Every
+range is transcribed in its own process, as in streaming mode, with its own
+model; the processes read the decoded samples from one shared, read-only
+memory-mapped file instead of receiving a copy. Samples that are not in a
+file (video soundtracks, or any input with caching disabled; see
+semantics.core.decode) are sent to each process as its range's slice, so
+nothing is written to disk.
+
+Ranges are extended into their neighbours by OVERLAP_SECONDS so that a
+word at a cut is heard whole by at least one of them. When the transcripts
+are merged, a segment is kept by the range in which its midpoint falls, so
+a word in the overlap is kept exactly once. Ranges are written to the
+transcript in order as they finish.
+
+Each worker checkpoints its range (see semantics.core.checkpoint) as it
+goes, segments included, to `<stem>.range<i>.checkpoint.json`; a resumed
+run recomputes the same cuts and every worker continues its range from its
+checkpoint. The checkpoints are removed once the transcript is complete.
+
+Workers are spawned rather than forked: forking a process in which torch
+has started its thread pools can deadlock the children. Each worker gets an
+equal share of the cores for its math libraries' threads.
+"""
+
+from __future__ import annotations
+
+import glob
+import math
+import multiprocessing
+import os
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import click
+import numpy as np
+
+from semantics.core.checkpoint import SUFFIX, Checkpoint
+from semantics.core.decode import SAMPLE_RATE, load_audio
+from semantics.modules.audio.stream import OVERLAP_SECONDS as WINDOW_OVERLAP_SECONDS
+from semantics.modules.audio.stream import (
+    Segment,
+    SegmentStitcher,
+    TranscriptWriter,
+    Window,
+    iter_windows,
+)
+
+# Each range is at least this long; shorter recordings use fewer workers
+MIN_RANGE_SECONDS = 60.0
+
+# A cut is placed at the quietest moment this close to its ideal position
+SEARCH_SECONDS = 15.0
+
+# Loudness is compared over frames of this length, smoothed over a few
+CUT_FRAME_SECONDS = 0.1
+_SMOOTH_FRAMES = 5
+
+# Frames within this factor of the quietest count as equally quiet
+_QUIET_RATIO = 1.25
+
+# Audio each range shares with its neighbours
+OVERLAP_SECONDS = 1.0
+
+# Environment variables limiting the threads of math libraries
+_THREAD_VARIABLES = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def find_cuts(samples: np.ndarray, sample_rate: int, parts: int) -> list[int]:
+    """Find where to cut a recording into parts of about equal length.
+
+    Only SEARCH_SECONDS on either side of each ideal cut are read, so long
+    memory-mapped recordings are not paged in.
+
+    Args:
+        samples: Mono audio as floats in [-1, 1]
+        sample_rate: Sample rate in Hz
+        parts: Number of parts
+
+    Returns:
+        The parts - 1 cut positions in samples, in increasing order.
+    """
+    frame = max(1, int(CUT_FRAME_SECONDS * sample_rate))
+    search = int(SEARCH_SECONDS * sample_rate)
+    cuts: list[int] = []
+    for index in range(1, parts):
+        target = len(samples) * index // parts
+        low = max(target - search, cuts[-1] + frame if cuts else 0)
+        high = min(target + search, len(samples))
+        count = (high - low) // frame
+        if count < 1:
+            cuts.append(target)
+            continue
+
+        region = np.asarray(samples[low : low + count * frame], dtype=np.float32)
+        energy = np.mean(region.reshape(count, frame) ** 2, axis=1)
+        kernel = np.ones(_SMOOTH_FRAMES) / _SMOOTH_FRAMES
+        energy = np.convolve(energy, kernel, mode="same")
+
+        # Of the quietest frames, take the one nearest the ideal position
+        quiet = np.flatnonzero(energy <= energy.min() * _QUIET_RATIO + 1e-12)
+        centers = low + quiet * frame + frame // 2
+        cuts.append(int(centers[np.argmin(np.abs(centers - target))]))
+    return cuts
+
+
+def _reader(samples: np.ndarray, start: int, end: int) -> Callable[[int], bytes]:
+    """Return a PCM stream of samples[start:end] for iter_windows()."""
+    position = start
+
+    def read(size: int) -> bytes:
+        nonlocal position
+        chunk = samples[position : min(end, position + size // 2)]
+        position += len(chunk)
+        return (chunk * 32768.0).astype("<i2").tobytes()
+
+    return read
+
+
+def transcribe_range(
+    samples: str | np.ndarray,
+    start: int,
+    end: int,
+    make_transcriber: Callable[[], Callable[[Window], list[Segment]]],
+    checkpoint: Checkpoint | None = None,
+) -> list[Segment]:
+    """Transcribe one range of a recording, window by window.
+
+    Runs in a worker process.
+
+    Args:
+        samples: .npy file of the decoded recording, or the samples of the
+            range itself when the recording is not in a file
+        start: First sample of the range
+        end: Sample after the range
+        make_transcriber: Picklable function returning the window
+            transcriber, called once in the worker (e.g. to load a model)
+        checkpoint: Where to save the range's progress; a usable
+            checkpoint found there is continued from
+
+    Returns:
+        The stitched segments, in seconds from the start of the recording.
+    """
+    state = checkpoint.load() if checkpoint is not None else None
+    if state is None:
+        state = {"position": 0.0, "cut": 0.0, "segments": [], "done": False}
+    segments = [Segment(*segment) for segment in state["segments"]]
+    if state["done"]:
+        return segments
+
+    if isinstance(samples, str):
+        samples = np.load(samples, mmap_mode="r")[start:end]
+    transcribe = make_transcriber()
+    stitcher = SegmentStitcher(cut=state["cut"])
+    offset = start / SAMPLE_RATE
+    reader = _reader(samples, 0, len(samples))
+    for window in iter_windows(reader, start=state["position"]):
+        segments.extend(
+            Segment(segment.start + offset, segment.end + offset, segment.text)
+            for segment in stitcher.add(window, transcribe(window))
+        )
+        if checkpoint is not None:
+            progress = {
+                "position": window.end - WINDOW_OVERLAP_SECONDS,
+                "cut": stitcher.cut,
+                "segments": segments,
+                "done": window.final,
+            }
+            checkpoint.save(progress, force=window.final)
+    return segments
+
+
+def _limit_threads(threads: int) -> None:
+    """Limit the threads of math libraries in a worker, before they load."""
+    for name in _THREAD_VARIABLES:
+        os.environ[name] = str(threads)
+
+
+def transcribe_parallel(
+    input_path: Path,
+    output_path: Path,
+    stem: str,
+    workers: int,
+    make_transcriber: Callable[[], Callable[[Window], list[Segment]]],
+    verbose: bool = False,
+    checkpoint: Checkpoint | None = None,
+    resume: bool = False,
+) -> int:
+    """Transcribe a recording on several processes and merge the transcripts.
+
+    Writes the same files as streaming mode (see TranscriptWriter).
+
+    Args:
+        input_path: Path to the input audio file
+        output_path: Path to the output folder
+        stem: Base name of the output files
+        workers: Maximum number of processes
+        make_transcriber: Picklable function returning the window
+            transcriber, called once in each worker
+        verbose: Print each range as it is written
+        checkpoint: The run's checkpoint, from which each range's is derived
+        resume: Continue every range from its checkpoint, if usable
+
+    Returns:
+        The number of segments written.
+    """
+    if checkpoint is not None and not resume:
+        _remove_range_checkpoints(output_path, stem)
+
+    samples = load_audio(input_path)
+    # Workers map the decoded audio cache's file, or get their slice
+    samples_path = str(samples.filename) if isinstance(samples, np.memmap) else None
+    total = len(samples)
+    parts = max(1, min(workers, int(total / SAMPLE_RATE // MIN_RANGE_SECONDS)))
+    bounds = [0, *find_cuts(samples, SAMPLE_RATE, parts), total]
+    ranges = list(zip(bounds, bounds[1:]))
+    overlap = int(OVERLAP_SECONDS * SAMPLE_RATE)
+    jobs = []
+    for index, (start, end) in enumerate(ranges):
+        start, end = max(0, start - overlap), min(total, end + overlap)
+        range_checkpoint = None
+        if checkpoint is not None:
+            range_checkpoint = Checkpoint(
+                output_path / f"{stem}.range{index}{SUFFIX}",
+                f"{checkpoint.key}:{start}:{end}",
+                checkpoint.interval,
+            )
+        source = samples_path or samples[start:end]
+        jobs.append((source, start, end, make_transcriber, range_checkpoint))
+    click.echo(f"[PARALLEL] Transcribing {len(ranges)} range(s) at once")
+    if resume:
+        found = sum(job[-1] is not None and job[-1].path.exists() for job in jobs)
+        click.echo(f"[RESUME] Found checkpoints for {found} range(s)")
+
+    with TranscriptWriter(output_path, stem) as writer:
+        if len(jobs) == 1:
+            # Not worth starting a process
+            segments = transcribe_range(*jobs[0])
+            _write_ranges(writer, ranges, iter([segments]), total, verbose)
+        else:
+            _run_workers(writer, ranges, jobs, total, verbose)
+
+    if checkpoint is not None:
+        _remove_range_checkpoints(output_path, stem)
+        checkpoint.remove()
+    return writer.count
+
+
+def _remove_range_checkpoints(output_path: Path, stem: str) -> None:
+    """Remove the checkpoints of every range of a recording."""
+    for path in output_path.glob(f"{glob.escape(stem)}.range*{SUFFIX}"):
+        Checkpoint(path, "").remove()
+
+
+def _run_workers(
+    writer: TranscriptWriter,
+    ranges: list[tuple[int, int]],
+    jobs: list[tuple],
+    total: int,
+    verbose: bool,
+) -> None:
+    """Transcribe every range in its own process, writing them in order."""
+    threads = max(1, (os.cpu_count() or 1) // len(jobs))
+    with ProcessPoolExecutor(
+        max_workers=len(jobs),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_limit_threads,
+        initargs=(threads,),
+    ) as pool:
+        futures = [pool.submit(transcribe_range, *job) for job in jobs]
+        try:
+            results = (future.result() for future in futures)
+            _write_ranges(writer, ranges, results, total, verbose)
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def _write_ranges(
+    writer: TranscriptWriter,
+    ranges: list[tuple[int, int]],
+    results: Iterator[list[Segment]],
+    total: int,
+    verbose: bool,
+) -> None:
+    """Write each range's own segments, in order, as their results arrive."""
+    for (start, end), segments in zip(ranges, results):
+        first = start / SAMPLE_RATE
+        last = math.inf if end == total else end / SAMPLE_RATE
+        writer.write_segments(
+            [s for s in segments if first <= (s.start + s.end) / 2 < last]
+        )
+        if verbose:
+            click.echo(
+                f"   [PARALLEL] Wrote {first:.1f}s-{end / SAMPLE_RATE:.1f}s"
+            )
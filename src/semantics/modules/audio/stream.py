@@ -0,0 +1,460 @@
+"""Streaming transcription of long recordings in bounded memory.
+
+The input is decoded to 16 kHz mono 16-bit PCM and consumed as fixed-size,
+overlapping windows: at most one window (plus one sample of look-ahead) is
+held in memory, whatever the duration of the recording. Each window is
+transcribed on its own and its segments are stitched onto the previous
+window's at the middle of their overlap, so words cut by a window boundary
+are taken from the window that heard them whole. Segments are written to the
+output folder as soon as their window is done.
+
+Progress can be checkpointed (see semantics.core.checkpoint) after each
+window: where the next window starts, where the stitcher cuts and how much of
+the transcript files is complete. A resumed run decodes up to that point
+without transcribing it and continues as if it had never stopped.
+
+Input is read through semantics.core.decode: samples another handler or an
+earlier run already decoded are read from its cache, and anything else is
+decoded while it is streamed and stored there for the next reader.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+import click
+
+from semantics.core.checkpoint import Checkpoint
+from semantics.core.decode import SAMPLE_RATE, SAMPLE_WIDTH
+
+# Whisper's native context is 30 seconds
+WINDOW_SECONDS = 30.0
+
+# Audio shared by consecutive windows, long enough to hold a spoken word
+OVERLAP_SECONDS = 2.0
+
+
+class Window(NamedTuple):
+    """A slice of decoded audio."""
+
+    start: float
+    pcm: bytes
+    final: bool
+
+    @property
+    def end(self) -> float:
+        """End of the window in seconds."""
+        return self.start + len(self.pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+
+
+class Segment(NamedTuple):
+    """A transcribed stretch of speech, in seconds from the start of the input."""
+
+    start: float
+    end: float
+    text: str
+
+
+def iter_windows(
+    read: Callable[[int], bytes],
+    window: float = WINDOW_SECONDS,
+    overlap: float = OVERLAP_SECONDS,
+    start: float = 0.0,
+) -> Iterator[Window]:
+    """Split a PCM stream into overlapping windows.
+
+    Args:
+        read: Function returning up to the requested number of PCM bytes
+        window: Window length in seconds
+        overlap: Seconds shared by consecutive windows
+        start: Seconds at the start of the stream to skip; windows' times
+            still count from the start of the stream
+
+    Yields:
+        Windows in order; the last one has final set and may be shorter.
+    """
+    if not 0 <= overlap < window:
+        raise ValueError("overlap must be at least 0 and shorter than the window")
+
+    bytes_per_second = SAMPLE_RATE * SAMPLE_WIDTH
+    window_bytes = int(window * SAMPLE_RATE) * SAMPLE_WIDTH
+    hop_bytes = window_bytes - int(overlap * SAMPLE_RATE) * SAMPLE_WIDTH
+    buffer = bytearray()
+    offset = 0
+
+    skip = round(start * SAMPLE_RATE) * SAMPLE_WIDTH
+    while offset < skip:
+        chunk = read(min(skip - offset, window_bytes))
+        if not chunk:
+            return
+        offset += len(chunk)
+
+    while True:
+        # Read one sample past the window to learn whether another follows
+        while len(buffer) <= window_bytes:
+            chunk = read(window_bytes + SAMPLE_WIDTH - len(buffer))
+            if not chunk:
+                break
+            buffer += chunk
+
+        if len(buffer) <= window_bytes:
+            # Drop a trailing partial sample
+            buffer = buffer[: len(buffer) - len(buffer) % SAMPLE_WIDTH]
+            if buffer:
+                yield Window(offset / bytes_per_second, bytes(buffer), True)
+            return
+
+        yield Window(offset / bytes_per_second, bytes(buffer[:window_bytes]), False)
+        del buffer[:hop_bytes]
+        offset += hop_bytes
+
+
+class SegmentStitcher:
+    """Merge the segments of overlapping windows into one sequence.
+
+    Consecutive windows are cut at the middle of their overlap; a segment
+    belongs to the window in which its midpoint falls before the cut.
+
+    Args:
+        overlap: Seconds shared by consecutive windows
+        cut: Seconds before which segments were already kept, when resuming
+    """
+
+    def __init__(self, overlap: float = OVERLAP_SECONDS, cut: float = 0.0) -> None:
+        self.overlap = overlap
+        self.cut = cut
+
+    def add(self, window: Window, segments: list[Segment]) -> list[Segment]:
+        """Return the segments of a window that belong to it.
+
+        Args:
+            window: The window that was transcribed
+            segments: Its segments, in seconds from the start of the window
+
+        Returns:
+            The kept segments, in seconds from the start of the input.
+        """
+        upper = float("inf") if window.final else window.end - self.overlap / 2
+        kept = []
+        for segment in segments:
+            start = window.start + segment.start
+            end = window.start + segment.end
+            if self.cut <= (start + end) / 2 < upper:
+                kept.append(Segment(start, end, segment.text.strip()))
+        self.cut = upper
+        return kept
+
+
+def require_whisper() -> None:
+    """Check that Whisper is installed, without importing it.
+
+    Raises:
+        click.ClickException: If the audio dependencies are not installed.
+    """
+    if importlib.util.find_spec("whisper") is None:
+        raise click.ClickException(
+            "This feature requires additional dependencies. "
+            'Run: uv pip install -e ".[audio]"'
+        )
+
+
+def load_model(name: str):
+    """Return a Whisper model from the shared model pool.
+
+    The model is loaded and warmed up on first use only; later files handled
+    by this process reuse it.
+
+    Raises:
+        click.ClickException: If the audio dependencies are not installed.
+    """
+    require_whisper()
+
+    from semantics.core.models import default_device, get_model
+
+    # Whisper runs on CUDA or the CPU only
+    device = "cuda" if default_device() == "cuda" else "cpu"
+    return get_model("whisper", name, load_whisper, device=device, warmup=_warm_up)
+
+
+def load_whisper(key):
+    """Load the Whisper model for a ModelKey, in half precision for 'fp16'."""
+    import whisper
+
+    model = whisper.load_model(key.name, device=key.device)
+    return model.half() if key.precision == "fp16" else model
+
+
+def _warm_up(model) -> None:
+    """Run one second of silence through a freshly loaded model."""
+    import numpy as np
+
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    model.transcribe(silence, language="en", verbose=None, fp16=_use_fp16(model))
+
+
+def _use_fp16(model) -> bool:
+    """Return True if the model was loaded in half precision."""
+    import torch
+
+    return next(model.parameters()).dtype == torch.float16
+
+
+def pcm_to_float(pcm: bytes):
+    """Convert 16-bit PCM to a float32 NumPy array in [-1, 1]."""
+    import numpy as np
+
+    return np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def transcribe_window(model, window: Window, language: str) -> list[Segment]:
+    """Transcribe one window with a Whisper model.
+
+    Returns:
+        Segments in seconds from the start of the window.
+    """
+    audio = pcm_to_float(window.pcm)
+    result = model.transcribe(
+        audio, language=language, verbose=None, fp16=_use_fp16(model)
+    )
+    return [
+        Segment(float(s["start"]), float(s["end"]), s["text"])
+        for s in result["segments"]
+    ]
+
+
+def transcribe_batch(
+    model, windows: list[Window], language: str
+) -> list[list[Segment]]:
+    """Transcribe several windows in one batched pass of a Whisper model.
+
+    Every window is padded to Whisper's 30 s context, encoded together and
+    decoded together with timestamps.
+
+    Returns:
+        The segments of each window, in seconds from its start.
+    """
+    import torch
+    import whisper
+    from whisper.tokenizer import get_tokenizer
+
+    mels = torch.stack(
+        [
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(pcm_to_float(window.pcm)), model.dims.n_mels
+            )
+            for window in windows
+        ]
+    ).to(model.device)
+    options = whisper.DecodingOptions(
+        language=language, without_timestamps=False, fp16=_use_fp16(model)
+    )
+    results = whisper.decode(model, mels, options)
+    tokenizer = get_tokenizer(
+        model.is_multilingual,
+        num_languages=model.num_languages,
+        language=language,
+        task="transcribe",
+    )
+    return [
+        _parse_segments(result.tokens, tokenizer, window.end - window.start)
+        for result, window in zip(results, windows)
+    ]
+
+
+def _parse_segments(tokens: list[int], tokenizer, duration: float) -> list[Segment]:
+    """Split decoded tokens into segments at their timestamp tokens."""
+    # Whisper timestamps are in steps of 20 ms
+    precision = 0.02
+    segments = []
+    start = None
+    text: list[int] = []
+    for token in tokens:
+        if token < tokenizer.timestamp_begin:
+            text.append(token)
+            continue
+        time = min((token - tokenizer.timestamp_begin) * precision, duration)
+        if start is not None and text:
+            segments.append(Segment(start, time, tokenizer.decode(text)))
+            start, text = None, []
+        else:
+            start = time
+    if text:
+        segments.append(Segment(start or 0.0, duration, tokenizer.decode(text)))
+    return segments
+
+
+def speech_window(window: Window):
+    """Join the speech in a window into a shorter window (see core.vad).
+
+    Returns:
+        The speech-only window and the TimeMap from its times to the
+        original window's, or (None, None) if the window holds no speech.
+    """
+    import numpy as np
+
+    from semantics.core import vad
+
+    regions = vad.detect_speech(pcm_to_float(window.pcm), SAMPLE_RATE)
+    if not regions:
+        return None, None
+    samples = np.frombuffer(window.pcm, dtype="<i2")
+    speech, time_map = vad.compact(samples, regions, SAMPLE_RATE)
+    return window._replace(pcm=speech.tobytes()), time_map
+
+
+def map_segments(segments: list[Segment], time_map) -> list[Segment]:
+    """Map segments of a speech-only window back onto the original window."""
+    return [
+        Segment(
+            time_map.to_original(segment.start),
+            time_map.to_original(segment.end, end=True),
+            segment.text,
+        )
+        for segment in segments
+    ]
+
+
+class SpeechOnly:
+    """Window transcriber that only sends the speech in a window to the model.
+
+    Windows without speech do not reach the model at all.
+    """
+
+    def __init__(self, transcribe: Callable[[Window], list[Segment]]) -> None:
+        self.transcribe = transcribe
+        self.total_seconds = 0.0
+        self.speech_seconds = 0.0
+
+    def __call__(self, window: Window) -> list[Segment]:
+        self.total_seconds += window.end - window.start
+        speech, time_map = speech_window(window)
+        if speech is None:
+            return []
+        self.speech_seconds += speech.end - speech.start
+        return map_segments(self.transcribe(speech), time_map)
+
+
+def whisper_transcriber(
+    model: str, language: str, vad: bool
+) -> Callable[[Window], list[Segment]]:
+    """Return a window transcriber using a Whisper model from the pool.
+
+    Module-level so that it can be sent, with its arguments bound by
+    functools.partial, to worker processes that build their own.
+    """
+    model_obj = load_model(model)
+
+    def transcribe(window: Window) -> list[Segment]:
+        return transcribe_window(model_obj, window, language)
+
+    return SpeechOnly(transcribe) if vad else transcribe
+
+
+class TranscriptWriter:
+    """Stitch windows' segments and append them to the transcript files.
+
+    Writes `<stem>.segments.jsonl` (one segment per line) and `<stem>.txt`,
+    flushing after every window. Windows must be written in order.
+
+    Args:
+        output_path: Path to the output folder
+        stem: Base name of the output files
+        append: Add to existing files instead of replacing them, when resuming
+    """
+
+    def __init__(self, output_path: Path, stem: str, append: bool = False) -> None:
+        self.stitcher = SegmentStitcher()
+        self.count = 0
+        self.paths = (
+            output_path / f"{stem}.segments.jsonl",
+            output_path / f"{stem}.txt",
+        )
+        mode = "a" if append else "w"
+        self._jsonl = open(self.paths[0], mode, encoding="utf-8")
+        self._text = open(self.paths[1], mode, encoding="utf-8")
+
+    def write(self, window: Window, segments: list[Segment]) -> None:
+        """Write the segments of the next window."""
+        self.write_segments(self.stitcher.add(window, segments))
+
+    def write_segments(self, segments: list[Segment]) -> None:
+        """Write segments that are already stitched, in seconds from the start."""
+        for segment in segments:
+            record = json.dumps(segment._asdict(), ensure_ascii=False)
+            self._jsonl.write(record + "\n")
+            self._text.write(segment.text + "\n")
+            self.count += 1
+        self._jsonl.flush()
+        self._text.flush()
+
+    def close(self) -> None:
+        """Close the transcript files."""
+        self._jsonl.close()
+        self._text.close()
+
+    def __enter__(self) -> TranscriptWriter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def stream_transcribe(
+    read: Callable[[int], bytes],
+    transcribe: Callable[[Window], list[Segment]],
+    output_path: Path,
+    stem: str,
+    verbose: bool = False,
+    checkpoint: Checkpoint | None = None,
+    resume: bool = False,
+) -> int:
+    """Transcribe a PCM stream window by window, writing segments as they finish.
+
+    Args:
+        read: PCM stream, as yielded by open_pcm()
+        transcribe: Function returning a window's segments
+        output_path: Path to the output folder
+        stem: Base name of the output files (see TranscriptWriter)
+        verbose: Print progress after each window
+        checkpoint: Where to save progress; removed once the stream is done
+        resume: Continue from the checkpoint, if there is a usable one
+
+    Returns:
+        The number of segments written.
+    """
+    state = checkpoint.load() if checkpoint is not None and resume else None
+    if state is not None:
+        click.echo(
+            f"[RESUME] Continuing from {state['position']:.1f}s "
+            f"({state['count']} segment(s) already written)"
+        )
+    elif resume:
+        click.echo("[RESUME] No checkpoint to resume from, starting over")
+
+    with TranscriptWriter(output_path, stem, append=state is not None) as writer:
+        start = 0.0
+        if state is not None:
+            start = state["position"]
+            writer.stitcher.cut = state["cut"]
+            writer.count = state["count"]
+        for window in iter_windows(read, start=start):
+            writer.write(window, transcribe(window))
+            if verbose:
+                click.echo(f"   [STREAM] Transcribed up to {window.end:.1f}s")
+            if checkpoint is None or window.final:
+                continue
+            # The next window starts one overlap before this one ends
+            progress = {
+                "position": window.end - OVERLAP_SECONDS,
+                "cut": writer.stitcher.cut,
+                "count": writer.count,
+            }
+            if checkpoint.save(progress, writer.paths) and verbose:
+                click.echo(f"   [CHECKPOINT] Saved at {progress['position']:.1f}s")
+    if checkpoint is not None:
+        checkpoint.remove()
+    return writer.count
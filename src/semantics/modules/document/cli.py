@@ -11,6 +11,7 @@ from pathlib import Path
 import click
 from click_help_colors import HelpColorsCommand
 
+from semantics.core.scheduler import Operation, run_operations
 from semantics.modules.document.handlers import extract_text
 
 _DOCUMENT_HELP = """\
@@ -48,6 +49,11 @@ Examples:
     type=click.Choice(["text", "json"]),
     help="Output format (default: text)",
 )
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Recompute results instead of reusing cached ones",
+)
 @click.option(
     "--verbose",
     "-v",
@@ -59,6 +65,7 @@ def cli(
     output: str,
     do_extract_text: bool,
     output_format: str,
+    no_cache: bool,
     verbose: bool,
 ) -> None:
     if not do_extract_text:
@@ -68,6 +75,11 @@ def cli(
     output_path = Path(output)
     output_path.mkdir(parents=True, exist_ok=True)
 
+    operations = []
     if do_extract_text:
-        extract_text.handle(input_path, output_path, verbose=verbose, format=output_format)
+        operations.append(Operation(extract_text, {"format": output_format}))
+
+    run_operations(
+        operations, input_path, output_path, verbose=verbose, use_cache=not no_cache
+    )
 
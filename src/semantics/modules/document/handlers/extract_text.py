@@ -4,6 +4,14 @@ from pathlib import Path
 
 import click
 
+# Part of the result cache key; bump when this handler's output changes
+VERSION = "1"
+
+# Scheduling hints for semantics.core.scheduler: operations that must finish
+# first, and whether the handler is "cpu" or "io" bound
+DEPENDS_ON = ()
+WORKLOAD = "cpu"
+
 
 def handle(input_path: Path, output_path: Path, verbose: bool = False, **options) -> None:
     """
@@ -0,0 +1,11 @@
+"""Document module manifest.
+
+Static description of the document module. The main CLI reads this file to
+list and route to the module without importing its CLI or handlers.
+"""
+
+HELP = "Extract text from documents and images"
+
+FLAGS = ["--extract-text"]
+
+EXTENSIONS = [".pdf", ".png", ".jpg", ".jpeg", ".tiff", ".bmp", ".gif"]
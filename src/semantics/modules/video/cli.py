@@ -11,7 +11,10 @@ from pathlib import Path
 import click
 from click_help_colors import HelpColorsCommand
 
+from semantics.core.scheduler import Operation, run_operations
+from semantics.modules.video.demux import SINGLE_PASS
 from semantics.modules.video.handlers import detect_objects, transcribe
+from semantics.modules.video.sampling import DEFAULT_FPS, STRATEGIES
 
 _VIDEO_HELP = """\
 Semantics Video CLI - Unified interface for media intelligence
@@ -23,6 +26,11 @@ Examples:
   semantics video video.mp4 -o ./output --transcribe
   semantics video video.mp4 -o ./output --detect-objects
   semantics video video.mp4 -o ./output --transcribe --detect-objects
+  semantics video video.mp4 -o ./output --detect-objects --sample fps --sample-fps 2
+  semantics video video.mp4 -o ./output --detect-objects --sample keyframes
+  semantics video video.mp4 -o ./output --detect-objects --batch-size 16
+  semantics video video.mp4 -o ./output --detect-objects --detect-model yolov8s
+  semantics video video.mp4 -o ./output --detect-objects --sample scene --track
 """
 
 
@@ -52,7 +60,12 @@ Examples:
     "--model",
     "-m",
     default="base",
-    help="Model size (default: base)",
+    help="Model size for transcription (default: base)",
+)
+@click.option(
+    "--detect-model",
+    default="yolov8n",
+    help="YOLO model for object detection (default: yolov8n)",
 )
 @click.option(
     "--confidence",
@@ -61,6 +74,46 @@ Examples:
     type=click.FloatRange(0.0, 1.0),
     help="Confidence threshold for object detection (default: 0.5)",
 )
+@click.option(
+    "--sample",
+    type=click.Choice(STRATEGIES),
+    default="all",
+    help="Frames to detect objects in: all, a fixed rate (fps), key frames "
+    "only (keyframes) or the start of each shot (scene) (default: all)",
+)
+@click.option(
+    "--sample-fps",
+    default=DEFAULT_FPS,
+    type=click.FloatRange(0.0, min_open=True),
+    help=f"Frames per second with --sample fps (default: {DEFAULT_FPS:g})",
+)
+@click.option(
+    "--batch-size",
+    default=8,
+    type=click.IntRange(1),
+    help="Frames sent to the object detection model at once (default: 8)",
+)
+@click.option(
+    "--track",
+    is_flag=True,
+    help="Follow detected objects between sampled frames and report each "
+    "one once, with a track ID and start and end times",
+)
+@click.option(
+    "--vad/--no-vad",
+    default=True,
+    help="Transcribe only speech, skipping silence and music (default: on)",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue an interrupted transcription from its last checkpoint",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Recompute results instead of reusing cached ones",
+)
 @click.option(
     "--verbose",
     "-v",
@@ -74,7 +127,15 @@ def cli(
     do_detect_objects: bool,
     language: str,
     model: str,
+    detect_model: str,
     confidence: float,
+    sample: str,
+    sample_fps: float,
+    batch_size: int,
+    track: bool,
+    vad: bool,
+    resume: bool,
+    no_cache: bool,
     verbose: bool,
 ) -> None:
     if not do_transcribe and not do_detect_objects:
@@ -86,13 +147,36 @@ def cli(
     output_path = Path(output)
     output_path.mkdir(parents=True, exist_ok=True)
 
-    if do_transcribe:
-        transcribe.handle(
-            input_path, output_path, verbose=verbose, language=language, model=model
-        )
+    # Transcription and detection read the file in one pass when both run
+    single_pass = None
+    if do_transcribe and do_detect_objects and SINGLE_PASS:
+        single_pass = {"sample": sample, "sample_fps": sample_fps}
 
+    operations = []
+    if do_transcribe:
+        options = {
+            "language": language,
+            "model": model,
+            "vad": vad,
+            "resume": resume,
+            "single_pass": single_pass,
+        }
+        operations.append(Operation(transcribe, options))
     if do_detect_objects:
-        detect_objects.handle(
-            input_path, output_path, verbose=verbose, model=model, confidence=confidence
-        )
+        options = {
+            "model": detect_model,
+            "confidence": confidence,
+            "sample": sample,
+            "sample_fps": sample_fps,
+            "batch_size": batch_size,
+            "track": track,
+            "single_pass": single_pass,
+        }
+        operations.append(Operation(detect_objects, options))
+
+    # Transcription and detection are independent and run concurrently, as
+    # threads sharing the demuxer
+    run_operations(
+        operations, input_path, output_path, verbose=verbose, use_cache=not no_cache
+    )
 
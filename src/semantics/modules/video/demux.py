@@ -0,0 +1,344 @@
+"""One read of a video feeding both transcription and object detection.
+
+Transcription needs a video's soundtrack and detection its frames. Decoding
+each separately reads and demuxes the whole file twice, which on large 4K
+sources doubles the I/O. When both run, a Demuxer instead starts one ffmpeg
+process with two outputs: the sampled frames (see
+semantics.modules.video.sampling) on its stdout and the soundtrack, as
+16 kHz mono PCM, on a second pipe. A reader thread per output hands its
+items to the consuming handler through a bounded queue, so memory stays
+bounded and ffmpeg waits while a consumer is busy.
+
+Each output is a _Stream that its consumer attaches to. A stream nobody has
+attached to buffers up to its queue size and is then dropped, so a handler
+that does not need its stream (say, because its result was cached) never
+stalls the other one. A consumer that finds its stream dropped, or the
+shared ffmpeg failed before giving it anything, decodes on its own as
+without a Demuxer. Since a slow consumer holds up ffmpeg, the other stream
+advances at the pace of the slower handler.
+
+Both handlers reach the same Demuxer through shared_demuxer(), so they must
+run in the same process (their WORKLOAD is "io"). The second output is an
+inherited pipe, which needs POSIX; elsewhere SINGLE_PASS is False and each
+handler decodes on its own.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import shutil
+import subprocess
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import click
+
+from semantics.core.decode import SAMPLE_RATE, open_decoder
+from semantics.modules.video.sampling import (
+    DEFAULT_FPS,
+    FrameSample,
+    frame_output_args,
+    input_args,
+    read_frames,
+    read_log,
+    sample_frames,
+)
+
+# Whether one ffmpeg process can write both outputs
+SINGLE_PASS = os.name == "posix"
+
+# Bytes of PCM per audio item, and items queued: about two minutes of audio
+AUDIO_CHUNK = 64 * 1024
+AUDIO_QUEUE = 64
+
+# Frames queued; a 4K frame is 25 MB
+FRAME_QUEUE = 4
+
+
+class _Stream:
+    """Items of one output, handed from its reader thread to its consumer.
+
+    A stream is "waiting" until its consumer attaches, then "attached"
+    until it releases it. A waiting stream whose queue fills up is
+    "dropped". Released and dropped streams discard their items.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.state = "waiting"
+        self._lock = threading.Lock()
+
+    def put(self, item) -> None:
+        """Queue an item, waiting for room if the stream is attached."""
+        with self._lock:
+            if self.state == "waiting":
+                try:
+                    self.queue.put_nowait(item)
+                except queue.Full:
+                    self.state = "dropped"
+                    self._drain()
+                return
+            if self.state != "attached":
+                return
+        # Unblocked by release(), which empties the queue
+        self.queue.put(item)
+
+    def attach(self) -> bool:
+        """Attach the consumer; False if the stream was dropped."""
+        with self._lock:
+            if self.state != "waiting":
+                return False
+            self.state = "attached"
+            return True
+
+    def release(self) -> None:
+        """Detach the consumer, discarding what is queued and what follows."""
+        with self._lock:
+            if self.state == "attached":
+                self.state = "released"
+            self._drain()
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+
+class Demuxer:
+    """Decodes a video's frames and soundtrack in one ffmpeg process.
+
+    ffmpeg starts with the first consumer, and is stopped by close().
+
+    Args:
+        input_path: Path to the input video file
+        sample: Sampling strategy of the frames (see sampling.STRATEGIES)
+        fps: Frames per second with the "fps" strategy
+    """
+
+    def __init__(
+        self, input_path: Path, sample: str = "all", fps: float = DEFAULT_FPS
+    ) -> None:
+        self.input_path = input_path
+        self.sample = sample
+        self.fps = fps
+        self._audio = _Stream(AUDIO_QUEUE)
+        self._frames = _Stream(FRAME_QUEUE)
+        self._process: subprocess.Popen | None = None
+        self._threads: list[threading.Thread] = []
+        self._errors: list[str] = []
+        self._started = False
+        self._lock = threading.Lock()
+
+    def command(self, ffmpeg: str, audio_fd: int) -> list[str]:
+        """Build the ffmpeg command writing frames to stdout, audio to audio_fd."""
+        return [
+            *input_args(ffmpeg, self.input_path, self.sample),
+            *frame_output_args(self.sample, self.fps),
+            "pipe:1",
+            "-map",
+            "0:a:0",
+            "-f",
+            "s16le",
+            "-ac",
+            "1",
+            "-ar",
+            str(SAMPLE_RATE),
+            f"pipe:{audio_fd}",
+        ]
+
+    def _start(self) -> None:
+        """Start ffmpeg and the reader threads, once."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            ffmpeg = shutil.which("ffmpeg")
+            if ffmpeg is None:
+                # Consumers fall back to decoding on their own
+                self._audio.put(None)
+                self._frames.put(None)
+                return
+
+            audio_read, audio_write = os.pipe()
+            try:
+                self._process = subprocess.Popen(
+                    self.command(ffmpeg, audio_write),
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    pass_fds=(audio_write,),
+                )
+            except OSError:
+                os.close(audio_read)
+                raise
+            finally:
+                os.close(audio_write)
+
+            infos: queue.Queue = queue.Queue()
+            audio = os.fdopen(audio_read, "rb")
+            targets = [
+                (read_log, (self._process.stderr, infos, self._errors)),
+                (self._read_frames, (self._process.stdout, infos)),
+                (self._read_audio, (audio,)),
+            ]
+            for target, args in targets:
+                thread = threading.Thread(target=target, args=args, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _read_frames(self, stdout, infos: queue.Queue) -> None:
+        """Reader thread: queue the frames ffmpeg writes to stdout."""
+        try:
+            for frame in read_frames(stdout, infos):
+                self._frames.put(frame)
+            # Keep ffmpeg writing if frames stopped matching the log
+            while stdout.read(AUDIO_CHUNK):
+                pass
+        finally:
+            stdout.close()
+            self._frames.put(None)
+
+    def _read_audio(self, audio) -> None:
+        """Reader thread: queue the PCM ffmpeg writes to the audio pipe."""
+        try:
+            while chunk := audio.read(AUDIO_CHUNK):
+                self._audio.put(chunk)
+        finally:
+            audio.close()
+            self._audio.put(None)
+
+    def _succeeded(self) -> bool:
+        """Wait for ffmpeg to exit and return True if it succeeded."""
+        if self._process is None:
+            return False
+        return self._process.wait() == 0
+
+    def _items(self, stream: _Stream) -> Iterator | None:
+        """Attach to a stream and return its items, or None to fall back.
+
+        Raises:
+            click.ClickException: If ffmpeg failed after delivering items.
+        """
+        if not stream.attach():
+            return None
+        self._start()
+        first = stream.queue.get()
+        if first is None and not self._succeeded():
+            stream.release()
+            return None
+
+        def items() -> Iterator:
+            item = first
+            try:
+                while item is not None:
+                    yield item
+                    item = stream.queue.get()
+                if not self._succeeded():
+                    message = "\n".join(self._errors[-5:]).strip()
+                    raise click.ClickException(
+                        f"Could not decode {self.input_path.name}: {message}"
+                    )
+            finally:
+                stream.release()
+
+        return items()
+
+    @contextmanager
+    def open_audio(self, input_path: Path) -> Iterator[Callable[[int], bytes]]:
+        """Open the soundtrack as 16 kHz mono 16-bit PCM, like open_decoder().
+
+        Pass it as the decoder of semantics.core.decode.open_pcm() or
+        load_audio().
+        """
+        items = self._items(self._audio)
+        if items is None:
+            with open_decoder(input_path) as read:
+                yield read
+            return
+
+        pending = bytearray()
+
+        def read(size: int) -> bytes:
+            while len(pending) < size:
+                chunk = next(items, b"")
+                if not chunk:
+                    break
+                pending.extend(chunk)
+            chunk = bytes(pending[:size])
+            del pending[:size]
+            return chunk
+
+        try:
+            yield read
+        finally:
+            items.close()
+
+    def frames(self) -> Iterator[FrameSample]:
+        """Yield the sampled frames, like sampling.sample_frames()."""
+        items = self._items(self._frames)
+        if items is None:
+            yield from sample_frames(self.input_path, self.sample, self.fps)
+            return
+        try:
+            yield from items
+        finally:
+            items.close()
+
+    def close(self) -> None:
+        """Stop ffmpeg, if still running, and wait for the reader threads."""
+        self._audio.release()
+        self._frames.release()
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+        for thread in self._threads:
+            thread.join()
+        if self._process is not None:
+            self._process.wait()
+            self._process.stderr.close()
+
+
+# Demuxers in use by the handlers of this process, with their user counts
+_shared: dict[tuple, list] = {}
+_shared_lock = threading.Lock()
+
+
+@contextmanager
+def shared_demuxer(
+    input_path: Path, single_pass: dict | None
+) -> Iterator[Demuxer | None]:
+    """Share one Demuxer between the handlers of a video run.
+
+    Args:
+        input_path: Path to the input video file
+        single_pass: The "single_pass" option of the video handlers: the
+            sampling options of the detection, or None to decode separately
+
+    Yields:
+        The shared Demuxer, or None without single_pass.
+    """
+    if not single_pass or not SINGLE_PASS:
+        yield None
+        return
+
+    sample, fps = single_pass["sample"], single_pass["sample_fps"]
+    key = (str(input_path.resolve()), sample, fps)
+    with _shared_lock:
+        entry = _shared.get(key)
+        if entry is None:
+            entry = _shared[key] = [Demuxer(input_path, sample, fps), 0]
+        entry[1] += 1
+    try:
+        yield entry[0]
+    finally:
+        with _shared_lock:
+            entry[1] -= 1
+            last = entry[1] == 0
+            if last:
+                del _shared[key]
+        if last:
+            entry[0].close()
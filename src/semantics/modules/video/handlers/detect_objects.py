@@ -1,9 +1,29 @@
 """Video object detection handler."""
 
+import json
+from collections.abc import Callable
 from pathlib import Path
+from typing import Any
 
 import click
 
+from semantics.modules.video.demux import shared_demuxer
+from semantics.modules.video.sampling import DEFAULT_FPS, sample_frames
+
+# Part of the result cache key; bump when this handler's output changes
+VERSION = "2"
+
+# Scheduling hints for semantics.core.scheduler: operations that must finish
+# first, and whether the handler is "cpu" or "io" bound. Decoding runs in
+# ffmpeg and the model releases the GIL; threads let transcription share the
+# decoding pass (see semantics.modules.video.demux)
+DEPENDS_ON = ()
+WORKLOAD = "io"
+
+# Options that change how the handler runs, not what it writes; they are left
+# out of the result cache key
+RUN_OPTIONS = ("single_pass", "batch_size")
+
 
 def handle(input_path: Path, output_path: Path, verbose: bool = False, **options) -> None:
     """
@@ -13,26 +33,129 @@ def handle(input_path: Path, output_path: Path, verbose: bool = False, **options
         input_path: Path to the input video file.
         output_path: Path to the output folder.
         verbose: Enable verbose output.
-        **options: Additional options (model, confidence).
+        **options: Additional options (model, confidence, sample, sample_fps,
+            batch_size, track, single_pass).
     """
     model = options.get("model", "yolov8n")
     confidence = options.get("confidence", 0.5)
+    sample = options.get("sample", "all")
+    sample_fps = options.get("sample_fps", DEFAULT_FPS)
+    batch_size = options.get("batch_size", 8)
+    track = options.get("track", False)
+    single_pass = options.get("single_pass")
 
     if verbose:
-        click.echo(f"[OPTIONS] model={model}, confidence={confidence}")
+        click.echo(
+            f"[OPTIONS] model={model}, confidence={confidence}, sample={sample}, "
+            f"sample_fps={sample_fps}, batch_size={batch_size}, track={track}"
+        )
 
     click.echo(f"[DETECT] Detecting objects in video: {input_path.name}")
     click.echo(f"   Output folder: {output_path}")
+    if sample != "all":
+        rate = f" at {sample_fps:g} fps" if sample == "fps" else ""
+        click.echo(f"[SAMPLE] Detecting on sampled frames: {sample}{rate}")
+    if track:
+        tracks_name = f"{input_path.stem}.tracks.jsonl"
+        click.echo(f"[TRACK] Writing one record per object: {tracks_name}")
+
+    detect = detector(model, confidence)
+    # NumPy is only needed once the model has loaded
+    from semantics.modules.video.pipeline import detect_frames
+    from semantics.modules.video.tracking import Tracker, write_tracks
+
+    with shared_demuxer(input_path, single_pass) as demuxer:
+        if demuxer is not None:
+            click.echo("[DEMUX] Sharing one decoding pass with transcription")
+            frames = demuxer.frames()
+        else:
+            frames = sample_frames(input_path, sample, sample_fps)
+
+        # Decoding, letterboxing and inference overlap; the model gets
+        # batch_size frames at a time
+        found = detect_frames(frames, detect, batch_size)
+        frame_count = count = 0
+        if track:
+            tracker = Tracker()
+            for time, detections in found:
+                tracker.update(
+                    time, detections.boxes, detections.labels, detections.scores
+                )
+                frame_count += 1
+                count += len(detections.labels)
+        else:
+            detections_path = output_path / f"{input_path.stem}.detections.jsonl"
+            with open(detections_path, "w", encoding="utf-8") as f:
+                for time, detections in found:
+                    record = detections.to_json(time)
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    frame_count += 1
+                    count += len(detections.labels)
+
+    if track:
+        tracks = tracker.finish()
+        write_tracks(output_path / tracks_name, tracks)
+        click.echo(f"[TRACK] Linked {count} detection(s) into {len(tracks)} track(s)")
+    click.echo(
+        f"[OK] Object detection complete ({count} object(s) in "
+        f"{frame_count} frame(s))"
+    )
+
+
+def detector(name: str, confidence: float) -> Callable[[Any], list]:
+    """Return a function detecting objects in a batch of model images.
+
+    The function takes a (count, 3, size, size) float32 batch, as made by
+    pipeline.DetectionPipeline, and returns a pipeline.Detections per image.
+
+    Raises:
+        click.ClickException: If the video dependencies are not installed.
+    """
+    model_obj = load_model(name)
+    import torch
+
+    from semantics.modules.video.pipeline import Detections
+
+    def detect(images) -> list[Detections]:
+        results = model_obj(torch.from_numpy(images), conf=confidence, verbose=False)
+        return [
+            Detections(
+                result.boxes.xyxy.cpu().numpy(),
+                [result.names[int(c)] for c in result.boxes.cls],
+                result.boxes.conf.tolist(),
+            )
+            for result in results
+        ]
+
+    return detect
+
+
+def load_model(name: str):
+    """Return a YOLO model from the shared model pool, warmed up on first use.
+
+    Raises:
+        click.ClickException: If the video dependencies are not installed.
+    """
+    try:
+        from ultralytics import YOLO
+    except ImportError:
+        raise click.ClickException(
+            "This feature requires additional dependencies. "
+            'Run: uv pip install -e ".[video]"'
+        ) from None
+
+    from semantics.core.models import get_model
+
+    def load(key):
+        model = YOLO(key.name)
+        model.to(key.device)
+        # Defaults for every predict() call, the warm-up's included
+        model.overrides["half"] = key.precision == "fp16"
+        return model
+
+    def warm_up(model) -> None:
+        import numpy as np
+
+        model.predict(np.zeros((640, 640, 3), dtype=np.uint8), verbose=False)
 
-    # TODO: Implement actual object detection with heavy dependencies
-    # try:
-    #     from ultralytics import YOLO
-    #     model_obj = YOLO(model)
-    #     results = model_obj(str(input_path), conf=confidence)
-    # except ImportError:
-    #     raise click.ClickException(
-    #         'This feature requires additional dependencies. '
-    #         'Run: uv pip install -e ".[video]"'
-    #     )
-
-    click.echo("[OK] Object detection complete (dummy)")
+    return get_model("yolo", name, load, warmup=warm_up)
@@ -1,9 +1,26 @@
 """Video transcription handler."""
 
+import importlib.util
 from pathlib import Path
 
 import click
 
+from semantics.modules.video.demux import shared_demuxer
+
+# Part of the result cache key; bump when this handler's output changes
+VERSION = "2"
+
+# Scheduling hints for semantics.core.scheduler: operations that must finish
+# first, and whether the handler is "cpu" or "io" bound. Decoding runs in
+# ffmpeg and the model releases the GIL; threads let detection share the
+# decoding pass (see semantics.modules.video.demux)
+DEPENDS_ON = ()
+WORKLOAD = "io"
+
+# Options that change how the handler runs, not what it writes; they are left
+# out of the result cache key
+RUN_OPTIONS = ("resume", "single_pass")
+
 
 def handle(input_path: Path, output_path: Path, verbose: bool = False, **options) -> None:
     """
@@ -13,26 +30,83 @@ def handle(input_path: Path, output_path: Path, verbose: bool = False, **options
         input_path: Path to the input video file.
         output_path: Path to the output folder.
         verbose: Enable verbose output.
-        **options: Additional options (language, model).
+        **options: Additional options (language, model, vad, resume,
+            single_pass).
     """
     language = options.get("language", "en")
     model = options.get("model", "base")
+    vad = options.get("vad", True)
+    resume = options.get("resume", False)
+    single_pass = options.get("single_pass")
 
     if verbose:
-        click.echo(f"[OPTIONS] language={language}, model={model}")
+        click.echo(
+            f"[OPTIONS] language={language}, model={model}, vad={vad}, "
+            f"resume={resume}"
+        )
 
     click.echo(f"[VIDEO] Transcribing video audio: {input_path.name}")
     click.echo(f"   Output folder: {output_path}")
 
-    # TODO: Implement actual transcription with heavy dependencies
-    # try:
-    #     import whisper
-    #     model_obj = whisper.load_model(model)
-    #     result = model_obj.transcribe(str(input_path))
-    # except ImportError:
-    #     raise click.ClickException(
-    #         'This feature requires additional dependencies. '
-    #         'Run: uv pip install -e ".[video]"'
-    #     )
-
-    click.echo("[OK] Video transcription complete (dummy)")
+    model_obj = load_model(model)
+    from semantics.core.decode import open_pcm
+    from semantics.modules.audio import stream
+
+    def transcribe(window: stream.Window) -> list[stream.Segment]:
+        return stream.transcribe_window(model_obj, window, language)
+
+    speech_only = stream.SpeechOnly(transcribe) if vad else None
+
+    with shared_demuxer(input_path, single_pass) as demuxer:
+        if demuxer is not None:
+            click.echo("[DEMUX] Sharing one decoding pass with object detection")
+
+        # The soundtrack streams from the decoder's pipe window by window and
+        # is never written to disk; with a demuxer, it is read from the pass
+        # shared with detection
+        decoder = demuxer.open_audio if demuxer is not None else None
+        with open_pcm(input_path, decoder=decoder) as read:
+            count = stream.stream_transcribe(
+                read,
+                speech_only or transcribe,
+                output_path,
+                input_path.stem,
+                verbose=verbose,
+                checkpoint=_checkpoint(
+                    input_path, output_path, language=language, model=model, vad=vad
+                ),
+                resume=resume,
+            )
+
+    if speech_only is not None and speech_only.total_seconds:
+        share = speech_only.speech_seconds / speech_only.total_seconds
+        click.echo(f"[VAD] Sent {share:.0%} of the audio to the model")
+    click.echo(f"[OK] Video transcription complete ({count} segment(s))")
+
+
+def _checkpoint(input_path: Path, output_path: Path, **options):
+    """Return the checkpoint of a transcription (see core.checkpoint)."""
+    from semantics.core.checkpoint import SUFFIX, Checkpoint, checkpoint_key
+
+    key = checkpoint_key(input_path, __name__, VERSION, options)
+    return Checkpoint(output_path / f"{input_path.stem}{SUFFIX}", key)
+
+
+def load_model(name: str):
+    """Return a Whisper model from the shared model pool.
+
+    Raises:
+        click.ClickException: If the video dependencies are not installed.
+    """
+    if importlib.util.find_spec("whisper") is None:
+        raise click.ClickException(
+            "This feature requires additional dependencies. "
+            'Run: uv pip install -e ".[video]"'
+        )
+
+    from semantics.core.models import default_device, get_model
+    from semantics.modules.audio.stream import load_whisper
+
+    # Whisper runs on CUDA or the CPU only
+    device = "cuda" if default_device() == "cuda" else "cpu"
+    return get_model("whisper", name, load_whisper, device=device)
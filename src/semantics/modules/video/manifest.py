@@ -0,0 +1,11 @@
+"""Video module manifest.
+
+Static description of the video module. The main CLI reads this file to list
+and route to the module without importing its CLI or handlers.
+"""
+
+HELP = "Transcribe video audio and detect objects in frames"
+
+FLAGS = ["--transcribe", "--detect-objects"]
+
+EXTENSIONS = [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".webm", ".flv"]
@@ -0,0 +1,319 @@
+"""Staged decoding, preprocessing and batching of frames for object detection.
+
+Taken one frame at a time, detection decodes a frame, prepares it and runs
+the model, and then waits for the next decode: the stages never overlap and
+most cores sit idle. A DetectionPipeline runs the stages concurrently:
+
+    decoder thread -> preprocessing pool -> batches -> inference (the caller)
+
+The decoder thread pulls frames from their source (see sampling and demux)
+into a bounded queue. A batching thread takes `batch_size` of them at a time
+and has a thread pool letterbox each one into its slot of a preallocated
+batch buffer: scaled to fit IMAGE_SIZE with its aspect ratio kept, padded
+with gray, channels first and normalized to [0, 1], as YOLO models take
+them. NumPy releases the GIL while resizing, so the slots fill in parallel.
+The caller iterates over full batches and runs the model on each.
+
+A few batch buffers are allocated up front and recycled, and every queue is
+bounded, so a slow stage holds up the ones before it instead of letting
+frames pile up in memory. Letterbox parameters are kept per frame, so that
+boxes found in a batch can be mapped back to the frame with unletterbox().
+
+detect_frames() runs a detector over a pipeline and does that mapping.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from semantics.modules.video.sampling import FrameSample
+
+# Side of the square images the model takes
+IMAGE_SIZE = 640
+
+# Frames per batch, by default
+DEFAULT_BATCH_SIZE = 8
+
+# Batch buffers: one being filled, one waiting and one in inference
+BUFFERS = 3
+
+# Gray of the padding, as YOLO pads
+PAD_VALUE = 114 / 255
+
+# Seconds between checks for a closed pipeline while waiting on a queue
+_POLL = 0.1
+
+
+class Letterbox(NamedTuple):
+    """How a frame was placed in its model image."""
+
+    scale: float
+    pad_x: int
+    pad_y: int
+
+
+class Batch(NamedTuple):
+    """Preprocessed frames to run the model on.
+
+    `images` is a view of a recycled buffer: it is only valid until the
+    pipeline is asked for the next batch.
+    """
+
+    images: np.ndarray  # (count, 3, IMAGE_SIZE, IMAGE_SIZE) float32
+    times: list[float]
+    letterboxes: list[Letterbox]
+
+
+class Detections(NamedTuple):
+    """Objects a detector found in one image."""
+
+    boxes: np.ndarray  # (n, 4) x1, y1, x2, y2
+    labels: list[str]
+    scores: list[float]
+
+    def to_json(self, time: float) -> dict:
+        """Return the detections of a frame as a JSON-serializable record."""
+        return {
+            "time": round(time, 3),
+            "objects": [
+                {
+                    "label": label,
+                    "score": round(float(score), 3),
+                    "box": [round(float(value), 1) for value in box],
+                }
+                for box, label, score in zip(self.boxes, self.labels, self.scores)
+            ],
+        }
+
+
+def _resize(frame: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Resize an (h, w, 3) uint8 frame with bilinear interpolation."""
+    source_height, source_width = frame.shape[:2]
+
+    def taps(size: int, source_size: int) -> tuple[np.ndarray, ...]:
+        position = (np.arange(size) + 0.5) * (source_size / size) - 0.5
+        position = np.clip(position, 0, source_size - 1)
+        low = position.astype(np.intp)
+        high = np.minimum(low + 1, source_size - 1)
+        return low, high, (position - low).astype(np.float32)
+
+    top, bottom, wy = taps(height, source_height)
+    left, right, wx = taps(width, source_width)
+    rows = frame[top].astype(np.float32)
+    rows += (frame[bottom] - rows) * wy[:, None, None]
+    result = rows[:, left]
+    result += (rows[:, right] - result) * wx[None, :, None]
+    return result
+
+
+def letterbox(frame: np.ndarray, out: np.ndarray) -> Letterbox:
+    """Fit a frame into a square model image, keeping its aspect ratio.
+
+    Args:
+        frame: (height, width, 3) RGB uint8 frame
+        out: (3, size, size) float32 slot to write the image to
+
+    Returns:
+        Where the frame was placed, for unletterbox().
+    """
+    size = out.shape[-1]
+    height, width = frame.shape[:2]
+    scale = min(size / height, size / width)
+    new_height = max(1, round(height * scale))
+    new_width = max(1, round(width * scale))
+    pad_y = (size - new_height) // 2
+    pad_x = (size - new_width) // 2
+
+    out.fill(PAD_VALUE)
+    resized = _resize(frame, new_height, new_width)
+    resized *= 1 / 255
+    target = out[:, pad_y : pad_y + new_height, pad_x : pad_x + new_width]
+    target[...] = resized.transpose(2, 0, 1)
+    return Letterbox(scale, pad_x, pad_y)
+
+
+def unletterbox(boxes: np.ndarray, placement: Letterbox) -> np.ndarray:
+    """Map (x1, y1, x2, y2) boxes from a model image back to its frame."""
+    offset = np.array([placement.pad_x, placement.pad_y] * 2, dtype=np.float32)
+    return (np.asarray(boxes, dtype=np.float32) - offset) / placement.scale
+
+
+class _Closed(Exception):
+    """Raised in a stage thread once the pipeline has been closed."""
+
+
+class DetectionPipeline:
+    """Turns a stream of frames into batches of model images.
+
+    Iterate over it to get the batches; stopping early, or an error in a
+    stage, stops the other stages. Use it as a context manager, or call
+    close(), to stop them when not iterating to the end.
+
+    Args:
+        frames: Source of frames, iterated on the decoder thread
+        batch_size: Frames per batch; the last batch may be smaller
+        workers: Threads preprocessing frames; defaults to the number of
+            CPUs, at most batch_size
+        image_size: Side of the model images
+    """
+
+    def __init__(
+        self,
+        frames: Iterable[FrameSample],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: int | None = None,
+        image_size: int = IMAGE_SIZE,
+    ) -> None:
+        self.frames = frames
+        self.batch_size = batch_size
+        self.workers = workers or max(1, min(os.cpu_count() or 1, batch_size))
+        self.image_size = image_size
+        self._decoded: queue.Queue = queue.Queue(batch_size)
+        self._ready: queue.Queue = queue.Queue(BUFFERS - 1)
+        self._free: queue.Queue = queue.Queue()
+        for _ in range(BUFFERS):
+            shape = (batch_size, 3, image_size, image_size)
+            self._free.put(np.empty(shape, dtype=np.float32))
+        self._closed = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def _put(self, target: queue.Queue, item) -> None:
+        """Queue an item, waiting for room unless the pipeline is closed."""
+        while True:
+            if self._closed.is_set():
+                raise _Closed
+            try:
+                target.put(item, timeout=_POLL)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, source: queue.Queue):
+        """Take an item, waiting for one unless the pipeline is closed."""
+        while True:
+            if self._closed.is_set():
+                raise _Closed
+            try:
+                return source.get(timeout=_POLL)
+            except queue.Empty:
+                continue
+
+    def _decode(self) -> None:
+        """Decoder thread: pull frames from the source."""
+        frames = iter(self.frames)
+        try:
+            for frame in frames:
+                self._put(self._decoded, frame)
+            self._put(self._decoded, None)
+        except _Closed:
+            pass
+        except BaseException as e:
+            self._fail(self._decoded, e)
+        finally:
+            # Stop a generator source, such as an ffmpeg process, early
+            close = getattr(frames, "close", None)
+            if close is not None:
+                close()
+
+    def _batch(self) -> None:
+        """Batching thread: letterbox frames into batch buffers."""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                ended = False
+                while not ended:
+                    buffer = self._get(self._free)
+                    frames: list[FrameSample] = []
+                    while len(frames) < self.batch_size:
+                        item = self._get(self._decoded)
+                        if isinstance(item, BaseException):
+                            raise item
+                        if item is None:
+                            ended = True
+                            break
+                        frames.append(item)
+                    if not frames:
+                        break
+                    slots = [
+                        pool.submit(letterbox, frame.frame, buffer[index])
+                        for index, frame in enumerate(frames)
+                    ]
+                    batch = Batch(
+                        buffer[: len(frames)],
+                        [frame.time for frame in frames],
+                        [slot.result() for slot in slots],
+                    )
+                    self._put(self._ready, (buffer, batch))
+                self._put(self._ready, None)
+            except _Closed:
+                pass
+            except BaseException as e:
+                self._fail(self._ready, e)
+
+    def _fail(self, target: queue.Queue, error: BaseException) -> None:
+        """Pass a stage's error on to the next stage."""
+        try:
+            self._put(target, error)
+        except _Closed:
+            pass
+
+    def __iter__(self) -> Iterator[Batch]:
+        for target in (self._decode, self._batch):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        try:
+            while (item := self._ready.get()) is not None:
+                if isinstance(item, BaseException):
+                    raise item
+                buffer, batch = item
+                yield batch
+                # The caller is done with the batch: recycle its buffer
+                self._free.put(buffer)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop the stages and wait for them."""
+        self._closed.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self) -> DetectionPipeline:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def detect_frames(
+    frames: Iterable[FrameSample],
+    detect: Callable[[np.ndarray], list[Detections]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[tuple[float, Detections]]:
+    """Run a detector over frames through a DetectionPipeline.
+
+    Args:
+        frames: Source of frames, e.g. sampling.sample_frames()
+        detect: Function returning the detections in each image of a
+            (count, 3, size, size) batch, in model image coordinates
+        batch_size: Frames per batch
+
+    Yields:
+        The time of each frame and its detections, in frame coordinates.
+    """
+    with DetectionPipeline(frames, batch_size) as pipeline:
+        for batch in pipeline:
+            found = detect(batch.images)
+            for time, placement, detections in zip(
+                batch.times, batch.letterboxes, found
+            ):
+                boxes = unletterbox(detections.boxes, placement).reshape(-1, 4)
+                yield time, detections._replace(boxes=boxes)
@@ -0,0 +1,234 @@
+"""Choosing which frames of a video object detection runs on.
+
+Running a detector on every frame is rarely needed: footage from fixed
+cameras and lectures changes little from one frame to the next. A sampling
+strategy picks the frames worth looking at:
+
+- all: every frame, as decoded;
+- fps: at most `fps` frames per second, the first frame of each 1 / fps
+  second interval, so that no frame is repeated and timing never drifts;
+- keyframes: only the key frames (I-frames) listed in the container's
+  index; the decoder skips every other frame instead of decoding it;
+- scene: the first frame of every shot, found from the change between
+  consecutive frames, plus a frame at least every SCENE_MAX_GAP seconds so
+  that slow changes within a shot are not missed.
+
+Frames are selected by ffmpeg while decoding, so frames that are not sampled
+never leave ffmpeg. Each frame's presentation time and size come from the
+`showinfo` filter, which ffmpeg logs for every frame it outputs, so that
+timestamps are the video's own whatever the strategy and even when the frame
+rate varies. Times are in seconds from the start of the video, as ffmpeg
+shifts the first timestamp to zero.
+"""
+
+from __future__ import annotations
+
+import queue
+import re
+import shutil
+import subprocess
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+import click
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Names of the sampling strategies, for --sample
+STRATEGIES = ("all", "fps", "keyframes", "scene")
+
+# Frames per second sampled by the "fps" strategy, by default
+DEFAULT_FPS = 1.0
+
+# Scene change score (0 to 1, the share of the picture that changed) above
+# which a frame starts a new shot
+SCENE_THRESHOLD = 0.3
+
+# Longest time without a sampled frame with the "scene" strategy
+SCENE_MAX_GAP = 10.0
+
+# A frame logged by the showinfo filter
+_SHOWINFO = re.compile(
+    r"\bpts_time:(?P<time>\S+).*?\bs:(?P<width>\d+)x(?P<height>\d+)"
+)
+
+
+class FrameSample(NamedTuple):
+    """A sampled frame and when it is shown."""
+
+    time: float
+    frame: np.ndarray  # (height, width, 3) RGB
+
+
+class FrameInfo(NamedTuple):
+    """Time and size of a frame, as logged by ffmpeg."""
+
+    time: float
+    width: int
+    height: int
+
+
+def select_filter(strategy: str, fps: float = DEFAULT_FPS) -> str:
+    """Build the ffmpeg filter that keeps the frames of a strategy.
+
+    Args:
+        strategy: One of STRATEGIES
+        fps: Frames per second kept by the "fps" strategy
+
+    Returns:
+        A filter chain ending with `showinfo`.
+
+    Raises:
+        ValueError: If the strategy is unknown.
+    """
+    if strategy in ("all", "keyframes"):
+        # Key frames are picked by the decoder (see sampling_command())
+        return "showinfo"
+    if strategy == "fps":
+        interval = f"floor(t*{fps:g})"
+        previous = f"floor(prev_selected_t*{fps:g})"
+        condition = f"isnan(prev_selected_t)+gt({interval},{previous})"
+    elif strategy == "scene":
+        condition = (
+            "isnan(prev_selected_t)"
+            f"+gt(scene,{SCENE_THRESHOLD:g})"
+            f"+gte(t-prev_selected_t,{SCENE_MAX_GAP:g})"
+        )
+    else:
+        raise ValueError(f"Unknown sampling strategy: {strategy}")
+    return f"select='{condition}',showinfo"
+
+
+def input_args(ffmpeg: str, input_path: Path, strategy: str) -> list[str]:
+    """Build the start of an ffmpeg command reading the input for a strategy.
+
+    The log level lets the showinfo lines through.
+    """
+    command = [ffmpeg, "-nostdin", "-hide_banner", "-loglevel", "info"]
+    if strategy == "keyframes":
+        command += ["-skip_frame", "nokey"]
+    return command + ["-i", str(input_path)]
+
+
+def frame_output_args(strategy: str, fps: float = DEFAULT_FPS) -> list[str]:
+    """Build the ffmpeg output options writing a strategy's frames as raw RGB."""
+    return [
+        "-map",
+        "0:v:0",
+        "-vf",
+        select_filter(strategy, fps),
+        "-fps_mode",
+        "passthrough",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgb24",
+    ]
+
+
+def sampling_command(
+    ffmpeg: str, input_path: Path, strategy: str, fps: float = DEFAULT_FPS
+) -> list[str]:
+    """Build the ffmpeg command writing a strategy's frames to stdout."""
+    return [
+        *input_args(ffmpeg, input_path, strategy),
+        *frame_output_args(strategy, fps),
+        "-",
+    ]
+
+
+def parse_showinfo(line: str) -> FrameInfo | None:
+    """Parse the showinfo line of a frame, or return None for other lines."""
+    if "showinfo" not in line:
+        return None
+    match = _SHOWINFO.search(line)
+    if match is None:
+        return None
+    return FrameInfo(float(match["time"]), int(match["width"]), int(match["height"]))
+
+
+def read_log(stderr, frames: queue.Queue, errors: list[str]) -> None:
+    """Queue the frames ffmpeg logs, keeping other lines for error messages."""
+    for raw in stderr:
+        line = raw.decode(errors="replace").rstrip()
+        info = parse_showinfo(line)
+        if info is not None:
+            frames.put(info)
+        elif "showinfo" not in line:
+            errors.append(line)
+    frames.put(None)
+
+
+def read_frames(stdout, frames: queue.Queue) -> Iterator[FrameSample]:
+    """Pair the raw frames ffmpeg writes with the frames read_log() queued.
+
+    Args:
+        stdout: Binary stream of rgb24 frames
+        frames: Queue of FrameInfo, ended by None
+
+    Yields:
+        Frames until either ends.
+    """
+    import numpy as np
+
+    while (info := frames.get()) is not None:
+        size = info.width * info.height * 3
+        data = stdout.read(size)
+        if len(data) < size:
+            return
+        frame = np.frombuffer(data, dtype=np.uint8)
+        yield FrameSample(info.time, frame.reshape(info.height, info.width, 3))
+
+
+def sample_frames(
+    input_path: Path, strategy: str = "all", fps: float = DEFAULT_FPS
+) -> Iterator[FrameSample]:
+    """Decode the frames of a video selected by a sampling strategy.
+
+    Args:
+        input_path: Path to the input video file
+        strategy: One of STRATEGIES
+        fps: Frames per second kept by the "fps" strategy
+
+    Yields:
+        Sampled frames, in presentation order.
+
+    Raises:
+        click.ClickException: If ffmpeg is missing or cannot decode the file.
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise click.ClickException(
+            f"Sampling frames of {input_path.name} requires ffmpeg. "
+            "Install ffmpeg and try again."
+        )
+
+    process = subprocess.Popen(
+        sampling_command(ffmpeg, input_path, strategy, fps),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    frames: queue.Queue = queue.Queue()
+    errors: list[str] = []
+    reader = threading.Thread(
+        target=read_log, args=(process.stderr, frames, errors), daemon=True
+    )
+    reader.start()
+    finished = False
+    try:
+        yield from read_frames(process.stdout, frames)
+        finished = True
+    finally:
+        if not finished:
+            process.kill()
+        process.stdout.close()
+        returncode = process.wait()
+        reader.join()
+        process.stderr.close()
+    if returncode != 0:
+        message = "\n".join(errors[-5:]).strip()
+        raise click.ClickException(f"Could not decode {input_path.name}: {message}")
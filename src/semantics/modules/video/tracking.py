@@ -0,0 +1,288 @@
+"""Tracking detected objects across the frames the detector runs on.
+
+With sparse sampling (see sampling) the detector only sees some frames.
+A Tracker links the detections of successive detector frames into tracks,
+so that each object is reported once, with an ID and the times it was first
+and last seen, instead of once per frame.
+
+Each track holds a constant-velocity Kalman filter over its box center,
+width and height. Before a detector frame, every track is moved to the
+frame's time by its filter, so a fast-moving object is still found where
+it went; the predicted boxes are then matched to the detections of the
+same label by intersection over union, greedily from the best pair down.
+Matched tracks are corrected with their detection, unmatched detections
+start new tracks, and a track unmatched on MAX_MISSES detector frames in a
+row ends. Prediction, IoU and correction are computed for all tracks at
+once with NumPy.
+
+The filter's noise scales with the box height, as in SORT-like trackers, so
+that it behaves the same for near and far objects.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+# Least IoU of a predicted box and a detection for them to match
+IOU_THRESHOLD = 0.3
+
+# Detector frames in a row a track may go unmatched before it ends
+MAX_MISSES = 3
+
+# Noise of the filter, relative to the box height: position, then velocity
+# (per second)
+_POSITION_NOISE = 1 / 20
+_VELOCITY_NOISE = 1 / 8
+
+# Measurement matrix: the filter observes center, width and height
+_H = np.hstack([np.eye(4), np.zeros((4, 4))])
+
+
+class Track(NamedTuple):
+    """An object followed over time."""
+
+    id: int
+    label: str
+    start: float
+    end: float
+    score: float
+    boxes: list[tuple[float, ...]]  # (time, x1, y1, x2, y2) per detection
+
+    def to_json(self) -> dict:
+        """Return the track as a JSON-serializable record."""
+        return {
+            "track": self.id,
+            "label": self.label,
+            "start": round(self.start, 3),
+            "end": round(self.end, 3),
+            "score": round(self.score, 3),
+            "boxes": [
+                [round(time, 3), *(round(value, 1) for value in box)]
+                for time, *box in self.boxes
+            ],
+        }
+
+
+def iou(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Return the IoU of every pair of (x1, y1, x2, y2) boxes.
+
+    Args:
+        first: (n, 4) boxes
+        second: (m, 4) boxes
+
+    Returns:
+        (n, m) intersections over unions.
+    """
+    first = first[:, None, :]
+    second = second[None, :, :]
+    low = np.maximum(first[..., :2], second[..., :2])
+    high = np.minimum(first[..., 2:], second[..., 2:])
+    intersection = np.prod(np.clip(high - low, 0, None), axis=-1)
+    area_first = np.prod(first[..., 2:] - first[..., :2], axis=-1)
+    area_second = np.prod(second[..., 2:] - second[..., :2], axis=-1)
+    union = area_first + area_second - intersection
+    return np.where(union > 0, intersection / np.where(union > 0, union, 1), 0.0)
+
+
+def _to_state(boxes: np.ndarray) -> np.ndarray:
+    """Convert (x1, y1, x2, y2) boxes to (cx, cy, w, h)."""
+    size = boxes[:, 2:] - boxes[:, :2]
+    return np.hstack([boxes[:, :2] + size / 2, size])
+
+
+def _to_boxes(states: np.ndarray) -> np.ndarray:
+    """Convert (cx, cy, w, h, ...) states to (x1, y1, x2, y2) boxes."""
+    half = states[:, 2:4] / 2
+    return np.hstack([states[:, :2] - half, states[:, :2] + half])
+
+
+class _LiveTrack:
+    """Detections of a track that has not ended yet."""
+
+    def __init__(self, id: int, label: str, time: float) -> None:
+        self.id = id
+        self.label = label
+        self.start = self.end = time
+        self.score = 0.0
+        self.misses = 0
+        self.boxes: list[tuple[float, float, float, float, float]] = []
+
+    def extend(self, time: float, box: np.ndarray, score: float) -> None:
+        """Record a detection of the track."""
+        self.end = time
+        self.misses = 0
+        self.score = max(self.score, float(score))
+        self.boxes.append((time, *(float(value) for value in box)))
+
+    def close(self) -> Track:
+        """Return the ended track."""
+        return Track(self.id, self.label, self.start, self.end, self.score, self.boxes)
+
+
+def _match(scores: np.ndarray, threshold: float) -> list[tuple[int, int]]:
+    """Pair rows and columns greedily, best score first, above a threshold."""
+    rows, columns = np.nonzero(scores >= threshold)
+    order = np.argsort(-scores[rows, columns], kind="stable")
+    used_rows: set[int] = set()
+    used_columns: set[int] = set()
+    pairs = []
+    for row, column in zip(rows[order].tolist(), columns[order].tolist()):
+        if row not in used_rows and column not in used_columns:
+            used_rows.add(row)
+            used_columns.add(column)
+            pairs.append((row, column))
+    return pairs
+
+
+class Tracker:
+    """Links the detections of successive detector frames into tracks.
+
+    Call update() with the detections of each detector frame, in time order,
+    then finish() to get every track.
+
+    Args:
+        iou_threshold: Least IoU of a predicted box and a detection to match
+        max_misses: Detector frames in a row a track may go unmatched
+    """
+
+    def __init__(
+        self, iou_threshold: float = IOU_THRESHOLD, max_misses: int = MAX_MISSES
+    ) -> None:
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self._means = np.zeros((0, 8))
+        self._covariances = np.zeros((0, 8, 8))
+        self._labels: list[str] = []
+        self._live: list[_LiveTrack] = []
+        self._ended: list[Track] = []
+        self._next_id = 1
+        self._time: float | None = None
+
+    def _predict(self, dt: float) -> None:
+        """Move every track's filter dt seconds forward."""
+        if not len(self._means) or dt <= 0:
+            return
+        transition = np.eye(8)
+        transition[:4, 4:] = dt * np.eye(4)
+        height = self._means[:, 3:4]
+        std = np.hstack(
+            [
+                np.repeat(_POSITION_NOISE * height, 4, axis=1),
+                np.repeat(_VELOCITY_NOISE * height, 4, axis=1),
+            ]
+        ) * np.sqrt(dt)
+        self._means = self._means @ transition.T
+        self._covariances = transition @ self._covariances @ transition.T
+        self._covariances += np.einsum("ij,jk->ijk", std**2, np.eye(8))
+
+    def _correct(self, indices: np.ndarray, measured: np.ndarray) -> None:
+        """Correct the filters of some tracks with their measured states."""
+        means = self._means[indices]
+        covariances = self._covariances[indices]
+        std = _POSITION_NOISE * measured[:, 3:4].repeat(4, axis=1)
+        projected = _H @ covariances @ _H.T
+        projected += np.einsum("ij,jk->ijk", std**2, np.eye(4))
+        # Kalman gain K = P H^T S^-1, solved as S K^T = H P
+        gain = np.linalg.solve(projected, _H @ covariances).transpose(0, 2, 1)
+        innovation = measured - means @ _H.T
+        self._means[indices] = means + np.einsum("ijk,ik->ij", gain, innovation)
+        self._covariances[indices] = covariances - gain @ _H @ covariances
+
+    def update(
+        self,
+        time: float,
+        boxes: np.ndarray,
+        labels: list[str],
+        scores: list[float] | np.ndarray,
+    ) -> list[int]:
+        """Add the detections of a detector frame.
+
+        Args:
+            time: Time of the frame, in seconds
+            boxes: (n, 4) detected (x1, y1, x2, y2) boxes
+            labels: Label of each detection
+            scores: Confidence of each detection
+
+        Returns:
+            The track ID of each detection.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if self._time is not None:
+            self._predict(time - self._time)
+        self._time = time
+
+        overlap = iou(_to_boxes(self._means), boxes)
+        same_label = np.array(self._labels)[:, None] == np.array(labels)[None, :]
+        pairs = _match(np.where(same_label, overlap, 0.0), self.iou_threshold)
+
+        ids = [0] * len(boxes)
+        matched = np.zeros(len(self._live), dtype=bool)
+        if pairs:
+            tracks, detections = (np.array(side) for side in zip(*pairs))
+            self._correct(tracks, _to_state(boxes[detections]))
+            matched[tracks] = True
+            for track, detection in pairs:
+                live = self._live[track]
+                live.extend(time, boxes[detection], scores[detection])
+                ids[detection] = live.id
+
+        for track, live in enumerate(self._live):
+            if not matched[track]:
+                live.misses += 1
+        keep = np.array([live.misses < self.max_misses for live in self._live])
+        if len(keep) and not keep.all():
+            for track in np.flatnonzero(~keep):
+                self._ended.append(self._live[track].close())
+            self._means = self._means[keep]
+            self._covariances = self._covariances[keep]
+            self._labels = [label for label, k in zip(self._labels, keep) if k]
+            self._live = [live for live, k in zip(self._live, keep) if k]
+
+        used = {detection for _, detection in pairs}
+        for detection in range(len(boxes)):
+            if detection not in used:
+                ids[detection] = self._start(
+                    time, boxes[detection], labels[detection], scores[detection]
+                )
+        return ids
+
+    def _start(self, time: float, box: np.ndarray, label: str, score: float) -> int:
+        """Start a track at a detection that matched none."""
+        state = np.zeros((1, 8))
+        state[0, :4] = _to_state(box[None, :])[0]
+        height = max(state[0, 3], 1.0)
+        variance = np.concatenate(
+            [
+                np.full(4, (2 * _POSITION_NOISE * height) ** 2),
+                np.full(4, (10 * _VELOCITY_NOISE * height) ** 2),
+            ]
+        )
+        self._means = np.vstack([self._means, state])
+        covariance = np.diag(variance)[None]
+        self._covariances = np.concatenate([self._covariances, covariance])
+        self._labels.append(label)
+        live = _LiveTrack(self._next_id, label, time)
+        live.extend(time, box, score)
+        self._live.append(live)
+        self._next_id += 1
+        return live.id
+
+    def finish(self) -> list[Track]:
+        """End every track and return all of them, by ID."""
+        self._ended.extend(live.close() for live in self._live)
+        self._live = []
+        self._means = np.zeros((0, 8))
+        self._covariances = np.zeros((0, 8, 8))
+        self._labels = []
+        return sorted(self._ended, key=lambda track: track.id)
+
+
+def write_tracks(path: Path, tracks: list[Track]) -> None:
+    """Write tracks as JSON Lines, one record per track."""
+    with open(path, "w", encoding="utf-8") as f:
+        for track in tracks:
+            f.write(json.dumps(track.to_json(), ensure_ascii=False) + "\n")
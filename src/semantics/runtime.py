@@ -0,0 +1,66 @@
+"""Entry point for the shared-runtime distribution.
+
+`python build.py shared` bundles this script, together with every module,
+into a single onedir runtime. The per-module executables next to it are hard
+links to (or copies of) the same small bootloader, so all of them share one
+copy of the interpreter and libraries and nothing is extracted at startup.
+
+The name the program was started under decides what runs: `semantics` is the
+launcher, which finds the bundled modules importable and runs them in-process,
+and `semantics-<module>` is the module CLI, as with the onefile builds. Every
+module is bundled, so a module entry point only discovers its own module (see
+get_entry_module) and behaves like the onefile executable of that module.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+
+def get_entry_name() -> str:
+    """Return the name this program was started under, without '.exe'.
+
+    Returns:
+        The executable name (e.g., 'semantics', 'semantics-audio').
+    """
+    path = sys.executable if getattr(sys, "frozen", False) else sys.argv[0]
+    name = Path(path).name
+    if name.lower().endswith(".exe"):
+        name = name[:-4]
+    return name
+
+
+def get_entry_module() -> str | None:
+    """Return the module a frozen `semantics-<module>` executable is for.
+
+    Returns:
+        The module name (e.g., 'audio'), or None when running from source or
+        as the launcher, where every module is available.
+    """
+    if not getattr(sys, "frozen", False):
+        return None
+    name = get_entry_name()
+    if not name.startswith("semantics-"):
+        return None
+    return name[len("semantics-") :]
+
+
+def main() -> None:
+    """Run the launcher or a module CLI depending on the entry name."""
+    if get_entry_name().startswith("semantics-"):
+        from semantics.cli import main as cli_main
+
+        cli_main()
+    else:
+        from semantics.launcher import main as launcher_main
+
+        launcher_main()
+
+
+if __name__ == "__main__":
+    # Required for batch worker processes in PyInstaller executables
+    import multiprocessing
+
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,251 @@
+"""Benchmark fixtures and helpers.
+
+Benchmarks compare measured times against the budgets stored in
+baselines.json and fail when an entry point gets slower than its budget.
+
+Environment variables:
+    SEMANTICS_BENCH_RUNS: Number of warm runs per entry point (default: 5).
+    SEMANTICS_BENCH_UPDATE: Set to 1 to rewrite the recorded baselines with
+        the values measured in this session. Budgets are never rewritten.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+import pytest
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+# Project root directory
+ROOT_DIR = Path(__file__).parent.parent.parent
+DIST_DIR = ROOT_DIR / "dist"
+SHARED_DIR = DIST_DIR / "shared" / "semantics"
+BASELINES_FILE = Path(__file__).parent / "baselines.json"
+
+WARM_RUNS = int(os.environ.get("SEMANTICS_BENCH_RUNS", "5"))
+UPDATE_BASELINES = os.environ.get("SEMANTICS_BENCH_UPDATE") == "1"
+
+
+class StartupResult(NamedTuple):
+    """Measured startup cost of one entry point."""
+
+    cold_ms: float
+    warm_ms: float
+    import_us: dict[str, int]
+
+
+def get_executable_path(variant: str, shared: bool = False) -> Path:
+    """Get the platform-aware path for an executable variant.
+
+    Args:
+        variant: The variant name ('launcher', 'audio', 'video', 'document')
+        shared: Return the entry point in the shared onedir runtime instead
+            of the onefile executable.
+
+    Returns:
+        Path to the executable with platform-appropriate extension.
+    """
+    if variant == "launcher":
+        exe_name = "semantics"
+    else:
+        exe_name = f"semantics-{variant}"
+
+    if sys.platform == "win32":
+        exe_name += ".exe"
+
+    return (SHARED_DIR if shared else DIST_DIR) / exe_name
+
+
+def benchmark_env() -> dict[str, str]:
+    """Return the environment used for benchmark subprocesses.
+
+    The test session sets PYTHONDONTWRITEBYTECODE, which would make every
+    run a cold run, so it is removed here.
+    """
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    return env
+
+
+def time_command(cmd: list[str], env: dict[str, str], timeout: int = 60) -> float:
+    """Run a command once and return its wall time in milliseconds.
+
+    Args:
+        cmd: Command line to run.
+        env: Environment for the subprocess.
+        timeout: Maximum execution time in seconds.
+
+    Returns:
+        Wall time in milliseconds.
+    """
+    start = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, env=env, timeout=timeout)
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        pytest.fail(f"{' '.join(cmd)} exited with {result.returncode}:\n{result.stderr!r}")
+    return elapsed
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """Parse `-X importtime` output into cumulative import times.
+
+    Args:
+        stderr: Standard error of a process run with `-X importtime`.
+
+    Returns:
+        Dictionary mapping module names to cumulative import time in microseconds.
+    """
+    timings: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        timings[parts[2].strip()] = int(parts[1])
+    return timings
+
+
+def measure_python_entry(code: str, args: list[str], pycache: Path) -> StartupResult:
+    """Measure a Python entry point started the way its console script is.
+
+    The cold run compiles everything into an empty pycache prefix; warm runs
+    then reuse that bytecode. A final run collects the `-X importtime` profile.
+
+    Args:
+        code: Python source passed to `-c` that calls the entry point.
+        args: Command-line arguments for the entry point.
+        pycache: Empty directory used as the bytecode cache prefix.
+
+    Returns:
+        Cold and median warm wall time plus the import time profile.
+    """
+    env = benchmark_env()
+    cmd = [sys.executable, "-X", f"pycache_prefix={pycache}", "-c", code, *args]
+
+    cold_ms = time_command(cmd, env)
+    warm_ms = statistics.median(time_command(cmd, env) for _ in range(WARM_RUNS))
+
+    profile_cmd = [sys.executable, "-X", "importtime", *cmd[1:]]
+    result = subprocess.run(profile_cmd, capture_output=True, text=True, env=env, timeout=60)
+    return StartupResult(cold_ms, warm_ms, parse_importtime(result.stderr))
+
+
+def measure_executable(exe_path: Path, args: list[str]) -> StartupResult:
+    """Measure a frozen executable.
+
+    The first run is reported as cold. PyInstaller bundles do not honour
+    `-X importtime`, so no import profile is collected.
+
+    Args:
+        exe_path: Path to the executable.
+        args: Command-line arguments to pass.
+
+    Returns:
+        Cold and median warm wall time.
+    """
+    env = benchmark_env()
+    cmd = [str(exe_path), *args]
+
+    cold_ms = time_command(cmd, env)
+    warm_ms = statistics.median(time_command(cmd, env) for _ in range(WARM_RUNS))
+    return StartupResult(cold_ms, warm_ms, {})
+
+
+def format_top_imports(import_us: dict[str, int], count: int = 10) -> str:
+    """Format the slowest imports of a profile for failure messages."""
+    top = sorted(import_us.items(), key=lambda item: item[1], reverse=True)[:count]
+    return "\n".join(f"  {us / 1000:8.1f} ms  {name}" for name, us in top)
+
+
+@pytest.fixture(scope="session")
+def baselines() -> Generator[dict, None, None]:
+    """Load the stored baselines and budgets for the session.
+
+    When SEMANTICS_BENCH_UPDATE=1, the measured baselines are written back
+    to baselines.json at the end of the session.
+
+    Yields:
+        Parsed contents of baselines.json.
+    """
+    data = json.loads(BASELINES_FILE.read_text(encoding="utf-8"))
+    yield data
+
+    if UPDATE_BASELINES:
+        BASELINES_FILE.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+@pytest.fixture
+def python_startup(tmp_path: Path):
+    """Return a function that measures a Python entry point with a fresh pycache."""
+
+    def measure(code: str, args: list[str]) -> StartupResult:
+        pycache = tmp_path / "pycache"
+        pycache.mkdir(exist_ok=True)
+        return measure_python_entry(code, args, pycache)
+
+    return measure
+
+
+@pytest.fixture
+def executable_startup():
+    """Return a function that measures a built executable variant."""
+
+    def measure(variant: str, args: list[str], shared: bool = False) -> StartupResult:
+        exe_path = get_executable_path(variant, shared)
+        if not exe_path.exists():
+            pytest.skip(f"Executable not built: {exe_path}")
+        return measure_executable(exe_path, args)
+
+    return measure
+
+
+@pytest.fixture
+def check_budget(baselines: dict):
+    """Return a function that records a result and enforces its budget."""
+
+    def check(entry: str, result: StartupResult) -> None:
+        config = baselines["entries"][entry]
+        budget = config["budget"]
+
+        config["baseline"] = {
+            "cold_ms": round(result.cold_ms, 1),
+            "warm_ms": round(result.warm_ms, 1),
+        }
+        print(f"\n[BENCH] {entry}: cold={result.cold_ms:.1f} ms warm={result.warm_ms:.1f} ms")
+
+        failures = []
+        if result.cold_ms > budget["cold_ms"]:
+            failures.append(f"cold start {result.cold_ms:.1f} ms > {budget['cold_ms']} ms")
+        if result.warm_ms > budget["warm_ms"]:
+            failures.append(f"warm start {result.warm_ms:.1f} ms > {budget['warm_ms']} ms")
+
+        if result.import_us:
+            import_budgets = config.get("import_budget_us", {})
+            for module, limit in import_budgets.items():
+                spent = result.import_us.get(module, 0)
+                if spent > limit:
+                    failures.append(f"import of {module} took {spent} us > {limit} us")
+
+            for module in config.get("forbidden_imports", []):
+                loaded = [name for name in result.import_us if name.startswith(module)]
+                if loaded:
+                    failures.append(f"imported {', '.join(sorted(loaded))}")
+
+        if failures:
+            message = f"{entry} is over budget:\n  " + "\n  ".join(failures)
+            if result.import_us:
+                message += "\nSlowest imports:\n" + format_top_imports(result.import_us)
+            pytest.fail(message)
+
+    return check
@@ -0,0 +1,41 @@
+"""Startup benchmarks for the PyInstaller executables.
+
+These use executables already present in dist/ and skip otherwise. Run
+`python build.py all` and `python build.py shared` first.
+"""
+
+import pytest
+
+
+@pytest.mark.build
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    ("variant", "entry"),
+    [
+        ("launcher", "dist/semantics --version"),
+        ("audio", "dist/semantics-audio --help"),
+        ("video", "dist/semantics-video --help"),
+        ("document", "dist/semantics-document --help"),
+    ],
+)
+def test_executable_startup(executable_startup, check_budget, variant: str, entry: str) -> None:
+    """Test each frozen executable starts within budget."""
+    args = entry.split()[1:]
+    check_budget(entry, executable_startup(variant, args))
+
+
+@pytest.mark.build
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    ("variant", "entry"),
+    [
+        ("launcher", "dist/shared/semantics/semantics --version"),
+        ("audio", "dist/shared/semantics/semantics-audio --help"),
+        ("video", "dist/shared/semantics/semantics-video --help"),
+        ("document", "dist/shared/semantics/semantics-document --help"),
+    ],
+)
+def test_shared_runtime_startup(executable_startup, check_budget, variant: str, entry: str) -> None:
+    """Test each entry point of the shared onedir runtime starts within budget."""
+    args = entry.split()[1:]
+    check_budget(entry, executable_startup(variant, args, shared=True))
@@ -0,0 +1,91 @@
+"""Benchmark of converting short clips in-process against spawning ffmpeg.
+
+Short clips are the common workload, and on them starting a decoder process
+costs more than the conversion itself. Both routes convert the same 44.1 kHz
+stereo WAV clips to 16 kHz mono 16-bit PCM.
+"""
+
+import shutil
+import statistics
+import subprocess
+import time
+import wave
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from semantics.core.decode import SAMPLE_RATE, open_decoder  # noqa: E402
+
+ENTRY = "frontend 44.1 kHz stereo clip"
+CLIPS = 20
+CLIP_SECONDS = 5
+
+
+@pytest.fixture(scope="module")
+def clips(tmp_path_factory: pytest.TempPathFactory) -> list[Path]:
+    """Write short 44.1 kHz stereo WAV clips of noise."""
+    folder = tmp_path_factory.mktemp("clips")
+    rng = np.random.default_rng(0)
+    paths = []
+    for index in range(CLIPS):
+        path = folder / f"clip{index}.wav"
+        with wave.open(str(path), "wb") as wav:
+            wav.setnchannels(2)
+            wav.setsampwidth(2)
+            wav.setframerate(44100)
+            noise = rng.normal(0, 3000, 2 * 44100 * CLIP_SECONDS)
+            wav.writeframes(noise.astype("<i2").tobytes())
+        paths.append(path)
+    return paths
+
+
+def convert_in_process(path: Path) -> int:
+    """Convert a clip with open_decoder() and return the PCM size."""
+    with open_decoder(path) as read:
+        return sum(len(chunk) for chunk in iter(lambda: read(1024**2), b""))
+
+
+def convert_with_ffmpeg(path: Path) -> int:
+    """Convert a clip with an ffmpeg process and return the PCM size."""
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-i", str(path),
+        "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-",
+    ]
+    return len(subprocess.run(command, capture_output=True, check=True).stdout)
+
+
+def per_clip_ms(convert, clips: list[Path]) -> float:
+    """Return the median milliseconds per clip over three passes."""
+    passes = []
+    for _ in range(3):
+        start = time.perf_counter()
+        for path in clips:
+            assert convert(path) == 2 * SAMPLE_RATE * CLIP_SECONDS
+        passes.append((time.perf_counter() - start) * 1000 / len(clips))
+    return statistics.median(passes)
+
+
+@pytest.mark.benchmark
+class TestFrontend:
+    """Per-clip cost of converting PCM to the model sample format."""
+
+    def test_in_process_within_budget(self, clips: list[Path], baselines: dict) -> None:
+        """Test that the in-process front-end converts a clip within budget."""
+        config = baselines["entries"][ENTRY]
+        elapsed = per_clip_ms(convert_in_process, clips)
+
+        config["baseline"] = {"per_clip_ms": round(elapsed, 1)}
+        print(f"\n[BENCH] {ENTRY}: in-process={elapsed:.1f} ms")
+        assert elapsed <= config["budget"]["per_clip_ms"]
+
+    def test_in_process_beats_ffmpeg(self, clips: list[Path]) -> None:
+        """Test that converting in-process is faster than spawning ffmpeg per clip."""
+        if shutil.which("ffmpeg") is None:
+            pytest.skip("ffmpeg not installed")
+        in_process = per_clip_ms(convert_in_process, clips)
+        ffmpeg = per_clip_ms(convert_with_ffmpeg, clips)
+
+        print(f"\n[BENCH] {ENTRY}: in-process={in_process:.1f} ms ffmpeg={ffmpeg:.1f} ms")
+        assert in_process < ffmpeg
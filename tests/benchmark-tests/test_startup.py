@@ -0,0 +1,35 @@
+"""Startup benchmarks for the Python entry points."""
+
+import pytest
+
+# Mirrors the console scripts generated from [project.scripts] in pyproject.toml
+CLI_ENTRY = "import sys; from semantics.cli import main; sys.exit(main())"
+LAUNCHER_ENTRY = "import sys; from semantics.launcher import main; sys.exit(main())"
+
+
+@pytest.mark.benchmark
+class TestCLIStartup:
+    """Startup budgets for the `semantics` console script."""
+
+    def test_cli_help(self, python_startup, check_budget) -> None:
+        """Test `semantics --help` starts within budget."""
+        check_budget("semantics --help", python_startup(CLI_ENTRY, ["--help"]))
+
+    def test_cli_version(self, python_startup, check_budget) -> None:
+        """Test `semantics --version` starts within budget."""
+        check_budget("semantics --version", python_startup(CLI_ENTRY, ["--version"]))
+
+
+@pytest.mark.benchmark
+class TestLauncherStartup:
+    """Startup budgets for the `semantics-launcher` console script."""
+
+    def test_launcher_help(self, python_startup, check_budget) -> None:
+        """Test `semantics-launcher --help` starts within budget."""
+        result = python_startup(LAUNCHER_ENTRY, ["--help"])
+        check_budget("semantics-launcher --help", result)
+
+    def test_launcher_version(self, python_startup, check_budget) -> None:
+        """Test `semantics-launcher --version` starts within budget."""
+        result = python_startup(LAUNCHER_ENTRY, ["--version"])
+        check_budget("semantics-launcher --version", result)
@@ -15,13 +15,16 @@ if TYPE_CHECKING:
 # Project root directory
 ROOT_DIR = Path(__file__).parent.parent.parent
 DIST_DIR = ROOT_DIR / "dist"
+SHARED_DIR = DIST_DIR / "shared" / "semantics"
 
 
-def get_executable_path(variant: str) -> Path:
+def get_executable_path(variant: str, shared: bool = False) -> Path:
     """Get the platform-aware path for an executable variant.
 
     Args:
         variant: The variant name ('launcher', 'audio', 'video', 'document')
+        shared: Return the entry point in the shared onedir runtime instead
+            of the onefile executable.
 
     Returns:
         Path to the executable with platform-appropriate extension.
@@ -34,7 +37,7 @@ def get_executable_path(variant: str) -> Path:
     if sys.platform == "win32":
         exe_name += ".exe"
 
-    return DIST_DIR / exe_name
+    return (SHARED_DIR if shared else DIST_DIR) / exe_name
 
 
 def run_executable(exe_path: Path, args: list[str], timeout: int = 30) -> subprocess.CompletedProcess[str]:
@@ -95,6 +98,39 @@ def build_all_executables() -> Generator[Path, None, None]:
     yield DIST_DIR
 
 
+@pytest.fixture(scope="session")
+def shared_runtime() -> Path:
+    """Build the shared onedir runtime once per test session.
+
+    This fixture runs `python build.py shared` unless the runtime already
+    exists, and returns its directory.
+
+    Returns:
+        Path to the directory holding the shared runtime's entry points.
+    """
+    all_variants = ["launcher", "audio", "video", "document"]
+    if not all(get_executable_path(v, shared=True).exists() for v in all_variants):
+        print("\n[BUILD] Building shared runtime...")
+        result = subprocess.run(
+            [sys.executable, str(ROOT_DIR / "build.py"), "shared"],
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=600,
+            cwd=str(ROOT_DIR),
+        )
+        if result.returncode != 0:
+            pytest.fail(f"Build failed:\nstdout: {result.stdout}\nstderr: {result.stderr}")
+
+    for variant in all_variants:
+        exe_path = get_executable_path(variant, shared=True)
+        if not exe_path.exists():
+            pytest.skip(f"Executable not built: {exe_path}")
+
+    return SHARED_DIR
+
+
 @pytest.fixture
 def launcher_exe(build_all_executables: Path) -> Path:
     """Get path to the launcher executable."""
@@ -0,0 +1,92 @@
+"""Tests for the shared onedir runtime built by `python build.py shared`."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+def run_executable(exe_path: Path, args: list[str], timeout: int = 30) -> subprocess.CompletedProcess[str]:
+    """Run an executable with the given arguments."""
+    return subprocess.run(
+        [str(exe_path), *args],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        timeout=timeout,
+    )
+
+
+def entry_point(shared_runtime: Path, name: str) -> Path:
+    """Get the platform-aware path of an entry point in the shared runtime."""
+    return shared_runtime / (f"{name}.exe" if sys.platform == "win32" else name)
+
+
+@pytest.mark.build
+class TestSharedLayout:
+    """Test the shared runtime holds one copy of the libraries."""
+
+    def test_entry_points_share_bootloader(self, shared_runtime: Path) -> None:
+        """Test that module entry points are the same small bootloader."""
+        launcher = entry_point(shared_runtime, "semantics")
+        for module in ("audio", "video", "document"):
+            module_exe = entry_point(shared_runtime, f"semantics-{module}")
+            assert module_exe.stat().st_size == launcher.stat().st_size
+
+    def test_single_internal_directory(self, shared_runtime: Path) -> None:
+        """Test that the libraries live in one _internal directory."""
+        assert (shared_runtime / "_internal").is_dir()
+
+
+@pytest.mark.build
+class TestSharedEntryPoints:
+    """Test each entry point of the shared runtime behaves like its onefile variant."""
+
+    def test_launcher_lists_bundled_modules(self, shared_runtime: Path) -> None:
+        """Test the launcher lists every bundled module."""
+        result = run_executable(entry_point(shared_runtime, "semantics"), ["--help"])
+        assert result.returncode == 0
+        for module in ("audio", "video", "document"):
+            assert module in result.stdout
+
+    def test_launcher_runs_module_in_process(self, shared_runtime: Path, tmp_path: Path) -> None:
+        """Test the launcher runs a bundled module without delegating."""
+        input_file = tmp_path / "test.wav"
+        input_file.write_bytes(b"RIFF\x00\x00\x00\x00WAVE")
+        output_dir = tmp_path / "output"
+
+        result = run_executable(
+            entry_point(shared_runtime, "semantics"),
+            ["audio", str(input_file), "-o", str(output_dir), "--transcribe"],
+        )
+        assert result.returncode == 0
+        assert "[AUDIO] Transcribing audio" in result.stdout
+
+    @pytest.mark.parametrize("module", ["audio", "video", "document"])
+    def test_module_entry_point_help(self, shared_runtime: Path, module: str) -> None:
+        """Test each module entry point runs the module CLI."""
+        result = run_executable(entry_point(shared_runtime, f"semantics-{module}"), [module, "--help"])
+        assert result.returncode == 0
+        assert "Usage" in result.stdout
+
+    @pytest.mark.parametrize(("module", "other"), [("audio", "video"), ("video", "document")])
+    def test_module_entry_point_has_only_its_module(
+        self, shared_runtime: Path, tmp_path: Path, module: str, other: str
+    ) -> None:
+        """Test a module entry point rejects the other bundled modules, like its onefile variant."""
+        result = run_executable(entry_point(shared_runtime, f"semantics-{module}"), ["--help"])
+        assert result.returncode == 0
+        assert other not in result.stdout
+
+        input_file = tmp_path / "input"
+        input_file.write_text("dummy")
+        result = run_executable(
+            entry_point(shared_runtime, f"semantics-{module}"),
+            [other, str(input_file), "-o", str(tmp_path / "output")],
+        )
+        assert result.returncode != 0
+        assert "no such command" in (result.stdout + result.stderr).lower()
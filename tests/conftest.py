@@ -1,5 +1,9 @@
 """Shared test fixtures for all tests."""
 
+import io
+from contextlib import contextmanager
+from pathlib import Path
+
 import pytest
 from click.testing import CliRunner
 
@@ -8,3 +12,83 @@ from click.testing import CliRunner
 def runner() -> CliRunner:
     """Create a CLI test runner."""
     return CliRunner()
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the result cache at a fresh directory for every test."""
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("SEMANTICS_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture
+def fake_detection(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, float]]:
+    """Run video object detection without ffmpeg or a model.
+
+    Every video has four frames, half a second apart, and the detector finds
+    one cat filling each frame.
+
+    Returns:
+        The (sample, fps) of each request for frames.
+    """
+    np = pytest.importorskip("numpy")
+    from semantics.modules.video import demux
+    from semantics.modules.video.handlers import detect_objects
+    from semantics.modules.video.pipeline import Detections
+    from semantics.modules.video.sampling import FrameSample
+
+    requests: list[tuple[str, float]] = []
+
+    def sample_frames(input_path: Path, sample: str, fps: float):
+        requests.append((sample, fps))
+        for n in range(4):
+            yield FrameSample(n / 2, np.full((4, 6, 3), n, dtype=np.uint8))
+
+    def detector(name: str, confidence: float):
+        def detect(images):
+            # A 6x4 frame fills rows 106 to 533 of its model image
+            box = np.array([[0.0, 106.0, 640.0, 533.0]])
+            return [Detections(box, ["cat"], [0.9]) for _ in images]
+
+        return detect
+
+    monkeypatch.setattr(detect_objects, "sample_frames", sample_frames)
+    monkeypatch.setattr(demux, "sample_frames", sample_frames)
+    monkeypatch.setattr(detect_objects, "detector", detector)
+    return requests
+
+
+@pytest.fixture
+def fake_transcription(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Run video transcription without ffmpeg or a model.
+
+    Every video's soundtrack is a three second tone, and the model hears
+    "hello" in every window it gets.
+
+    Returns:
+        The duration of each window sent to the model.
+    """
+    np = pytest.importorskip("numpy")
+    from semantics.core import decode
+    from semantics.modules.audio import stream
+    from semantics.modules.video import demux
+    from semantics.modules.video.handlers import transcribe
+
+    time = np.arange(3 * 16000) / 16000
+    pcm = (np.sin(2 * np.pi * 220 * time) * 8000).astype("<i2").tobytes()
+    heard: list[float] = []
+
+    @contextmanager
+    def open_decoder(input_path: Path):
+        yield io.BytesIO(pcm).read
+
+    def transcribe_window(model, window, language: str):
+        heard.append(window.end - window.start)
+        return [stream.Segment(0.0, window.end - window.start, "hello")]
+
+    monkeypatch.setattr(decode, "open_decoder", open_decoder)
+    monkeypatch.setattr(demux, "open_decoder", open_decoder)
+    monkeypatch.setattr(transcribe, "load_model", lambda name: object())
+    monkeypatch.setattr(stream, "transcribe_window", transcribe_window)
+    return heard
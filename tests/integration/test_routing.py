@@ -22,7 +22,7 @@ class TestDirectInputProcessing:
         assert result.exit_code == 0
         assert "Transcribing" in result.output
 
-    def test_direct_video_detect_objects(self, runner: CliRunner, tmp_path) -> None:
+    def test_direct_video_detect_objects(self, runner: CliRunner, tmp_path, fake_detection) -> None:
         """Test direct video object detection with -i option."""
         input_file = tmp_path / "test.mp4"
         input_file.write_text("dummy video")
@@ -112,3 +112,173 @@ class TestDirectInputProcessing:
         )
         assert result.exit_code != 0
         assert "At least one operation" in result.output
+
+
+class TestBatchInputProcessing:
+    """Tests for directory, glob and multi-file inputs using -i/--input."""
+
+    @pytest.fixture
+    def input_dir(self, tmp_path):
+        """Create a folder with mixed media files."""
+        input_dir = tmp_path / "inputs"
+        (input_dir / "sub").mkdir(parents=True)
+        (input_dir / "a.wav").write_text("dummy audio")
+        (input_dir / "sub" / "b.mp4").write_text("dummy video")
+        (input_dir / "c.pdf").write_text("dummy pdf")
+        (input_dir / "notes.txt").write_text("unsupported")
+        return input_dir
+
+    def test_batch_directory(
+        self, runner: CliRunner, tmp_path, input_dir, fake_transcription
+    ) -> None:
+        """Test that a directory input routes every supported file."""
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(
+            main,
+            ["-i", str(input_dir), "-o", str(output_dir), "--transcribe"],
+        )
+        assert result.exit_code == 0
+        assert "Transcribing audio: a.wav" in result.output
+        assert "Transcribing video audio: b.mp4" in result.output
+        assert "2 succeeded, 0 failed, 2 skipped" in result.output
+        assert (output_dir / "a.wav").is_dir()
+        assert (output_dir / "sub" / "b.mp4").is_dir()
+
+    def test_batch_glob(self, runner: CliRunner, tmp_path, input_dir, fake_detection) -> None:
+        """Test that a glob pattern input is expanded."""
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(
+            main,
+            ["-i", str(input_dir / "**" / "*.mp4"), "-o", str(output_dir), "--detect-objects"],
+        )
+        assert result.exit_code == 0
+        assert "Detecting objects in video: b.mp4" in result.output
+        assert "1 succeeded, 0 failed, 0 skipped" in result.output
+
+    def test_batch_multiple_inputs(self, runner: CliRunner, tmp_path, input_dir) -> None:
+        """Test that -i can be repeated."""
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(
+            main,
+            [
+                "-i", str(input_dir / "a.wav"),
+                "-i", str(input_dir / "c.pdf"),
+                "-o", str(output_dir),
+                "--extract-text",
+            ],
+        )
+        assert result.exit_code == 0
+        assert "Extracting text" in result.output
+        assert "1 succeeded, 0 failed, 1 skipped" in result.output
+
+    def test_batch_reports_failures(self, runner: CliRunner, tmp_path, input_dir) -> None:
+        """Test that failed files are listed and the exit code is non-zero."""
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(
+            main,
+            ["-i", str(input_dir), "-o", str(output_dir), "--transcribe", "--bogus"],
+        )
+        assert result.exit_code == 1
+        assert "0 succeeded, 2 failed" in result.output
+        assert "[FAILED]" in result.output
+
+    def test_batch_parallel_jobs(
+        self, runner: CliRunner, tmp_path, input_dir, fake_transcription
+    ) -> None:
+        """Test that --jobs runs files on a process pool."""
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(
+            main,
+            ["-i", str(input_dir), "-o", str(output_dir), "--transcribe", "--jobs", "2"],
+        )
+        assert result.exit_code == 0
+        assert "with 2 job(s)" in result.output
+        assert "2 succeeded, 0 failed, 2 skipped" in result.output
+
+    def test_batch_attached_jobs_value(
+        self, runner: CliRunner, tmp_path, input_dir, fake_transcription
+    ) -> None:
+        """Test that -j2 is taken as the main option, not passed to modules."""
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(
+            main,
+            [f"-i{input_dir}", "-o", str(output_dir), "--transcribe", "-j2"],
+        )
+        assert result.exit_code == 0
+        assert "with 2 job(s)" in result.output
+        assert "2 succeeded, 0 failed, 2 skipped" in result.output
+
+    def test_batch_same_file_names(self, runner: CliRunner, tmp_path) -> None:
+        """Test that two files given directly with the same name are rejected."""
+        for folder in ("a", "b"):
+            (tmp_path / folder).mkdir()
+            (tmp_path / folder / "x.wav").write_text("dummy audio")
+
+        result = runner.invoke(
+            main,
+            [
+                "-i", str(tmp_path / "a" / "x.wav"),
+                "-i", str(tmp_path / "b" / "x.wav"),
+                "-o", str(tmp_path / "output"),
+                "--transcribe",
+            ],
+        )
+        assert result.exit_code != 0
+        assert "Inputs would write to the same output folder" in result.output
+        assert not (tmp_path / "output").exists()
+
+    def test_batch_missing_path(self, runner: CliRunner, tmp_path) -> None:
+        """Test error for an input that does not exist."""
+        result = runner.invoke(
+            main,
+            ["-i", str(tmp_path / "missing"), "-o", str(tmp_path / "output"), "--transcribe"],
+        )
+        assert result.exit_code != 0
+        assert "does not exist" in result.output
+
+
+class TestContentRouting:
+    """Tests for routing by file content instead of extension."""
+
+    def test_mislabeled_audio_routes_to_audio(self, runner: CliRunner, tmp_path) -> None:
+        """Test that a WAV file with a .bin extension is routed to audio."""
+        input_file = tmp_path / "upload.bin"
+        input_file.write_bytes(b"RIFF\x00\x00\x00\x00WAVEfmt " + b"\x00" * 32)
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(
+            main,
+            ["-i", str(input_file), "-o", str(output_dir), "--transcribe"],
+        )
+        assert result.exit_code == 0
+        assert "Transcribing audio" in result.output
+
+    def test_audio_only_mp4_routes_to_audio(self, runner: CliRunner, tmp_path) -> None:
+        """Test that an .mp4 without a video track is routed to audio."""
+        hdlr = (32).to_bytes(4, "big") + b"hdlr" + b"\x00" * 8 + b"soun" + b"\x00" * 12
+        trak = (8 + len(hdlr)).to_bytes(4, "big") + b"trak" + hdlr
+        moov = (8 + len(trak)).to_bytes(4, "big") + b"moov" + trak
+        ftyp = (16).to_bytes(4, "big") + b"ftypisom\x00\x00\x02\x00"
+        input_file = tmp_path / "call.mp4"
+        input_file.write_bytes(ftyp + moov)
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(
+            main,
+            ["-i", str(input_file), "-o", str(output_dir), "--transcribe"],
+        )
+        assert result.exit_code == 0
+        assert "Transcribing audio" in result.output
+
+        result = runner.invoke(
+            main,
+            ["-i", str(input_file), "-o", str(output_dir), "--detect-objects"],
+        )
+        assert result.exit_code != 0
+        assert "--detect-objects cannot be applied" in result.output
@@ -0,0 +1,374 @@
+"""Tests for the content-addressed result cache."""
+
+from __future__ import annotations
+
+import os
+import types
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from semantics.core import cache
+from semantics.core.cache import ResultCache, make_key, parse_size, run_cached, run_cached_batch
+
+
+def make_handler(version: str = "1") -> types.ModuleType:
+    """Create a handler module that writes one output file and counts calls."""
+    handler = types.ModuleType("tests.fake_handler")
+    handler.VERSION = version
+    handler.calls = 0
+
+    def handle(input_path: Path, output_path: Path, verbose: bool = False, **options) -> None:
+        handler.calls += 1
+        text = f"{input_path.read_text()} {options.get('language', '')}"
+        (output_path / "result.txt").write_text(text)
+
+    handler.handle = handle
+    handler.batches = []
+
+    def handle_batch(jobs: list[tuple[Path, Path]], verbose: bool = False, batch_size: int = 1, **options) -> None:
+        handler.batches.append([input_path.name for input_path, _ in jobs])
+        for input_path, output_path in jobs:
+            handle(input_path, output_path, verbose, **options)
+
+    handler.handle_batch = handle_batch
+    return handler
+
+
+@pytest.fixture
+def input_file(tmp_path: Path) -> Path:
+    """Create an input file."""
+    path = tmp_path / "input.wav"
+    path.write_text("audio")
+    return path
+
+
+@pytest.fixture
+def output_dir(tmp_path: Path) -> Path:
+    """Create an empty output folder."""
+    path = tmp_path / "output"
+    path.mkdir()
+    return path
+
+
+def store_entry(result_cache: ResultCache, tmp_path: Path, key: str, size: int) -> None:
+    """Store an entry holding one file of the given size."""
+    source = tmp_path / f"source-{key}"
+    source.mkdir()
+    (source / "out.bin").write_bytes(b"x" * size)
+    result_cache.store(key, source, [Path("out.bin")], {"handler": "test"})
+
+
+class TestParseSize:
+    """Tests for parsing cache size limits."""
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [("100", 100), ("2K", 2048), ("1.5M", 1536 * 1024), ("10G", 10 * 1024**3), ("1GiB", 1024**3)],
+    )
+    def test_parse_size(self, text: str, expected: int) -> None:
+        """Test that sizes with binary suffixes are parsed."""
+        assert parse_size(text) == expected
+
+    @pytest.mark.parametrize("text", ["", "G", "ten", "-5M"])
+    def test_invalid_size(self, text: str) -> None:
+        """Test that invalid sizes are rejected."""
+        with pytest.raises(ValueError):
+            parse_size(text)
+
+
+class TestMakeKey:
+    """Tests for building cache keys."""
+
+    def test_option_order_does_not_matter(self) -> None:
+        """Test that options are normalized before hashing."""
+        first = make_key("abc", "handler", "1", {"language": "en", "model": "base"})
+        second = make_key("abc", "handler", "1", {"model": "base", "language": "en"})
+        assert first == second
+
+    def test_key_changes_with_each_component(self) -> None:
+        """Test that content, handler, version and options are all part of the key."""
+        base = make_key("abc", "handler", "1", {"model": "base"})
+        assert make_key("abd", "handler", "1", {"model": "base"}) != base
+        assert make_key("abc", "other", "1", {"model": "base"}) != base
+        assert make_key("abc", "handler", "2", {"model": "base"}) != base
+        assert make_key("abc", "handler", "1", {"model": "small"}) != base
+
+
+class TestRunCached:
+    """Tests for running handlers through the cache."""
+
+    def test_second_run_reuses_result(
+        self, input_file: Path, output_dir: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that an identical run restores the stored output."""
+        handler = make_handler()
+        run_cached(handler, input_file, output_dir, language="en")
+        (output_dir / "result.txt").unlink()
+
+        run_cached(handler, input_file, output_dir, language="en")
+
+        assert handler.calls == 1
+        assert (output_dir / "result.txt").read_text() == "audio en"
+        assert "[CACHE] Reused fake_handler result for input.wav (1 file(s))" in capsys.readouterr().out
+
+    def test_restored_output_is_read_only_link(self, input_file: Path, output_dir: Path, tmp_path: Path) -> None:
+        """Test that hits hard link the read-only cached file."""
+        handler = make_handler()
+        run_cached(handler, input_file, output_dir)
+        second_output = tmp_path / "second"
+        second_output.mkdir()
+
+        run_cached(handler, input_file, second_output)
+
+        restored = second_output / "result.txt"
+        assert restored.stat().st_nlink >= 2
+        assert not restored.stat().st_mode & 0o222
+
+    def test_changed_options_rerun(self, input_file: Path, output_dir: Path) -> None:
+        """Test that different options are a miss."""
+        handler = make_handler()
+        run_cached(handler, input_file, output_dir, language="en")
+        run_cached(handler, input_file, output_dir, language="de")
+
+        assert handler.calls == 2
+        assert (output_dir / "result.txt").read_text() == "audio de"
+
+    def test_run_options_are_not_part_of_the_key(self, input_file: Path, output_dir: Path) -> None:
+        """Test that options listed in RUN_OPTIONS do not cause a miss."""
+        handler = make_handler()
+        handler.RUN_OPTIONS = ("resume",)
+        run_cached(handler, input_file, output_dir, language="en", resume=True)
+        run_cached(handler, input_file, output_dir, language="en", resume=False)
+
+        assert handler.calls == 1
+
+    def test_changed_content_reruns(self, input_file: Path, output_dir: Path) -> None:
+        """Test that a changed input file is a miss."""
+        handler = make_handler()
+        run_cached(handler, input_file, output_dir)
+        input_file.write_text("other audio")
+        run_cached(handler, input_file, output_dir)
+
+        assert handler.calls == 2
+
+    def test_same_content_elsewhere_hits(self, input_file: Path, output_dir: Path, tmp_path: Path) -> None:
+        """Test that the key depends on content, not on the file's path."""
+        handler = make_handler()
+        run_cached(handler, input_file, output_dir)
+        copy = tmp_path / "copy.wav"
+        copy.write_text("audio")
+        run_cached(handler, copy, output_dir)
+
+        assert handler.calls == 1
+
+    def test_new_handler_version_reruns(self, input_file: Path, output_dir: Path) -> None:
+        """Test that bumping a handler's VERSION invalidates its results."""
+        handler = make_handler("1")
+        run_cached(handler, input_file, output_dir)
+        handler.VERSION = "2"
+        run_cached(handler, input_file, output_dir)
+
+        assert handler.calls == 2
+
+    def test_disabled_cache_always_runs(
+        self, input_file: Path, output_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that use_cache=False and SEMANTICS_NO_CACHE bypass the cache."""
+        handler = make_handler()
+        run_cached(handler, input_file, output_dir)
+        run_cached(handler, input_file, output_dir, use_cache=False)
+        monkeypatch.setenv("SEMANTICS_NO_CACHE", "1")
+        run_cached(handler, input_file, output_dir)
+
+        assert handler.calls == 3
+
+    def test_existing_outputs_are_not_stored(self, input_file: Path, output_dir: Path, tmp_path: Path) -> None:
+        """Test that only files written by the handler are stored."""
+        (output_dir / "unrelated.txt").write_text("keep")
+        handler = make_handler()
+        run_cached(handler, input_file, output_dir)
+        second_output = tmp_path / "second"
+        second_output.mkdir()
+
+        run_cached(handler, input_file, second_output)
+
+        assert sorted(p.name for p in second_output.iterdir()) == ["result.txt"]
+
+    def test_empty_result_is_not_stored(self, input_file: Path, output_dir: Path) -> None:
+        """Test that a handler that writes nothing runs again instead of being skipped."""
+        handler = types.ModuleType("tests.silent_handler")
+        handler.calls = 0
+
+        def handle(input_path: Path, output_path: Path, verbose: bool = False, **options) -> None:
+            handler.calls += 1
+
+        handler.handle = handle
+        run_cached(handler, input_file, output_dir)
+        run_cached(handler, input_file, output_dir)
+
+        assert handler.calls == 2
+        assert ResultCache().stats().entries == 0
+
+
+class TestRunCachedBatch:
+    """Tests for running batched handlers through the cache."""
+
+    def make_jobs(self, tmp_path: Path, names: list[str]) -> list[tuple[Path, Path]]:
+        """Create one input file and output folder per name."""
+        jobs = []
+        for name in names:
+            input_path = tmp_path / f"{name}.wav"
+            input_path.write_text(f"audio {name}")
+            output_path = tmp_path / "output" / name
+            output_path.mkdir(parents=True)
+            jobs.append((input_path, output_path))
+        return jobs
+
+    def test_only_misses_are_batched(self, tmp_path: Path) -> None:
+        """Test that cached inputs are restored and the rest run as one batch."""
+        handler = make_handler()
+        jobs = self.make_jobs(tmp_path, ["a", "b", "c"])
+        run_cached(handler, *jobs[1], language="en")
+
+        run_cached_batch(handler, jobs, batch_options={"batch_size": 4}, language="en")
+
+        assert handler.batches == [["a.wav", "c.wav"]]
+        assert (jobs[1][1] / "result.txt").read_text() == "audio b en"
+
+    def test_batched_results_are_shared_with_single_runs(self, tmp_path: Path) -> None:
+        """Test that batch options are left out of the key."""
+        handler = make_handler()
+        jobs = self.make_jobs(tmp_path, ["a", "b"])
+        run_cached_batch(handler, jobs, batch_options={"batch_size": 4}, language="en")
+        (jobs[0][1] / "result.txt").unlink()
+
+        run_cached_batch(handler, jobs, batch_options={"batch_size": 2}, language="en")
+        run_cached(handler, *jobs[0], language="en")
+
+        assert handler.batches == [["a.wav", "b.wav"]]
+        assert handler.calls == 2
+        assert (jobs[0][1] / "result.txt").read_text() == "audio a en"
+
+    def test_disabled_cache_batches_everything(self, tmp_path: Path) -> None:
+        """Test that without the cache every input is passed to the handler."""
+        handler = make_handler()
+        jobs = self.make_jobs(tmp_path, ["a", "b"])
+
+        run_cached_batch(handler, jobs, language="en")
+        run_cached_batch(handler, jobs, use_cache=False, language="en")
+
+        assert handler.batches == [["a.wav", "b.wav"], ["a.wav", "b.wav"]]
+
+
+class TestResultCache:
+    """Tests for lookups, eviction and clearing."""
+
+    def test_hash_is_remembered(self, tmp_path: Path, input_file: Path) -> None:
+        """Test that unchanged files are not hashed twice."""
+        result_cache = ResultCache(tmp_path / "cache")
+        digest = result_cache.hash_file(input_file)
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(cache.hashlib, "file_digest", None)
+            assert result_cache.hash_file(input_file) == digest
+
+    def test_damaged_entry_is_a_miss(self, tmp_path: Path) -> None:
+        """Test that an entry with a missing file is removed on lookup."""
+        result_cache = ResultCache(tmp_path / "cache")
+        store_entry(result_cache, tmp_path, "aa11", 10)
+        files_dir = result_cache.lookup("aa11")
+        assert files_dir is not None
+        os.chmod(files_dir / "out.bin", 0o644)
+        (files_dir / "out.bin").unlink()
+
+        assert result_cache.lookup("aa11") is None
+        assert result_cache.stats().entries == 0
+
+    def test_prune_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        """Test that the least recently used entries are evicted first."""
+        result_cache = ResultCache(tmp_path / "cache")
+        for age, key in enumerate(["aa01", "bb02", "cc03"]):
+            store_entry(result_cache, tmp_path, key, 100)
+            os.utime(result_cache._entry_dir(key) / "meta.json", (1000 + age, 1000 + age))
+
+        # Using the oldest entry makes it the most recently used one
+        result_cache.lookup("aa01")
+        removed, freed = result_cache.prune(250)
+
+        assert (removed, freed) == (1, 100)
+        assert result_cache.lookup("bb02") is None
+        assert result_cache.lookup("aa01") is not None
+        assert result_cache.lookup("cc03") is not None
+
+    def test_store_prunes_to_limit(self, tmp_path: Path) -> None:
+        """Test that storing keeps the cache within its size limit."""
+        result_cache = ResultCache(tmp_path / "cache", max_size=250)
+        for age, key in enumerate(["aa01", "bb02", "cc03"]):
+            store_entry(result_cache, tmp_path, key, 100)
+            os.utime(result_cache._entry_dir(key) / "meta.json", (1000 + age, 1000 + age))
+
+        assert result_cache.stats().size == 200
+        assert result_cache.lookup("aa01") is None
+
+    def test_store_prunes_only_when_due(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that small stores do not scan the cache until the interval has passed."""
+        result_cache = ResultCache(tmp_path / "cache", max_size=1000)
+        scans = []
+        monkeypatch.setattr(result_cache, "prune", lambda: scans.append(1))
+
+        for key in ["aa01", "bb02", "cc03"]:
+            store_entry(result_cache, tmp_path, key, 10)
+        assert len(scans) == 1
+
+        # A tenth of the limit stored since the last prune makes one due
+        store_entry(result_cache, tmp_path, "dd04", 80)
+        assert len(scans) == 2
+
+        monkeypatch.setattr(cache.time, "time", lambda: 1e12)
+        store_entry(result_cache, tmp_path, "ee05", 10)
+        assert len(scans) == 3
+
+    def test_clear_removes_everything(self, tmp_path: Path) -> None:
+        """Test that clear removes all entries."""
+        result_cache = ResultCache(tmp_path / "cache")
+        store_entry(result_cache, tmp_path, "aa01", 10)
+        store_entry(result_cache, tmp_path, "bb02", 20)
+
+        assert result_cache.clear() == (2, 30)
+        assert result_cache.stats().entries == 0
+
+
+class TestCacheCommand:
+    """Tests for the `semantics cache` subcommand."""
+
+    def test_stats_prune_clear(self, runner: CliRunner, input_file: Path, output_dir: Path) -> None:
+        """Test the cache subcommands report and manage stored results."""
+        from semantics.cli import main
+
+        run_cached(make_handler(), input_file, output_dir)
+
+        result = runner.invoke(main, ["cache", "stats"])
+        assert result.exit_code == 0
+        assert "Entries: 1" in result.output
+        assert "Decoded inputs: 0" in result.output
+        assert "Fingerprints: 0" in result.output
+
+        result = runner.invoke(main, ["cache", "prune", "--max-size", "0"])
+        assert result.exit_code == 0
+        assert "Evicted 1 result(s)" in result.output
+
+        run_cached(make_handler(), input_file, output_dir)
+        result = runner.invoke(main, ["cache", "clear"])
+        assert result.exit_code == 0
+        assert "Removed 1 result(s)" in result.output
+        assert "Removed 0 fingerprint(s)" in result.output
+
+    def test_prune_rejects_invalid_size(self, runner: CliRunner) -> None:
+        """Test that an invalid --max-size is reported."""
+        from semantics.cli import main
+
+        result = runner.invoke(main, ["cache", "prune", "--max-size", "lots"])
+        assert result.exit_code != 0
+        assert "Invalid size: lots" in result.output
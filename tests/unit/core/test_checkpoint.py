@@ -0,0 +1,82 @@
+"""Tests for checkpoints of interrupted handlers."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from semantics.core.checkpoint import Checkpoint, checkpoint_key, has_checkpoints
+
+
+def make_output(tmp_path: Path, text: str = "first\n") -> Path:
+    """Create an output file."""
+    path = tmp_path / "talk.txt"
+    path.write_text(text)
+    return path
+
+
+class TestCheckpoint:
+    """Tests for saving and loading progress."""
+
+    def test_load_cuts_files_back_to_the_checkpoint(self, tmp_path: Path) -> None:
+        """Test that output written after the checkpoint is dropped on load."""
+        output = make_output(tmp_path)
+        checkpoint = Checkpoint(tmp_path / "talk.checkpoint.json", "key", interval=0)
+        checkpoint.save({"position": 28.0}, [output])
+        with open(output, "a") as f:
+            f.write("unsaved\n")
+
+        state = Checkpoint(checkpoint.path, "key").load()
+
+        assert state == {"position": 28.0}
+        assert output.read_text() == "first\n"
+
+    def test_other_key_is_ignored(self, tmp_path: Path) -> None:
+        """Test that a checkpoint of another input or options is not loaded."""
+        output = make_output(tmp_path)
+        Checkpoint(tmp_path / "talk.checkpoint.json", "key", interval=0).save({}, [output])
+
+        assert Checkpoint(tmp_path / "talk.checkpoint.json", "other").load() is None
+
+    def test_shortened_output_is_not_resumed(self, tmp_path: Path) -> None:
+        """Test that output lost since the checkpoint makes it unusable."""
+        output = make_output(tmp_path)
+        checkpoint = Checkpoint(tmp_path / "talk.checkpoint.json", "key", interval=0)
+        checkpoint.save({}, [output])
+        output.write_text("")
+
+        assert checkpoint.load() is None
+
+    def test_saves_are_spaced_by_the_interval(self, tmp_path: Path) -> None:
+        """Test that saves within the interval are skipped unless forced."""
+        checkpoint = Checkpoint(tmp_path / "talk.checkpoint.json", "key", interval=3600)
+
+        assert not checkpoint.save({"step": 1})
+        assert checkpoint.save({"step": 2}, force=True)
+        assert not checkpoint.save({"step": 3})
+        assert checkpoint.load() == {"step": 2}
+
+    def test_remove(self, tmp_path: Path) -> None:
+        """Test that a removed checkpoint is gone and cannot be loaded."""
+        checkpoint = Checkpoint(tmp_path / "talk.checkpoint.json", "key", interval=0)
+        checkpoint.save({})
+        assert has_checkpoints(tmp_path)
+
+        checkpoint.remove()
+
+        assert not has_checkpoints(tmp_path)
+        assert checkpoint.load() is None
+
+
+class TestCheckpointKey:
+    """Tests for tying checkpoints to their input and options."""
+
+    def test_key_changes_with_input_and_options(self, tmp_path: Path) -> None:
+        """Test that a modified input or other options give another key."""
+        path = make_output(tmp_path)
+        key = checkpoint_key(path, {"model": "base"})
+
+        assert checkpoint_key(path, {"model": "base"}) == key
+        assert checkpoint_key(path, {"model": "large"}) != key
+        os.utime(path, ns=(0, 0))
+        assert checkpoint_key(path, {"model": "base"}) != key
@@ -0,0 +1,379 @@
+"""Tests for the decoded audio cache."""
+
+from __future__ import annotations
+
+import io
+import os
+import struct
+import sys
+import threading
+import wave
+from contextlib import contextmanager
+from pathlib import Path
+
+import click
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from semantics.core import decode  # noqa: E402
+from semantics.core.decode import (  # noqa: E402
+    SAMPLE_RATE,
+    DecodedAudioCache,
+    load_audio,
+    open_pcm,
+)
+
+
+def ramp_pcm(samples: int) -> bytes:
+    """Return 16-bit PCM counting up from 0."""
+    return np.arange(samples, dtype="<i2").tobytes()
+
+
+def write_wav(path: Path, pcm: bytes, rate: int = SAMPLE_RATE) -> Path:
+    """Write a mono 16-bit WAV file."""
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm)
+    return path
+
+
+class FakeDecoder:
+    """Stand-in for open_decoder() returning fixed PCM and counting decodes."""
+
+    def __init__(self, pcm: bytes) -> None:
+        self.pcm = pcm
+        self.decodes = 0
+
+    @contextmanager
+    def __call__(self, input_path: Path):
+        self.decodes += 1
+        yield io.BytesIO(self.pcm).read
+
+
+def video_file(path: Path) -> Path:
+    """Write a minimal MP4 file with a video track."""
+
+    def box(kind: bytes, payload: bytes) -> bytes:
+        return struct.pack(">I", 8 + len(payload)) + kind + payload
+
+    handler = box(b"hdlr", b"\x00" * 8 + b"vide" + b"\x00" * 12)
+    path.write_bytes(
+        box(b"ftyp", b"isom\x00\x00\x02\x00isom")
+        + box(b"moov", box(b"trak", handler))
+        + box(b"mdat", b"\x00" * 64)
+    )
+    return path
+
+
+@pytest.fixture
+def compressed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> tuple[Path, FakeDecoder]:
+    """Create an input that needs decoding, decoded by a fake decoder."""
+    path = tmp_path / "talk.mp3"
+    path.write_bytes(b"ID3 compressed audio")
+    decoder = FakeDecoder(ramp_pcm(5000))
+    monkeypatch.setattr(decode, "open_decoder", decoder)
+    return path, decoder
+
+
+def read_all(read, size: int = 3000) -> bytes:
+    """Read a PCM stream to its end."""
+    return b"".join(iter(lambda: read(size), b""))
+
+
+class TestLoadAudio:
+    """Tests for decoding inputs once and mapping the samples."""
+
+    def test_input_is_decoded_once(self, compressed: tuple[Path, FakeDecoder]) -> None:
+        """Test that a second load maps the cached file instead of decoding."""
+        path, decoder = compressed
+
+        first = load_audio(path)
+        second = load_audio(path)
+
+        assert decoder.decodes == 1
+        assert isinstance(second, np.memmap)
+        assert not second.flags.writeable
+        assert second.dtype == np.float32
+        assert np.array_equal(first, np.arange(5000, dtype=np.float32) / 32768)
+
+    def test_same_content_elsewhere_is_shared(
+        self, compressed: tuple[Path, FakeDecoder], tmp_path: Path
+    ) -> None:
+        """Test that samples are keyed by content, not path."""
+        path, decoder = compressed
+        copy = tmp_path / "copy.mp3"
+        copy.write_bytes(path.read_bytes())
+
+        load_audio(path)
+        load_audio(copy)
+
+        assert decoder.decodes == 1
+
+    def test_model_format_wav_is_read_directly(self, tmp_path: Path) -> None:
+        """Test that 16 kHz mono WAV files are decoded without ffmpeg."""
+        path = write_wav(tmp_path / "talk.wav", ramp_pcm(100))
+
+        samples = load_audio(path)
+
+        assert samples[:3].tolist() == [0.0, 1 / 32768, 2 / 32768]
+
+    def test_disabled_cache_decodes_in_memory(
+        self, compressed: tuple[Path, FakeDecoder], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that SEMANTICS_NO_CACHE decodes every time and stores nothing."""
+        path, decoder = compressed
+        monkeypatch.setenv("SEMANTICS_NO_CACHE", "1")
+
+        samples = load_audio(path)
+        load_audio(path)
+
+        assert decoder.decodes == 2
+        assert len(samples) == 5000
+        assert DecodedAudioCache().stats().entries == 0
+
+    def test_other_wav_is_converted_without_ffmpeg(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a PCM WAV file at another rate is converted in-process."""
+        path = write_wav(tmp_path / "hifi.wav", np.full(44100, 8000, dtype="<i2").tobytes(), rate=44100)
+        monkeypatch.setattr(decode.shutil, "which", lambda name: None)
+
+        samples = load_audio(path)
+
+        assert len(samples) == SAMPLE_RATE
+        assert samples[4000:12000] == pytest.approx(8000 / 32768, abs=1e-4)
+
+    def test_video_soundtrack_is_not_stored(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the samples of a video are decoded in memory only."""
+        path = video_file(tmp_path / "talk.mp4")
+        decoder = FakeDecoder(ramp_pcm(5000))
+
+        samples = load_audio(path, decoder=decoder)
+        load_audio(path, decoder=decoder)
+
+        assert decoder.decodes == 2
+        assert not isinstance(samples, np.memmap)
+        assert len(samples) == 5000
+        assert DecodedAudioCache().stats().entries == 0
+
+    def test_other_formats_need_ffmpeg(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a compressed file reports a missing ffmpeg."""
+        path = tmp_path / "talk.mp3"
+        path.write_bytes(b"ID3 compressed audio")
+        monkeypatch.setattr(decode.shutil, "which", lambda name: None)
+
+        with pytest.raises(click.ClickException, match="requires ffmpeg"):
+            load_audio(path)
+        assert list(DecodedAudioCache().root.glob("tmp/*")) == []
+
+
+class TestOpenPcm:
+    """Tests for streaming PCM through the cache."""
+
+    def test_stream_is_stored_for_the_next_reader(self, compressed: tuple[Path, FakeDecoder]) -> None:
+        """Test that a fully read stream is cached and then read from the cache."""
+        path, decoder = compressed
+
+        with open_pcm(path) as read:
+            first = read_all(read)
+        with open_pcm(path) as read:
+            second = read_all(read)
+
+        load_audio(path)
+
+        assert first == second == ramp_pcm(5000)
+        assert decoder.decodes == 1
+
+    def test_partly_read_stream_is_not_stored(self, compressed: tuple[Path, FakeDecoder]) -> None:
+        """Test that stopping early leaves no truncated samples behind."""
+        path, decoder = compressed
+
+        with open_pcm(path) as read:
+            read(100)
+        with open_pcm(path) as read:
+            read_all(read)
+
+        assert decoder.decodes == 2
+
+    def test_model_format_wav_is_not_stored(self, tmp_path: Path) -> None:
+        """Test that WAV files needing no decoding are streamed as they are."""
+        path = write_wav(tmp_path / "talk.wav", ramp_pcm(100))
+
+        with open_pcm(path) as read:
+            assert read_all(read) == ramp_pcm(100)
+        assert DecodedAudioCache().stats().entries == 0
+
+
+    def test_video_soundtrack_is_streamed(self, tmp_path: Path) -> None:
+        """Test that the soundtrack of a video streams without being stored."""
+        path = video_file(tmp_path / "talk.mp4")
+        decoder = FakeDecoder(ramp_pcm(5000))
+
+        with open_pcm(path, decoder=decoder) as read:
+            assert read_all(read) == ramp_pcm(5000)
+        assert DecodedAudioCache().stats().entries == 0
+
+
+class TestReadAhead:
+    """Tests for reading a decoder's pipe ahead into a ring buffer."""
+
+    def test_stream_wraps_around_the_buffer(self) -> None:
+        """Test that a stream larger than the buffer is read whole and in order."""
+        data = os.urandom(10_000)
+        ahead = decode._ReadAhead(io.BytesIO(data).read1, 1000)
+
+        assert read_all(ahead.read, 777) == data
+        ahead.close()
+
+    def test_reads_ahead_up_to_capacity(self) -> None:
+        """Test that the producer fills the buffer, then waits for the reader."""
+        source = io.BytesIO(os.urandom(5000))
+        ahead = decode._ReadAhead(source.read1, 1000)
+
+        for _ in range(100):
+            if source.tell() == 1000:
+                break
+            threading.Event().wait(0.01)
+        assert source.tell() == 1000
+        ahead.read(300)
+        ahead.close()
+        assert source.tell() <= 1300
+
+    def test_error_is_raised_to_the_reader(self) -> None:
+        """Test that a failing stream fails the read after its data."""
+        chunks = [b"abc"]
+
+        def read(size: int) -> bytes:
+            if chunks:
+                return chunks.pop()
+            raise OSError("broken pipe")
+
+        ahead = decode._ReadAhead(read, 1000)
+
+        assert ahead.read(10) == b"abc"
+        with pytest.raises(OSError, match="broken pipe"):
+            ahead.read(10)
+        ahead.close()
+
+    def test_ffmpeg_output_is_read_ahead(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that open_decoder() streams ffmpeg's output through memory."""
+        script = tmp_path / "ffmpeg"
+        script.write_text(
+            f"#!{sys.executable}\n"
+            "import sys\n"
+            "for _ in range(8):\n"
+            "    sys.stdout.buffer.write(bytes(range(256)) * 1024)\n"
+        )
+        script.chmod(0o755)
+        monkeypatch.setattr(decode.shutil, "which", lambda name: str(script))
+        monkeypatch.setattr(decode, "READ_AHEAD", 64 * 1024)
+        path = video_file(tmp_path / "talk.mp4")
+
+        with decode.open_decoder(path) as read:
+            pcm = read_all(read, 100_000)
+        assert pcm == bytes(range(256)) * 1024 * 8
+
+        # A reader stopping early stops ffmpeg and the read-ahead thread
+        with pytest.raises(KeyError):
+            with decode.open_decoder(path) as read:
+                read(10)
+                raise KeyError
+
+        # Stopping early without an error is not a decoding failure
+        with decode.open_decoder(path) as read:
+            assert read(10) == bytes(range(10))
+
+    def fake_ffmpeg(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, body: str) -> Path:
+        """Install a fake ffmpeg running body and return a video to decode."""
+        script = tmp_path / "ffmpeg"
+        script.write_text(f"#!{sys.executable}\nimport sys\n{body}")
+        script.chmod(0o755)
+        monkeypatch.setattr(decode.shutil, "which", lambda name: str(script))
+        return video_file(tmp_path / "talk.mp4")
+
+    def test_ffmpeg_log_does_not_block_decoding(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a log larger than the stderr pipe is drained while decoding."""
+        path = self.fake_ffmpeg(
+            tmp_path,
+            monkeypatch,
+            "sys.stderr.write('warning\\n' * 100_000)\n"
+            "sys.stderr.flush()\n"
+            "sys.stdout.buffer.write(b'pcm')\n",
+        )
+
+        with decode.open_decoder(path) as read:
+            assert read_all(read, 100) == b"pcm"
+
+    def test_ffmpeg_failure_is_reported(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that ffmpeg's error log is shown when decoding fails."""
+        path = self.fake_ffmpeg(
+            tmp_path, monkeypatch, "sys.stderr.write('Invalid data')\nsys.exit(1)\n"
+        )
+
+        with pytest.raises(click.ClickException, match="talk.mp4: Invalid data"):
+            with decode.open_decoder(path) as read:
+                read_all(read, 100)
+
+
+class TestDecodedAudioCache:
+    """Tests for eviction and clearing."""
+
+    def store(self, cache: DecodedAudioCache, content_hash: str, samples: int) -> Path:
+        """Store samples under a hash."""
+        with cache.writer(content_hash) as writer:
+            writer.write(ramp_pcm(samples))
+            writer.commit()
+        return cache.path(content_hash)
+
+    def test_prune_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        """Test that the least recently used files are evicted first."""
+        cache = DecodedAudioCache(tmp_path / "decoded")
+        for age, key in enumerate(["aa01", "bb02", "cc03"]):
+            os.utime(self.store(cache, key, 100), (1000 + age, 1000 + age))
+        size = cache.path("aa01").stat().st_size
+
+        # Using the oldest file makes it the most recently used one
+        cache.lookup("aa01")
+        removed, freed = cache.prune(2 * size)
+
+        assert (removed, freed) == (1, size)
+        assert cache.lookup("bb02") is None
+        assert cache.lookup("aa01") is not None
+
+    def test_file_larger_than_limit_is_kept_when_written(self, tmp_path: Path) -> None:
+        """Test that a fresh file is kept even if it alone exceeds the limit."""
+        cache = DecodedAudioCache(tmp_path / "decoded", max_size=10)
+
+        self.store(cache, "aa01", 100)
+        self.store(cache, "bb02", 100)
+
+        assert cache.lookup("aa01") is None
+        assert cache.lookup("bb02") is not None
+
+    def test_damaged_file_is_a_miss(self, tmp_path: Path) -> None:
+        """Test that an unreadable file is removed on lookup."""
+        cache = DecodedAudioCache(tmp_path / "decoded")
+        self.store(cache, "aa01", 100).write_bytes(b"not an array")
+
+        assert cache.lookup("aa01") is None
+        assert cache.stats().entries == 0
+
+    def test_clear_removes_everything(self, tmp_path: Path) -> None:
+        """Test that clear removes all decoded audio."""
+        cache = DecodedAudioCache(tmp_path / "decoded")
+        size = self.store(cache, "aa01", 100).stat().st_size
+        self.store(cache, "bb02", 100)
+
+        assert cache.clear() == (2, 2 * size)
+        assert cache.stats().entries == 0
@@ -0,0 +1,62 @@
+"""Tests for the fingerprint index."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from semantics.core.fingerprints import Candidate, FingerprintIndex
+
+
+def add(index: FingerprintIndex, content_hash: str, values: list[int], scope: str = "base") -> None:
+    """Index a recording whose sub-fingerprints are values."""
+    index.add(
+        scope,
+        content_hash,
+        bytes(len(values)),
+        [(value, frame) for frame, value in enumerate(values)],
+        {".txt": content_hash.encode()},
+    )
+
+
+class TestFingerprintIndex:
+    """Tests for finding recordings by their sub-fingerprints."""
+
+    def test_candidates_vote_for_recording_and_offset(self, tmp_path: Path) -> None:
+        """Test that shared sub-fingerprints at one offset make the best candidate."""
+        index = FingerprintIndex(tmp_path / "fingerprints.sqlite")
+        add(index, "aa01", [10, 11, 12, 13, 14, 15])
+        add(index, "bb02", [20, 21, 12, 23])
+
+        # The query starts two frames into aa01
+        candidates = index.candidates("base", [(12, 0), (13, 1), (15, 3)])
+
+        assert candidates[0] == Candidate(index.find("base", "aa01").id, 2, 3)
+        assert len(candidates) == 2
+
+    def test_scopes_are_kept_apart(self, tmp_path: Path) -> None:
+        """Test that recordings indexed with other options are not found."""
+        index = FingerprintIndex(tmp_path / "fingerprints.sqlite")
+        add(index, "aa01", [10, 11], scope="large")
+
+        assert index.candidates("base", [(10, 0)]) == []
+        assert index.find("base", "aa01") is None
+
+    def test_same_content_replaces_its_entry(self, tmp_path: Path) -> None:
+        """Test that indexing a recording again keeps one entry with the new files."""
+        index = FingerprintIndex(tmp_path / "fingerprints.sqlite")
+        add(index, "aa01", [10, 11])
+        index.add("base", "aa01", b"", [(30, 0)], {".txt": b"new"})
+
+        entry = index.find("base", "aa01")
+        assert entry.files == {".txt": b"new"}
+        assert index.candidates("base", [(10, 0)]) == []
+        assert index.stats().entries == 1
+
+    def test_clear(self, tmp_path: Path) -> None:
+        """Test that clear removes the database."""
+        index = FingerprintIndex(tmp_path / "fingerprints.sqlite")
+        add(index, "aa01", [10, 11])
+
+        assert index.clear()[0] == 1
+        assert not index.path.exists()
+        assert index.stats().entries == 0
@@ -0,0 +1,135 @@
+"""Tests for converting PCM audio in-process."""
+
+from __future__ import annotations
+
+import wave
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from semantics.core.decode import SAMPLE_RATE, open_decoder  # noqa: E402
+from semantics.core.frontend import (  # noqa: E402
+    Frontend,
+    Resampler,
+    downmix,
+    to_float,
+    to_pcm16,
+)
+
+
+def tone(frequency: float, rate: int, seconds: float = 1.0) -> np.ndarray:
+    """Return a sine tone at half of full scale, as floats."""
+    t = np.arange(int(rate * seconds)) / rate
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def resample(samples: np.ndarray, in_rate: int, out_rate: int, block: int | None = None) -> np.ndarray:
+    """Resample samples at once, or in blocks of the given size."""
+    resampler = Resampler(in_rate, out_rate)
+    block = block or len(samples)
+    parts = [resampler.process(samples[i : i + block]) for i in range(0, len(samples), block)]
+    return np.concatenate([*parts, resampler.flush()])
+
+
+class TestSampleConversion:
+    """Tests for normalizing and downmixing samples."""
+
+    @pytest.mark.parametrize(
+        ("pcm", "width", "expected"),
+        [
+            (bytes([0, 128, 255]), 1, [-1.0, 0.0, 127 / 128]),
+            (np.array([-32768, 0, 16384], dtype="<i2").tobytes(), 2, [-1.0, 0.0, 0.5]),
+            (bytes([0, 0, 0x80, 0, 0, 0, 0, 0, 0x40]), 3, [-1.0, 0.0, 0.5]),
+            (np.array([-(2**31), 0, 2**30], dtype="<i4").tobytes(), 4, [-1.0, 0.0, 0.5]),
+        ],
+    )
+    def test_widths_are_normalized_to_full_scale(self, pcm: bytes, width: int, expected: list) -> None:
+        """Test that every sample width maps full scale to [-1, 1]."""
+        assert to_float(pcm, width).tolist() == pytest.approx(expected)
+
+    def test_unsupported_width_is_rejected(self) -> None:
+        """Test that a sample width over four bytes raises ValueError."""
+        with pytest.raises(ValueError, match="sample width"):
+            to_float(b"\0" * 8, 8)
+
+    def test_channels_are_averaged(self) -> None:
+        """Test that interleaved stereo frames become their mean."""
+        stereo = np.array([0.5, -0.5, 1.0, 0.0], dtype=np.float32)
+
+        assert downmix(stereo, 2).tolist() == [0.0, 0.5]
+
+    def test_pcm16_is_clipped(self) -> None:
+        """Test that samples beyond full scale are clipped."""
+        pcm = to_pcm16(np.array([2.0, -2.0, 0.5], dtype=np.float32))
+
+        assert np.frombuffer(pcm, dtype="<i2").tolist() == [32767, -32768, 16384]
+
+
+class TestResampler:
+    """Tests for polyphase resampling."""
+
+    @pytest.mark.parametrize("in_rate", [8000, 22050, 44100, 48000])
+    def test_tone_keeps_its_frequency(self, in_rate: int) -> None:
+        """Test that a tone below both Nyquist frequencies is preserved."""
+        output = resample(tone(440, in_rate), in_rate, SAMPLE_RATE)
+
+        assert len(output) == SAMPLE_RATE
+        expected = tone(440, SAMPLE_RATE)
+        assert np.abs(output - expected)[100:-100].max() < 1e-3
+
+    def test_frequencies_above_nyquist_are_removed(self) -> None:
+        """Test that a 12 kHz tone does not alias into the 16 kHz output."""
+        output = resample(tone(12000, 44100), 44100, SAMPLE_RATE)
+
+        assert np.abs(output[100:-100]).max() < 1e-3
+
+    def test_blocks_give_the_same_output(self) -> None:
+        """Test that resampling block by block equals resampling at once."""
+        samples = np.random.default_rng(0).normal(0, 0.1, 44100).astype(np.float32)
+
+        at_once = resample(samples, 44100, SAMPLE_RATE)
+        in_blocks = resample(samples, 44100, SAMPLE_RATE, block=777)
+
+        assert np.array_equal(at_once, in_blocks)
+
+    def test_equal_rates_pass_through(self) -> None:
+        """Test that no filtering happens when the rates match."""
+        samples = tone(440, SAMPLE_RATE)
+
+        assert np.array_equal(resample(samples, SAMPLE_RATE, SAMPLE_RATE), samples)
+
+
+class TestFrontend:
+    """Tests for converting PCM streams."""
+
+    def test_partial_frames_are_carried_over(self) -> None:
+        """Test that blocks split inside a frame convert like whole ones."""
+        stereo = np.repeat(tone(440, 48000), 2)
+        pcm = to_pcm16(stereo)
+
+        whole = Frontend(48000, 2, 2, SAMPLE_RATE)
+        expected = np.concatenate([whole.process(pcm), whole.flush()])
+        split = Frontend(48000, 2, 2, SAMPLE_RATE)
+        parts = [split.process(pcm[i : i + 1001]) for i in range(0, len(pcm), 1001)]
+        output = np.concatenate([*parts, split.flush()])
+
+        assert np.array_equal(output, expected)
+
+    def test_stereo_wav_is_decoded_without_ffmpeg(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that open_decoder() converts a 44.1 kHz stereo WAV in-process."""
+        monkeypatch.setattr("shutil.which", lambda name: None)
+        path = tmp_path / "music.wav"
+        with wave.open(str(path), "wb") as wav:
+            wav.setnchannels(2)
+            wav.setsampwidth(2)
+            wav.setframerate(44100)
+            wav.writeframes(to_pcm16(np.repeat(tone(440, 44100, seconds=3.0), 2)))
+
+        with open_decoder(path) as read:
+            pcm = b"".join(iter(lambda: read(4097), b""))
+
+        samples = to_float(pcm, 2)
+        assert len(samples) == 3 * SAMPLE_RATE
+        assert np.abs(samples - tone(440, SAMPLE_RATE, seconds=3.0))[100:-100].max() < 1e-3
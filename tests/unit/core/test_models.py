@@ -0,0 +1,188 @@
+"""Tests for the shared model pool."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from semantics.core import models
+from semantics.core.models import ModelKey, ModelPool, estimate_size, get_model
+
+
+class FakeTensor:
+    """Tensor stand-in reporting a size."""
+
+    def __init__(self, numel: int, element_size: int = 4) -> None:
+        self._numel = numel
+        self._element_size = element_size
+
+    def numel(self) -> int:
+        return self._numel
+
+    def element_size(self) -> int:
+        return self._element_size
+
+
+class FakeModel:
+    """Model with torch-style parameters() and buffers()."""
+
+    def __init__(self, name: str, size: int) -> None:
+        self.name = name
+        self.warm = False
+        self._size = size
+
+    def parameters(self):
+        return iter([FakeTensor(self._size // 4)])
+
+    def buffers(self):
+        return iter([])
+
+
+def key(name: str) -> ModelKey:
+    """Return a CPU key for a fake model."""
+    return ModelKey("fake", name, "cpu", "fp32")
+
+
+class Loader:
+    """Load fake models of fixed sizes and count the loads."""
+
+    def __init__(self, sizes: dict[str, int]) -> None:
+        self.sizes = sizes
+        self.loads: list[str] = []
+
+    def __call__(self, model_key: ModelKey) -> FakeModel:
+        self.loads.append(model_key.name)
+        return FakeModel(model_key.name, self.sizes[model_key.name])
+
+
+class TestModelPool:
+    """Tests for loading, reusing and evicting models."""
+
+    def test_model_is_loaded_and_warmed_up_once(self) -> None:
+        """Test that later requests reuse the loaded, warmed-up model."""
+        pool = ModelPool(budget=1000)
+        load = Loader({"base": 100})
+        warmups = []
+
+        first = pool.get(key("base"), load, warmups.append)
+        second = pool.get(key("base"), load, warmups.append)
+
+        assert first is second
+        assert load.loads == ["base"]
+        assert warmups == [first]
+        assert pool.stats() == models.PoolStats(1, 100, 1000, 1, 1)
+
+    def test_key_components_are_distinct(self) -> None:
+        """Test that device and precision are part of the model's identity."""
+        pool = ModelPool(budget=1000)
+        load = Loader({"base": 100})
+
+        pool.get(ModelKey("fake", "base", "cpu", "fp32"), load)
+        pool.get(ModelKey("fake", "base", "cuda", "fp16"), load)
+
+        assert load.loads == ["base", "base"]
+
+    def test_least_recently_used_model_is_evicted(self) -> None:
+        """Test that loading past the budget drops the least recently used model."""
+        pool = ModelPool(budget=250)
+        load = Loader({"tiny": 100, "base": 100, "small": 100})
+        pool.get(key("tiny"), load)
+        pool.get(key("base"), load)
+        pool.get(key("tiny"), load)
+
+        pool.get(key("small"), load)
+
+        assert key("base") not in pool
+        assert key("tiny") in pool
+        assert key("small") in pool
+        assert pool.size == 200
+
+    def test_oversized_model_is_kept_alone(self) -> None:
+        """Test that a model larger than the budget evicts the others but is kept."""
+        pool = ModelPool(budget=150)
+        load = Loader({"tiny": 100, "large": 500})
+        pool.get(key("tiny"), load)
+
+        model = pool.get(key("large"), load)
+
+        assert pool.get(key("large"), load) is model
+        assert key("tiny") not in pool
+        assert load.loads == ["tiny", "large"]
+
+    def test_other_models_are_available_during_a_load(self) -> None:
+        """Test that a slow load only blocks requests for the same model."""
+        pool = ModelPool(budget=1000)
+        pool.get(key("tiny"), Loader({"tiny": 10}))
+        loading = threading.Event()
+        release = threading.Event()
+        load = Loader({"large": 100})
+
+        def slow_load(model_key: ModelKey) -> FakeModel:
+            loading.set()
+            assert release.wait(10)
+            return load(model_key)
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(pool.get(key("large"), slow_load)))
+            for _ in range(2)
+        ]
+        threads[0].start()
+        assert loading.wait(10)
+        threads[1].start()
+
+        # The pool is not locked while "large" loads
+        assert pool.get(key("tiny"), Loader({})).name == "tiny"
+        release.set()
+        for thread in threads:
+            thread.join(10)
+
+        assert load.loads == ["large"]
+        assert results[0] is results[1]
+
+    def test_discard_and_clear(self) -> None:
+        """Test that models can be dropped explicitly."""
+        pool = ModelPool(budget=1000)
+        load = Loader({"tiny": 10, "base": 10})
+        pool.get(key("tiny"), load)
+        pool.get(key("base"), load)
+
+        assert pool.discard(key("tiny"))
+        assert not pool.discard(key("tiny"))
+        pool.clear()
+        assert pool.stats().models == 0
+
+
+class TestHelpers:
+    """Tests for the module-level helpers."""
+
+    def test_estimate_size_of_wrapped_model(self) -> None:
+        """Test that models wrapping a torch module in `.model` are measured."""
+
+        class Wrapper:
+            model = FakeModel("inner", 400)
+
+        assert estimate_size(FakeModel("plain", 400)) == 400
+        assert estimate_size(Wrapper()) == 400
+        assert estimate_size(object()) == 0
+
+    @pytest.mark.parametrize(("value", "expected"), [("2G", 2 * 1024**3), ("bad", None)])
+    def test_memory_budget_from_environment(
+        self, monkeypatch: pytest.MonkeyPatch, value: str, expected: int | None
+    ) -> None:
+        """Test that SEMANTICS_MODEL_MEMORY sets the budget, falling back if invalid."""
+        monkeypatch.setenv("SEMANTICS_MODEL_MEMORY", value)
+        assert models.get_memory_budget() == (expected or models.DEFAULT_MEMORY_BUDGET)
+
+    def test_get_model_uses_shared_pool(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that get_model() loads through the process-wide pool once."""
+        monkeypatch.setattr(models, "_pool", None)
+        load = Loader({"base": 10})
+
+        first = get_model("fake", "base", load, device="cpu")
+        second = get_model("fake", "base", load, device="cpu")
+
+        assert first is second
+        assert load.loads == ["base"]
+        assert key("base") in models.get_pool()
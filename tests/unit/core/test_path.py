@@ -0,0 +1,63 @@
+"""Tests for the shared path utilities."""
+
+from pathlib import Path
+
+import pytest
+
+from semantics.core.path import expand_inputs, is_glob_pattern
+
+
+class TestExpandInputs:
+    """Tests for the expand_inputs function."""
+
+    def test_single_file(self, tmp_path: Path) -> None:
+        """Test that a file is returned with its name as relative path."""
+        input_file = tmp_path / "a.wav"
+        input_file.touch()
+
+        assert expand_inputs([str(input_file)]) == [(input_file, Path("a.wav"))]
+
+    def test_directory_is_walked(self, tmp_path: Path) -> None:
+        """Test that directories are walked recursively, skipping hidden entries."""
+        (tmp_path / "sub").mkdir()
+        (tmp_path / ".cache").mkdir()
+        (tmp_path / "a.wav").touch()
+        (tmp_path / "sub" / "b.mp4").touch()
+        (tmp_path / ".cache" / "c.wav").touch()
+        (tmp_path / ".d.wav").touch()
+
+        relatives = [relative for _, relative in expand_inputs([str(tmp_path)])]
+
+        assert relatives == [Path("a.wav"), Path("sub/b.mp4")]
+
+    def test_glob_pattern(self, tmp_path: Path) -> None:
+        """Test that glob patterns are expanded relative to their root."""
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "a.wav").touch()
+        (tmp_path / "sub" / "b.wav").touch()
+        (tmp_path / "sub" / "c.pdf").touch()
+
+        found = expand_inputs([str(tmp_path / "**" / "*.wav")])
+
+        assert [relative for _, relative in found] == [Path("a.wav"), Path("sub/b.wav")]
+
+    def test_duplicates_removed(self, tmp_path: Path) -> None:
+        """Test that a file matched twice is only returned once."""
+        input_file = tmp_path / "a.wav"
+        input_file.touch()
+
+        found = expand_inputs([str(input_file), str(tmp_path)])
+
+        assert len(found) == 1
+
+    def test_missing_path_raises(self, tmp_path: Path) -> None:
+        """Test that a missing non-glob path raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            expand_inputs([str(tmp_path / "missing.wav")])
+
+
+def test_is_glob_pattern() -> None:
+    """Test detection of glob wildcards."""
+    assert is_glob_pattern("*.wav")
+    assert is_glob_pattern("data/file[0-9].mp4")
+    assert not is_glob_pattern("data/file.mp4")
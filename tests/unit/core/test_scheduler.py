@@ -0,0 +1,299 @@
+"""Tests for the operation scheduler."""
+
+from __future__ import annotations
+
+import importlib
+import multiprocessing
+import os
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from semantics.core.scheduler import Operation, OperationPools, run_operations
+
+# Handler template: writes <name>.txt, optionally waiting for another
+# operation's marker first so tests can prove two operations overlapped
+HANDLER = '''
+import os
+import time
+from pathlib import Path
+
+VERSION = "1"
+DEPENDS_ON = {depends_on!r}
+WORKLOAD = {workload!r}
+
+
+def handle(input_path, output_path, verbose=False, **options):
+    rendezvous = Path(options["rendezvous"])
+    (rendezvous / "{name}.started").touch()
+    wait_for = options.get("wait_for")
+    if wait_for:
+        deadline = time.monotonic() + 10
+        while not (rendezvous / f"{{wait_for}}.started").exists():
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{name}: {{wait_for}} never started")
+            time.sleep(0.01)
+    if (output_path / "{name}.checkpoint.json").exists():
+        print("[{name}] resumed")
+    if options.get("fail"):
+        if options.get("checkpoint"):
+            (output_path / "{name}.checkpoint.json").write_text("{{}}")
+        raise RuntimeError("{name} failed")
+    read = options.get("read")
+    text = (output_path / read).read_text() if read else input_path.read_text()
+    print("[{name}] pid", os.getpid())
+    print("[{name}] folder", output_path)
+    (output_path / "{name}.txt").write_text(f"{name}:{{text}}")
+'''
+
+
+# Handler template: gets a model from the shared model pool, logging each load
+MODEL_HANDLER = '''
+from semantics.core.models import get_model
+
+VERSION = "1"
+WORKLOAD = "cpu"
+
+
+def handle(input_path, output_path, verbose=False, **options):
+    def load(key):
+        with open(options["loads"], "a") as f:
+            f.write(key.name + "\\n")
+        return object()
+
+    get_model("test", "tiny", load, device="cpu")
+    (output_path / "model.txt").write_text("done")
+'''
+
+
+@pytest.fixture
+def handlers(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Return a factory for importable handler modules."""
+    package = tmp_path / "handlers"
+    package.mkdir()
+    monkeypatch.syspath_prepend(str(package))
+    created = []
+
+    def make(name: str, workload: str = "cpu", depends_on: tuple[str, ...] = ()):
+        source = HANDLER.format(name=name, workload=workload, depends_on=depends_on)
+        (package / f"{name}.py").write_text(textwrap.dedent(source))
+        importlib.invalidate_caches()
+        created.append(name)
+        return importlib.import_module(name)
+
+    yield make
+    for name in created:
+        sys.modules.pop(name, None)
+
+
+@pytest.fixture
+def paths(tmp_path: Path) -> tuple[Path, Path, Path]:
+    """Create an input file, an output folder and a rendezvous folder."""
+    input_path = tmp_path / "input.wav"
+    input_path.write_text("audio")
+    output_path = tmp_path / "output"
+    output_path.mkdir()
+    rendezvous = tmp_path / "rendezvous"
+    rendezvous.mkdir()
+    return input_path, output_path, rendezvous
+
+
+class TestConcurrency:
+    """Tests for running independent operations concurrently."""
+
+    @pytest.mark.parametrize("workload", ["cpu", "io"])
+    def test_independent_operations_overlap(
+        self, handlers, paths, workload: str, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that independent operations run at the same time."""
+        input_path, output_path, rendezvous = paths
+        first = handlers("first", workload)
+        second = handlers("second", workload)
+        operations = [
+            Operation(first, {"rendezvous": str(rendezvous), "wait_for": "second"}),
+            Operation(second, {"rendezvous": str(rendezvous), "wait_for": "first"}),
+        ]
+
+        run_operations(operations, input_path, output_path, use_cache=False)
+
+        assert (output_path / "first.txt").read_text() == "first:audio"
+        assert (output_path / "second.txt").read_text() == "second:audio"
+        assert sorted(p.name for p in output_path.iterdir()) == ["first.txt", "second.txt"]
+        out = capsys.readouterr().out
+        assert "[first] pid" in out
+        assert "[second] pid" in out
+        # Handlers ran in staging folders, but show the output folder
+        assert f"[first] folder {output_path}\n" in out
+        assert f"[second] folder {output_path}\n" in out
+
+    def test_cpu_operations_use_processes_and_io_threads(
+        self, handlers, paths, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that CPU-bound operations run in other processes and I/O-bound in this one."""
+        input_path, output_path, rendezvous = paths
+        operations = [
+            Operation(handlers("crunch", "cpu"), {"rendezvous": str(rendezvous)}),
+            Operation(handlers("fetch", "io"), {"rendezvous": str(rendezvous)}),
+        ]
+
+        run_operations(operations, input_path, output_path, use_cache=False)
+
+        out = capsys.readouterr().out
+        assert f"[fetch] pid {os.getpid()}" in out
+        assert f"[crunch] pid {os.getpid()}" not in out
+
+    def test_worker_processes_are_shut_down(self, handlers, paths) -> None:
+        """Test that no worker processes outlive the run."""
+        input_path, output_path, rendezvous = paths
+        operations = [
+            Operation(handlers("first", "cpu"), {"rendezvous": str(rendezvous)}),
+            Operation(handlers("second", "cpu"), {"rendezvous": str(rendezvous)}),
+        ]
+
+        run_operations(operations, input_path, output_path, use_cache=False)
+
+        assert multiprocessing.active_children() == []
+
+    def test_models_are_loaded_once_for_several_inputs(
+        self, handlers, paths, tmp_path: Path
+    ) -> None:
+        """Test that inputs sharing OperationPools reuse the worker's loaded model."""
+        input_path, output_path, rendezvous = paths
+        fetch = handlers("fetch", "io")
+        (tmp_path / "handlers" / "model_user.py").write_text(MODEL_HANDLER)
+        importlib.invalidate_caches()
+        model_user = importlib.import_module("model_user")
+        loads = tmp_path / "loads.txt"
+        operations = [
+            Operation(model_user, {"loads": str(loads)}),
+            Operation(fetch, {"rendezvous": str(rendezvous)}),
+        ]
+
+        try:
+            with OperationPools() as pools:
+                for name in ("a", "b", "c"):
+                    folder = output_path / name
+                    folder.mkdir()
+                    run_operations(
+                        operations, input_path, folder, use_cache=False, pools=pools
+                    )
+        finally:
+            sys.modules.pop("model_user", None)
+
+        assert all((output_path / name / "model.txt").exists() for name in "abc")
+        assert loads.read_text().splitlines() == ["tiny"]
+        assert multiprocessing.active_children() == []
+
+    def test_single_operation_runs_inline(
+        self, handlers, paths, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that a lone CPU-bound operation runs in this process."""
+        input_path, output_path, rendezvous = paths
+        operation = Operation(handlers("alone", "cpu"), {"rendezvous": str(rendezvous)})
+
+        run_operations([operation], input_path, output_path, use_cache=False)
+
+        assert f"[alone] pid {os.getpid()}" in capsys.readouterr().out
+
+
+class TestDependencies:
+    """Tests for ordering dependent operations."""
+
+    def test_dependent_sees_dependency_output(self, handlers, paths) -> None:
+        """Test that a dependent started next to a running operation gets its inputs."""
+        input_path, output_path, rendezvous = paths
+        first = handlers("first", "io")
+        other = handlers("other", "io")
+        after = handlers("after", "io", depends_on=("first",))
+        rendezvous_opt = {"rendezvous": str(rendezvous)}
+        operations = [
+            Operation(after, {**rendezvous_opt, "read": "first.txt"}),
+            Operation(first, rendezvous_opt),
+            # Keeps running until 'after' has started, so 'after' is staged
+            Operation(other, {**rendezvous_opt, "wait_for": "after"}),
+        ]
+
+        run_operations(operations, input_path, output_path, use_cache=False)
+
+        assert (output_path / "after.txt").read_text() == "after:first:audio"
+        assert (output_path / "first.txt").read_text() == "first:audio"
+        assert not [p for p in output_path.iterdir() if p.name.startswith(".")]
+
+    def test_dependencies_not_requested_are_ignored(self, handlers, paths) -> None:
+        """Test that a dependency that was not requested does not block an operation."""
+        input_path, output_path, rendezvous = paths
+        after = handlers("after", "io", depends_on=("missing",))
+
+        run_operations(
+            [Operation(after, {"rendezvous": str(rendezvous)})],
+            input_path,
+            output_path,
+            use_cache=False,
+        )
+
+        assert (output_path / "after.txt").exists()
+
+    def test_cycle_is_rejected(self, handlers, paths) -> None:
+        """Test that cyclic dependencies are reported."""
+        input_path, output_path, rendezvous = paths
+        ping = handlers("ping", "io", depends_on=("pong",))
+        pong = handlers("pong", "io", depends_on=("ping",))
+        operations = [Operation(ping, {}), Operation(pong, {})]
+
+        with pytest.raises(ValueError, match="Cyclic operation dependencies: ping, pong"):
+            run_operations(operations, input_path, output_path, use_cache=False)
+
+
+class TestFailures:
+    """Tests for operations that fail."""
+
+    def test_failure_is_raised_after_others_finish(self, handlers, paths) -> None:
+        """Test that a failure stops dependents but lets running operations finish."""
+        input_path, output_path, rendezvous = paths
+        rendezvous_opt = {"rendezvous": str(rendezvous)}
+        operations = [
+            Operation(handlers("broken", "io"), {**rendezvous_opt, "fail": True}),
+            Operation(handlers("sound", "io"), {**rendezvous_opt, "wait_for": "broken"}),
+            Operation(handlers("later", "io", depends_on=("broken",)), rendezvous_opt),
+        ]
+
+        with pytest.raises(RuntimeError, match="broken failed"):
+            run_operations(operations, input_path, output_path, use_cache=False)
+
+        assert (output_path / "sound.txt").exists()
+        assert not (rendezvous / "later.started").exists()
+        assert sorted(p.name for p in output_path.iterdir()) == ["sound.txt"]
+
+    def test_checkpointed_staging_is_resumed(
+        self, handlers, paths, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that a failed operation's checkpoint is handed to its next run."""
+        input_path, output_path, rendezvous = paths
+        rendezvous_opt = {"rendezvous": str(rendezvous)}
+        broken = handlers("broken", "io")
+        sound = handlers("sound", "io")
+
+        with pytest.raises(RuntimeError, match="broken failed"):
+            run_operations(
+                [
+                    Operation(broken, {**rendezvous_opt, "fail": True, "checkpoint": True}),
+                    Operation(sound, {**rendezvous_opt, "wait_for": "broken"}),
+                ],
+                input_path,
+                output_path,
+                use_cache=False,
+            )
+        assert [p.name[:8] for p in output_path.glob(".*")] == [".broken-"]
+        capsys.readouterr()
+
+        run_operations(
+            [Operation(broken, rendezvous_opt), Operation(sound, rendezvous_opt)],
+            input_path,
+            output_path,
+            use_cache=False,
+        )
+
+        assert "[broken] resumed" in capsys.readouterr().out
+        assert sorted(p.name for p in output_path.iterdir()) == ["broken.txt", "sound.txt"]
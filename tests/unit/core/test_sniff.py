@@ -0,0 +1,126 @@
+"""Tests for content sniffing."""
+
+from pathlib import Path
+
+import pytest
+
+from semantics.core.sniff import MediaType, sniff_head, sniff_media
+
+
+def box(box_type: bytes, payload: bytes = b"") -> bytes:
+    """Build an ISO-BMFF box."""
+    return (8 + len(payload)).to_bytes(4, "big") + box_type + payload
+
+
+def hdlr(handler_type: bytes) -> bytes:
+    """Build an ISO-BMFF handler reference box."""
+    return box(b"hdlr", b"\x00" * 8 + handler_type + b"\x00" * 12)
+
+
+def mp4(brand: bytes, *handlers: bytes, moov_first: bool = True) -> bytes:
+    """Build a minimal ISO-BMFF file with one track per handler type."""
+    ftyp = box(b"ftyp", brand + b"\x00\x00\x02\x00" + brand)
+    moov = box(b"moov", b"".join(box(b"trak", hdlr(h)) for h in handlers))
+    mdat = box(b"mdat", b"\x00" * 8192)
+    return ftyp + (moov + mdat if moov_first else mdat + moov)
+
+
+# An MPEG-1 Layer III frame: 128 kbps, 44.1 kHz, 417 bytes
+MP3_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+# An ADTS (AAC) frame of 100 bytes
+ADTS_FRAME = b"\xff\xf1\x50\x80\x0c\x9f\xfc" + b"\x00" * 93
+
+
+class TestSniffHead:
+    """Tests for signature detection from the first bytes of a file."""
+
+    @pytest.mark.parametrize(
+        ("head", "expected"),
+        [
+            (b"RIFF\x00\x00\x00\x00WAVEfmt ", MediaType("wav", "audio", False)),
+            (b"RIFF\x00\x00\x00\x00AVI LIST", MediaType("avi", "video", True)),
+            (b"ID3\x04\x00\x00\x00\x00\x00\x00", MediaType("mp3", "audio", False)),
+            (MP3_FRAME * 2, MediaType("mp3", "audio", False)),
+            (ADTS_FRAME * 2, MediaType("aac", "audio", False)),
+            (b"fLaC\x00\x00\x00\x22", MediaType("flac", "audio", False)),
+            (b"OggS\x00\x02" + b"\x00" * 22 + b"\x01vorbis", MediaType("ogg", "audio", False)),
+            (b"OggS\x00\x02" + b"\x00" * 22 + b"\x80theora", MediaType("ogv", "video", True)),
+            (b"%PDF-1.7\n", MediaType("pdf", "document", False)),
+            (b"\x89PNG\r\n\x1a\n\x00\x00", MediaType("png", "document", False)),
+            (b"\xff\xd8\xff\xe0\x00\x10JFIF", MediaType("jpeg", "document", False)),
+            (b"II*\x00\x08\x00\x00\x00", MediaType("tiff", "document", False)),
+            (b"MM\x00*\x00\x00\x00\x08", MediaType("tiff", "document", False)),
+            (b"GIF89a\x01\x00\x01\x00", MediaType("gif", "document", False)),
+        ],
+    )
+    def test_signatures(self, head: bytes, expected: MediaType) -> None:
+        """Test that known signatures are detected."""
+        assert sniff_head(head) == expected
+
+    def test_unknown_content(self) -> None:
+        """Test that plain text is not recognised."""
+        assert sniff_head(b"dummy audio") is None
+
+    def test_utf16_text_is_not_mpeg_audio(self) -> None:
+        """Test that a UTF-16LE byte order mark is not taken for a frame sync."""
+        text = "Hello, this is a plain text file.\n" * 200
+        assert sniff_head(b"\xff\xfe" + text.encode("utf-16-le")) is None
+        assert sniff_head(b"\xff\xfe" + "Hi".encode("utf-16-le")) is None
+
+    def test_lone_frame_sync_is_not_mpeg_audio(self) -> None:
+        """Test that a frame header not followed by another frame is rejected."""
+        assert sniff_head(MP3_FRAME + b"\x00" * 500) is None
+        assert sniff_head(ADTS_FRAME + b"\x00" * 500) is None
+
+    def test_single_frame_file(self) -> None:
+        """Test that a file holding exactly one frame is still recognised."""
+        assert sniff_head(MP3_FRAME) == MediaType("mp3", "audio", False)
+
+    def test_frame_cut_by_the_head(self) -> None:
+        """Test that a frame running past a full head is accepted."""
+        head = (MP3_FRAME * 10)[:4096]
+        assert sniff_head(head) == MediaType("mp3", "audio", False)
+
+    def test_isobmff_with_video(self) -> None:
+        """Test that an MP4 with a video track routes to video."""
+        assert sniff_head(mp4(b"isom", b"soun", b"vide")) == MediaType("mp4", "video", True)
+
+    def test_isobmff_audio_only(self) -> None:
+        """Test that an MP4 with only a sound track routes to audio."""
+        assert sniff_head(mp4(b"isom", b"soun")) == MediaType("m4a", "audio", False)
+
+    def test_isobmff_audio_brand_without_moov(self) -> None:
+        """Test that the M4A brand is used when 'moov' is not in the head."""
+        head = mp4(b"M4A ", b"soun", moov_first=False)[:4096]
+        assert sniff_head(head) == MediaType("m4a", "audio", False)
+
+    def test_isobmff_inconclusive_without_moov(self) -> None:
+        """Test that a video brand without 'moov' in the head is inconclusive."""
+        head = mp4(b"isom", b"vide", moov_first=False)[:4096]
+        assert sniff_head(head) == MediaType("mp4", None, None)
+
+    def test_matroska_tracks(self) -> None:
+        """Test that Matroska track types decide between audio and video."""
+        header = b"\x1a\x45\xdf\xa3\x42\x82\x84webm"
+        video = header + b"\x16\x54\xae\x6b\x83\x81\x01"
+        audio = header + b"\x16\x54\xae\x6b\x83\x81\x02"
+
+        assert sniff_head(video) == MediaType("webm", "video", True)
+        assert sniff_head(audio) == MediaType("webm", "audio", False)
+        assert sniff_head(header) == MediaType("webm", None, None)
+
+
+class TestSniffMedia:
+    """Tests for sniffing files on disk."""
+
+    def test_reads_moov_beyond_head(self, tmp_path: Path) -> None:
+        """Test that a trailing 'moov' box is found with extra reads."""
+        path = tmp_path / "clip.mp4"
+        path.write_bytes(mp4(b"isom", b"vide", moov_first=False))
+
+        assert sniff_media(path) == MediaType("mp4", "video", True)
+
+    def test_missing_file(self, tmp_path: Path) -> None:
+        """Test that unreadable files are not recognised."""
+        assert sniff_media(tmp_path / "missing.wav") is None
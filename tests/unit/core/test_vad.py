@@ -0,0 +1,111 @@
+"""Tests for voice activity detection."""
+
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from semantics.core.vad import SpeechRegion, TimeMap, compact, detect_speech  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def voiced(seconds: float, f0: float = 140.0) -> np.ndarray:
+    """Return a speech-like signal: formant-shaped harmonics in syllables."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+
+    def formants(freq: float) -> float:
+        return np.exp(-(((freq - 500) / 200) ** 2)) + 0.6 * np.exp(
+            -(((freq - 1500) / 300) ** 2)
+        )
+
+    harmonics = sum(
+        (formants(f0 * k) + 0.1) * np.sin(2 * np.pi * f0 * k * t)
+        for k in range(1, int(4000 / f0))
+    )
+    syllables = np.clip(np.sin(2 * np.pi * 3 * t), 0, 1)
+    return (0.1 * harmonics * syllables).astype(np.float32)
+
+
+def silence(seconds: float) -> np.ndarray:
+    """Return near-silent background noise."""
+    rng = np.random.default_rng(0)
+    return rng.normal(0, 1e-4, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+
+def tone(seconds: float) -> np.ndarray:
+    """Return a steady tone, like hold music."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def noise(seconds: float) -> np.ndarray:
+    """Return loud white noise."""
+    rng = np.random.default_rng(1)
+    return rng.normal(0, 0.1, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+
+def seconds(regions: list[SpeechRegion]) -> list[tuple[float, float]]:
+    """Convert regions to rounded seconds."""
+    return [(round(r.start / SAMPLE_RATE, 1), round(r.end / SAMPLE_RATE, 1)) for r in regions]
+
+
+class TestDetectSpeech:
+    """Tests for finding speech regions."""
+
+    def test_speech_between_silences_is_found(self) -> None:
+        """Test that speech is found and padded, and silence is skipped."""
+        samples = np.concatenate([silence(2), voiced(3), silence(3), voiced(2), silence(1)])
+
+        regions = detect_speech(samples, SAMPLE_RATE)
+
+        assert len(regions) == 2
+        (first_start, first_end), (second_start, second_end) = seconds(regions)
+        assert 1.7 <= first_start <= 2.0 and 5.0 <= first_end <= 5.3
+        assert 7.7 <= second_start <= 8.0 and 10.0 <= second_end <= 10.3
+
+    @pytest.mark.parametrize("make", [silence, tone, noise], ids=["silence", "tone", "noise"])
+    def test_non_speech_is_rejected(self, make) -> None:
+        """Test that silence, steady tones and broadband noise are not speech."""
+        samples = np.concatenate([silence(1), make(3), silence(1)])
+
+        assert detect_speech(samples, SAMPLE_RATE) == []
+
+    def test_short_pauses_are_bridged(self) -> None:
+        """Test that a pause shorter than MIN_SILENCE_SECONDS stays inside a region."""
+        samples = np.concatenate([silence(1), voiced(1), silence(0.1), voiced(1), silence(1)])
+
+        assert len(detect_speech(samples, SAMPLE_RATE)) == 1
+
+    def test_too_short_input(self) -> None:
+        """Test that input shorter than a frame has no speech."""
+        assert detect_speech(np.zeros(10, dtype=np.float32), SAMPLE_RATE) == []
+
+
+class TestCompact:
+    """Tests for joining speech regions and mapping times back."""
+
+    def test_compact_joins_regions(self) -> None:
+        """Test that only the samples of the regions are kept, in order."""
+        samples = np.arange(100, dtype=np.int16)
+        regions = [SpeechRegion(10, 20), SpeechRegion(50, 55)]
+
+        joined, _ = compact(samples, regions, sample_rate=10)
+
+        assert joined.tolist() == list(range(10, 20)) + list(range(50, 55))
+
+    def test_times_map_back_to_original_timeline(self) -> None:
+        """Test that times in compacted audio map to the right region."""
+        time_map = TimeMap([SpeechRegion(10, 20), SpeechRegion(50, 55)], sample_rate=10)
+
+        assert time_map.to_original(0.0) == 1.0
+        assert time_map.to_original(0.5) == 1.5
+        assert time_map.to_original(1.2) == 5.2
+        # On the boundary, a start belongs to the next region, an end to the last
+        assert time_map.to_original(1.0) == 5.0
+        assert time_map.to_original(1.0, end=True) == 2.0
+
+    def test_empty_map_is_identity(self) -> None:
+        """Test that a map without regions leaves times unchanged."""
+        assert TimeMap([], SAMPLE_RATE).to_original(3.5) == 3.5
@@ -0,0 +1,91 @@
+"""Tests for the resident worker."""
+
+from __future__ import annotations
+
+import os
+import signal
+import time
+from pathlib import Path
+
+import click
+import pytest
+
+from semantics.core import worker
+
+pytestmark = pytest.mark.skipif(not worker.is_supported(), reason="POSIX only")
+
+
+@click.command()
+@click.argument("name")
+@click.option("--fail", is_flag=True)
+def greet(name: str, fail: bool) -> None:
+    """Print a greeting, or fail on request."""
+    if fail:
+        raise click.ClickException("failed on request")
+    click.echo(f"hello {name} from {os.getcwd()}")
+
+
+@pytest.fixture
+def runtime_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point worker sockets at a temporary runtime directory."""
+    runtime_dir = tmp_path / "run"
+    monkeypatch.setenv("SEMANTICS_RUNTIME_DIR", str(runtime_dir))
+    return runtime_dir
+
+
+@pytest.fixture
+def running_worker(runtime_dir: Path):
+    """Start a worker serving the 'greet' module in a child process."""
+    pid = os.fork()
+    if pid == 0:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        try:
+            worker.serve(greet, ["greet"], "greet")
+        finally:
+            os._exit(0)
+
+    socket_path = runtime_dir / "greet.sock"
+    for _ in range(100):
+        if socket_path.exists():
+            break
+        time.sleep(0.05)
+    yield socket_path
+
+    os.kill(pid, signal.SIGTERM)
+    os.waitpid(pid, 0)
+
+
+class TestRunInWorker:
+    """Tests for running commands through a worker."""
+
+    def test_no_worker_returns_none(self, runtime_dir: Path) -> None:
+        """Test that callers fall back when no worker is running."""
+        assert worker.run_in_worker("greet", ["world"]) is None
+
+    def test_stale_socket_returns_none(self, runtime_dir: Path) -> None:
+        """Test that a socket file without a listener is ignored."""
+        runtime_dir.mkdir()
+        (runtime_dir / "greet.sock").touch()
+        assert worker.run_in_worker("greet", ["world"]) is None
+
+    def test_runs_command_with_caller_stdio_and_cwd(
+        self, running_worker: Path, tmp_path: Path, capfd: pytest.CaptureFixture[str],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that output goes to the caller's stdout and cwd is forwarded."""
+        monkeypatch.chdir(tmp_path)
+
+        assert worker.run_in_worker("greet", ["world"]) == 0
+        assert f"hello world from {tmp_path}" in capfd.readouterr().out
+
+    def test_forwards_exit_code(
+        self, running_worker: Path, capfd: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that a failing command reports its exit code."""
+        assert worker.run_in_worker("greet", ["world", "--fail"]) == 1
+        assert "failed on request" in capfd.readouterr().err
+
+    def test_worker_binds_private_socket(self, running_worker: Path) -> None:
+        """Test that the worker socket is only accessible to its owner."""
+        assert running_worker.stat().st_mode & 0o777 == 0o600
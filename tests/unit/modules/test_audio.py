@@ -25,6 +25,34 @@ class TestAudioModule:
         assert result.exit_code != 0
         assert "At least one operation" in result.output
 
+    def test_audio_transcribe_reuses_cached_result(
+        self, runner: CliRunner, tmp_path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that repeating a transcription reuses the cached result."""
+        from semantics.modules.audio.handlers import transcribe
+
+        dummy_handle = transcribe.handle
+
+        def handle(input_path, output_path, verbose=False, **options) -> None:
+            dummy_handle(input_path, output_path, verbose=verbose, **options)
+            (output_path / f"{input_path.stem}.txt").write_text("transcript")
+
+        # Only results with output files are cached
+        monkeypatch.setattr(transcribe, "handle", handle)
+        input_file = tmp_path / "test.wav"
+        input_file.write_text("dummy audio")
+        args = ["audio", str(input_file), "-o", str(tmp_path / "output"), "--transcribe"]
+
+        first = runner.invoke(main, args)
+        second = runner.invoke(main, args)
+        uncached = runner.invoke(main, [*args, "--no-cache"])
+
+        assert "Transcribing" in first.output
+        assert second.exit_code == 0
+        assert "[CACHE] Reused transcribe result for test.wav" in second.output
+        assert "Transcribing" not in second.output
+        assert "Transcribing" in uncached.output
+
     def test_audio_transcribe(self, runner: CliRunner, tmp_path) -> None:
         """Test audio transcription with --transcribe flag."""
         input_file = tmp_path / "test.wav"
@@ -39,6 +67,49 @@ class TestAudioModule:
         assert "Transcribing" in result.output
         assert "complete" in result.output.lower()
 
+    def test_audio_multiple_inputs(self, runner: CliRunner, tmp_path) -> None:
+        """Test that each of several inputs gets its own output folder."""
+        inputs = []
+        for name in ["first.wav", "second.wav"]:
+            (tmp_path / name).write_text(f"dummy {name}")
+            inputs.append(str(tmp_path / name))
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(main, ["audio", *inputs, "-o", str(output_dir), "--transcribe"])
+
+        assert result.exit_code == 0
+        assert (output_dir / "first.wav").is_dir()
+        assert (output_dir / "second.wav").is_dir()
+
+    def test_audio_duplicate_input_names(self, runner: CliRunner, tmp_path) -> None:
+        """Test that inputs whose output folders would collide are rejected."""
+        for folder in ["a", "b"]:
+            (tmp_path / folder).mkdir()
+            (tmp_path / folder / "test.wav").write_text("dummy")
+
+        result = runner.invoke(
+            main,
+            ["audio", str(tmp_path / "a" / "test.wav"), str(tmp_path / "b" / "test.wav"), "-o", str(tmp_path / "out"), "--transcribe"],
+        )
+
+        assert result.exit_code != 0
+        assert "different file names: test.wav" in result.output
+
+    def test_audio_workers_with_batch_size(self, runner: CliRunner, tmp_path) -> None:
+        """Test that --workers and --batch-size are not combined."""
+        inputs = []
+        for name in ["first.wav", "second.wav"]:
+            (tmp_path / name).write_text(f"dummy {name}")
+            inputs.append(str(tmp_path / name))
+
+        result = runner.invoke(
+            main,
+            ["audio", *inputs, "-o", str(tmp_path / "out"), "--transcribe", "--batch-size", "4", "--workers", "2"],
+        )
+
+        assert result.exit_code != 0
+        assert "--workers cannot be combined with --batch-size" in result.output
+
     def test_audio_extract_metadata(self, runner: CliRunner, tmp_path) -> None:
         """Test audio metadata extraction with --extract-metadata flag."""
         input_file = tmp_path / "test.wav"
@@ -0,0 +1,104 @@
+"""Tests for batched multi-file transcription."""
+
+from __future__ import annotations
+
+import json
+import wave
+from pathlib import Path
+
+from semantics.modules.audio.batch import bucket_of, transcribe_files
+from semantics.modules.audio.stream import SAMPLE_RATE, Segment, Window
+
+
+def write_wav(path: Path, seconds: float) -> Path:
+    """Write a silent 16 kHz mono WAV file."""
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(b"\0\0" * int(seconds * SAMPLE_RATE))
+    return path
+
+
+def read_segments(path: Path) -> list[dict]:
+    """Read a segments file."""
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class FakeBatchModel:
+    """Record batches and return one segment per window naming its length."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[float]] = []
+
+    def __call__(self, windows: list[Window]) -> list[list[Segment]]:
+        lengths = [window.end - window.start for window in windows]
+        self.batches.append(lengths)
+        return [[Segment(1.0, 2.0, f"{length:g}s")] for length in lengths]
+
+
+class TestBucketOf:
+    """Tests for length buckets."""
+
+    def test_windows_of_similar_length_share_a_bucket(self) -> None:
+        """Test that windows are bucketed by BUCKET_SECONDS of length."""
+
+        def window(seconds: float) -> Window:
+            return Window(10.0, b"\0\0" * int(seconds * SAMPLE_RATE), False)
+
+        assert bucket_of(window(3)) == bucket_of(window(4.5)) == 1
+        assert bucket_of(window(14)) == 3
+        assert bucket_of(window(0)) == 1
+
+
+class TestTranscribeFiles:
+    """Tests for bucketing windows across files."""
+
+    def test_windows_are_batched_by_length_and_demultiplexed(self, tmp_path: Path) -> None:
+        """Test that batches hold similar lengths and results reach their file."""
+        jobs = []
+        for name, seconds in [("short1", 4), ("long", 70), ("short2", 3), ("mid", 14)]:
+            output = tmp_path / name
+            output.mkdir()
+            jobs.append((write_wav(tmp_path / f"{name}.wav", seconds), output))
+        model = FakeBatchModel()
+
+        counts = transcribe_files(jobs, model, batch_size=2, vad=False)
+
+        assert counts == [1, 3, 1, 1]
+        # Windows are sent as soon as a bucket holds two of similar length
+        assert model.batches == [[30, 30], [4, 3], [14, 14]]
+        long_segments = read_segments(tmp_path / "long" / "long.segments.jsonl")
+        assert [(s["start"], s["text"]) for s in long_segments] == [
+            (1.0, "30s"),
+            (29.0, "30s"),
+            (57.0, "14s"),
+        ]
+        assert (tmp_path / "short2" / "short2.txt").read_text() == "3s\n"
+
+    def test_results_are_written_in_window_order(self, tmp_path: Path) -> None:
+        """Test that a file's last window finishing first is held back."""
+        output = tmp_path / "out"
+        output.mkdir()
+        jobs = [(write_wav(tmp_path / "talk.wav", 40), output)]
+        model = FakeBatchModel()
+
+        # The 30s window waits for a second one; the 12s tail runs at the end
+        transcribe_files(jobs, model, batch_size=2, vad=False)
+
+        segments = read_segments(output / "talk.segments.jsonl")
+        assert [s["start"] for s in segments] == [1.0, 29.0]
+
+    def test_silent_windows_skip_the_model(self, tmp_path: Path) -> None:
+        """Test that with VAD, windows without speech are not batched."""
+        output = tmp_path / "out"
+        output.mkdir()
+        model = FakeBatchModel()
+
+        counts = transcribe_files(
+            [(write_wav(tmp_path / "quiet.wav", 40), output)], model, batch_size=4
+        )
+
+        assert counts == [0]
+        assert model.batches == []
+        assert (output / "quiet.txt").read_text() == ""
@@ -0,0 +1,188 @@
+"""Tests for reusing transcripts of recordings that sound the same."""
+
+from __future__ import annotations
+
+import json
+import wave
+from pathlib import Path
+
+import click
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from semantics.core.decode import SAMPLE_RATE  # noqa: E402
+from semantics.core.fingerprints import FingerprintIndex  # noqa: E402
+from semantics.modules.audio.fingerprint import (  # noqa: E402
+    MATCH_BIT_ERROR_RATE,
+    Deduplicator,
+    bit_error_rate,
+    fingerprint,
+)
+from semantics.modules.audio.handlers import transcribe  # noqa: E402
+
+
+def chords(seed: int, seconds: float = 30.0) -> np.ndarray:
+    """Return a sequence of random 200 ms chords, as floats."""
+    rng = np.random.default_rng(seed)
+    step = int(0.2 * SAMPLE_RATE)
+    t = np.arange(step) / SAMPLE_RATE
+    pieces = []
+    for _ in range(int(seconds / 0.2)):
+        frequencies = rng.uniform(200, 2500, 3)
+        amplitudes = rng.uniform(0, 1, 3)
+        pieces.append(sum(a * np.sin(2 * np.pi * f * t) for a, f in zip(amplitudes, frequencies)))
+    return (np.concatenate(pieces) * 0.2).astype(np.float32)
+
+
+def re_encoded(samples: np.ndarray, delay: float = 0.0) -> np.ndarray:
+    """Return a quieter, slightly noisy copy, starting after some silence."""
+    rng = np.random.default_rng(99)
+    copy = np.concatenate([np.zeros(int(delay * SAMPLE_RATE), np.float32), samples * 0.5])
+    return copy + rng.normal(0, 0.002, len(copy)).astype(np.float32)
+
+
+def write_wav(path: Path, samples: np.ndarray) -> Path:
+    """Write a mono 16 kHz WAV file."""
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+    return path
+
+
+def write_transcript(output_path: Path, stem: str) -> None:
+    """Write the transcript files of a streaming transcription."""
+    segment = {"start": 2.0, "end": 3.0, "text": "hello"}
+    (output_path / f"{stem}.segments.jsonl").write_text(json.dumps(segment) + "\n")
+    (output_path / f"{stem}.txt").write_text("hello\n")
+
+
+@pytest.fixture
+def deduplicator(tmp_path: Path) -> Deduplicator:
+    """Create a deduplicator with its own index."""
+    return Deduplicator({"model": "base"}, FingerprintIndex(tmp_path / "fingerprints.sqlite"))
+
+
+class TestFingerprint:
+    """Tests for computing and comparing fingerprints."""
+
+    def test_copy_is_close_and_other_recording_is_not(self) -> None:
+        """Test that a quieter, noisy copy keeps most bits and another recording half."""
+        original = fingerprint(chords(1))
+
+        assert original.dtype == np.uint32
+        assert bit_error_rate(original, fingerprint(re_encoded(chords(1)))) < MATCH_BIT_ERROR_RATE
+        assert bit_error_rate(original, fingerprint(chords(2))) > 0.4
+
+    def test_short_input_has_no_fingerprint(self) -> None:
+        """Test that inputs shorter than two frames give an empty fingerprint."""
+        assert len(fingerprint(np.zeros(100, dtype=np.float32))) == 0
+
+
+class TestDeduplicator:
+    """Tests for reusing transcripts."""
+
+    def test_new_recording_is_not_reused(self, deduplicator: Deduplicator, tmp_path: Path) -> None:
+        """Test that the first recording is transcribed and then remembered."""
+        path = write_wav(tmp_path / "first.wav", chords(1))
+
+        assert not deduplicator.reuse(path, tmp_path)
+        write_transcript(tmp_path, "first")
+        deduplicator.remember(path, tmp_path)
+
+        other = write_wav(tmp_path / "other.wav", chords(2))
+        assert not deduplicator.reuse(other, tmp_path)
+
+    def test_identical_content_is_reused(
+        self, deduplicator: Deduplicator, tmp_path: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        """Test that a byte-identical copy gets the transcript under its own name."""
+        path = write_wav(tmp_path / "first.wav", chords(1))
+        deduplicator.reuse(path, tmp_path)
+        write_transcript(tmp_path, "first")
+        deduplicator.remember(path, tmp_path)
+        copy = tmp_path / "forwarded.wav"
+        copy.write_bytes(path.read_bytes())
+
+        assert deduplicator.reuse(copy, tmp_path)
+        assert (tmp_path / "forwarded.txt").read_text() == "hello\n"
+        assert "identical input" in capsys.readouterr().out
+
+    def test_re_encoded_copy_is_reused_with_shifted_times(
+        self, deduplicator: Deduplicator, tmp_path: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        """Test that a delayed copy reuses the transcript, moved by the delay."""
+        path = write_wav(tmp_path / "first.wav", chords(1))
+        deduplicator.reuse(path, tmp_path)
+        write_transcript(tmp_path, "first")
+        deduplicator.remember(path, tmp_path)
+        copy = write_wav(tmp_path / "upload.wav", re_encoded(chords(1), delay=1.0))
+
+        assert deduplicator.reuse(copy, tmp_path)
+        segment = json.loads((tmp_path / "upload.segments.jsonl").read_text())
+        assert segment["text"] == "hello"
+        assert segment["start"] == pytest.approx(3.0, abs=0.07)
+        assert "sounds the same" in capsys.readouterr().out
+
+    def test_other_options_are_not_reused(self, deduplicator: Deduplicator, tmp_path: Path) -> None:
+        """Test that a transcript made with another model is not reused."""
+        path = write_wav(tmp_path / "first.wav", chords(1))
+        deduplicator.reuse(path, tmp_path)
+        write_transcript(tmp_path, "first")
+        deduplicator.remember(path, tmp_path)
+
+        large = Deduplicator({"model": "large"}, deduplicator.index)
+
+        assert not large.reuse(path, tmp_path)
+
+
+class TestHandler:
+    """Tests for --dedupe in the transcribe handler."""
+
+    def test_duplicate_skips_transcription(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the second of two copies is not transcribed."""
+        streamed = []
+
+        def stream(input_path: Path, output_path: Path, *args) -> None:
+            streamed.append(input_path.name)
+            write_transcript(output_path, input_path.stem)
+
+        monkeypatch.setattr(transcribe, "_stream", stream)
+        first = write_wav(tmp_path / "first.wav", chords(1))
+        second = write_wav(tmp_path / "second.wav", re_encoded(chords(1)))
+
+        transcribe.handle(first, tmp_path, dedupe=True, stream=True)
+        transcribe.handle(second, tmp_path, dedupe=True, stream=True)
+
+        assert streamed == ["first.wav"]
+        assert "Transcription complete (reused)" in capsys.readouterr().out
+        assert (tmp_path / "second.txt").read_text() == "hello\n"
+
+    def test_nothing_written_is_not_remembered(self, tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+        """Test that a run writing no transcript does not make copies reuse an empty one."""
+        first = write_wav(tmp_path / "first.wav", chords(1))
+        second = write_wav(tmp_path / "second.wav", chords(1))
+
+        transcribe.handle(first, tmp_path, dedupe=True)
+        transcribe.handle(second, tmp_path, dedupe=True)
+
+        output = capsys.readouterr().out
+        assert output.count("Transcription complete (dummy)") == 2
+        assert "reused" not in output
+
+    def test_missing_numpy_is_reported(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that --dedupe without NumPy asks to install the audio extras."""
+        find_spec = transcribe.importlib.util.find_spec
+        monkeypatch.setattr(
+            transcribe.importlib.util,
+            "find_spec",
+            lambda name, *args: None if name == "numpy" else find_spec(name, *args),
+        )
+        path = write_wav(tmp_path / "first.wav", chords(1, seconds=1))
+
+        with pytest.raises(click.ClickException, match=r'uv pip install -e "\.\[audio\]"'):
+            transcribe.handle(path, tmp_path, dedupe=True)
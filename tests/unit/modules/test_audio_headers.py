@@ -0,0 +1,317 @@
+"""Tests for header-only audio metadata and the bulk catalog."""
+
+from __future__ import annotations
+
+import csv
+import json
+import struct
+import wave
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from semantics.cli import main
+from semantics.modules.audio import headers
+from semantics.modules.audio.catalog import iter_audio_files, write_catalog
+from semantics.modules.audio.headers import read_info
+
+
+def chunk(chunk_id: bytes, data: bytes) -> bytes:
+    """Return a RIFF chunk, padded to an even size."""
+    return chunk_id + struct.pack("<I", len(data)) + data + b"\0" * (len(data) & 1)
+
+
+def write_wav(path: Path, seconds: float = 1.0, rate: int = 16000, info: dict | None = None) -> Path:
+    """Write a mono 16-bit WAV file, with LIST/INFO tags if given."""
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\0\0" * int(seconds * rate))
+    if info:
+        entries = b"".join(chunk(key, value.encode() + b"\0") for key, value in info.items())
+        data = path.read_bytes() + chunk(b"LIST", b"INFO" + entries)
+        path.write_bytes(data[:4] + struct.pack("<I", len(data) - 8) + data[8:])
+    return path
+
+
+def vorbis_comment(comments: dict[str, str]) -> bytes:
+    """Return a Vorbis comment list."""
+    vendor = b"test"
+    data = struct.pack("<I", len(vendor)) + vendor + struct.pack("<I", len(comments))
+    for key, value in comments.items():
+        entry = f"{key}={value}".encode()
+        data += struct.pack("<I", len(entry)) + entry
+    return data
+
+
+def streaminfo(rate: int, channels: int, bits: int, total_samples: int) -> bytes:
+    """Return a FLAC STREAMINFO block body."""
+    packed = (rate << 44) | ((channels - 1) << 41) | ((bits - 1) << 36) | total_samples
+    return b"\0" * 10 + packed.to_bytes(8, "big") + b"\0" * 16
+
+
+def flac_block(block_type: int, data: bytes, last: bool = False) -> bytes:
+    """Return a FLAC metadata block."""
+    return bytes([block_type | (0x80 if last else 0)]) + len(data).to_bytes(3, "big") + data
+
+
+def id3v2_frame(frame_id: str, data: bytes) -> bytes:
+    """Return an ID3v2.3 frame."""
+    return frame_id.encode() + struct.pack(">I", len(data)) + b"\0\0" + data
+
+
+def id3v2_tag(frames: bytes, padding: int = 64) -> bytes:
+    """Return an ID3v2.3 tag holding frames."""
+    size = len(frames) + padding
+    synchsafe = bytes((size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    return b"ID3\x03\x00\x00" + synchsafe + frames + b"\0" * padding
+
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, stereo: 417-byte frames
+MP3_FRAME = b"\xff\xfb\x90\x00" + b"\0" * 413
+
+
+def ogg_page(packets: list[bytes], granule: int = 0, sequence: int = 0) -> bytes:
+    """Return an Ogg page holding whole packets."""
+    lacing = b""
+    for packet in packets:
+        lacing += b"\xff" * (len(packet) // 255) + bytes([len(packet) % 255])
+    header = b"OggS\0\0" + struct.pack("<qIII", granule, 1, sequence, 0)
+    return header + bytes([len(lacing)]) + lacing + b"".join(packets)
+
+
+class TestReadInfo:
+    """Tests for reading metadata from each container."""
+
+    def test_wav(self, tmp_path: Path) -> None:
+        """Test that WAV stream parameters, duration and INFO tags are read."""
+        path = write_wav(tmp_path / "a.wav", 2.5, info={b"INAM": "Intro", b"IART": "Band"})
+
+        info = read_info(path)
+
+        assert (info.format, info.codec) == ("wav", "pcm")
+        assert (info.sample_rate, info.channels, info.bits_per_sample) == (16000, 1, 16)
+        assert info.bitrate == 256000
+        assert info.duration == 2.5
+        assert info.tags == {"title": "Intro", "artist": "Band"}
+
+    def test_flac(self, tmp_path: Path) -> None:
+        """Test that STREAMINFO and Vorbis comments are read."""
+        path = tmp_path / "a.flac"
+        path.write_bytes(
+            b"fLaC"
+            + flac_block(0, streaminfo(48000, 2, 24, 48000 * 90))
+            + flac_block(4, vorbis_comment({"TITLE": "Song", "tracknumber": "3"}), last=True)
+            + b"\0" * 1000
+        )
+
+        info = read_info(path)
+
+        assert (info.format, info.codec) == ("flac", "flac")
+        assert (info.sample_rate, info.channels, info.bits_per_sample) == (48000, 2, 24)
+        assert info.duration == 90.0
+        assert info.tags == {"title": "Song", "track": "3"}
+
+    def test_cbr_mp3_with_id3_tags(self, tmp_path: Path) -> None:
+        """Test ID3v2 text frames, skipped cover art and CBR duration."""
+        cover = id3v2_frame("APIC", b"\0" * (headers.MAX_TAG_SIZE + 1))
+        tag = id3v2_tag(
+            id3v2_frame("TIT2", b"\x00Title")
+            + cover
+            + id3v2_frame("TPE1", b"\x01" + "Artíst".encode("utf-16"))
+        )
+        id3v1 = b"TAG" + b"Old title".ljust(30, b"\0") + b"\0" * 60 + b"1999" + b"\0" * 31
+        path = tmp_path / "a.mp3"
+        path.write_bytes(tag + MP3_FRAME * 100 + id3v1)
+
+        info = read_info(path)
+
+        assert (info.format, info.codec) == ("mpeg", "mp3")
+        assert (info.sample_rate, info.channels, info.bitrate) == (44100, 2, 128000)
+        assert info.duration == pytest.approx(100 * 417 * 8 / 128000, abs=0.001)
+        assert info.tags == {"title": "Title", "artist": "Artíst", "date": "1999"}
+
+    def test_vbr_mp3_uses_xing_frame_count(self, tmp_path: Path) -> None:
+        """Test that the Xing header's frame count gives the duration."""
+        xing = b"\xff\xfb\x90\x00" + b"\0" * 32 + b"Xing" + struct.pack(">II", 1, 1000)
+        path = tmp_path / "a.mp3"
+        path.write_bytes(xing.ljust(417, b"\0") + MP3_FRAME * 10)
+
+        info = read_info(path)
+
+        assert info.duration == pytest.approx(1000 * 1152 / 44100, abs=0.001)
+
+    def test_ogg_vorbis(self, tmp_path: Path) -> None:
+        """Test Vorbis identification and comment headers and the last granule."""
+        identification = b"\x01vorbis" + struct.pack("<IBIiii", 0, 2, 44100, 0, 128000, 0) + b"\x01"
+        comments = b"\x03vorbis" + vorbis_comment({"ARTIST": "Someone"}) + b"\x01"
+        path = tmp_path / "a.ogg"
+        path.write_bytes(
+            ogg_page([identification])
+            + ogg_page([comments], sequence=1)
+            + ogg_page([b"\0" * 300], granule=441000, sequence=2)
+        )
+
+        info = read_info(path)
+
+        assert (info.format, info.codec) == ("ogg", "vorbis")
+        assert (info.sample_rate, info.channels) == (44100, 2)
+        assert info.duration == 10.0
+        assert info.tags == {"artist": "Someone"}
+
+    def test_ogg_opus(self, tmp_path: Path) -> None:
+        """Test that Opus durations count 48 kHz samples after the pre-skip."""
+        identification = b"OpusHead\x01" + struct.pack("<BHIhB", 1, 312, 16000, 0, 0)
+        comments = b"OpusTags" + vorbis_comment({"TITLE": "Memo"})
+        path = tmp_path / "a.opus"
+        path.write_bytes(
+            ogg_page([identification])
+            + ogg_page([comments], sequence=1)
+            + ogg_page([b"\0" * 100], granule=48000 * 5 + 312, sequence=2)
+        )
+
+        info = read_info(path)
+
+        assert (info.codec, info.sample_rate, info.channels) == ("opus", 16000, 1)
+        assert info.duration == 5.0
+        assert info.tags == {"title": "Memo"}
+
+    @pytest.mark.parametrize(
+        "content",
+        [b"dummy audio", b"\xff\xfb\x90\x00 not followed by another frame" * 3, b""],
+        ids=["text", "stray-sync", "empty"],
+    )
+    def test_unrecognized_content(self, tmp_path: Path, content: bytes) -> None:
+        """Test that files without a known container are rejected."""
+        path = tmp_path / "a.mp3"
+        path.write_bytes(content)
+
+        with pytest.raises(ValueError, match="Unrecognized"):
+            read_info(path)
+
+    def test_damaged_headers(self, tmp_path: Path) -> None:
+        """Test that a truncated fmt chunk is reported as damaged."""
+        path = tmp_path / "a.wav"
+        path.write_bytes(b"RIFF\0\0\0\0WAVE" + chunk(b"fmt ", b"\x01\x00"))
+
+        with pytest.raises(ValueError, match="Damaged"):
+            read_info(path)
+
+    def test_only_the_head_is_read(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a long file costs a few small reads."""
+        path = write_wav(tmp_path / "long.wav", 600)
+        reads = []
+        pread = headers._pread
+
+        def counting_pread(fd: int, size: int, offset: int) -> bytes:
+            reads.append(size)
+            return pread(fd, size, offset)
+
+        monkeypatch.setattr(headers, "_pread", counting_pread)
+        read_info(path)
+
+        assert sum(reads) <= headers.HEAD_SIZE
+
+
+class TestCatalog:
+    """Tests for scanning folders into one catalog."""
+
+    @pytest.fixture
+    def library(self, tmp_path: Path) -> Path:
+        """Create a folder tree of audio and other files."""
+        root = tmp_path / "library"
+        (root / "b").mkdir(parents=True)
+        (root / ".hidden").mkdir()
+        write_wav(root / "a.wav", 1.0)
+        write_wav(root / "b" / "c.WAV", 2.0)
+        write_wav(root / ".hidden" / "d.wav")
+        (root / "b" / "broken.mp3").write_bytes(b"not audio")
+        (root / "notes.txt").write_text("not audio")
+        return root
+
+    def test_only_visible_audio_files_are_found(self, library: Path) -> None:
+        """Test that hidden and non-audio files are skipped, in name order."""
+        found = [path.relative_to(library).as_posix() for path in iter_audio_files([library])]
+
+        assert found == ["a.wav", "b/broken.mp3", "b/c.WAV"]
+
+    def test_jsonl_catalog(self, library: Path, tmp_path: Path) -> None:
+        """Test that every file gets a row, unreadable ones with an error."""
+        catalog = tmp_path / "catalog.jsonl"
+
+        stats = write_catalog([library], catalog, workers=2)
+
+        rows = [json.loads(line) for line in catalog.read_text().splitlines()]
+        assert (stats.files, stats.errors) == (3, 1)
+        assert [Path(row["path"]).name for row in rows] == ["a.wav", "broken.mp3", "c.WAV"]
+        assert rows[0]["duration"] == 1.0
+        assert rows[1]["error"] == "Unrecognized audio container"
+        assert rows[2]["duration"] == 2.0
+
+    def test_csv_catalog(self, library: Path, tmp_path: Path) -> None:
+        """Test that a .csv catalog has one column per field and tag."""
+        catalog = tmp_path / "catalog.csv"
+
+        write_catalog([library / "a.wav", library / "b"], catalog)
+
+        with open(catalog, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert [Path(row["path"]).name for row in rows] == ["a.wav", "broken.mp3", "c.WAV"]
+        assert rows[0]["sample_rate"] == "16000"
+        assert rows[0]["title"] == ""
+        assert rows[1]["error"] == "Unrecognized audio container"
+
+
+class TestMetadataCommand:
+    """Tests for the metadata operation and the --catalog mode."""
+
+    def test_extract_metadata_writes_json(self, runner: CliRunner, tmp_path: Path) -> None:
+        """Test that --extract-metadata writes the header metadata."""
+        input_file = write_wav(tmp_path / "talk.wav", 3.0, info={b"INAM": "Talk"})
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(main, ["audio", str(input_file), "-o", str(output_dir), "--extract-metadata"])
+
+        assert result.exit_code == 0
+        metadata = json.loads((output_dir / "talk.metadata.json").read_text())
+        assert metadata["duration"] == 3.0
+        assert metadata["tags"] == {"title": "Talk"}
+        assert "path" not in metadata
+
+    def test_unsupported_container_is_reported(self, runner: CliRunner, tmp_path: Path) -> None:
+        """Test that a container the headers reader does not know is reported as such."""
+        input_file = tmp_path / "song.m4a"
+        input_file.write_bytes(b"\x00\x00\x00\x20ftypM4A " + bytes(100))
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(main, ["audio", str(input_file), "-o", str(output_dir), "--extract-metadata"])
+
+        assert result.exit_code == 0
+        assert "[WARN] Unsupported container: song.m4a (metadata is read from wav, flac, mp3, ogg files)" in result.output
+        metadata = json.loads((output_dir / "song.metadata.json").read_text())
+        assert metadata == {
+            "size": 112,
+            "error": "Unsupported container",
+            "supported_formats": ["wav", "flac", "mp3", "ogg"],
+        }
+
+    def test_catalog_option(self, runner: CliRunner, tmp_path: Path) -> None:
+        """Test that --catalog scans folders without an output folder."""
+        (tmp_path / "in").mkdir()
+        write_wav(tmp_path / "in" / "a.wav")
+        catalog = tmp_path / "catalog.jsonl"
+
+        result = runner.invoke(main, ["audio", str(tmp_path / "in"), "--catalog", str(catalog)])
+
+        assert result.exit_code == 0
+        assert "Cataloged 1 file(s)" in result.output
+        assert len(catalog.read_text().splitlines()) == 1
+
+    def test_folders_need_catalog(self, runner: CliRunner, tmp_path: Path) -> None:
+        """Test that operations reject folder inputs."""
+        result = runner.invoke(main, ["audio", str(tmp_path), "-o", str(tmp_path / "out"), "--extract-metadata"])
+
+        assert result.exit_code != 0
+        assert "only accepted with --catalog" in result.output
@@ -0,0 +1,174 @@
+"""Tests for transcribing one recording on several processes."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import wave
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from semantics.core.checkpoint import Checkpoint  # noqa: E402
+from semantics.modules.audio.parallel import (  # noqa: E402
+    find_cuts,
+    transcribe_parallel,
+)
+from semantics.modules.audio.stream import SAMPLE_RATE, Segment, Window  # noqa: E402
+
+# A one second burst of "speech" every ten seconds, starting at 5 s
+BURST_EVERY = 10
+BURST_SECONDS = 1
+
+
+def bursts(seconds: int) -> np.ndarray:
+    """Return int16 audio with numbered bursts; burst k has amplitude 100 * (k + 1)."""
+    samples = np.zeros(seconds * SAMPLE_RATE, dtype="<i2")
+    for index, start in enumerate(range(5, seconds - BURST_SECONDS, BURST_EVERY)):
+        begin = start * SAMPLE_RATE
+        samples[begin : begin + BURST_SECONDS * SAMPLE_RATE] = 100 * (index + 1)
+    return samples
+
+
+def write_wav(path: Path, samples: np.ndarray) -> Path:
+    """Write a mono 16 kHz WAV file."""
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.tobytes())
+    return path
+
+
+def transcribe_bursts(window: Window) -> list[Segment]:
+    """Transcribe each run of sound in a window as "word<k>"."""
+    samples = np.frombuffer(window.pcm, dtype="<i2")
+    loud = np.flatnonzero(samples)
+    if not len(loud):
+        return []
+    breaks = np.flatnonzero(np.diff(loud) > 1)
+    starts = np.concatenate(([loud[0]], loud[breaks + 1]))
+    ends = np.concatenate((loud[breaks], [loud[-1]])) + 1
+    return [
+        Segment(start / SAMPLE_RATE, end / SAMPLE_RATE, f"word{samples[start] // 100}")
+        for start, end in zip(starts, ends)
+    ]
+
+
+def make_transcriber():
+    """Return the fake transcriber; module-level so workers can unpickle it."""
+    return transcribe_bursts
+
+
+def fail_at_word12(window: Window) -> list[Segment]:
+    """Transcribe like transcribe_bursts(), but fail on hearing burst 12."""
+    segments = transcribe_bursts(window)
+    if any(segment.text == "word12" for segment in segments):
+        raise RuntimeError("preempted")
+    return segments
+
+
+def make_failing_transcriber():
+    """Return a transcriber that fails in the range holding burst 12."""
+    return fail_at_word12
+
+
+def read_segments(output_path: Path, stem: str) -> list[dict]:
+    """Read the segments written by a transcription."""
+    lines = (output_path / f"{stem}.segments.jsonl").read_text().splitlines()
+    return [json.loads(line) for line in lines]
+
+
+class TestFindCuts:
+    """Tests for choosing where to cut a recording."""
+
+    def test_cuts_fall_in_silence(self) -> None:
+        """Test that cuts avoid bursts and stay near equal division points."""
+        samples = bursts(200).astype(np.float32) / 32768
+
+        cuts = find_cuts(samples, SAMPLE_RATE, 4)
+
+        assert len(cuts) == 3
+        for index, cut in enumerate(cuts, start=1):
+            assert samples[cut] == 0
+            assert abs(cut - len(samples) * index // 4) <= 15 * SAMPLE_RATE
+        assert cuts == sorted(cuts)
+
+    def test_cut_moves_off_a_burst(self) -> None:
+        """Test that an ideal cut inside a burst is moved into the silence."""
+        samples = np.zeros(20 * SAMPLE_RATE, dtype=np.float32)
+        samples[9 * SAMPLE_RATE : 11 * SAMPLE_RATE] = 0.5
+
+        (cut,) = find_cuts(samples, SAMPLE_RATE, 2)
+
+        assert not 9 * SAMPLE_RATE <= cut < 11 * SAMPLE_RATE
+
+
+class TestTranscribeParallel:
+    """Tests for transcribing time ranges in worker processes."""
+
+    def test_ranges_are_merged_in_order(self, tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+        """Test that every burst is transcribed exactly once, in order."""
+        path = write_wav(tmp_path / "lecture.wav", bursts(200))
+
+        count = transcribe_parallel(
+            path, tmp_path, "lecture", workers=3, make_transcriber=make_transcriber
+        )
+
+        segments = read_segments(tmp_path, "lecture")
+        assert count == len(segments) == 20
+        assert [s["text"] for s in segments] == [f"word{k}" for k in range(1, 21)]
+        assert [round(s["start"]) for s in segments] == list(range(5, 200, 10))
+        assert "Transcribing 3 range(s)" in capsys.readouterr().out
+        assert (tmp_path / "lecture.txt").read_text().split() == [s["text"] for s in segments]
+
+    def test_uncached_samples_are_sent_to_workers(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that without a decoded file, workers get their slice in memory."""
+        monkeypatch.setenv("SEMANTICS_NO_CACHE", "1")
+        monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "tmp"))
+        (tmp_path / "tmp").mkdir()
+        path = write_wav(tmp_path / "lecture.wav", bursts(200))
+
+        count = transcribe_parallel(
+            path, tmp_path, "lecture", workers=3, make_transcriber=make_transcriber
+        )
+
+        segments = read_segments(tmp_path, "lecture")
+        assert count == 20
+        assert [round(s["start"]) for s in segments] == list(range(5, 200, 10))
+        assert list((tmp_path / "tmp").iterdir()) == []
+
+    def test_short_recording_uses_one_range(self, tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+        """Test that a recording shorter than two ranges is not split."""
+        path = write_wav(tmp_path / "memo.wav", bursts(90))
+
+        count = transcribe_parallel(
+            path, tmp_path, "memo", workers=8, make_transcriber=make_transcriber
+        )
+
+        assert count == 9
+        assert "Transcribing 1 range(s)" in capsys.readouterr().out
+
+    def test_interrupted_ranges_are_resumed(self, tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+        """Test that a resumed run continues every range from its checkpoint."""
+        path = write_wav(tmp_path / "lecture.wav", bursts(200))
+
+        def run(make, resume: bool = False) -> int:
+            checkpoint = Checkpoint(tmp_path / "lecture.checkpoint.json", "key", interval=0)
+            return transcribe_parallel(
+                path, tmp_path, "lecture", 3, make, checkpoint=checkpoint, resume=resume
+            )
+
+        with pytest.raises(RuntimeError, match="preempted"):
+            run(make_failing_transcriber)
+        capsys.readouterr()
+        count = run(make_transcriber, resume=True)
+
+        assert "Found checkpoints for 3 range(s)" in capsys.readouterr().out
+        assert count == 20
+        assert [s["text"] for s in read_segments(tmp_path, "lecture")] == [f"word{k}" for k in range(1, 21)]
+        assert not list(tmp_path.glob("*.checkpoint.json"))
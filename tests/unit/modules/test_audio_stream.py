@@ -0,0 +1,268 @@
+"""Tests for streaming transcription in bounded memory."""
+
+from __future__ import annotations
+
+import io
+import json
+import sys
+import types
+import wave
+from pathlib import Path
+
+import pytest
+
+from semantics.core.checkpoint import Checkpoint
+from semantics.core.decode import open_pcm
+from semantics.core.models import ModelKey
+from semantics.modules.audio.stream import (
+    SAMPLE_RATE,
+    Segment,
+    SegmentStitcher,
+    SpeechOnly,
+    Window,
+    iter_windows,
+    load_whisper,
+    stream_transcribe,
+)
+
+BYTES_PER_SECOND = SAMPLE_RATE * 2
+
+
+def pcm(seconds: float) -> bytes:
+    """Return silent PCM of the given duration."""
+    return b"\0\0" * int(seconds * SAMPLE_RATE)
+
+
+def write_wav(path: Path, seconds: float, rate: int = SAMPLE_RATE) -> Path:
+    """Write a silent mono 16-bit WAV file."""
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\0\0" * int(seconds * rate))
+    return path
+
+
+class TestIterWindows:
+    """Tests for splitting PCM into overlapping windows."""
+
+    def test_windows_overlap_and_cover_the_stream(self) -> None:
+        """Test that windows hop by window - overlap and the last one is final."""
+        windows = list(iter_windows(io.BytesIO(pcm(25)).read, window=10, overlap=2))
+
+        assert [(w.start, w.end, w.final) for w in windows] == [
+            (0.0, 10.0, False),
+            (8.0, 18.0, False),
+            (16.0, 25.0, True),
+        ]
+
+    def test_exact_fit_has_no_empty_tail(self) -> None:
+        """Test that a stream ending on a window boundary ends with that window."""
+        windows = list(iter_windows(io.BytesIO(pcm(18)).read, window=10, overlap=2))
+
+        assert [(w.start, w.end, w.final) for w in windows] == [
+            (0.0, 10.0, False),
+            (8.0, 18.0, True),
+        ]
+
+    def test_empty_stream_has_no_windows(self) -> None:
+        """Test that an empty stream yields nothing."""
+        assert list(iter_windows(io.BytesIO(b"").read)) == []
+
+    def test_reads_are_bounded_by_the_window(self) -> None:
+        """Test that no more than one window is requested from the decoder."""
+        source = io.BytesIO(pcm(300))
+        requested = []
+
+        def read(size: int) -> bytes:
+            requested.append(size)
+            return source.read(size)
+
+        windows = iter_windows(read, window=10, overlap=2)
+        assert sum(1 for _ in windows) == 38
+        assert max(requested) <= 10 * BYTES_PER_SECOND + 2
+
+    def test_invalid_overlap(self) -> None:
+        """Test that an overlap as long as the window is rejected."""
+        with pytest.raises(ValueError):
+            list(iter_windows(io.BytesIO(pcm(1)).read, window=2, overlap=2))
+
+
+class TestSegmentStitcher:
+    """Tests for merging the segments of overlapping windows."""
+
+    def test_overlap_duplicates_are_dropped(self) -> None:
+        """Test that a segment heard by two windows is kept once."""
+        stitcher = SegmentStitcher(overlap=2)
+        first = Window(0.0, pcm(10), False)
+        second = Window(8.0, pcm(10), True)
+
+        kept = stitcher.add(first, [Segment(0, 4, " one"), Segment(8.5, 9.5, " two")])
+        kept += stitcher.add(
+            second, [Segment(0.5, 1.5, " two"), Segment(3, 5, " three")]
+        )
+
+        assert kept == [
+            Segment(0.0, 4.0, "one"),
+            Segment(8.5, 9.5, "two"),
+            Segment(11.0, 13.0, "three"),
+        ]
+
+    def test_segment_straddling_the_cut_goes_to_one_window(self) -> None:
+        """Test that each window keeps only segments centred before its cut."""
+        stitcher = SegmentStitcher(overlap=2)
+        first = Window(0.0, pcm(10), False)
+        second = Window(8.0, pcm(10), True)
+
+        # Cut at 9s: the first window heard the word cut off, the second whole
+        kept = stitcher.add(first, [Segment(8.8, 10.0, "cut")])
+        kept += stitcher.add(second, [Segment(0.8, 1.6, "whole")])
+
+        assert [s.text for s in kept] == ["whole"]
+
+
+class TestStreamTranscribe:
+    """Tests for transcribing a file window by window."""
+
+    def test_segments_are_written_as_windows_finish(self, tmp_path: Path) -> None:
+        """Test that each window's segments are on disk before the next starts."""
+        input_path = write_wav(tmp_path / "long.wav", 70)
+        seen_on_disk = []
+
+        def transcribe(window: Window) -> list[Segment]:
+            lines = (tmp_path / "long.segments.jsonl").read_text().splitlines()
+            seen_on_disk.append(len(lines))
+            return [Segment(10.0, 12.0, f"at {window.start:g}")]
+
+        with open_pcm(input_path) as read:
+            count = stream_transcribe(read, transcribe, tmp_path, "long")
+
+        assert count == 3
+        assert seen_on_disk == [0, 1, 2]
+        records = [
+            json.loads(line)
+            for line in (tmp_path / "long.segments.jsonl").read_text().splitlines()
+        ]
+        assert [r["start"] for r in records] == [10.0, 38.0, 66.0]
+        assert (tmp_path / "long.txt").read_text() == "at 0\nat 28\nat 56\n"
+
+
+class TestResume:
+    """Tests for continuing an interrupted transcription from its checkpoint."""
+
+    @staticmethod
+    def transcribe(window: Window) -> list[Segment]:
+        """Return one segment per window, named after its start."""
+        return [Segment(10.0, 12.0, f"at {window.start:g}")]
+
+    def run(self, input_path: Path, output_path: Path, stop_after: int | None = None, resume: bool = False) -> list[float]:
+        """Transcribe, failing after stop_after windows; return the windows transcribed."""
+        starts = []
+
+        def transcribe(window: Window) -> list[Segment]:
+            if len(starts) == stop_after:
+                raise RuntimeError("preempted")
+            starts.append(window.start)
+            return self.transcribe(window)
+
+        checkpoint = Checkpoint(output_path / "long.checkpoint.json", "key", interval=0)
+        with open_pcm(input_path) as read:
+            stream_transcribe(read, transcribe, output_path, "long", checkpoint=checkpoint, resume=resume)
+        return starts
+
+    def test_resumed_run_matches_uninterrupted_run(self, tmp_path: Path) -> None:
+        """Test that resuming transcribes only the rest and writes the same files."""
+        input_path = write_wav(tmp_path / "long.wav", 100)
+        (tmp_path / "full").mkdir()
+        (tmp_path / "resumed").mkdir()
+        self.run(input_path, tmp_path / "full")
+
+        with pytest.raises(RuntimeError, match="preempted"):
+            self.run(input_path, tmp_path / "resumed", stop_after=2)
+        starts = self.run(input_path, tmp_path / "resumed", resume=True)
+
+        assert starts == [56.0, 84.0]
+        for name in ["long.segments.jsonl", "long.txt"]:
+            assert (tmp_path / "resumed" / name).read_text() == (tmp_path / "full" / name).read_text()
+        assert not (tmp_path / "resumed" / "long.checkpoint.json").exists()
+
+    def test_without_resume_starts_over(self, tmp_path: Path) -> None:
+        """Test that a checkpoint is ignored unless resuming."""
+        input_path = write_wav(tmp_path / "long.wav", 100)
+
+        with pytest.raises(RuntimeError, match="preempted"):
+            self.run(input_path, tmp_path, stop_after=2)
+        starts = self.run(input_path, tmp_path)
+
+        assert starts == [0.0, 28.0, 56.0, 84.0]
+
+
+class TestSpeechOnly:
+    """Tests for sending only the speech in a window to the model."""
+
+    @staticmethod
+    def speech_window() -> Window:
+        """Return a window with 2s of speech-like sound after 1s of silence."""
+        np = pytest.importorskip("numpy")
+        t = np.arange(2 * SAMPLE_RATE) / SAMPLE_RATE
+        harmonics = sum(np.sin(2 * np.pi * f * t) for f in (450, 600, 1500))
+        syllables = np.clip(np.sin(2 * np.pi * 3 * t), 0, 1)
+        speech = (3000 * harmonics * syllables).astype("<i2").tobytes()
+        return Window(0.0, pcm(1) + speech + pcm(2), True)
+
+    def test_only_speech_reaches_the_model(self) -> None:
+        """Test that silence is cut out and timestamps are mapped back."""
+        received = []
+
+        def transcribe(window: Window) -> list[Segment]:
+            received.append(window)
+            return [Segment(0.0, window.end - window.start, "hello")]
+
+        speech_only = SpeechOnly(transcribe)
+        (segment,) = speech_only(self.speech_window())
+
+        assert len(received) == 1
+        assert received[0].end - received[0].start < 3
+        assert 0.7 <= segment.start <= 1.0
+        assert 2.8 <= segment.end <= 3.3
+        assert speech_only.total_seconds == 5.0
+        assert speech_only.speech_seconds < 3
+
+    def test_silent_window_skips_the_model(self) -> None:
+        """Test that a window without speech is not transcribed."""
+        pytest.importorskip("numpy")
+
+        def transcribe(window: Window) -> list[Segment]:
+            raise AssertionError("model called for silence")
+
+        assert SpeechOnly(transcribe)(Window(0.0, pcm(5), True)) == []
+
+
+class TestLoadWhisper:
+    """Tests for loading Whisper models in the key's precision."""
+
+    class FakeWhisperModel:
+        """Whisper model stand-in recording half()."""
+
+        def __init__(self, name: str, device: str) -> None:
+            self.name = name
+            self.device = device
+            self.halved = False
+
+        def half(self):
+            self.halved = True
+            return self
+
+    @pytest.mark.parametrize(("precision", "halved"), [("fp16", True), ("fp32", False)])
+    def test_precision_is_applied(
+        self, monkeypatch: pytest.MonkeyPatch, precision: str, halved: bool
+    ) -> None:
+        """Test that an fp16 key loads the model in half precision."""
+        whisper = types.ModuleType("whisper")
+        whisper.load_model = lambda name, device: self.FakeWhisperModel(name, device)
+        monkeypatch.setitem(sys.modules, "whisper", whisper)
+
+        model = load_whisper(ModelKey("whisper", "base", "cuda", precision))
+
+        assert (model.name, model.device) == ("base", "cuda")
+        assert model.halved is halved
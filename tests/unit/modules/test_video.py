@@ -1,5 +1,8 @@
 """Tests for the video module commands with chained flags."""
 
+import importlib.util
+import json
+
 import pytest
 from click.testing import CliRunner
 
@@ -25,7 +28,7 @@ class TestVideoModule:
         assert result.exit_code != 0
         assert "At least one operation" in result.output
 
-    def test_video_detect_objects(self, runner: CliRunner, tmp_path) -> None:
+    def test_video_detect_objects(self, runner: CliRunner, tmp_path, fake_detection) -> None:
         """Test video object detection with --detect-objects flag."""
         input_file = tmp_path / "test.mp4"
         input_file.write_text("dummy video")
@@ -37,9 +40,106 @@ class TestVideoModule:
         )
         assert result.exit_code == 0
         assert "Detecting objects" in result.output
-        assert "complete" in result.output.lower()
+        assert "[OK] Object detection complete (4 object(s) in 4 frame(s))" in result.output
+        lines = (output_dir / "test.detections.jsonl").read_text().splitlines()
+        records = [json.loads(line) for line in lines]
+        assert [record["time"] for record in records] == [0.0, 0.5, 1.0, 1.5]
+        assert records[0]["objects"] == [
+            {"label": "cat", "score": 0.9, "box": [0.0, 0.0, 6.0, 4.0]}
+        ]
+
+    def test_video_detect_model(
+        self, runner: CliRunner, tmp_path, fake_detection, fake_transcription, monkeypatch
+    ) -> None:
+        """Test that detection gets --detect-model and transcription gets --model."""
+        from semantics.modules.video.handlers import detect_objects
+
+        fake_detector = detect_objects.detector
+        names: list[str] = []
+
+        def detector(name: str, confidence: float):
+            names.append(name)
+            return fake_detector(name, confidence)
+
+        monkeypatch.setattr(detect_objects, "detector", detector)
+        input_file = tmp_path / "test.mp4"
+        input_file.write_text("dummy video")
+
+        for extra in ([], ["--detect-model", "yolov8s"]):
+            result = runner.invoke(
+                main,
+                [
+                    "video", str(input_file), "-o", str(tmp_path / "output"), "--transcribe",
+                    "--detect-objects", "--model", "small", "--no-cache", "-v", *extra,
+                ],
+            )
+            assert result.exit_code == 0, result.output
+            assert "language=en, model=small" in result.output
+
+        assert names == ["yolov8n", "yolov8s"]
+
+    def test_video_detect_objects_without_dependencies(self, runner: CliRunner, tmp_path) -> None:
+        """Test that detection without the video extra reports how to install it."""
+        if importlib.util.find_spec("ultralytics") is not None:
+            pytest.skip("ultralytics is installed")
+        input_file = tmp_path / "test.mp4"
+        input_file.write_text("dummy video")
+
+        result = runner.invoke(
+            main,
+            ["video", str(input_file), "-o", str(tmp_path / "output"), "--detect-objects"],
+        )
+        assert result.exit_code != 0
+        assert 'uv pip install -e ".[video]"' in result.output
+
+    def test_video_transcribe(self, runner: CliRunner, tmp_path, fake_transcription) -> None:
+        """Test that the soundtrack streams through the model into a transcript."""
+        input_file = tmp_path / "test.mp4"
+        input_file.write_text("dummy video")
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(
+            main,
+            ["video", str(input_file), "-o", str(output_dir), "--transcribe", "--no-vad"],
+        )
+        assert result.exit_code == 0
+        assert "[OK] Video transcription complete (1 segment(s))" in result.output
+        assert fake_transcription == [3.0]
+        assert (output_dir / "test.txt").read_text() == "hello\n"
+        assert (output_dir / "test.segments.jsonl").exists()
+
+    def test_video_transcribe_speech_only(
+        self, runner: CliRunner, tmp_path, fake_transcription
+    ) -> None:
+        """Test that --vad (the default) sends the model only the speech."""
+        input_file = tmp_path / "test.mp4"
+        input_file.write_text("dummy video")
 
-    def test_video_chained_operations(self, runner: CliRunner, tmp_path) -> None:
+        result = runner.invoke(
+            main, ["video", str(input_file), "-o", str(tmp_path / "output"), "--transcribe"]
+        )
+        assert result.exit_code == 0
+        assert "[VAD] Sent" in result.output
+
+    def test_video_transcribe_resume(self, runner: CliRunner, tmp_path, fake_transcription) -> None:
+        """Test that --resume looks for a checkpoint of the transcription."""
+        input_file = tmp_path / "test.mp4"
+        input_file.write_text("dummy video")
+
+        result = runner.invoke(
+            main,
+            [
+                "video", str(input_file), "-o", str(tmp_path / "output"), "--transcribe",
+                "--no-vad", "--resume",
+            ],
+        )
+        assert result.exit_code == 0
+        assert "[RESUME] No checkpoint to resume from, starting over" in result.output
+        assert "[OK] Video transcription complete (1 segment(s))" in result.output
+
+    def test_video_chained_operations(
+        self, runner: CliRunner, tmp_path, fake_detection, fake_transcription
+    ) -> None:
         """Test chaining multiple video operations."""
         input_file = tmp_path / "test.mp4"
         input_file.write_text("dummy video")
@@ -52,3 +152,82 @@ class TestVideoModule:
         assert result.exit_code == 0
         assert "Transcribing" in result.output
         assert "Detecting objects" in result.output
+        assert "[DEMUX] Sharing one decoding pass with object detection" in result.output
+        assert "[DEMUX] Sharing one decoding pass with transcription" in result.output
+        assert (output_dir / "test.txt").exists()
+        assert (output_dir / "test.detections.jsonl").exists()
+
+    def test_video_detect_objects_sampling(self, runner: CliRunner, tmp_path, fake_detection) -> None:
+        """Test that --sample and --sample-fps reach the detection handler."""
+        input_file = tmp_path / "test.mp4"
+        input_file.write_text("dummy video")
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(
+            main,
+            [
+                "video", str(input_file), "-o", str(output_dir), "--detect-objects",
+                "--sample", "fps", "--sample-fps", "2", "--verbose",
+            ],
+        )
+        assert result.exit_code == 0
+        assert "sample=fps, sample_fps=2.0, batch_size=8, track=False" in result.output
+        assert "Detecting on sampled frames: fps at 2 fps" in result.output
+        # Detection runs on the frames sampled with these options
+        assert fake_detection == [("fps", 2.0)]
+        assert "in 4 frame(s)" in result.output
+        assert len((output_dir / "test.detections.jsonl").read_text().splitlines()) == 4
+
+    def test_video_chained_operations_sample_once(
+        self, runner: CliRunner, tmp_path, fake_detection, fake_transcription
+    ) -> None:
+        """Test that the shared decoding pass samples frames with --sample."""
+        input_file = tmp_path / "test.mp4"
+        input_file.write_text("dummy video")
+
+        result = runner.invoke(
+            main,
+            [
+                "video", str(input_file), "-o", str(tmp_path / "output"), "--transcribe",
+                "--detect-objects", "--sample", "keyframes",
+            ],
+        )
+        assert result.exit_code == 0
+        assert fake_detection == [("keyframes", 1.0)]
+
+    def test_video_detect_objects_tracking(self, runner: CliRunner, tmp_path, fake_detection) -> None:
+        """Test that --track writes one record per object to the tracks file."""
+        input_file = tmp_path / "test.mp4"
+        input_file.write_text("dummy video")
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(
+            main,
+            [
+                "video", str(input_file), "-o", str(output_dir), "--detect-objects",
+                "--sample", "scene", "--track", "--verbose",
+            ],
+        )
+        assert result.exit_code == 0
+        assert "track=True" in result.output
+        assert "[TRACK] Writing one record per object: test.tracks.jsonl" in result.output
+        assert "[TRACK] Linked 4 detection(s) into 1 track(s)" in result.output
+        lines = (output_dir / "test.tracks.jsonl").read_text().splitlines()
+        assert len(lines) == 1
+        track = json.loads(lines[0])
+        assert track["label"] == "cat"
+        assert (track["start"], track["end"]) == (0.0, 1.5)
+        assert [box[0] for box in track["boxes"]] == [0.0, 0.5, 1.0, 1.5]
+        assert not (output_dir / "test.detections.jsonl").exists()
+
+    def test_video_rejects_unknown_sample(self, runner: CliRunner, tmp_path) -> None:
+        """Test that an unknown sampling strategy is rejected."""
+        input_file = tmp_path / "test.mp4"
+        input_file.write_text("dummy video")
+
+        result = runner.invoke(
+            main,
+            ["video", str(input_file), "-o", str(tmp_path / "out"), "--detect-objects", "--sample", "odd"],
+        )
+        assert result.exit_code != 0
+        assert "--sample" in result.output
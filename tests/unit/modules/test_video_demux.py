@@ -0,0 +1,202 @@
+"""Tests for decoding a video once for transcription and detection."""
+
+from __future__ import annotations
+
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+np = pytest.importorskip("numpy")
+
+from semantics.core.decode import load_audio  # noqa: E402
+from semantics.modules.video import demux  # noqa: E402
+from semantics.modules.video.demux import Demuxer, shared_demuxer  # noqa: E402
+from semantics.modules.video.sampling import FrameSample  # noqa: E402
+
+pytestmark = pytest.mark.skipif(not demux.SINGLE_PASS, reason="needs POSIX pipes")
+
+FRAMES = 10
+
+# Stand-in for ffmpeg: per frame, logs it, writes it to stdout and writes
+# half a second of PCM to the audio pipe; exits with the given code
+FAKE_FFMPEG = """\
+import os, sys
+audio_fd, runs, code = int(sys.argv[1]), sys.argv[2], int(sys.argv[3])
+with open(runs, "a") as f:
+    f.write("run\\n")
+audio = os.fdopen(audio_fd, "wb")
+for n in range(0 if code else %d):
+    sys.stderr.write(f"[Parsed_showinfo_1 @ 0x1] n:{n} pts:{n} pts_time:{n / 2} sar:1/1 s:4x2 i:P\\n")
+    sys.stderr.flush()
+    sys.stdout.buffer.write(bytes([n]) * (4 * 2 * 3))
+    sys.stdout.flush()
+    audio.write(bytes([n, 0]) * 8000)
+    audio.flush()
+sys.exit(code)
+""" % FRAMES
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Make Demuxer run a Python script instead of ffmpeg.
+
+    Returns:
+        A function setting the script's exit code and returning the file
+        that counts its runs.
+    """
+    script = tmp_path / "ffmpeg.py"
+    script.write_text(FAKE_FFMPEG)
+    runs = tmp_path / "runs.txt"
+    runs.touch()
+    exit_code = {"code": 0}
+    monkeypatch.setattr(demux.shutil, "which", lambda name: sys.executable)
+    monkeypatch.setattr(
+        Demuxer,
+        "command",
+        lambda self, ffmpeg, fd: [ffmpeg, str(script), str(fd), str(runs), str(exit_code["code"])],
+    )
+
+    def configure(code: int = 0) -> Path:
+        exit_code["code"] = code
+        return runs
+
+    return configure
+
+
+@pytest.fixture
+def fallbacks(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Record decoding on their own instead of through the demuxer."""
+    used: list[str] = []
+
+    @contextmanager
+    def fake_decoder(input_path: Path):
+        used.append("audio")
+        yield lambda size: b""
+
+    def fake_sample_frames(input_path: Path, sample: str, fps: float):
+        used.append("frames")
+        return iter([])
+
+    monkeypatch.setattr(demux, "open_decoder", fake_decoder)
+    monkeypatch.setattr(demux, "sample_frames", fake_sample_frames)
+    return used
+
+
+def read_all_audio(demuxer: Demuxer, input_path: Path) -> bytes:
+    """Read the whole soundtrack from a demuxer."""
+    with demuxer.open_audio(input_path) as read:
+        return b"".join(iter(lambda: read(3000), b""))
+
+
+class TestDemuxer:
+    """Tests for one ffmpeg process feeding two consumers."""
+
+    def test_both_streams_come_from_one_process(self, fake_ffmpeg, tmp_path: Path) -> None:
+        """Test that concurrent consumers get all frames and audio from one run."""
+        runs = fake_ffmpeg()
+        path = tmp_path / "talk.mp4"
+        frames: list[FrameSample] = []
+        audio: list[bytes] = []
+
+        with shared_demuxer(path, {"sample": "all", "sample_fps": 1.0}) as first:
+            with shared_demuxer(path, {"sample": "all", "sample_fps": 1.0}) as second:
+                assert first is second
+                detect = threading.Thread(target=lambda: frames.extend(first.frames()))
+                detect.start()
+                audio.append(read_all_audio(second, path))
+                detect.join()
+
+        assert [frame.time for frame in frames] == [n / 2 for n in range(FRAMES)]
+        assert [int(frame.frame[0, 0, 0]) for frame in frames] == list(range(FRAMES))
+        assert len(audio[0]) == FRAMES * 16000
+        assert runs.read_text().count("run") == 1
+
+    def test_soundtrack_feeds_load_audio(self, fake_ffmpeg, tmp_path: Path) -> None:
+        """Test that load_audio() caches the soundtrack read from the demuxer."""
+        fake_ffmpeg()
+        path = tmp_path / "talk.mp4"
+        path.write_bytes(b"video")
+        demuxer = Demuxer(path)
+        try:
+            samples = load_audio(path, decoder=demuxer.open_audio)
+        finally:
+            demuxer.close()
+
+        assert len(samples) == FRAMES * 8000
+        assert load_audio(path)[:1].tolist() == [0.0]
+
+    def test_unused_stream_does_not_stall(
+        self, fake_ffmpeg, fallbacks: list[str], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that audio nobody reads is dropped, and a late reader decodes alone."""
+        fake_ffmpeg()
+        monkeypatch.setattr(demux, "AUDIO_QUEUE", 2)
+        path = tmp_path / "talk.mp4"
+        demuxer = Demuxer(path)
+        try:
+            frames = list(demuxer.frames())
+            read_all_audio(demuxer, path)
+        finally:
+            demuxer.close()
+
+        assert len(frames) == FRAMES
+        assert fallbacks == ["audio"]
+
+    def test_failure_before_any_item_falls_back(self, fake_ffmpeg, fallbacks: list[str], tmp_path: Path) -> None:
+        """Test that consumers decode on their own when the shared ffmpeg fails at once."""
+        fake_ffmpeg(code=1)
+        path = tmp_path / "silent.mp4"
+        demuxer = Demuxer(path)
+        try:
+            assert list(demuxer.frames()) == []
+            read_all_audio(demuxer, path)
+        finally:
+            demuxer.close()
+
+        assert fallbacks == ["frames", "audio"]
+
+    def test_no_single_pass_gives_no_demuxer(self, tmp_path: Path) -> None:
+        """Test that handlers decode on their own without the single_pass option."""
+        with shared_demuxer(tmp_path / "talk.mp4", None) as demuxer:
+            assert demuxer is None
+
+
+class TestVideoHandlers:
+    """Tests for the video handlers reading from one shared demuxer."""
+
+    def test_one_ffmpeg_feeds_both_handlers(
+        self,
+        fake_ffmpeg,
+        fake_detection,
+        fake_transcription,
+        runner: CliRunner,
+        tmp_path: Path,
+    ) -> None:
+        """Test that transcription and detection both consume one ffmpeg run."""
+        from semantics.cli import main
+
+        runs = fake_ffmpeg()
+        input_file = tmp_path / "talk.mp4"
+        input_file.write_text("dummy video")
+        output_dir = tmp_path / "output"
+
+        result = runner.invoke(
+            main,
+            [
+                "video", str(input_file), "-o", str(output_dir),
+                "--transcribe", "--detect-objects", "--no-vad",
+            ],
+        )
+
+        assert result.exit_code == 0, result.output
+        assert runs.read_text().count("run") == 1
+        # Neither handler fell back to decoding on its own
+        assert fake_detection == []
+        detections = (output_dir / "talk.detections.jsonl").read_text().splitlines()
+        assert len(detections) == FRAMES
+        assert fake_transcription == [FRAMES / 2]
+        assert (output_dir / "talk.txt").read_text() == "hello\n"
@@ -0,0 +1,169 @@
+"""Tests for the staged frame pipeline of object detection."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from semantics.modules.video import pipeline  # noqa: E402
+from semantics.modules.video.pipeline import (  # noqa: E402
+    IMAGE_SIZE,
+    PAD_VALUE,
+    DetectionPipeline,
+    Detections,
+    Letterbox,
+    detect_frames,
+    letterbox,
+    unletterbox,
+)
+from semantics.modules.video.sampling import FrameSample  # noqa: E402
+
+
+def frames(count: int, height: int = 48, width: int = 64):
+    """Yield frames whose pixels all hold the frame number."""
+    for index in range(count):
+        yield FrameSample(index / 10, np.full((height, width, 3), index, dtype=np.uint8))
+
+
+class TestLetterbox:
+    """Tests for fitting frames into model images."""
+
+    def test_wide_frame_is_padded_above_and_below(self) -> None:
+        """Test that a 4:3 frame fills the width and is centered vertically."""
+        out = np.zeros((3, 32, 32), dtype=np.float32)
+        frame = np.full((48, 64, 3), 255, dtype=np.uint8)
+
+        placement = letterbox(frame, out)
+
+        assert placement == Letterbox(0.5, 0, 4)
+        assert np.allclose(out[:, :4], PAD_VALUE)
+        assert np.allclose(out[:, -4:], PAD_VALUE)
+        assert np.allclose(out[:, 4:28], 1.0)
+
+    def test_channels_come_first(self) -> None:
+        """Test that RGB values land in their own channel planes."""
+        out = np.zeros((3, 16, 16), dtype=np.float32)
+        frame = np.zeros((16, 16, 3), dtype=np.uint8)
+        frame[..., 0] = 255
+
+        letterbox(frame, out)
+
+        assert np.allclose(out[0], 1.0)
+        assert np.allclose(out[1:], 0.0)
+
+    def test_boxes_map_back_to_the_frame(self) -> None:
+        """Test that unletterbox() undoes the scale and padding."""
+        placement = Letterbox(0.5, 0, 4)
+
+        boxes = unletterbox(np.array([[2.0, 6.0, 10.0, 14.0]]), placement)
+
+        assert boxes.tolist() == [[4.0, 4.0, 20.0, 20.0]]
+
+
+class TestDetectionPipeline:
+    """Tests for batching frames through the stages."""
+
+    def test_batches_keep_frame_order_and_times(self) -> None:
+        """Test that frames arrive in order, in full batches and a last partial one."""
+        batches = [
+            (batch.times, batch.images[:, 0, 16, 16].copy())
+            for batch in DetectionPipeline(frames(10), batch_size=4, image_size=32)
+        ]
+
+        assert [len(times) for times, _ in batches] == [4, 4, 2]
+        assert [t for times, _ in batches for t in times] == [i / 10 for i in range(10)]
+        centers = np.concatenate([values for _, values in batches])
+        assert np.allclose(centers, np.arange(10) / 255)
+
+    def test_buffers_are_recycled(self) -> None:
+        """Test that no more than BUFFERS batch buffers are ever used."""
+        seen = {
+            batch.images.__array_interface__["data"][0]
+            for batch in DetectionPipeline(frames(40), batch_size=2, image_size=16)
+        }
+
+        assert len(seen) <= pipeline.BUFFERS
+
+    def test_slow_inference_holds_back_decoding(self) -> None:
+        """Test that the bounded queues stop the decoder running far ahead."""
+        pulled = []
+
+        def source():
+            for frame in frames(100):
+                pulled.append(frame.time)
+                yield frame
+
+        stages = DetectionPipeline(source(), batch_size=2, image_size=16)
+        iterator = iter(stages)
+        next(iterator)
+        threading.Event().wait(0.5)
+
+        # Two queued batches, one being filled and the decoder queue
+        assert len(pulled) <= 2 * (pipeline.BUFFERS + 1) + 1
+        iterator.close()
+
+    def test_source_error_reaches_the_caller(self) -> None:
+        """Test that an error while decoding is raised from the iteration."""
+
+        def failing():
+            yield from frames(3)
+            raise RuntimeError("corrupt frame")
+
+        with pytest.raises(RuntimeError, match="corrupt frame"):
+            list(DetectionPipeline(failing(), batch_size=2, image_size=16))
+
+    def test_stopping_early_closes_the_source(self) -> None:
+        """Test that leaving the loop stops the stages and the frame source."""
+        closed = threading.Event()
+
+        def source():
+            try:
+                yield from frames(1000)
+            finally:
+                closed.set()
+
+        stages = DetectionPipeline(source(), batch_size=2, image_size=16)
+        for _ in stages:
+            break
+
+        assert closed.is_set()
+        assert stages._threads == []
+
+
+class TestDetectFrames:
+    """Tests for running a detector over a frame source."""
+
+    def test_boxes_are_in_frame_coordinates(self) -> None:
+        """Test that each frame's detections come back unletterboxed, with its time."""
+        batches: list[int] = []
+
+        def detect(images: np.ndarray) -> list[Detections]:
+            batches.append(len(images))
+            # 64x48 frames are scaled by 10 and padded by 80 rows
+            box = np.array([[0.0, 80.0, IMAGE_SIZE, IMAGE_SIZE - 80.0]])
+            return [Detections(box, ["dog"], [0.8]) for _ in images]
+
+        found = list(detect_frames(frames(5), detect, batch_size=2))
+
+        assert batches == [2, 2, 1]
+        assert [time for time, _ in found] == [0.0, 0.1, 0.2, 0.3, 0.4]
+        _, detections = found[0]
+        assert np.allclose(detections.boxes, [[0, 0, 64, 48]])
+        assert detections.to_json(0.1) == {
+            "time": 0.1,
+            "objects": [{"label": "dog", "score": 0.8, "box": [0.0, 0.0, 64.0, 48.0]}],
+        }
+
+    def test_frame_without_detections(self) -> None:
+        """Test that a frame the detector found nothing in has no objects."""
+
+        def detect(images: np.ndarray) -> list[Detections]:
+            return [Detections(np.zeros((0, 4)), [], []) for _ in images]
+
+        (time, detections), = detect_frames(frames(1), detect)
+
+        assert detections.boxes.shape == (0, 4)
+        assert detections.to_json(time) == {"time": 0.0, "objects": []}
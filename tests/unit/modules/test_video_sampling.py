@@ -0,0 +1,155 @@
+"""Tests for sampling the frames object detection runs on."""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import click
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from semantics.modules.video import sampling  # noqa: E402
+from semantics.modules.video.sampling import (  # noqa: E402
+    FrameInfo,
+    parse_showinfo,
+    sample_frames,
+    sampling_command,
+    select_filter,
+)
+
+# Lines logged by the showinfo filter of ffmpeg 6 and ffmpeg 4
+SHOWINFO_6 = (
+    "[Parsed_showinfo_1 @ 0x5581] n:   3 pts:  24576 pts_time:1.6     duration:    512 "
+    "duration_time:0.0333333 fmt:yuv420p cl:left sar:1/1 s:320x240 i:P iskey:0 type:P"
+)
+SHOWINFO_4 = (
+    "[Parsed_showinfo_0 @ 0x7f1c] n:   0 pts:      0 pts_time:0       pos:       48 "
+    "fmt:yuv420p sar:1/1 s:64x48 i:P iskey:1 type:I checksum:8AF2 plane_checksum:[1 2 3]"
+)
+
+# Stand-in for ffmpeg: logs three frames of 4x2 pixels at uneven times
+FAKE_FFMPEG = """\
+import sys
+for n, time in enumerate((0.0, 0.4, 1.75)):
+    sys.stderr.write("Stream #0:0: Video: h264\\n")
+    sys.stderr.write(f"[Parsed_showinfo_1 @ 0x1] n:{n} pts:{n} pts_time:{time} sar:1/1 s:4x2 i:P\\n")
+    sys.stderr.flush()
+    sys.stdout.buffer.write(bytes([n]) * (4 * 2 * 3))
+    sys.stdout.flush()
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Make sample_frames() run a Python script instead of ffmpeg."""
+    script = tmp_path / "ffmpeg.py"
+    script.write_text(FAKE_FFMPEG)
+    monkeypatch.setattr(sampling.shutil, "which", lambda name: sys.executable)
+    monkeypatch.setattr(
+        sampling, "sampling_command", lambda ffmpeg, *args: [ffmpeg, str(script)]
+    )
+    return script
+
+
+class TestCommand:
+    """Tests for the ffmpeg command of each strategy."""
+
+    def test_fps_keeps_first_frame_of_each_interval(self) -> None:
+        """Test that fps sampling compares intervals instead of frame distances."""
+        assert select_filter("fps", 2.0) == (
+            "select='isnan(prev_selected_t)+gt(floor(t*2),floor(prev_selected_t*2))',showinfo"
+        )
+
+    def test_scene_has_a_maximum_gap(self) -> None:
+        """Test that scene sampling also keeps a frame every SCENE_MAX_GAP seconds."""
+        condition = select_filter("scene")
+
+        assert f"gt(scene,{sampling.SCENE_THRESHOLD:g})" in condition
+        assert f"gte(t-prev_selected_t,{sampling.SCENE_MAX_GAP:g})" in condition
+
+    def test_keyframes_are_picked_by_the_decoder(self) -> None:
+        """Test that only the keyframes strategy skips non-key frames."""
+        keyframes = sampling_command("ffmpeg", Path("a.mp4"), "keyframes")
+        every = sampling_command("ffmpeg", Path("a.mp4"), "all")
+
+        assert keyframes[keyframes.index("-skip_frame") + 1] == "nokey"
+        assert "-skip_frame" not in every
+        assert keyframes.index("-skip_frame") < keyframes.index("-i")
+
+    def test_unknown_strategy_is_rejected(self) -> None:
+        """Test that an unknown strategy raises ValueError."""
+        with pytest.raises(ValueError, match="Unknown sampling strategy"):
+            select_filter("every-other")
+
+
+class TestShowinfo:
+    """Tests for reading frame times from the ffmpeg log."""
+
+    @pytest.mark.parametrize(
+        ("line", "expected"),
+        [(SHOWINFO_6, FrameInfo(1.6, 320, 240)), (SHOWINFO_4, FrameInfo(0.0, 64, 48))],
+    )
+    def test_frame_lines_are_parsed(self, line: str, expected: FrameInfo) -> None:
+        """Test that time and size are read from old and new ffmpeg versions."""
+        assert parse_showinfo(line) == expected
+
+    def test_other_lines_are_ignored(self) -> None:
+        """Test that stream information is not taken for a frame."""
+        assert parse_showinfo("  Stream #0:0: Video: h264, yuv420p, 320x240, 30 fps") is None
+
+
+class TestSampleFrames:
+    """Tests for decoding sampled frames."""
+
+    def test_frames_keep_their_logged_times(self, fake_ffmpeg: Path) -> None:
+        """Test that each frame is paired with the time ffmpeg logged for it."""
+        samples = list(sample_frames(Path("clip.mp4"), "fps"))
+
+        assert [sample.time for sample in samples] == [0.0, 0.4, 1.75]
+        assert [sample.frame.shape for sample in samples] == [(2, 4, 3)] * 3
+        assert [int(sample.frame[0, 0, 0]) for sample in samples] == [0, 1, 2]
+
+    def test_missing_ffmpeg_is_reported(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that sampling without ffmpeg raises a ClickException."""
+        monkeypatch.setattr(sampling.shutil, "which", lambda name: None)
+
+        with pytest.raises(click.ClickException, match="requires ffmpeg"):
+            list(sample_frames(Path("clip.mp4")))
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+class TestWithFfmpeg:
+    """Tests for sampling a real video."""
+
+    @pytest.fixture
+    def video(self, tmp_path: Path) -> Path:
+        """Encode 3 s of a test pattern at 10 fps with a key frame every second."""
+        path = tmp_path / "pattern.mp4"
+        subprocess.run(
+            [
+                "ffmpeg", "-loglevel", "error", "-f", "lavfi", "-i",
+                "testsrc=size=64x48:rate=10:duration=3", "-g", "10",
+                "-keyint_min", "10", "-sc_threshold", "0", str(path),
+            ],
+            check=True,
+        )
+        return path
+
+    @pytest.mark.parametrize(
+        ("strategy", "times"),
+        [("fps", [0.0, 1.0, 2.0]), ("keyframes", [0.0, 1.0, 2.0])],
+    )
+    def test_sampled_times(self, video: Path, strategy: str, times: list[float]) -> None:
+        """Test that fps and keyframes sampling keep one frame per second."""
+        samples = list(sample_frames(video, strategy, fps=1.0))
+
+        assert [sample.time for sample in samples] == pytest.approx(times)
+        assert samples[0].frame.shape == (48, 64, 3)
+
+    def test_all_frames(self, video: Path) -> None:
+        """Test that every frame is decoded without sampling."""
+        assert len(list(sample_frames(video))) == 30
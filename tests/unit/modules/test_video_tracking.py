@@ -0,0 +1,144 @@
+"""Tests for tracking detected objects across sampled frames."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from semantics.modules.video.tracking import Tracker, iou, write_tracks  # noqa: E402
+
+
+def box(x: float, y: float, size: float = 40) -> list[float]:
+    """Return a square (x1, y1, x2, y2) box at (x, y)."""
+    return [x, y, x + size, y + size]
+
+
+class TestIou:
+    """Tests for the pairwise IoU matrix."""
+
+    def test_pairs(self) -> None:
+        """Test that every pair of boxes gets its IoU."""
+        first = np.array([box(0, 0), box(100, 100)], dtype=float)
+        second = np.array([box(0, 0), box(20, 0), box(500, 500)], dtype=float)
+
+        result = iou(first, second)
+
+        assert result.shape == (2, 3)
+        assert result[0, 0] == pytest.approx(1.0)
+        assert result[0, 1] == pytest.approx(800 / 2400)
+        assert result[0, 2] == 0
+        assert not result[1].any()
+
+    def test_empty(self) -> None:
+        """Test that no boxes on either side give an empty matrix."""
+        assert iou(np.zeros((0, 4)), np.array([box(0, 0)], dtype=float)).shape == (0, 1)
+
+    def test_degenerate_boxes(self) -> None:
+        """Test that empty boxes have no overlap instead of dividing by zero."""
+        flat = np.array([[5.0, 5.0, 5.0, 5.0]])
+        assert iou(flat, flat)[0, 0] == 0
+
+
+class TestTracker:
+    """Tests for linking detections into tracks."""
+
+    def test_moving_object_keeps_its_id(self) -> None:
+        """Test that an object seen on successive frames forms one track."""
+        tracker = Tracker()
+        ids = [
+            tracker.update(step * 0.5, [box(10 * step, 0)], ["car"], [0.6 + step / 100])
+            for step in range(5)
+        ]
+
+        assert ids == [[1]] * 5
+        [track] = tracker.finish()
+        assert (track.id, track.label, track.start, track.end) == (1, "car", 0.0, 2.0)
+        assert track.score == pytest.approx(0.64)
+        assert [entry[0] for entry in track.boxes] == [0.0, 0.5, 1.0, 1.5, 2.0]
+        assert track.boxes[-1][1:] == tuple(box(40, 0))
+
+    def test_prediction_follows_fast_motion(self) -> None:
+        """Test that a fast object is matched where its velocity takes it.
+
+        Each step moves the box 30 pixels, so its last box barely overlaps
+        the next one (IoU 0.14, under the threshold); the prediction does.
+        """
+        first = np.array([box(0, 0)], dtype=float)
+        assert iou(first, np.array([box(30, 0)], dtype=float))[0, 0] < 0.3
+
+        tracker = Tracker()
+        tracker.update(0.0, [box(0, 0)], ["ball"], [0.9])
+        tracker.update(1.0, [box(20, 0)], ["ball"], [0.9])
+        ids = [
+            tracker.update(float(step), [box(20 + 30 * (step - 1), 0)], ["ball"], [0.9])
+            for step in range(2, 8)
+        ]
+
+        assert ids == [[1]] * 6
+        assert len(tracker.finish()) == 1
+
+    def test_labels_are_not_mixed(self) -> None:
+        """Test that a detection only continues a track of its label."""
+        tracker = Tracker()
+        tracker.update(0.0, [box(0, 0)], ["dog"], [0.8])
+        ids = tracker.update(1.0, [box(0, 0)], ["cat"], [0.8])
+
+        assert ids == [2]
+        assert [track.label for track in tracker.finish()] == ["dog", "cat"]
+
+    def test_objects_are_matched_best_first(self) -> None:
+        """Test that nearby objects keep their own tracks."""
+        tracker = Tracker()
+        tracker.update(0.0, [box(0, 0), box(30, 0)], ["person"] * 2, [0.9, 0.9])
+        ids = tracker.update(1.0, [box(32, 0), box(2, 0)], ["person"] * 2, [0.9, 0.9])
+
+        assert ids == [2, 1]
+
+    def test_track_ends_after_misses(self) -> None:
+        """Test that a track ends once unmatched for max_misses frames."""
+        tracker = Tracker(max_misses=2)
+        tracker.update(0.0, [box(0, 0)], ["car"], [0.7])
+        tracker.update(1.0, [], [], [])
+        assert tracker.update(2.0, [box(0, 0)], ["car"], [0.7]) == [1]
+
+        tracker.update(3.0, [], [], [])
+        tracker.update(4.0, [], [], [])
+        assert tracker.update(5.0, [box(0, 0)], ["car"], [0.7]) == [2]
+
+        tracks = tracker.finish()
+        assert [(track.id, track.start, track.end) for track in tracks] == [
+            (1, 0.0, 2.0),
+            (2, 5.0, 5.0),
+        ]
+
+    def test_empty_frames(self) -> None:
+        """Test that frames without detections and trackers without frames work."""
+        tracker = Tracker()
+        assert tracker.update(0.0, np.zeros((0, 4)), [], []) == []
+        assert tracker.finish() == []
+
+
+class TestWriteTracks:
+    """Tests for writing tracks as JSON Lines."""
+
+    def test_one_record_per_track(self, tmp_path) -> None:
+        """Test that each track is written as one rounded JSON record."""
+        tracker = Tracker()
+        tracker.update(0.0, [box(0, 0)], ["car"], [0.91234])
+        tracker.update(1 / 3, [box(1, 0)], ["car"], [0.8])
+        path = tmp_path / "video.tracks.jsonl"
+
+        write_tracks(path, tracker.finish())
+
+        [line] = path.read_text(encoding="utf-8").splitlines()
+        assert json.loads(line) == {
+            "track": 1,
+            "label": "car",
+            "start": 0.0,
+            "end": 0.333,
+            "score": 0.912,
+            "boxes": [[0.0, 0.0, 0.0, 40.0, 40.0], [0.333, 1.0, 0.0, 41.0, 40.0]],
+        }
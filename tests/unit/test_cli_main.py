@@ -1,5 +1,8 @@
 """Tests for the main CLI group, extension mapping, and ModuleRegistry."""
 
+from pathlib import Path
+from unittest.mock import patch
+
 import pytest
 from click.testing import CliRunner
 
@@ -68,3 +71,57 @@ class TestModuleRegistry:
         # Initially no failures
         assert registry.get_unavailable_modules() == []
         assert registry.get_unavailable_modules() == []
+
+    def test_discover_reads_manifests_without_loading(self) -> None:
+        """Test that discover_modules only reads manifests."""
+        registry = ModuleRegistry()
+        registry.discover_modules()
+
+        assert {"audio", "video", "document"} <= registry.get_available_modules()
+        assert registry.commands == {}
+        assert "--transcribe" in registry.manifests["audio"].flags
+        assert ".wav" in registry.manifests["audio"].extensions
+
+    def test_discover_only_one_module(self) -> None:
+        """Test that discover_modules can be limited to a single module."""
+        registry = ModuleRegistry()
+        registry.discover_modules(only="audio")
+
+        assert registry.get_available_modules() == {"audio"}
+        assert registry.get_command("video") is None
+
+    def test_get_command_loads_module_on_demand(self) -> None:
+        """Test that get_command imports only the requested module."""
+        registry = ModuleRegistry()
+        registry.discover_modules()
+
+        cmd = registry.get_command("audio")
+
+        assert cmd is not None
+        assert set(registry.commands) == {"audio"}
+        assert registry.get_command("missing") is None
+
+    def test_discover_loads_modules_without_manifest(self, tmp_path: Path) -> None:
+        """Test that modules without a manifest are loaded eagerly."""
+        module_dir = tmp_path / "extra"
+        module_dir.mkdir()
+        (module_dir / "cli.py").write_text(
+            "import click\n\n@click.command()\ndef cli():\n    pass\n"
+        )
+
+        registry = ModuleRegistry()
+        with patch.object(ModuleRegistry, "_modules_dir", return_value=tmp_path):
+            registry.discover_modules()
+
+        assert "extra" in registry.commands
+        assert registry.manifests == {}
+
+    def test_claimed_extensions_from_manifests(self) -> None:
+        """Test that manifest extensions agree with the static extension map."""
+        registry = ModuleRegistry()
+        registry.discover_modules()
+
+        claimed = registry.get_claimed_extensions()
+
+        for ext, module_name in claimed.items():
+            assert EXTENSION_MAP[ext] == module_name
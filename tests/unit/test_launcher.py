@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import json
+import os
 import sys
 from pathlib import Path
 from unittest.mock import patch, MagicMock
@@ -100,6 +102,121 @@ class TestDiscoverModules:
             assert "video" in modules
 
 
+class TestDiscoveryCache:
+    """Tests for the cached module discovery."""
+
+    @pytest.fixture
+    def install_dir(self, tmp_path: Path) -> Path:
+        """Create an install directory with two module executables."""
+        (tmp_path / "semantics").write_text("launcher")
+        (tmp_path / "semantics-audio").write_text("audio")
+        (tmp_path / "semantics-video").write_text("video")
+        return tmp_path
+
+    @staticmethod
+    def fake_describe(exe_path: Path) -> dict:
+        """Return a --describe payload for a fake executable."""
+        name = exe_path.name.removeprefix("semantics-")
+        return {
+            "version": "1.2.3",
+            "modules": {name: {"help": f"{name} help", "flags": [f"--{name}-op"]}},
+        }
+
+    def test_build_writes_cache_with_module_info(self, install_dir: Path) -> None:
+        """Test that building the cache records version, help and flags."""
+        with patch.object(launcher, "get_install_dir", return_value=install_dir):
+            with patch.object(launcher, "describe_module", side_effect=self.fake_describe):
+                modules = launcher.build_discovery_cache(install_dir)
+
+        assert set(modules) == {"audio", "video"}
+        assert modules["audio"]["version"] == "1.2.3"
+        assert modules["audio"]["flags"] == ["--audio-op"]
+        assert (install_dir / launcher.CACHE_FILE_NAME).exists()
+        assert launcher.read_discovery_cache(install_dir) == modules
+
+    def test_build_skips_excluded_modules(self, install_dir: Path) -> None:
+        """Test that excluded (importable) modules are not described or cached."""
+        with patch.object(launcher, "get_install_dir", return_value=install_dir):
+            with patch.object(launcher, "describe_module", side_effect=self.fake_describe) as describe:
+                modules = launcher.build_discovery_cache(install_dir, frozenset({"audio"}))
+
+        assert set(modules) == {"video"}
+        describe.assert_called_once_with(install_dir / "semantics-video")
+
+    def test_cache_read_without_scanning(self, install_dir: Path) -> None:
+        """Test that a valid cache is used without scanning the directory."""
+        with patch.object(launcher, "get_install_dir", return_value=install_dir):
+            with patch.object(launcher, "describe_module", side_effect=self.fake_describe):
+                launcher.build_discovery_cache(install_dir)
+
+            # Frozen launchers do not bundle any importable modules
+            with patch.object(launcher, "discover_importable_modules", return_value={}):
+                with patch.object(launcher, "discover_modules") as discover:
+                    with patch.object(sys, "frozen", True, create=True):
+                        modules = launcher.load_module_info()
+
+        discover.assert_not_called()
+        assert set(modules) == {"audio", "video"}
+
+    def test_cache_stale_when_module_added(self, install_dir: Path) -> None:
+        """Test that adding an executable invalidates the cache."""
+        with patch.object(launcher, "get_install_dir", return_value=install_dir):
+            with patch.object(launcher, "describe_module", side_effect=self.fake_describe):
+                launcher.build_discovery_cache(install_dir)
+
+        (install_dir / "semantics-document").write_text("document")
+
+        assert launcher.read_discovery_cache(install_dir) is None
+
+    def test_cache_stale_when_module_replaced(self, install_dir: Path) -> None:
+        """Test that overwriting an executable in place invalidates the cache."""
+        with patch.object(launcher, "get_install_dir", return_value=install_dir):
+            with patch.object(launcher, "describe_module", side_effect=self.fake_describe):
+                launcher.build_discovery_cache(install_dir)
+
+        stat = (install_dir / "semantics-audio").stat()
+        (install_dir / "semantics-audio").write_text("audio v2")
+        os.utime(install_dir / "semantics-audio", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert launcher.read_discovery_cache(install_dir) is None
+
+    def test_cache_is_replaced_atomically(self, install_dir: Path) -> None:
+        """Test that a rebuilt cache replaces the file instead of rewriting it."""
+        with patch.object(launcher, "get_install_dir", return_value=install_dir):
+            with patch.object(launcher, "describe_module", side_effect=self.fake_describe):
+                launcher.build_discovery_cache(install_dir)
+                cache_path = install_dir / launcher.CACHE_FILE_NAME
+                reader = cache_path.open(encoding="utf-8")
+                modules = launcher.build_discovery_cache(install_dir)
+
+        # A reader of the old file still sees it whole
+        with reader:
+            assert json.loads(reader.read())["modules"] == modules
+        assert sorted(path.name for path in install_dir.iterdir()) == [
+            launcher.CACHE_FILE_NAME, "semantics", "semantics-audio", "semantics-video"
+        ]
+
+    def test_cache_valid_when_directory_changes(self, install_dir: Path) -> None:
+        """Test that unrelated files in the install directory keep the cache."""
+        with patch.object(launcher, "get_install_dir", return_value=install_dir):
+            with patch.object(launcher, "describe_module", side_effect=self.fake_describe):
+                modules = launcher.build_discovery_cache(install_dir)
+
+        (install_dir / "README.txt").write_text("notes")
+
+        assert launcher.read_discovery_cache(install_dir) == modules
+
+    def test_unreadable_cache_is_ignored(self, install_dir: Path) -> None:
+        """Test that a corrupt cache file is treated as missing."""
+        (install_dir / launcher.CACHE_FILE_NAME).write_text("{not json")
+
+        assert launcher.read_discovery_cache(install_dir) is None
+
+    def test_describe_failure_returns_empty(self, tmp_path: Path) -> None:
+        """Test that describe_module tolerates executables that cannot run."""
+        assert launcher.describe_module(tmp_path / "missing") == {}
+
+
 class TestGetVersion:
     """Tests for get_version function."""
 
@@ -204,6 +321,138 @@ class TestLauncherCLI:
             assert cmd.name == "audio"
 
 
+class TestDelegation:
+    """Tests for delegating module commands to workers and executables."""
+
+    def test_delegates_to_running_worker(self, tmp_path: Path) -> None:
+        """Test that a running worker is used instead of spawning."""
+        audio_exe = tmp_path / "semantics-audio"
+        audio_exe.touch()
+
+        with patch.object(launcher, "_discovered_modules", {"audio": audio_exe}):
+            with patch("semantics.core.worker.run_in_worker", return_value=0) as worker:
+                with patch.object(launcher.subprocess, "run") as run:
+                    result = CliRunner().invoke(launcher.main, ["audio", "x.wav", "--transcribe"])
+
+        assert result.exit_code == 0
+        worker.assert_called_once_with("audio", ["audio", "x.wav", "--transcribe"])
+        run.assert_not_called()
+
+    def test_execs_executable_without_worker(self, tmp_path: Path) -> None:
+        """Test that the launcher is replaced by the executable when no worker is running."""
+        audio_exe = tmp_path / "semantics-audio"
+        audio_exe.touch()
+
+        with patch.object(launcher, "_discovered_modules", {"audio": audio_exe}):
+            with patch("semantics.core.worker.run_in_worker", return_value=None):
+                with patch.object(launcher.sys, "platform", "linux"):
+                    with patch.object(launcher.os, "execv") as execv:
+                        with patch.object(launcher.subprocess, "run") as run:
+                            CliRunner().invoke(launcher.main, ["audio", "x.wav"])
+
+        execv.assert_called_once_with(audio_exe, [str(audio_exe), "audio", "x.wav"])
+        run.assert_not_called()
+
+    def test_exec_failure_is_reported(self, tmp_path: Path) -> None:
+        """Test that an executable that cannot be run gives a clean error."""
+        audio_exe = tmp_path / "semantics-audio"
+        audio_exe.touch()
+
+        with patch.object(launcher, "_discovered_modules", {"audio": audio_exe}):
+            with patch("semantics.core.worker.run_in_worker", return_value=None):
+                with patch.object(launcher.sys, "platform", "linux"):
+                    with patch.object(launcher.os, "execv", side_effect=PermissionError):
+                        result = CliRunner().invoke(launcher.main, ["audio", "x.wav"])
+
+        assert result.exit_code == 1
+        assert "Could not execute 'audio' module." in result.output
+
+    def test_spawns_executable_on_windows(self, tmp_path: Path) -> None:
+        """Test that Windows waits on a child process instead of using execv."""
+        audio_exe = tmp_path / "semantics-audio.exe"
+        audio_exe.touch()
+
+        with patch.object(launcher, "_discovered_modules", {"audio": audio_exe}):
+            with patch("semantics.core.worker.run_in_worker", return_value=None):
+                with patch.object(launcher.sys, "platform", "win32"):
+                    with patch.object(launcher.os, "execv") as execv:
+                        with patch.object(launcher.subprocess, "run") as run:
+                            run.return_value = MagicMock(returncode=3)
+                            result = CliRunner().invoke(launcher.main, ["audio", "x.wav"])
+
+        assert result.exit_code == 3
+        run.assert_called_once_with([str(audio_exe), "audio", "x.wav"])
+        execv.assert_not_called()
+
+
+class TestInProcessDispatch:
+    """Tests for running importable modules inside the launcher process."""
+
+    def test_discovers_importable_modules(self) -> None:
+        """Test that modules shipped as packages are found with their manifest info."""
+        modules = launcher.discover_importable_modules()
+
+        assert {"audio", "video", "document"} <= set(modules)
+        assert Path(modules["audio"]["path"]).name == "cli.py"
+        assert "--transcribe" in modules["audio"]["flags"]
+
+    def test_importable_modules_take_precedence(self, tmp_path: Path) -> None:
+        """Test that an importable module wins over an executable of the same name."""
+        (tmp_path / "semantics-audio").touch()
+
+        with patch.object(launcher, "get_install_dir", return_value=tmp_path):
+            modules = launcher.load_module_info()
+
+        assert "path" in modules["audio"]
+        assert "file" not in modules["audio"]
+
+    def test_runs_module_command_in_process(self, tmp_path: Path) -> None:
+        """Test that importable modules run without a worker or a new process."""
+        input_file = tmp_path / "x.wav"
+        input_file.write_bytes(b"RIFF\x00\x00\x00\x00WAVE")
+        modules = {
+            name: Path(info["path"])
+            for name, info in launcher.discover_importable_modules().items()
+        }
+
+        with patch.object(launcher, "_discovered_modules", modules):
+            with patch("semantics.core.worker.run_in_worker") as worker:
+                with patch.object(launcher.os, "execv") as execv:
+                    with patch.object(launcher.subprocess, "run") as run:
+                        result = CliRunner().invoke(
+                            launcher.main,
+                            ["audio", str(input_file), "-o", str(tmp_path / "out"), "--transcribe"],
+                        )
+
+        assert result.exit_code == 0
+        assert "[AUDIO] Transcribing audio" in result.output
+        worker.assert_not_called()
+        execv.assert_not_called()
+        run.assert_not_called()
+
+
+class TestModuleInfoInHelp:
+    """Tests for using cached module info in help and version output."""
+
+    def test_command_short_help_from_cache(self, tmp_path: Path) -> None:
+        """Test that cached help and flags are listed for each module."""
+        fake_info = {"audio": {"file": "semantics-audio", "help": "Audio things", "flags": ["--transcribe"]}}
+        with patch.object(launcher, "_discovered_modules", {"audio": tmp_path / "semantics-audio"}):
+            with patch.object(launcher, "_module_info", fake_info):
+                result = CliRunner().invoke(launcher.main, ["--help"])
+
+        assert result.exit_code == 0
+        assert "Audio things (--transcribe)" in result.output
+
+    def test_version_message_lists_modules(self) -> None:
+        """Test that cached module versions are included in --version."""
+        fake_info = {"audio": {"file": "semantics-audio", "version": "9.9.9"}}
+        with patch.object(launcher, "_module_info", fake_info):
+            message = launcher.generate_version_message()
+
+        assert "audio 9.9.9" in message
+
+
 class TestGenerateHelpText:
     """Tests for generate_help_text function."""
 
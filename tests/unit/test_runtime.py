@@ -0,0 +1,80 @@
+"""Tests for the shared-runtime entry point."""
+
+from __future__ import annotations
+
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from semantics import runtime
+
+
+class TestGetEntryName:
+    """Tests for detecting the name the runtime was started under."""
+
+    @pytest.mark.parametrize(
+        ("executable", "expected"),
+        [
+            ("/opt/semantics/semantics", "semantics"),
+            ("/opt/semantics/semantics-audio", "semantics-audio"),
+            ("/opt/semantics/semantics-video.exe", "semantics-video"),
+        ],
+    )
+    def test_entry_name_when_frozen(self, executable: str, expected: str) -> None:
+        """Test that the executable name is used when frozen."""
+        with patch.object(sys, "frozen", True, create=True):
+            with patch.object(sys, "executable", executable):
+                assert runtime.get_entry_name() == expected
+
+    def test_entry_name_from_source(self) -> None:
+        """Test that the script name is used when running from source."""
+        with patch.object(sys, "argv", ["/usr/bin/semantics-document"]):
+            assert runtime.get_entry_name() == "semantics-document"
+
+
+class TestGetEntryModule:
+    """Tests for detecting the module a frozen entry point is for."""
+
+    @pytest.mark.parametrize(
+        ("executable", "expected"),
+        [
+            ("/opt/semantics/semantics", None),
+            ("/opt/semantics/semantics-audio", "audio"),
+            ("/opt/semantics/semantics-video.exe", "video"),
+        ],
+    )
+    def test_entry_module_when_frozen(self, executable: str, expected: str | None) -> None:
+        """Test that a module entry point names its module."""
+        with patch.object(sys, "frozen", True, create=True):
+            with patch.object(sys, "executable", executable):
+                assert runtime.get_entry_module() == expected
+
+    def test_entry_module_from_source(self) -> None:
+        """Test that every module is available when running from source."""
+        with patch.object(sys, "argv", ["/usr/bin/semantics-document"]):
+            assert runtime.get_entry_module() is None
+
+
+class TestDispatch:
+    """Tests for dispatching to the launcher or a module CLI."""
+
+    def test_module_entry_runs_module_cli(self) -> None:
+        """Test that semantics-<module> runs the module CLI."""
+        with patch.object(runtime, "get_entry_name", return_value="semantics-audio"):
+            with patch("semantics.cli.main") as cli_main:
+                with patch("semantics.launcher.main") as launcher_main:
+                    runtime.main()
+
+        cli_main.assert_called_once_with()
+        launcher_main.assert_not_called()
+
+    def test_semantics_entry_runs_launcher(self) -> None:
+        """Test that semantics runs the launcher."""
+        with patch.object(runtime, "get_entry_name", return_value="semantics"):
+            with patch("semantics.cli.main") as cli_main:
+                with patch("semantics.launcher.main") as launcher_main:
+                    runtime.main()
+
+        launcher_main.assert_called_once_with()
+        cli_main.assert_not_called()